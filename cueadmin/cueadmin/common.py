@@ -25,6 +25,7 @@ import traceback
 from builtins import object, str
 
 import opencue
+import opencue.batch
 import opencue.wrappers.job
 import opencue.wrappers.proc
 
@@ -45,6 +46,7 @@ __ALL__ = [
     "resolveHostNames",
     "resolveShowNames",
     "confirm",
+    "runBatch",
     "formatTime",
     "formatDuration",
     "formatLongDuration",
@@ -695,6 +697,35 @@ def confirm(msg, force, func, *args, **kwargs):
         return func(*args, **kwargs)
 
 
+def runBatch(description, func, items, *args):
+    """Calls func(item, *args) for every item concurrently, showing the progress
+    on a terminal. Failures are logged, and the first one raised once every item
+    is done.
+
+    :type  description: str
+    :param description: what is done to the items, for the progress and errors
+    :type  func: callable
+    :param func: the action
+    :type  items: list
+    :param items: the hosts, jobs or names to apply it to
+    :rtype:  opencue.batch.BatchResult"""
+    def _printProgress(done, total, item, error):
+        del item, error
+        sys.stderr.write("\r%s: %d/%d" % (description, done, total))
+        if done == total:
+            sys.stderr.write("\n")
+        sys.stderr.flush()
+
+    progress = _printProgress if len(items) > 1 and sys.stderr.isatty() else None
+    result = opencue.batch.BatchExecutor(progress=progress).run(func, items, *args)
+    for item, error in result.failed:
+        logger.error("%s %s failed: %s", description, opencue.rep(item), error)
+    if result.failed and len(items) > 1:
+        logger.error("%s failed for %d of %d", description, len(result.failed), len(items))
+    result.raiseFirstError()
+    return result
+
+
 # These static utility methods are implementations that may or may not
 # need to be moved to the server, but should be someplace common
 #
@@ -1304,25 +1335,33 @@ def handleArgs(args):
     elif args.lock:
         if not hosts:
             raise ValueError(host_error_msg)
-        for host in hosts:
-            logger.debug("locking host: %s", opencue.rep(host))
-            host.lock()
+
+        def lockHost(host_):
+            logger.debug("locking host: %s", opencue.rep(host_))
+            host_.lock()
+
+        runBatch("Locking hosts", lockHost, hosts)
 
     elif args.unlock:
         if not hosts:
             raise ValueError(host_error_msg)
-        for host in hosts:
-            logger.debug("unlocking host: %s", opencue.rep(host))
-            host.unlock()
+
+        def unlockHost(host_):
+            logger.debug("unlocking host: %s", opencue.rep(host_))
+            host_.unlock()
+
+        runBatch("Unlocking hosts", unlockHost, hosts)
 
     elif args.move:
         if not hosts:
             raise ValueError(host_error_msg)
 
+        def moveHost(host_, dst_):
+            logger.debug("moving %s to %s", opencue.rep(host_), opencue.rep(dst_))
+            host_.setAllocation(dst_)
+
         def moveHosts(hosts_, dst_):
-            for host_ in hosts_:
-                logger.debug("moving %s to %s", opencue.rep(host_), opencue.rep(dst_))
-                host_.setAllocation(dst_)
+            runBatch("Moving hosts", moveHost, hosts_, dst_)
 
         confirm(
             "Move %d hosts to %s" % (len(hosts), args.move),
@@ -1336,10 +1375,12 @@ def handleArgs(args):
         if not hosts:
             raise ValueError(host_error_msg)
 
+        def deleteHost(host_):
+            logger.debug("deleting host: %s", host_)
+            host_.delete()
+
         def deleteHosts(hosts_):
-            for host_ in hosts_:
-                logger.debug("deleting host: %s", host_)
-                host_.delete()
+            runBatch("Deleting hosts", deleteHost, hosts_)
 
         confirm("Delete %s hosts" % len(hosts), args.force, deleteHosts, hosts)
 
@@ -1347,12 +1388,14 @@ def handleArgs(args):
         if not hosts:
             raise ValueError(host_error_msg)
 
+        def rebootHost(host_):
+            logger.debug(
+                "locking host and rebooting when idle %s", opencue.rep(host_)
+            )
+            host_.rebootWhenIdle()
+
         def safeReboot(hosts_):
-            for host_ in hosts_:
-                logger.debug(
-                    "locking host and rebooting when idle %s", opencue.rep(host_)
-                )
-                host_.rebootWhenIdle()
+            runBatch("Rebooting hosts", rebootHost, hosts_)
 
         confirm(
             "Lock and reboot %d hosts when idle" % len(hosts),
@@ -1365,10 +1408,12 @@ def handleArgs(args):
         if not hosts:
             raise ValueError(host_error_msg)
 
+        def setHostThreadMode(host_, mode):
+            logger.debug("setting host %s to thread mode %s", host_.data.name, mode)
+            host_.setThreadMode(Convert.strToThreadMode(mode))
+
         def setThreadMode(hosts_, mode):
-            for host_ in hosts_:
-                logger.debug("setting host %s to thread mode %s", host_.data.name, mode)
-                host_.setThreadMode(Convert.strToThreadMode(mode))
+            runBatch("Setting thread mode", setHostThreadMode, hosts_, mode)
 
         confirm(
             "Set %d hosts to thread mode %s" % (len(hosts), args.thread),
@@ -1382,10 +1427,12 @@ def handleArgs(args):
         if not hosts:
             raise ValueError(host_error_msg)
 
+        def setHostRepairState(host_):
+            logger.debug("setting host into the repair state %s", host_.data.name)
+            host_.setHardwareState(opencue.api.host_pb2.REPAIR)
+
         def setRepairState(hosts_):
-            for host_ in hosts_:
-                logger.debug("setting host into the repair state %s", host_.data.name)
-                host_.setHardwareState(opencue.api.host_pb2.REPAIR)
+            runBatch("Setting hosts into repair", setHostRepairState, hosts_)
 
         confirm(
             "Set %d hosts into the Repair state?" % len(hosts),
@@ -1398,10 +1445,12 @@ def handleArgs(args):
         if not hosts:
             raise ValueError(host_error_msg)
 
+        def setHostUpState(host_):
+            logger.debug("setting host into the up state %s", host_.data.name)
+            host_.setHardwareState(opencue.api.host_pb2.UP)
+
         def setUpState(hosts_):
-            for host_ in hosts_:
-                logger.debug("setting host into the repair state %s", host_.data.name)
-                host_.setHardwareState(opencue.api.host_pb2.UP)
+            runBatch("Setting hosts up", setHostUpState, hosts_)
 
         confirm(
             "Set %d hosts into the Up state?" % len(hosts),
@@ -1447,41 +1496,50 @@ def handleArgs(args):
     # Job operations
     #
     elif args.pause:
-        for job_name in args.pause:
+        def pauseJob(job_name):
             job = opencue.api.findJob(job_name)
             logger.debug("pausing job: %s", opencue.rep(job))
             job.pause()
 
+        runBatch("Pausing jobs", pauseJob, args.pause)
+
     elif args.unpause:
-        for job_name in args.unpause:
+        def unpauseJob(job_name):
             job = opencue.api.findJob(job_name)
             logger.debug("unpausing job: %s", opencue.rep(job))
             job.resume()
 
+        runBatch("Unpausing jobs", unpauseJob, args.unpause)
+
     elif args.kill:
+        def killJob(job_name):
+            job = opencue.api.findJob(job_name)
+            logger.debug("killing job: %s", opencue.rep(job))
+            job.kill()
+
         def killJobs(job_names):
-            for job_name in job_names:
-                job = opencue.api.findJob(job_name)
-                logger.debug("killing job: %s", opencue.rep(job))
-                job.kill()
+            runBatch("Killing jobs", killJob, job_names)
 
         confirm("Kill %d job(s)" % len(args.kill), args.force, killJobs, args.kill)
 
     elif args.kill_all:
+        def killAllJob(job):
+            logger.debug("killing job: %s", opencue.rep(job))
+            job.kill()
+
         def killAllJobs():
-            jobs = opencue.api.getJobs()
-            for job in jobs:
-                logger.debug("killing job: %s", opencue.rep(job))
-                job.kill()
+            runBatch("Killing jobs", killAllJob, opencue.api.getJobs())
 
         confirm("Kill ALL jobs", args.force, killAllJobs)
 
     elif args.retry:
+        def retryJob(job_name):
+            job = opencue.api.findJob(job_name)
+            logger.debug("retrying dead frames for job: %s", opencue.rep(job))
+            job.retryFrames()
+
         def retryJobs(job_names):
-            for job_name in job_names:
-                job = opencue.api.findJob(job_name)
-                logger.debug("retrying dead frames for job: %s", opencue.rep(job))
-                job.retryFrames()
+            runBatch("Retrying jobs", retryJob, job_names)
 
         confirm(
             "Retry dead frames for %d job(s)" % len(args.retry),
@@ -1491,11 +1549,12 @@ def handleArgs(args):
         )
 
     elif args.retry_all:
+        def retryAllJob(job):
+            logger.debug("retrying dead frames for job: %s", opencue.rep(job))
+            job.retryFrames()
+
         def retryAllJobs():
-            jobs = opencue.api.getJobs()
-            for job in jobs:
-                logger.debug("retrying dead frames for job: %s", opencue.rep(job))
-                job.retryFrames()
+            runBatch("Retrying jobs", retryAllJob, opencue.api.getJobs())
 
         confirm("Retry dead frames for ALL jobs", args.force, retryAllJobs)
 
@@ -291,6 +291,30 @@ class LockUnlockHostsTest(unittest.TestCase):
         host_mock1.unlock.assert_called_with()
         host_mock2.unlock.assert_called_with()
 
+    def test_lock_continues_after_failure(self, get_stub_mock, host_search_mock):
+        """Test that a host failing to lock doesn't stop the others.
+
+        Verifies that every host is locked and the first failure is raised
+        once they are all done.
+
+        Args:
+            get_stub_mock: Mock for opencue.cuebot.Cuebot.getStub (unused)
+            host_search_mock: Mock for opencue.search.HostSearch
+        """
+        # pylint: disable=unused-argument
+        args = self.parser.parse_args(['-lock', '-host', TEST_HOST1, TEST_HOST2, '-force'])
+        host_mock1 = mock.Mock()
+        host_mock1.lock.side_effect = RuntimeError("host is down")
+        host_mock2 = mock.Mock()
+
+        host_search_mock.byName.return_value = [host_mock1, host_mock2]
+
+        with self.assertRaises(RuntimeError):
+            cueadmin.common.handleArgs(args=args)
+
+        host_mock1.lock.assert_called_with()
+        host_mock2.lock.assert_called_with()
+
 @mock.patch('opencue.search.HostSearch')
 @mock.patch('opencue.cuebot.Cuebot.getStub')
 class AllocationTest(unittest.TestCase):
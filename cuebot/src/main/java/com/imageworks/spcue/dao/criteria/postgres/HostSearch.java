@@ -20,6 +20,7 @@ import java.util.Set;
 
 import com.imageworks.spcue.AllocationInterface;
 import com.imageworks.spcue.dao.criteria.HostSearchInterface;
+import com.imageworks.spcue.dao.criteria.Sort;
 import com.imageworks.spcue.grpc.host.HardwareState;
 import com.imageworks.spcue.grpc.host.LockState;
 import com.imageworks.spcue.grpc.host.HostSearchCriteria;
@@ -57,5 +58,12 @@ public class HostSearch extends Criteria implements HostSearchInterface {
             lockStateItems.add(lockState.toString());
         }
         addPhrase("host.str_lock_state", lockStateItems);
+
+        if (criteria.getFirstResult() > 1 || criteria.getMaxResults() > 0) {
+            // Pages are numbered over a stable order
+            addSort(Sort.asc("host.str_name"));
+            setFirstResult(criteria.getFirstResult());
+            setMaxResults(criteria.getMaxResults());
+        }
     }
 }
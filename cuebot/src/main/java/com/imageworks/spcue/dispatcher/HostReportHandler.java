@@ -55,6 +55,7 @@ import java.sql.Timestamp;
 import java.util.ArrayList;
 import java.util.Comparator;
 import java.util.HashMap;
+import java.util.LinkedHashMap;
 import java.util.List;
 import java.util.Map;
 import java.util.concurrent.ExecutionException;
@@ -122,6 +123,14 @@ public class HostReportHandler {
             .expireAfterWrite(FRAME_KILL_CACHE_EXPIRE_AFTER_WRITE_MINUTES, TimeUnit.MINUTES)
             .build();
 
+    // A cache <hostname, <frameId, info>> of the frames last reported by the hosts sending delta
+    // reports, which only list the frames whose info changed. Entries of hosts that stopped
+    // reporting expire.
+    private static final int REPORTED_FRAMES_CACHE_EXPIRE_AFTER_WRITE_MINUTES = 5;
+    Cache<String, Map<String, RunningFrameInfo>> reportedFramesCache = CacheBuilder.newBuilder()
+            .expireAfterWrite(REPORTED_FRAMES_CACHE_EXPIRE_AFTER_WRITE_MINUTES, TimeUnit.MINUTES)
+            .build();
+
     /**
      * Boolean to toggle if this class is accepting data or not.
      */
@@ -173,6 +182,7 @@ public class HostReportHandler {
 
     public void handleHostReport(HostReport report, boolean isBoot) {
         long startTime = System.currentTimeMillis();
+        report = withUnchangedFrames(report);
         try {
             // Record Prometheus metric for host report
             if (prometheusMetrics != null) {
@@ -365,6 +375,53 @@ public class HostReportHandler {
         }
     }
 
+    /**
+     * Returns a host report listing all the running frames of the host.
+     *
+     * A delta report only lists the frames whose info changed since the previous report, the
+     * frames in its unchanged_frame_ids are taken from the previous reports of the host. Those
+     * this Cuebot didn't get, e.g. when the host reported to another Cuebot, are left out until
+     * RQD sends its next complete report.
+     *
+     * @param report
+     * @return the report with all the frames, which is the given one unless it's a delta report
+     */
+    public HostReport withUnchangedFrames(HostReport report) {
+        String hostname = report.getHost().getName();
+        Map<String, RunningFrameInfo> previous = reportedFramesCache.getIfPresent(hostname);
+        // Only the frames of hosts sending delta reports are kept
+        if (!report.getFramesDelta() && previous == null) {
+            return report;
+        }
+
+        Map<String, RunningFrameInfo> frames = new LinkedHashMap<String, RunningFrameInfo>(
+                report.getFramesCount() + report.getUnchangedFrameIdsCount());
+        for (RunningFrameInfo frame : report.getFramesList()) {
+            frames.put(frame.getFrameId(), frame);
+        }
+        if (!report.getFramesDelta()) {
+            reportedFramesCache.put(hostname, frames);
+            return report;
+        }
+
+        int missing = 0;
+        for (String frameId : report.getUnchangedFrameIdsList()) {
+            RunningFrameInfo frame = previous != null ? previous.get(frameId) : null;
+            if (frame != null) {
+                frames.put(frameId, frame);
+            } else {
+                missing++;
+            }
+        }
+        if (missing > 0) {
+            logger.debug(hostname + " reported " + missing
+                    + " unchanged frames without a previous report, waiting for a full report.");
+        }
+        reportedFramesCache.put(hostname, frames);
+        return report.toBuilder().clearFrames().addAllFrames(frames.values())
+                .clearUnchangedFrameIds().setFramesDelta(false).build();
+    }
+
     /**
      * Check if a reported temp storage size and availability is enough for running a job
      *
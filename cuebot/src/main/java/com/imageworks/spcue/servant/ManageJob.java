@@ -142,6 +142,8 @@ import com.imageworks.spcue.grpc.job.JobShutdownIfCompletedRequest;
 import com.imageworks.spcue.grpc.job.JobShutdownIfCompletedResponse;
 import com.imageworks.spcue.grpc.job.JobStaggerFramesRequest;
 import com.imageworks.spcue.grpc.job.JobStaggerFramesResponse;
+import com.imageworks.spcue.grpc.job.JobStreamUpdatedFramesRequest;
+import com.imageworks.spcue.grpc.job.JobStreamUpdatedFramesResponse;
 import com.imageworks.spcue.grpc.job.LayerSeq;
 import com.imageworks.spcue.grpc.job.UpdatedFrameCheckResult;
 import com.imageworks.spcue.grpc.renderpartition.RenderPartition;
@@ -155,6 +157,7 @@ import com.imageworks.spcue.service.JobManager;
 import com.imageworks.spcue.service.JobManagerSupport;
 import com.imageworks.spcue.service.JobSpec;
 import com.imageworks.spcue.service.LocalBookingSupport;
+import com.imageworks.spcue.service.UpdatedFrameStreamer;
 import com.imageworks.spcue.service.Whiteboard;
 import com.imageworks.spcue.util.Convert;
 import com.imageworks.spcue.util.FrameSet;
@@ -178,6 +181,7 @@ public class ManageJob extends JobInterfaceGrpc.JobInterfaceImplBase {
     private JobInterface job;
     private FrameSearchFactory frameSearchFactory;
     private JobSearchFactory jobSearchFactory;
+    private UpdatedFrameStreamer updatedFrameStreamer;
     private final String property = "frame.finished_jobs_readonly";
     @Autowired
     private Environment env;
@@ -645,6 +649,24 @@ public class ManageJob extends JobInterfaceGrpc.JobInterfaceImplBase {
         }
     }
 
+    @Override
+    public void streamUpdatedFrames(JobStreamUpdatedFramesRequest request,
+            StreamObserver<JobStreamUpdatedFramesResponse> responseObserver) {
+        try {
+            JobInterface streamedJob = jobManagerSupport.getJobManager()
+                    .getJob(request.getJob().getId());
+            updatedFrameStreamer.subscribe(streamedJob,
+                    ServantUtil.convertLayerFilterList(request.getLayerFilter()),
+                    request.getLastCheck(), responseObserver);
+        } catch (IllegalArgumentException e) {
+            responseObserver.onError(Status.INVALID_ARGUMENT.withDescription(e.getMessage())
+                    .asRuntimeException());
+        } catch (EmptyResultDataAccessException e) {
+            responseObserver.onError(
+                    Status.NOT_FOUND.withDescription("Job not found").asRuntimeException());
+        }
+    }
+
     @Override
     public void setMaxRetries(JobSetMaxRetriesRequest request,
             StreamObserver<JobSetMaxRetriesResponse> responseObserver) {
@@ -967,6 +989,14 @@ public class ManageJob extends JobInterfaceGrpc.JobInterfaceImplBase {
         job = jobManager.getJob(jobData.getId());
     }
 
+    public UpdatedFrameStreamer getUpdatedFrameStreamer() {
+        return updatedFrameStreamer;
+    }
+
+    public void setUpdatedFrameStreamer(UpdatedFrameStreamer updatedFrameStreamer) {
+        this.updatedFrameStreamer = updatedFrameStreamer;
+    }
+
     public FrameSearchFactory getFrameSearchFactory() {
         return frameSearchFactory;
     }
@@ -0,0 +1,378 @@
+/*
+ * Copyright Contributors to the OpenCue Project
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+ * in compliance with the License. You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software distributed under the License
+ * is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+ * or implied. See the License for the specific language governing permissions and limitations under
+ * the License.
+ */
+
+package com.imageworks.spcue.service;
+
+import java.util.ArrayList;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.Set;
+import java.util.TreeSet;
+import java.util.concurrent.ConcurrentHashMap;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.RejectedExecutionException;
+import java.util.concurrent.ScheduledExecutorService;
+import java.util.concurrent.ThreadFactory;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.atomic.AtomicBoolean;
+
+import io.grpc.Status;
+import io.grpc.stub.ServerCallStreamObserver;
+import io.grpc.stub.StreamObserver;
+import org.apache.logging.log4j.LogManager;
+import org.apache.logging.log4j.Logger;
+import org.springframework.dao.EmptyResultDataAccessException;
+
+import com.imageworks.spcue.JobInterface;
+import com.imageworks.spcue.LayerInterface;
+import com.imageworks.spcue.grpc.job.JobState;
+import com.imageworks.spcue.grpc.job.JobStreamUpdatedFramesResponse;
+import com.imageworks.spcue.grpc.job.UpdatedFrame;
+import com.imageworks.spcue.grpc.job.UpdatedFrameCheckResult;
+import com.imageworks.spcue.grpc.job.UpdatedFrameSeq;
+
+/**
+ * Pushes the updated frames of jobs to the clients of the StreamUpdatedFrames rpc.
+ *
+ * Clients watching the same job with the same layer filter share a feed, and each feed is checked
+ * for updated frames once per poll interval on a bounded pool of threads, one check of a feed at a
+ * time. The database is queried once per watched job rather than once per client, and only changes
+ * are sent. Changes for a client that isn't ready for more are merged until it is.
+ */
+public class UpdatedFrameStreamer {
+    private static final Logger logger = LogManager.getLogger(UpdatedFrameStreamer.class);
+
+    private static final long DEFAULT_POLL_INTERVAL_MILLIS = 1000;
+    private static final int DEFAULT_CHECK_THREADS = 4;
+
+    private Whiteboard whiteboard;
+    private long pollIntervalMillis = DEFAULT_POLL_INTERVAL_MILLIS;
+    private int checkThreads = DEFAULT_CHECK_THREADS;
+    private final Map<String, Feed> feeds = new ConcurrentHashMap<String, Feed>();
+    private ScheduledExecutorService scheduler;
+    private ExecutorService checkers;
+
+    /**
+     * The updated frames of a job, with a layer filter, and the clients receiving them. Sends and
+     * changes to the subscribers are made holding the feed's lock, the database is queried without
+     * it.
+     */
+    private static final class Feed {
+        private final JobInterface job;
+        private final List<LayerInterface> layers;
+        private final Set<Subscriber> subscribers = ConcurrentHashMap.newKeySet();
+        private final AtomicBoolean checking = new AtomicBoolean(false);
+        private int lastCheck;
+        private boolean dropped = false;
+
+        private Feed(JobInterface job, List<LayerInterface> layers, int lastCheck) {
+            this.job = job;
+            this.layers = layers;
+            this.lastCheck = lastCheck;
+        }
+    }
+
+    /**
+     * A client stream. Check results the client isn't ready for are merged, keeping the latest
+     * update of every frame, and sent once it is ready, so a slow client costs at most one update
+     * per frame of the job.
+     */
+    private static final class Subscriber {
+        private final StreamObserver<JobStreamUpdatedFramesResponse> observer;
+        private volatile boolean closed = false;
+        private UpdatedFrameCheckResult pending;
+        private final Map<String, UpdatedFrame> pendingFrames =
+                new LinkedHashMap<String, UpdatedFrame>();
+
+        private Subscriber(StreamObserver<JobStreamUpdatedFramesResponse> observer) {
+            this.observer = observer;
+        }
+
+        /**
+         * Sends a check result, or merges it into the pending one while the client isn't ready.
+         * The stream is completed once the job is finished.
+         *
+         * @return whether the stream is still open
+         */
+        private synchronized boolean send(UpdatedFrameCheckResult result) {
+            if (closed) {
+                return false;
+            }
+            for (UpdatedFrame frame : result.getUpdatedFrames().getUpdatedFramesList()) {
+                pendingFrames.put(frame.getId(), frame);
+            }
+            pending = result;
+            flush();
+            return !closed;
+        }
+
+        /**
+         * Sends the pending updates if the client is ready for them, also called by gRPC once it
+         * is.
+         */
+        private synchronized void flush() {
+            if (closed || pending == null || !isReady()) {
+                return;
+            }
+            try {
+                observer.onNext(JobStreamUpdatedFramesResponse.newBuilder()
+                        .setState(pending.getState()).setServerTime(pending.getServerTime())
+                        .setUpdatedFrames(UpdatedFrameSeq.newBuilder()
+                                .addAllUpdatedFrames(pendingFrames.values()))
+                        .build());
+                if (pending.getState() == JobState.FINISHED) {
+                    closed = true;
+                    observer.onCompleted();
+                }
+            } catch (RuntimeException e) {
+                // The call was cancelled or failed
+                closed = true;
+            }
+            pending = null;
+            pendingFrames.clear();
+        }
+
+        private boolean isReady() {
+            return !(observer instanceof ServerCallStreamObserver)
+                    || ((ServerCallStreamObserver<JobStreamUpdatedFramesResponse>) observer)
+                            .isReady();
+        }
+
+        private synchronized void fail(Throwable error) {
+            if (!closed) {
+                closed = true;
+                try {
+                    observer.onError(error);
+                } catch (RuntimeException e) {
+                    // Already cancelled
+                }
+            }
+        }
+    }
+
+    public void initialize() {
+        scheduler =
+                Executors.newSingleThreadScheduledExecutor(daemonThreads("UpdatedFrameStreamer"));
+        checkers = Executors.newFixedThreadPool(checkThreads,
+                daemonThreads("UpdatedFrameStreamerCheck"));
+        scheduler.scheduleWithFixedDelay(this::poll, pollIntervalMillis, pollIntervalMillis,
+                TimeUnit.MILLISECONDS);
+    }
+
+    private static ThreadFactory daemonThreads(String name) {
+        return runnable -> {
+            Thread thread = new Thread(runnable, name);
+            thread.setDaemon(true);
+            return thread;
+        };
+    }
+
+    public void shutdown() {
+        if (scheduler != null) {
+            scheduler.shutdownNow();
+        }
+        if (checkers != null) {
+            checkers.shutdownNow();
+        }
+        for (Feed feed : feeds.values()) {
+            synchronized (feed) {
+                failSubscribers(feed,
+                        Status.UNAVAILABLE.withDescription("Cuebot is shutting down"));
+                feed.dropped = true;
+            }
+        }
+        feeds.clear();
+    }
+
+    /**
+     * Sends the frames changed since lastCheck to a client, then keeps sending the frames of the
+     * job as they change.
+     *
+     * @param job the job to watch
+     * @param layers the layers to limit the updates to, all of them when empty
+     * @param lastCheck the epoch time of the last update the client has
+     * @param observer the stream of the client
+     * @throws IllegalArgumentException when lastCheck is over a minute old
+     * @throws EmptyResultDataAccessException when the job doesn't exist
+     */
+    public void subscribe(JobInterface job, List<LayerInterface> layers, int lastCheck,
+            StreamObserver<JobStreamUpdatedFramesResponse> observer) {
+        UpdatedFrameCheckResult result = whiteboard.getUpdatedFrames(job, layers, lastCheck);
+
+        Subscriber subscriber = new Subscriber(observer);
+        if (observer instanceof ServerCallStreamObserver) {
+            ServerCallStreamObserver<JobStreamUpdatedFramesResponse> callObserver =
+                    (ServerCallStreamObserver<JobStreamUpdatedFramesResponse>) observer;
+            callObserver.setOnCancelHandler(() -> subscriber.closed = true);
+            callObserver.setOnReadyHandler(subscriber::flush);
+        }
+        String key = getFeedKey(job, layers);
+        while (true) {
+            Feed feed = feeds.computeIfAbsent(key, k -> new Feed(job,
+                    new ArrayList<LayerInterface>(layers), result.getServerTime()));
+            synchronized (feed) {
+                if (feed.dropped) {
+                    continue;
+                }
+                // The feed may have been checked since the query above, resume it from the
+                // older of the two so the frames changed in between reach the new client too.
+                feed.lastCheck = Math.min(feed.lastCheck, result.getServerTime());
+                if (subscriber.send(result)) {
+                    feed.subscribers.add(subscriber);
+                }
+                dropIfUnused(key, feed);
+                return;
+            }
+        }
+    }
+
+    /**
+     * Returns the number of jobs being watched.
+     */
+    public int getFeedCount() {
+        return feeds.size();
+    }
+
+    /**
+     * Hands every feed that isn't being checked already to the check threads.
+     */
+    private void poll() {
+        for (Map.Entry<String, Feed> entry : feeds.entrySet()) {
+            Feed feed = entry.getValue();
+            if (!feed.checking.compareAndSet(false, true)) {
+                continue;
+            }
+            try {
+                checkers.execute(() -> check(entry.getKey(), feed));
+            } catch (RejectedExecutionException e) {
+                // Shutting down
+                feed.checking.set(false);
+            }
+        }
+    }
+
+    /**
+     * Checks a feed for updated frames and sends them to its clients. A feed without clients is
+     * dropped.
+     */
+    private void check(String key, Feed feed) {
+        try {
+            int since;
+            synchronized (feed) {
+                feed.subscribers.removeIf(subscriber -> subscriber.closed);
+                dropIfUnused(key, feed);
+                if (feed.dropped) {
+                    return;
+                }
+                since = feed.lastCheck;
+            }
+            UpdatedFrameCheckResult result;
+            try {
+                // Without the lock, so that clients can join the feed in the meantime
+                result = whiteboard.getUpdatedFrames(feed.job, feed.layers, since);
+            } catch (EmptyResultDataAccessException e) {
+                fail(key, feed, Status.NOT_FOUND.withDescription("Job not found"));
+                return;
+            } catch (IllegalArgumentException e) {
+                // The feed fell over a minute behind and can't be checked from lastCheck anymore,
+                // clients start over from a full update.
+                logger.warn("Updated frames of job " + feed.job.getJobId() + " fell behind: "
+                        + e.getMessage());
+                fail(key, feed, Status.ABORTED
+                        .withDescription("Frame updates fell behind, get all frames again"));
+                return;
+            } catch (RuntimeException e) {
+                // Clients keep their stream, the next poll picks up from the same time
+                logger.warn("Failed to check the updated frames of job " + feed.job.getJobId(),
+                        e);
+                return;
+            }
+            synchronized (feed) {
+                if (feed.dropped) {
+                    return;
+                }
+                // A client that joined during the query may have moved lastCheck back, the next
+                // check then resumes from there.
+                if (feed.lastCheck == since) {
+                    feed.lastCheck = result.getServerTime();
+                }
+                if (result.getUpdatedFrames().getUpdatedFramesCount() > 0
+                        || result.getState() == JobState.FINISHED) {
+                    feed.subscribers.removeIf(subscriber -> !subscriber.send(result));
+                }
+                dropIfUnused(key, feed);
+            }
+        } finally {
+            feed.checking.set(false);
+        }
+    }
+
+    private void fail(String key, Feed feed, Status status) {
+        synchronized (feed) {
+            failSubscribers(feed, status);
+            dropIfUnused(key, feed);
+        }
+    }
+
+    private static void failSubscribers(Feed feed, Status status) {
+        for (Subscriber subscriber : feed.subscribers) {
+            subscriber.fail(status.asRuntimeException());
+        }
+        feed.subscribers.clear();
+    }
+
+    /**
+     * Removes a feed without clients, called holding the lock of the feed.
+     */
+    private void dropIfUnused(String key, Feed feed) {
+        if (feed.subscribers.isEmpty()) {
+            feed.dropped = true;
+            feeds.remove(key, feed);
+        }
+    }
+
+    private static String getFeedKey(JobInterface job, List<LayerInterface> layers) {
+        Set<String> layerIds = new TreeSet<String>();
+        for (LayerInterface layer : layers) {
+            layerIds.add(layer.getLayerId());
+        }
+        return job.getJobId() + ":" + String.join(",", layerIds);
+    }
+
+    public Whiteboard getWhiteboard() {
+        return whiteboard;
+    }
+
+    public void setWhiteboard(Whiteboard whiteboard) {
+        this.whiteboard = whiteboard;
+    }
+
+    public int getCheckThreads() {
+        return checkThreads;
+    }
+
+    public void setCheckThreads(int checkThreads) {
+        this.checkThreads = checkThreads;
+    }
+
+    public long getPollIntervalMillis() {
+        return pollIntervalMillis;
+    }
+
+    public void setPollIntervalMillis(long pollIntervalMillis) {
+        this.pollIntervalMillis = pollIntervalMillis;
+    }
+}
@@ -857,6 +857,21 @@ public class WhiteboardDaoTests extends AbstractTransactionalJUnit4SpringContext
         assertEquals(1, whiteboardDao.getHosts(hostSearchFactory.create(h)).getHostsCount());
     }
 
+    @Test
+    @Transactional
+    @Rollback(true)
+    public void testGetHostsByPage() {
+        RenderHost host = getRenderHost();
+        hostManager.createHost(host);
+
+        HostSearchCriteria h = HostSearchInterface.criteriaFactory();
+        h = h.toBuilder().addHosts(HOST).setFirstResult(1).setMaxResults(1).build();
+        assertEquals(1, whiteboardDao.getHosts(hostSearchFactory.create(h)).getHostsCount());
+
+        h = h.toBuilder().setFirstResult(2).build();
+        assertEquals(0, whiteboardDao.getHosts(hostSearchFactory.create(h)).getHostsCount());
+    }
+
     @Test
     @Transactional
     @Rollback(true)
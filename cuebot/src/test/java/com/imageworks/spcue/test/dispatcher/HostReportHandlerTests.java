@@ -61,6 +61,7 @@ import java.util.UUID;
 
 import static org.junit.Assert.assertEquals;
 import static org.junit.Assert.assertFalse;
+import static org.junit.Assert.assertSame;
 
 @ContextConfiguration
 public class HostReportHandlerTests extends TransactionalTest {
@@ -397,6 +398,42 @@ public class HostReportHandlerTests extends TransactionalTest {
         assertEquals(420000, frame.maxRss);
     }
 
+    @Test
+    public void testDeltaReportTakesUnchangedFramesFromPreviousReport() {
+        RunningFrameInfo frame1 =
+                RunningFrameInfo.newBuilder().setFrameId("frame1").setRss(100).build();
+        RunningFrameInfo frame2 =
+                RunningFrameInfo.newBuilder().setFrameId("frame2").setRss(200).build();
+        RunningFrameInfo frame2Update = frame2.toBuilder().setRss(300).build();
+        HostReport delta = HostReport.newBuilder().setHost(getRenderHost(hostname))
+                .setFramesDelta(true).addFrames(frame2Update).addUnchangedFrameIds("frame1")
+                .build();
+
+        // Unchanged frames aren't known before a full report
+        HostReport report = hostReportHandler.withUnchangedFrames(delta);
+        assertFalse(report.getFramesDelta());
+        assertEquals(Arrays.asList(frame2Update), report.getFramesList());
+
+        hostReportHandler.withUnchangedFrames(HostReport.newBuilder()
+                .setHost(getRenderHost(hostname)).addFrames(frame1).addFrames(frame2).build());
+        report = hostReportHandler.withUnchangedFrames(delta);
+        assertEquals(Arrays.asList(frame2Update, frame1), report.getFramesList());
+        assertEquals(0, report.getUnchangedFrameIdsCount());
+
+        // Finished frames are left out of the following reports
+        report = hostReportHandler.withUnchangedFrames(delta.toBuilder().clearFrames()
+                .clearUnchangedFrameIds().addUnchangedFrameIds("frame2").build());
+        assertEquals(Arrays.asList(frame2Update), report.getFramesList());
+    }
+
+    @Test
+    public void testFullReportIsKeptAsIs() {
+        HostReport full = HostReport.newBuilder().setHost(getRenderHost(hostname2))
+                .addFrames(RunningFrameInfo.newBuilder().setFrameId("frame1")).build();
+
+        assertSame(full, hostReportHandler.withUnchangedFrames(full));
+    }
+
     /**
      * Strict fencing: a reported running frame whose resource_id maps to a proc that now owns a
      * different frame is a zombie and must be killed immediately, skipping the grace period. The
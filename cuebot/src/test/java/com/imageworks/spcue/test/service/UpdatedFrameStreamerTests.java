@@ -0,0 +1,297 @@
+/*
+ * Copyright Contributors to the OpenCue Project
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License"); you may not use this file except
+ * in compliance with the License. You may obtain a copy of the License at
+ *
+ * http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software distributed under the License
+ * is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+ * or implied. See the License for the specific language governing permissions and limitations under
+ * the License.
+ */
+
+package com.imageworks.spcue.test.service;
+
+import java.util.ArrayList;
+import java.util.Collections;
+import java.util.List;
+
+import com.google.common.util.concurrent.MoreExecutors;
+import io.grpc.Status;
+import io.grpc.stub.ServerCallStreamObserver;
+import io.grpc.stub.StreamObserver;
+import org.junit.Before;
+import org.junit.Test;
+import org.mockito.ArgumentCaptor;
+import org.springframework.dao.EmptyResultDataAccessException;
+import org.springframework.test.util.ReflectionTestUtils;
+
+import com.imageworks.spcue.JobEntity;
+import com.imageworks.spcue.JobInterface;
+import com.imageworks.spcue.LayerInterface;
+import com.imageworks.spcue.grpc.job.FrameState;
+import com.imageworks.spcue.grpc.job.JobState;
+import com.imageworks.spcue.grpc.job.JobStreamUpdatedFramesResponse;
+import com.imageworks.spcue.grpc.job.UpdatedFrame;
+import com.imageworks.spcue.grpc.job.UpdatedFrameCheckResult;
+import com.imageworks.spcue.grpc.job.UpdatedFrameSeq;
+import com.imageworks.spcue.service.UpdatedFrameStreamer;
+import com.imageworks.spcue.service.Whiteboard;
+
+import static org.junit.Assert.assertEquals;
+import static org.junit.Assert.assertTrue;
+import static org.mockito.ArgumentMatchers.any;
+import static org.mockito.ArgumentMatchers.anyInt;
+import static org.mockito.ArgumentMatchers.anyList;
+import static org.mockito.ArgumentMatchers.eq;
+import static org.mockito.Mockito.mock;
+import static org.mockito.Mockito.never;
+import static org.mockito.Mockito.times;
+import static org.mockito.Mockito.verify;
+import static org.mockito.Mockito.when;
+
+/**
+ * Unit tests for {@link UpdatedFrameStreamer}, with a mocked {@link Whiteboard}. The poll thread is
+ * not started, polls are run by the tests and check the feeds on the calling thread.
+ */
+public class UpdatedFrameStreamerTests {
+
+    private static final List<LayerInterface> ALL_LAYERS = Collections.emptyList();
+
+    private UpdatedFrameStreamer streamer;
+    private Whiteboard whiteboard = mock(Whiteboard.class);
+    private JobInterface job = new JobEntity("job-uuid");
+
+    private static class RecordingObserver implements StreamObserver<JobStreamUpdatedFramesResponse> {
+        List<JobStreamUpdatedFramesResponse> responses = new ArrayList<>();
+        boolean completed = false;
+        Throwable error;
+
+        @Override
+        public void onNext(JobStreamUpdatedFramesResponse response) {
+            responses.add(response);
+        }
+
+        @Override
+        public void onError(Throwable t) {
+            error = t;
+        }
+
+        @Override
+        public void onCompleted() {
+            completed = true;
+        }
+    }
+
+    @Before
+    public void setUp() {
+        streamer = new UpdatedFrameStreamer();
+        streamer.setWhiteboard(whiteboard);
+        ReflectionTestUtils.setField(streamer, "checkers",
+                MoreExecutors.newDirectExecutorService());
+    }
+
+    private static UpdatedFrameCheckResult result(JobState state, int serverTime,
+            String... frameIds) {
+        UpdatedFrameSeq.Builder frames = UpdatedFrameSeq.newBuilder();
+        for (String frameId : frameIds) {
+            frames.addUpdatedFrames(
+                    UpdatedFrame.newBuilder().setId(frameId).setState(FrameState.RUNNING));
+        }
+        return UpdatedFrameCheckResult.newBuilder().setState(state).setServerTime(serverTime)
+                .setUpdatedFrames(frames).build();
+    }
+
+    private void poll() {
+        ReflectionTestUtils.invokeMethod(streamer, "poll");
+    }
+
+    @Test
+    public void subscribeSendsChangesSinceLastCheck() {
+        when(whiteboard.getUpdatedFrames(job, ALL_LAYERS, 100))
+                .thenReturn(result(JobState.PENDING, 110, "frame-1"));
+        RecordingObserver observer = new RecordingObserver();
+
+        streamer.subscribe(job, ALL_LAYERS, 100, observer);
+
+        assertEquals(1, observer.responses.size());
+        assertEquals("frame-1",
+                observer.responses.get(0).getUpdatedFrames().getUpdatedFrames(0).getId());
+        assertEquals(1, streamer.getFeedCount());
+    }
+
+    @Test
+    public void clientsOfAJobShareOneCheck() {
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(100)))
+                .thenReturn(result(JobState.PENDING, 110));
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(110)))
+                .thenReturn(result(JobState.PENDING, 111, "frame-2"));
+        RecordingObserver first = new RecordingObserver();
+        RecordingObserver second = new RecordingObserver();
+        streamer.subscribe(job, ALL_LAYERS, 100, first);
+        streamer.subscribe(job, ALL_LAYERS, 100, second);
+
+        poll();
+
+        verify(whiteboard, times(1)).getUpdatedFrames(eq(job), anyList(), eq(110));
+        assertEquals(1, streamer.getFeedCount());
+        assertEquals(2, first.responses.size());
+        assertEquals(2, second.responses.size());
+        assertEquals(111, second.responses.get(1).getServerTime());
+    }
+
+    @Test
+    public void unchangedFramesAreNotSent() {
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), anyInt()))
+                .thenReturn(result(JobState.PENDING, 110));
+        RecordingObserver observer = new RecordingObserver();
+        streamer.subscribe(job, ALL_LAYERS, 100, observer);
+
+        poll();
+        poll();
+
+        assertEquals(1, observer.responses.size());
+    }
+
+    @Test
+    public void streamCompletesWhenJobFinishes() {
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(100)))
+                .thenReturn(result(JobState.PENDING, 110));
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(110)))
+                .thenReturn(result(JobState.FINISHED, 111));
+        RecordingObserver observer = new RecordingObserver();
+        streamer.subscribe(job, ALL_LAYERS, 100, observer);
+
+        poll();
+
+        assertTrue(observer.completed);
+        assertEquals(JobState.FINISHED, observer.responses.get(1).getState());
+        assertEquals(0, streamer.getFeedCount());
+    }
+
+    @Test
+    public void streamFailsWhenJobIsDeleted() {
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(100)))
+                .thenReturn(result(JobState.PENDING, 110));
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(110)))
+                .thenThrow(new EmptyResultDataAccessException(1));
+        RecordingObserver observer = new RecordingObserver();
+        streamer.subscribe(job, ALL_LAYERS, 100, observer);
+
+        poll();
+
+        assertTrue(observer.error != null);
+        assertEquals(0, streamer.getFeedCount());
+    }
+
+    @Test
+    public void clientJoiningAfterACheckGetsTheFramesChangedSinceItsQuery() {
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(100)))
+                .thenReturn(result(JobState.PENDING, 110))
+                .thenReturn(result(JobState.PENDING, 105));
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(105)))
+                .thenReturn(result(JobState.PENDING, 112, "frame-4"));
+        RecordingObserver first = new RecordingObserver();
+        RecordingObserver second = new RecordingObserver();
+        streamer.subscribe(job, ALL_LAYERS, 100, first);
+        streamer.subscribe(job, ALL_LAYERS, 100, second);
+
+        poll();
+
+        verify(whiteboard, times(1)).getUpdatedFrames(eq(job), anyList(), eq(105));
+        assertEquals(2, second.responses.size());
+        assertEquals("frame-4",
+                second.responses.get(1).getUpdatedFrames().getUpdatedFrames(0).getId());
+    }
+
+    @Test
+    public void streamEndsWhenChecksFallBehind() {
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(100)))
+                .thenReturn(result(JobState.PENDING, 110));
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(110)))
+                .thenThrow(new IllegalArgumentException("timestamp is over a minute old"));
+        RecordingObserver observer = new RecordingObserver();
+        streamer.subscribe(job, ALL_LAYERS, 100, observer);
+
+        poll();
+
+        assertEquals(Status.Code.ABORTED, Status.fromThrowable(observer.error).getCode());
+        assertEquals(0, streamer.getFeedCount());
+    }
+
+    @Test
+    public void failedCheckKeepsStreamOpen() {
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(100)))
+                .thenReturn(result(JobState.PENDING, 110));
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(110)))
+                .thenThrow(new RuntimeException("database unavailable"))
+                .thenReturn(result(JobState.PENDING, 112, "frame-3"));
+        RecordingObserver observer = new RecordingObserver();
+        streamer.subscribe(job, ALL_LAYERS, 100, observer);
+
+        poll();
+        poll();
+
+        assertEquals(2, observer.responses.size());
+        assertEquals(1, streamer.getFeedCount());
+        verify(whiteboard, times(2)).getUpdatedFrames(any(JobInterface.class), anyList(),
+                eq(110));
+    }
+
+    @Test
+    public void clientJoiningDuringACheckGetsTheFramesChangedSinceItsQuery() {
+        RecordingObserver first = new RecordingObserver();
+        RecordingObserver second = new RecordingObserver();
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(100)))
+                .thenReturn(result(JobState.PENDING, 110))
+                .thenReturn(result(JobState.PENDING, 105));
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(110))).thenAnswer(invocation -> {
+            // The check queries without the feed's lock, so a client can join meanwhile
+            streamer.subscribe(job, ALL_LAYERS, 100, second);
+            return result(JobState.PENDING, 112, "frame-5");
+        });
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(105)))
+                .thenReturn(result(JobState.PENDING, 113, "frame-5"));
+        streamer.subscribe(job, ALL_LAYERS, 100, first);
+
+        poll();
+        poll();
+
+        verify(whiteboard, times(1)).getUpdatedFrames(eq(job), anyList(), eq(105));
+        assertEquals(3, second.responses.size());
+        assertEquals(113, second.responses.get(2).getServerTime());
+    }
+
+    @Test
+    @SuppressWarnings("unchecked")
+    public void updatesAreMergedUntilTheClientIsReady() {
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(100)))
+                .thenReturn(result(JobState.PENDING, 110, "frame-1"));
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(110)))
+                .thenReturn(result(JobState.PENDING, 111, "frame-1", "frame-2"));
+        when(whiteboard.getUpdatedFrames(eq(job), anyList(), eq(111)))
+                .thenReturn(result(JobState.PENDING, 112, "frame-2"));
+        ServerCallStreamObserver<JobStreamUpdatedFramesResponse> observer =
+                mock(ServerCallStreamObserver.class);
+        when(observer.isReady()).thenReturn(false);
+        streamer.subscribe(job, ALL_LAYERS, 100, observer);
+
+        poll();
+        poll();
+
+        verify(observer, never()).onNext(any());
+        ArgumentCaptor<Runnable> onReady = ArgumentCaptor.forClass(Runnable.class);
+        verify(observer).setOnReadyHandler(onReady.capture());
+        when(observer.isReady()).thenReturn(true);
+        onReady.getValue().run();
+
+        ArgumentCaptor<JobStreamUpdatedFramesResponse> sent =
+                ArgumentCaptor.forClass(JobStreamUpdatedFramesResponse.class);
+        verify(observer, times(1)).onNext(sent.capture());
+        assertEquals(112, sent.getValue().getServerTime());
+        assertEquals(2, sent.getValue().getUpdatedFrames().getUpdatedFramesCount());
+        assertEquals(1, streamer.getFeedCount());
+    }
+}
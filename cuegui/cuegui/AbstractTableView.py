@@ -0,0 +1,156 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Base class for CueGUI table views.
+
+The counterpart of AbstractTreeWidget for flat lists too long to keep an item
+per row: the rows come from a model, which only has to provide the object
+shown on a row through objectAt(row), and clear(). Unlike a QTreeView, a
+QTableView doesn't lay out every row whenever rows are added, removed or
+sorted, which takes seconds with a hundred thousand rows."""
+
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+from qtpy import QtCore
+from qtpy import QtWidgets
+
+import cuegui.AbstractTreeWidget
+
+
+class AbstractTableView(cuegui.AbstractTreeWidget.AbstractTreeMixin, QtWidgets.QTableView):
+    """Base class for CueGUI table views, looking like the tree widgets.
+
+    Columns are defined as for AbstractTreeWidget, before calling __init__."""
+
+    updated = QtCore.Signal()
+
+    def __init__(self, parent, model):
+        """
+        @type  parent: QWidget
+        @param parent: The widget to set as the parent
+        @type  model: QAbstractItemModel
+        @param model: The model of the rows, providing objectAt(row) and clear()"""
+        QtWidgets.QTableView.__init__(self, parent)
+        model.setParent(self)
+        self.setModel(model)
+
+        self.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.setShowGrid(False)
+        self.setWordWrap(False)
+        self.horizontalHeader().setDefaultAlignment(QtCore.Qt.AlignLeft | QtCore.Qt.AlignVCenter)
+        self.horizontalHeader().setHighlightSections(False)
+        rows = self.verticalHeader()
+        rows.hide()
+        rows.setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        rows.setMinimumSectionSize(1)
+        rows.setDefaultSectionSize(self.fontMetrics().height() + 4)
+
+        self._lastUpdate = 0
+        self._setupTree()
+
+        # pylint: disable=no-member
+        self.clicked.connect(self.__itemSingleClickedEmitToApp)
+        self.doubleClicked.connect(self.__itemDoubleClickedEmitToApp)
+        # pylint: enable=no-member
+
+        self.updateRequest()
+        self.setUpdateInterval(10)
+
+    def tick(self):
+        """Determines whether an update is needed and initiates updating logic.
+
+        Must be defined by inheriting classes."""
+        raise NotImplementedError
+
+    def _setupColumns(self):
+        """Sets the column widths and delegates, the model providing the headers."""
+        for col, columnInfo in enumerate(self.getColumnInfo()):
+            self.setColumnWidth(col, columnInfo[cuegui.AbstractTreeWidget.COLUMN_WIDTH])
+            if columnInfo[cuegui.AbstractTreeWidget.COLUMN_DELEGATE]:
+                self.setItemDelegateForColumn(
+                    col, columnInfo[cuegui.AbstractTreeWidget.COLUMN_DELEGATE](self))
+
+    def header(self):
+        """Returns the header of the columns, as QTreeView.header() does.
+        @rtype: QHeaderView"""
+        return self.horizontalHeader()
+
+    def columnCount(self):
+        """Returns the number of columns.
+        @rtype: int"""
+        return self.model().columnCount()
+
+    def objectAt(self, index):
+        """Returns the object shown on the row of an index.
+        @type  index: QModelIndex
+        @rtype:  object"""
+        return self.model().objectAt(index.row())
+
+    def selectedObjects(self):
+        """Provides a list of the objects on the selected rows, in display order
+        @return: A list of objects from selected rows
+        @rtype:  list<object>"""
+        model = self.model()
+        return [model.objectAt(row)
+                for row in sorted(index.row() for index in self.selectionModel().selectedRows())]
+
+    def selectRows(self, rows):
+        """Adds rows to the selection, as few ranges as possible.
+        @type  rows: list<int>
+        @param rows: The rows to select"""
+        model = self.model()
+        lastColumn = model.columnCount() - 1
+        selection = QtCore.QItemSelection()
+        for first, last in rowRanges(rows):
+            selection.select(model.index(first, 0), model.index(last, lastColumn))
+        self.selectionModel().select(selection, QtCore.QItemSelectionModel.Select)
+
+    def removeAllItems(self):
+        """Removes all rows from the view."""
+        self.model().clear()
+
+    def __itemSingleClickedEmitToApp(self, index):
+        """When a row is single clicked on:
+        emits "single_click(PyQt_PyObject)" to the app
+        @type  index: QModelIndex
+        @param index: The index single clicked on"""
+        self.app.single_click.emit(self.objectAt(index))
+
+    def __itemDoubleClickedEmitToApp(self, index):
+        """Handles when a row is double clicked on.
+        emits "double_click(PyQt_PyObject)" to the app
+        emits "view_object(PyQt_PyObject)" to the app
+        @type  index: QModelIndex
+        @param index: The index double clicked on"""
+        rpcObject = self.objectAt(index)
+        self.app.view_object.emit(rpcObject)
+        self.app.double_click.emit(rpcObject)
+
+
+def rowRanges(rows):
+    """Returns the first and last row of each run of consecutive rows.
+    @type  rows: iterable<int>
+    @param rows: Row numbers, in any order
+    @rtype:  list<tuple<int, int>>"""
+    ranges = []
+    for row in sorted(rows):
+        if ranges and row <= ranges[-1][1] + 1:
+            ranges[-1][1] = max(row, ranges[-1][1])
+        else:
+            ranges.append([row, row])
+    return [tuple(rowRange) for rowRange in ranges]
@@ -58,39 +58,23 @@ def DEFAULT_LAMBDA(s):
     return ""
 
 
-class AbstractTreeWidget(QtWidgets.QTreeWidget):
-    """Base class for CueGUI tree widgets.
+class AbstractTreeMixin(object):
+    """What the tree widgets and table views of CueGUI have in common.
 
-    Provides extended QTreeWidget functionality."""
+    Provides the column definitions, the update timer and ticks, and the
+    column menu, widths, visibility and order saved with the layout, to a
+    QAbstractItemView subclass with a header() of its columns and a tick(),
+    whose __init__ sets _lastUpdate and defines its columns, then calls
+    _setupTree()."""
 
-    itemDoubleClicked = QtCore.Signal(QtWidgets.QTreeWidgetItem, int)
-    itemSingleClicked = QtCore.Signal(QtWidgets.QTreeWidgetItem, int)
-    updated = QtCore.Signal()
-
-    def __init__(self, parent):
-        """Standard method to display a list or tree using QTreeWidget
-
-        columnInfoByType is a dictionary of lists keyed to opencue.Constants.TYPE_*
-        Each value is a list of lists that each define a column.
-        [<column name>, <width>, <lambda function>, <function name for sorting>,
-        <column delegate class>]
-        Only supported on the primary column:
-        <column name>, <column delegate class>, <width>
-
-        @type  parent: QWidget
-        @param parent: The widget to set as the parent"""
-        QtWidgets.QTreeWidget.__init__(self, parent)
+    def _setupTree(self):
+        """Sets up the view, its columns and its update timer."""
         self.app = cuegui.app()
 
-        self._items = {}
-        self._lastUpdate = 0
-
-        self._itemsLock = QtCore.QReadWriteLock()
         self._timer = QtCore.QTimer(self)
 
         self.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
 
-        self.setUniformRowHeights(True)
         self.setAutoScroll(False)
         self.setFocusPolicy(QtCore.Qt.NoFocus)
         self.setAlternatingRowColors(True)
@@ -102,19 +86,18 @@ class AbstractTreeWidget(QtWidgets.QTreeWidget):
 
         self.setItemDelegate(cuegui.ItemDelegate.ItemDelegate(self))
 
-        self.__setupColumns()
+        self._setupColumns()
 
         self.__setupColumnMenu()
 
-        # pylint: disable=no-member
-        self.itemClicked.connect(self.__itemSingleClickedEmitToApp)
-        self.itemDoubleClicked.connect(self.__itemDoubleClickedEmitToApp)
-        self._timer.timeout.connect(self.updateRequest)
-        # pylint: enable=no-member
+        self._timer.timeout.connect(self.updateRequest)  # pylint: disable=no-member
         self.app.request_update.connect(self.updateRequest)
 
-        self.updateRequest()
-        self.setUpdateInterval(10)
+    def _setupColumns(self):
+        """Sets up the columns of the view from the column definitions.
+
+        Must be defined by inheriting classes."""
+        raise NotImplementedError
 
     def closeEvent(self, event):
         """Close Event"""
@@ -172,36 +155,6 @@ class AbstractTreeWidget(QtWidgets.QTreeWidget):
         columnsInfo = self.__columnInfoByType[self.__columnCurrent]
         columnsInfo.append([name, width, data, sort, delegate, tip, default, id])
 
-    def __setupColumns(self):
-        """Setup the QTreeWidget based on the column information"""
-        primaryColumnInfo = self.__columnInfoByType[self.__columnPrimaryType]
-
-        self.setColumnCount(len(primaryColumnInfo))
-
-        columnNames = []
-        for col, columnInfo in enumerate(primaryColumnInfo):
-            # Set up column widths
-            self.setColumnWidth(col, primaryColumnInfo[col][COLUMN_WIDTH])
-
-            # Setup the column tooltips
-            if columnInfo[COLUMN_TOOLTIP]:
-                self.model().setHeaderData(col, QtCore.Qt.Horizontal,
-                                           columnInfo[COLUMN_TOOLTIP],
-                                           QtCore.Qt.ToolTipRole)
-
-            # Setup column delegates
-            if primaryColumnInfo[col][COLUMN_DELEGATE]:
-                self.setItemDelegateForColumn(col, primaryColumnInfo[col][COLUMN_DELEGATE](self))
-
-            # Setup column name list
-            if columnInfo[COLUMN_NAME].startswith("_"):
-                columnNames.append("")
-            else:
-                columnNames.append(columnInfo[COLUMN_NAME])
-
-        self.setHeaderLabels(columnNames)
-
-
     def startTicksUpdate(self, updateInterval,
                          updateWhenMinimized=False,
                          maxUpdateInterval=None):
@@ -258,12 +211,6 @@ class AbstractTreeWidget(QtWidgets.QTreeWidget):
         finally:
             self.ticksLock.unlock()
 
-    def tick(self):
-        """Determines whether an update is needed and initiates updating logic.
-
-        Must be defined by inheriting classes."""
-        raise NotImplementedError
-
     def getColumnInfo(self, columnType = None):
         """Returns the list that defines the column.
         @type  columnType: Constants.TYPE_*
@@ -277,102 +224,6 @@ class AbstractTreeWidget(QtWidgets.QTreeWidget):
             return self.__columnInfoByType[columnType]
         return self.__columnInfoByType[self.__columnPrimaryType]
 
-    @staticmethod
-    def __itemSingleClickedEmitToApp(item, col):
-        """When an item is single clicked on:
-        emits "single_click(PyQt_PyObject)" to the app
-        @type  item: QTreeWidgetItem
-        @param item: The item single clicked on
-        @type  col: int
-        @param col: Column number single clicked on"""
-        del col
-        if hasattr(item, 'rpcObject'):
-            cuegui.app().single_click.emit(item.rpcObject)
-
-    @staticmethod
-    def __itemDoubleClickedEmitToApp(item, col):
-        """Handles when an item is double clicked on.
-        emits "double_click(PyQt_PyObject)" to the app
-        emits "view_object(PyQt_PyObject)" to the app
-        @type  item: QTreeWidgetItem
-        @param item: The item double clicked on
-        @type  col: int
-        @param col: Column number double clicked on"""
-        del col
-        cuegui.app().view_object.emit(item.rpcObject)
-        cuegui.app().double_click.emit(item.rpcObject)
-
-    def addObject(self, rpcObject):
-        """Adds or updates an rpcObject in the list using the _createItem function
-        and object.proxy as the key. Used when user is adding an item but will
-        not want to wait for an update.
-        @type  paramA: opencue object
-        @param paramA: Object that provides .proxy"""
-        self._itemsLock.lockForWrite()
-        try:
-            # If id already exists, update it
-            objectKey = cuegui.Utils.getObjectKey(rpcObject)
-            if objectKey in self._items:
-                self._items[objectKey].update(rpcObject)
-            # If id does not exist, create it
-            else:
-                self._items[objectKey] = self._createItem(rpcObject)
-        finally:
-            self._itemsLock.unlock()
-
-    def removeItem(self, item):
-        """Removes an item from the TreeWidget
-        @param item: A tree widget item
-        @type  item: AbstractTreeWidgetItem"""
-        self._itemsLock.lockForWrite()
-        try:
-            self._removeItem(item)
-        finally:
-            self._itemsLock.unlock()
-
-    def _removeItem(self, item):
-        """Removes an item from the TreeWidget without locking
-        @type  item: AbstractTreeWidgetItem or String
-        @param item: A tree widget item or the string with the id of the item"""
-        if item in self._items:
-            item = self._items[item]
-        elif not isinstance(item, cuegui.AbstractWidgetItem.AbstractWidgetItem):
-            # if the parent was already deleted, then this one was too
-            return
-
-        # If it has children, they must be deleted first
-        if item.childCount() > 0:
-            for child in item.takeChildren():
-                self._removeItem(child)
-
-        if item.isSelected():
-            item.setSelected(False)
-
-        if item.parent():
-            item.parent().removeChild(item)
-        else:
-            self.takeTopLevelItem(self.indexOfTopLevelItem(item))
-        objectClass = item.rpcObject.__class__.__name__
-        objectId = item.rpcObject.id()
-        # Use pop with default value to avoid KeyError when item doesn't exist
-        # This can happen with archived jobs or when items are already removed
-        self._items.pop('{}.{}'.format(objectClass, objectId), None)
-
-    def removeAllItems(self):
-        """Removes all items from the tree."""
-        self._itemsLock.lockForWrite()
-        try:
-            self._items = {}
-            self.clear()
-        finally:
-            self._itemsLock.unlock()
-
-    def selectedObjects(self):
-        """Provides a list of all objects from selected items
-        @return: A list of objects from selected items
-        @rtype:  list<object>"""
-        return [item.rpcObject for item in self.selectedItems()]
-
     def setUpdateInterval(self, seconds):
         """Changes the update interval
         @param seconds: Update interval in seconds
@@ -399,37 +250,6 @@ class AbstractTreeWidget(QtWidgets.QTreeWidget):
             logger.warning("threadpool not found, doing work in gui thread")
             self._processUpdate(None, self._getUpdate())
 
-    def _processUpdate(self, work, rpcObjects):
-        """A generic function that Will:
-        Create new TreeWidgetItems if an item does not exist for the object.
-        Update existing TreeWidgetItems if an item already exists for the object.
-        Remove items that were not updated with rpcObjects.
-        @param work:
-        @type  work: from ThreadPool
-        @param rpcObjects: A list of rpc objects
-        @type  rpcObjects: list<rpc object> """
-        del work
-        self._itemsLock.lockForWrite()
-        try:
-            updated = []
-            for rpcObject in rpcObjects:
-                objectId = "{}.{}".format(rpcObject.__class__.__name__, rpcObject.id())
-                updated.append(objectId)
-
-                # If id already exists, update it
-                if objectId in self._items:
-                    self._items[objectId].update(rpcObject)
-                # If id does not exist, create it
-                else:
-                    self._items[objectId] = self._createItem(rpcObject)
-
-            # Remove any items that were not updated
-            for proxy in list(set(self._items.keys()) - set(updated)):
-                self._removeItem(proxy)
-            self.redraw()
-        finally:
-            self._itemsLock.unlock()
-
     def updateSoon(self):
         """Returns immediately. Causes an update to happen
         Constants.AFTER_ACTION_UPDATE_DELAY after calling this function."""
@@ -579,3 +399,204 @@ class AbstractTreeWidget(QtWidgets.QTreeWidget):
         for col in cols:
             old_col = header.visualIndex(settings[col])
             header.moveSection(int(old_col), int(col))
+
+
+class AbstractTreeWidget(AbstractTreeMixin, QtWidgets.QTreeWidget):
+    """Base class for CueGUI tree widgets.
+
+    Provides extended QTreeWidget functionality."""
+
+    itemDoubleClicked = QtCore.Signal(QtWidgets.QTreeWidgetItem, int)
+    itemSingleClicked = QtCore.Signal(QtWidgets.QTreeWidgetItem, int)
+    updated = QtCore.Signal()
+
+    def __init__(self, parent):
+        """Standard method to display a list or tree using QTreeWidget
+
+        columnInfoByType is a dictionary of lists keyed to opencue.Constants.TYPE_*
+        Each value is a list of lists that each define a column.
+        [<column name>, <width>, <lambda function>, <function name for sorting>,
+        <column delegate class>]
+        Only supported on the primary column:
+        <column name>, <column delegate class>, <width>
+
+        @type  parent: QWidget
+        @param parent: The widget to set as the parent"""
+        QtWidgets.QTreeWidget.__init__(self, parent)
+
+        self._items = {}
+        self._itemsLock = QtCore.QReadWriteLock()
+        self._lastUpdate = 0
+
+        self.setUniformRowHeights(True)
+        self._setupTree()
+
+        # pylint: disable=no-member
+        self.itemClicked.connect(self.__itemSingleClickedEmitToApp)
+        self.itemDoubleClicked.connect(self.__itemDoubleClickedEmitToApp)
+        # pylint: enable=no-member
+
+        self.updateRequest()
+        self.setUpdateInterval(10)
+
+    def tick(self):
+        """Determines whether an update is needed and initiates updating logic.
+
+        Must be defined by inheriting classes."""
+        raise NotImplementedError
+
+    def _setupColumns(self):
+        """Setup the QTreeWidget based on the column information"""
+        primaryColumnInfo = self.getColumnInfo()
+
+        self.setColumnCount(len(primaryColumnInfo))
+
+        columnNames = []
+        for col, columnInfo in enumerate(primaryColumnInfo):
+            # Set up column widths
+            self.setColumnWidth(col, primaryColumnInfo[col][COLUMN_WIDTH])
+
+            # Setup the column tooltips
+            if columnInfo[COLUMN_TOOLTIP]:
+                self.model().setHeaderData(col, QtCore.Qt.Horizontal,
+                                           columnInfo[COLUMN_TOOLTIP],
+                                           QtCore.Qt.ToolTipRole)
+
+            # Setup column delegates
+            if primaryColumnInfo[col][COLUMN_DELEGATE]:
+                self.setItemDelegateForColumn(col, primaryColumnInfo[col][COLUMN_DELEGATE](self))
+
+            # Setup column name list
+            if columnInfo[COLUMN_NAME].startswith("_"):
+                columnNames.append("")
+            else:
+                columnNames.append(columnInfo[COLUMN_NAME])
+
+        self.setHeaderLabels(columnNames)
+
+    @staticmethod
+    def __itemSingleClickedEmitToApp(item, col):
+        """When an item is single clicked on:
+        emits "single_click(PyQt_PyObject)" to the app
+        @type  item: QTreeWidgetItem
+        @param item: The item single clicked on
+        @type  col: int
+        @param col: Column number single clicked on"""
+        del col
+        if hasattr(item, 'rpcObject'):
+            cuegui.app().single_click.emit(item.rpcObject)
+
+    @staticmethod
+    def __itemDoubleClickedEmitToApp(item, col):
+        """Handles when an item is double clicked on.
+        emits "double_click(PyQt_PyObject)" to the app
+        emits "view_object(PyQt_PyObject)" to the app
+        @type  item: QTreeWidgetItem
+        @param item: The item double clicked on
+        @type  col: int
+        @param col: Column number double clicked on"""
+        del col
+        cuegui.app().view_object.emit(item.rpcObject)
+        cuegui.app().double_click.emit(item.rpcObject)
+
+    def addObject(self, rpcObject):
+        """Adds or updates an rpcObject in the list using the _createItem function
+        and object.proxy as the key. Used when user is adding an item but will
+        not want to wait for an update.
+        @type  paramA: opencue object
+        @param paramA: Object that provides .proxy"""
+        self._itemsLock.lockForWrite()
+        try:
+            # If id already exists, update it
+            objectKey = cuegui.Utils.getObjectKey(rpcObject)
+            if objectKey in self._items:
+                self._items[objectKey].update(rpcObject)
+            # If id does not exist, create it
+            else:
+                self._items[objectKey] = self._createItem(rpcObject)
+        finally:
+            self._itemsLock.unlock()
+
+    def removeItem(self, item):
+        """Removes an item from the TreeWidget
+        @param item: A tree widget item
+        @type  item: AbstractTreeWidgetItem"""
+        self._itemsLock.lockForWrite()
+        try:
+            self._removeItem(item)
+        finally:
+            self._itemsLock.unlock()
+
+    def _removeItem(self, item):
+        """Removes an item from the TreeWidget without locking
+        @type  item: AbstractTreeWidgetItem or String
+        @param item: A tree widget item or the string with the id of the item"""
+        if item in self._items:
+            item = self._items[item]
+        elif not isinstance(item, cuegui.AbstractWidgetItem.AbstractWidgetItem):
+            # if the parent was already deleted, then this one was too
+            return
+
+        # If it has children, they must be deleted first
+        if item.childCount() > 0:
+            for child in item.takeChildren():
+                self._removeItem(child)
+
+        if item.isSelected():
+            item.setSelected(False)
+
+        if item.parent():
+            item.parent().removeChild(item)
+        else:
+            self.takeTopLevelItem(self.indexOfTopLevelItem(item))
+        objectClass = item.rpcObject.__class__.__name__
+        objectId = item.rpcObject.id()
+        # Use pop with default value to avoid KeyError when item doesn't exist
+        # This can happen with archived jobs or when items are already removed
+        self._items.pop('{}.{}'.format(objectClass, objectId), None)
+
+    def removeAllItems(self):
+        """Removes all items from the tree."""
+        self._itemsLock.lockForWrite()
+        try:
+            self._items = {}
+            self.clear()
+        finally:
+            self._itemsLock.unlock()
+
+    def selectedObjects(self):
+        """Provides a list of all objects from selected items
+        @return: A list of objects from selected items
+        @rtype:  list<object>"""
+        return [item.rpcObject for item in self.selectedItems()]
+
+    def _processUpdate(self, work, rpcObjects):
+        """A generic function that Will:
+        Create new TreeWidgetItems if an item does not exist for the object.
+        Update existing TreeWidgetItems if an item already exists for the object.
+        Remove items that were not updated with rpcObjects.
+        @param work:
+        @type  work: from ThreadPool
+        @param rpcObjects: A list of rpc objects
+        @type  rpcObjects: list<rpc object> """
+        del work
+        self._itemsLock.lockForWrite()
+        try:
+            updated = []
+            for rpcObject in rpcObjects:
+                objectId = "{}.{}".format(rpcObject.__class__.__name__, rpcObject.id())
+                updated.append(objectId)
+
+                # If id already exists, update it
+                if objectId in self._items:
+                    self._items[objectId].update(rpcObject)
+                # If id does not exist, create it
+                else:
+                    self._items[objectId] = self._createItem(rpcObject)
+
+            # Remove any items that were not updated
+            for proxy in list(set(self._items.keys()) - set(updated)):
+                self._removeItem(proxy)
+            self.redraw()
+        finally:
+            self._itemsLock.unlock()
@@ -125,6 +125,7 @@ FRAME_UPDATE_DELAY = __config.get('refresh.frame_update_delay')
 HOST_UPDATE_DELAY = __config.get('refresh.host_update_delay')
 AFTER_ACTION_UPDATE_DELAY = __config.get('refresh.after_action_update_delay')
 MINIMUM_UPDATE_INTERVAL = __config.get('refresh.min_update_interval') // 1000
+FRAME_STREAM_UPDATES = __config.get('refresh.frame_stream_updates', True)
 
 FONT_FAMILY = __config.get('style.font.family')
 FONT_SIZE = __config.get('style.font.size')
@@ -146,6 +147,7 @@ DEFAULT_PLUGIN_PATHS = __config.get('paths.plugins')
 for i, path in enumerate(DEFAULT_PLUGIN_PATHS):
     if not os.path.isabs(path):
         DEFAULT_PLUGIN_PATHS[i] = os.path.abspath(os.path.join(os.path.dirname(__file__), path))
+PLUGIN_ACTIVATION_DELAY = __config.get('plugins.hidden_activation_delay', 5000)
 
 LOGGER_FORMAT = __config.get('logger.format')
 LOGGER_LEVEL = __config.get('logger.level')
@@ -214,6 +216,13 @@ MEMORY_WARNING_LEVEL = __config.get('memory_warning_level')
 LOG_HIGHLIGHT_ERROR = __config.get('render_logs.highlight.error')
 LOG_HIGHLIGHT_WARN = __config.get('render_logs.highlight.warning')
 LOG_HIGHLIGHT_INFO = __config.get('render_logs.highlight.info')
+LOG_VIEW_WINDOW_SIZE = __config.get('render_logs.view.window_size', 1048576)
+LOG_VIEW_PAGE_SIZE = __config.get('render_logs.view.page_size', 262144)
+LOG_VIEW_SEARCH_CHUNK_SIZE = __config.get('render_logs.view.search_chunk_size', 4194304)
+LOG_DATA_CACHE_SIZE = __config.get('render_logs.data.cache_size', 10000)
+LOG_DATA_MAX_AGE = __config.get('render_logs.data.max_age', 5)
+LOG_DATA_THREADS = __config.get('render_logs.data.threads', 8)
+LOG_DATA_MAX_WATCHES = __config.get('render_logs.data.max_watches', 2000)
 
 RESOURCE_LIMITS = __config.get('resources')
 
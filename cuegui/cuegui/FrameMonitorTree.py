@@ -23,11 +23,13 @@ from __future__ import division
 from builtins import str
 from builtins import map
 from builtins import object
+import collections
 import datetime
 import functools
 import glob
 import os
 import re
+import threading
 import time
 
 from qtpy import QtCore
@@ -39,10 +41,11 @@ import opencue
 from opencue_proto import job_pb2
 
 import cuegui
+import cuegui.AbstractTableView
 import cuegui.AbstractTreeWidget
-import cuegui.AbstractWidgetItem
 import cuegui.Constants
 import cuegui.eta
+import cuegui.LogData
 import cuegui.Logger
 import cuegui.MenuActions
 import cuegui.Style
@@ -55,6 +58,16 @@ logger = cuegui.Logger.getLogger(__file__)
 
 QCOLOR_BLACK = QtGui.QColor(QtCore.Qt.black)
 QCOLOR_GREEN = QtGui.QColor(QtCore.Qt.green)
+# Looked up once, as FrameTableModel.data() is called for every cell painted
+# and attribute lookups of Qt enums are slow with some bindings.
+DISPLAY_ROLE = QtCore.Qt.DisplayRole
+FOREGROUND_ROLE = QtCore.Qt.ForegroundRole
+BACKGROUND_ROLE = QtCore.Qt.BackgroundRole
+DECORATION_ROLE = QtCore.Qt.DecorationRole
+TEXT_ALIGNMENT_ROLE = QtCore.Qt.TextAlignmentRole
+USER_ROLE = QtCore.Qt.UserRole
+ALIGN_CENTER = QtCore.Qt.AlignCenter
+ALIGN_RIGHT = QtCore.Qt.AlignRight
 # Visual column indices, keyed to the order of addColumn() calls below.
 # Update these whenever a column is inserted/removed/reordered.
 STATUS_COLUMN = 3
@@ -66,9 +79,15 @@ LASTLINE_COLUMN = 20
 
 LOCALRESOURCE = "%s/" % os.getenv("HOST", "unknown").split(".")[0]
 
+# Fields copied from an UpdatedFrame to the Frame of an item, looked up once
+# instead of walking the descriptor for every updated frame.
+UPDATED_FRAME_FIELDS = tuple(
+    field for field in job_pb2.UpdatedFrame.DESCRIPTOR.fields_by_name
+    if field not in ("id", "frame_state_display_override"))
 
-class FrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
-    """Tree widget for displaying a list of frames."""
+
+class FrameMonitorTree(cuegui.AbstractTableView.AbstractTableView):
+    """Table view for displaying a list of frames."""
 
     job_changed = QtCore.Signal()
     handle_filter_layers_byLayer = QtCore.Signal(list)
@@ -250,8 +269,11 @@ class FrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
 
         self.__job = None
         self.__jobState = None
+        self.__updateStream = None
+        self.__streamUpdates = cuegui.Constants.FRAME_STREAM_UPDATES
 
-        cuegui.AbstractTreeWidget.AbstractTreeWidget.__init__(self, parent)
+        cuegui.AbstractTableView.AbstractTableView.__init__(
+            self, parent, FrameTableModel(self.getColumnInfo()))
 
         # Used to build right click context menus
         # pylint: disable=unused-private-member
@@ -261,9 +283,11 @@ class FrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
         self.ticksWithoutUpdate = 999
         self.__lastUpdateTime = None
 
-        self.itemClicked.connect(self.__itemSingleClickedCopy)  # pylint: disable=no-member
-        self.itemClicked.connect(self.__itemSingleClickedViewLog)  # pylint: disable=no-member
-        self.itemDoubleClicked.connect(self.__itemDoubleClickedViewLog)
+        # pylint: disable=no-member
+        self.clicked.connect(self.__itemSingleClickedCopy)
+        self.clicked.connect(self.__itemSingleClickedViewLog)
+        self.doubleClicked.connect(self.__itemDoubleClickedViewLog)
+        # pylint: enable=no-member
         self.header().sortIndicatorChanged.connect(self.__sortByColumnSave)
 
         self.__load = None
@@ -284,7 +308,11 @@ class FrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
                 self.ticksWithoutUpdate = 0
                 self._update()
                 return
-            if self.ticksWithoutUpdate > self.updateInterval:
+            # Changed frames come from the update stream when there is one,
+            # requested updates still poll for them.
+            if self.ticksWithoutUpdate >= 999 or (
+                    self.ticksWithoutUpdate > self.updateInterval and
+                    self.__updateStream is None):
                 logger.info("doing changed update")
                 self.ticksWithoutUpdate = 0
                 self._updateChanged()
@@ -340,12 +368,7 @@ class FrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
         """Forces the running frames to be redrawn with current values"""
         # pylint: disable=broad-except
         try:
-            items = self.findItems("Running",
-                                   QtCore.Qt.MatchExactly,
-                                   STATUS_COLUMN)
-            if items:
-                self.dataChanged(self.indexFromItem(items[0], RUNTIME_COLUMN),
-                                 self.indexFromItem(items[-1], LASTLINE_COLUMN))
+            self.model().refreshRows(self.model().runningRows(), RUNTIME_COLUMN, LASTLINE_COLUMN)
         except Exception as e:
             list(map(logger.warning, cuegui.Utils.exceptionOutput(e)))
 
@@ -365,29 +388,24 @@ class FrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
         settings = self.__sortByColumnCache.get(key, (0, QtCore.Qt.AscendingOrder))
         self.sortByColumn(settings[0], settings[1])
 
-    def __itemSingleClickedCopy(self, item, col):
-        """Called when an item is clicked on. Copies selected object names to
+    def __itemSingleClickedCopy(self, index):
+        """Called when a frame is clicked on. Copies selected object names to
         the middle click selection clip board.
-        @type  item: QTreeWidgetItem
-        @param item: The item single clicked on
-        @type  col: int
-        @param col: Column number single clicked on"""
-        del item
-        del col
+        @type  index: QModelIndex
+        @param index: The cell single clicked on"""
+        del index
         selected = [
             frame.data.name for frame in self.selectedObjects() if cuegui.Utils.isFrame(frame)]
         if selected:
             QtWidgets.QApplication.clipboard().setText(" ".join(selected),
                                                        QtGui.QClipboard.Selection)
 
-    def __itemSingleClickedViewLog(self, item, col):
-        """Called when an item is clicked on. Views the log file contents
-        @type  item: QTreeWidgetItem
-        @param item: The item single clicked on
-        @type  col: int
-        @param col: Column number single clicked on"""
-        del col
-        current_log_file = cuegui.Utils.getFrameLogFile(self.__job, item.rpcObject)
+    def __itemSingleClickedViewLog(self, index):
+        """Called when a frame is clicked on. Views the log file contents
+        @type  index: QModelIndex
+        @param index: The cell single clicked on"""
+        frame = self.objectAt(index)
+        current_log_file = cuegui.Utils.getFrameLogFile(self.__job, frame)
         try:
             old_log_files = sorted(glob.glob('%s.*' % current_log_file),
                                    key=lambda l: int(l.split('rqlog.')[-1]),
@@ -396,16 +414,13 @@ class FrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
             old_log_files = []
 
         self.app.display_log_file_content.emit([current_log_file] + old_log_files)
-        self.app.select_frame.emit(self.__job, item.rpcObject)
+        self.app.select_frame.emit(self.__job, frame)
 
-    def __itemDoubleClickedViewLog(self, item, col):
+    def __itemDoubleClickedViewLog(self, index):
         """Called when a frame is double clicked, views the frame log in a popup
-        @type  item: QTreeWidgetItem
-        @param item: The item double clicked on
-        @type  col: int
-        @param col: Column number double clicked on"""
-        del col
-        frame = item.rpcObject
+        @type  index: QModelIndex
+        @param index: The cell double clicked on"""
+        frame = self.objectAt(index)
         if frame.data.state == opencue.api.job_pb2.RUNNING:
             cuegui.Utils.popupFrameTail(self.__job, frame)
         else:
@@ -425,14 +440,68 @@ class FrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
         @param job: Job can be None, a job object, or a job name.
         @type  job: job, string, None"""
         self.frameSearch = opencue.search.FrameSearch()
+        self.__stopUpdateStream()
         self.__job = job
-        self.removeAllItems()
+        self.model().setJob(job)
         if job:
             self.__jobState = job.state()
             self.__sortByColumnLoad()
         self._lastUpdate = 0
         self.job_changed.emit()
 
+    def closeEvent(self, event):
+        self.__stopUpdateStream()
+        cuegui.AbstractTableView.AbstractTableView.closeEvent(self, event)
+
+    def __startUpdateStream(self):
+        """Subscribes to the frames of the job changed since the last update,
+        unless already subscribed, the job is finished or the cuebot doesn't
+        support it."""
+        if not self.__streamUpdates or self.__updateStream is not None or \
+                not self.__job or self.__lastUpdateTime is None or \
+                self.__jobState == opencue.api.job_pb2.FINISHED:
+            return
+        self.__updateStream = FrameUpdateStream(
+            self.__job, self.__lastUpdateTime,
+            self.__processStreamedUpdate, self.__processStreamEnd)
+        self.__updateStream.start()
+
+    def __stopUpdateStream(self):
+        if self.__updateStream is not None:
+            self.__updateStream.stop()
+            self.__updateStream = None
+
+    def __processStreamedUpdate(self, response):
+        """Applies a JobStreamUpdatedFramesResponse, in the gui thread."""
+        self.__lastUpdateTime = response.server_time
+        self.__jobState = response.state
+        self._processUpdateChanged(None, response.updated_frames.updated_frames)
+
+    def __processStreamEnd(self, error):
+        """Falls back to polling for the changed frames once the update stream
+        is over.
+        @type  error: grpc.RpcError or Exception or None
+        @param error: Why the stream ended, None when the job finished"""
+        self.__updateStream = None
+        if error is None:
+            return
+        # pylint: disable=no-member
+        code = error.code() if hasattr(error, 'code') else None
+        # pylint: enable=no-member
+        if code == grpc.StatusCode.UNIMPLEMENTED:
+            logger.info("cuebot can't stream changed frames, polling for them")
+            self.__streamUpdates = False
+        elif code == grpc.StatusCode.NOT_FOUND:
+            logger.info("Job not found, notifying and clearing job from view")
+            cuegui.app().job_not_found.emit(self.__job)
+            self.setJob(None)
+        elif code == grpc.StatusCode.ABORTED:
+            logger.info("Frame update stream fell behind, getting all frames again")
+            self.updateRequest()
+        else:
+            logger.warning("Frame update stream ended, polling until it can resume: %s",
+                           error)
+
     def getJob(self):
         """Returns the current job
         @return: The current job
@@ -451,21 +520,13 @@ class FrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
 
         @type  status: string
         @param status: A frame status to match"""
-        items = self.findItems(str(status),
-                               QtCore.Qt.MatchContains | QtCore.Qt.MatchWrap,
-                               STATUS_COLUMN)
-
-        # Select all found items
-        for item in items:
-            item.setSelected(True)
-
-        if items:
-            # Scroll to the first item
-            self.scrollToItem(items[0], QtWidgets.QAbstractItemView.PositionAtTop)
+        rows = self.model().matchingRows(STATUS_COLUMN, str(status))
+        self.selectRows(rows)
 
-    def _createItem(self, rpcObject):
-        """Creates and returns the proper item"""
-        return FrameWidgetItem(rpcObject, self, self.__job)
+        if rows:
+            # Scroll to the first frame
+            self.scrollTo(self.model().index(rows[0], 0),
+                          QtWidgets.QAbstractItemView.PositionAtTop)
 
     #
     #    updateRequest        -> _update        -> _getUpdate        -> _processUpdate
@@ -590,30 +651,22 @@ class FrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
         return updatedFrames
 
     def _processUpdate(self, work, rpcObjects):
-        """Remove all items currently in the list.
-        Create new TreeWidgetItems for all new rpcObjects.
+        """Replaces the frames of the model with the rpcObjects, only the rows
+        of frames that changed being redrawn.
         @param work:
         @type  work: from ThreadPool
         @param rpcObjects: A list of rpcObjects
         @type  rpcObjects: list<rpcObject> """
+        del work
         logger.info("_processUpdate")
         try:
-            self._itemsLock.lockForWrite()
-            try:
-                self.clear()
-                self._items = {}
-                if rpcObjects:
-                    for rpcObject in rpcObjects:
-                        self._items[cuegui.Utils.getObjectKey(rpcObject)] = \
-                            self._createItem(rpcObject)
-            finally:
-                self._itemsLock.unlock()
+            self.model().setFrames(rpcObjects or [])
+            self.__startUpdateStream()
         except opencue.exception.CueException as e:
             list(map(logger.warning, cuegui.Utils.exceptionOutput(e)))
 
     def _processUpdateChanged(self, work, rpcObjects):
-        """Update existing TreeWidgetItems if an item already exists for the rpcObject.
-        Remove items that were not updated with rpcObjects.
+        """Updates the frames of the model that are in rpcObjects.
         @param work: from ThreadPool
         @type  work:
         @param rpcObjects: A list of rpcObjects
@@ -626,47 +679,17 @@ class FrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
                 logger.warning("rpcObjects is None")
                 self.updateRequest()
             else:
-                self._itemsLock.lockForWrite()
-                try:
-                    for updatedFrame in rpcObjects:
-                        # If id already exists, update it
-                        self._updateFrame(updatedFrame)
-                finally:
-                    self._itemsLock.unlock()
-
-            logger.info("_processUpdateChanged calling redraw")
-            self.redraw()
+                self.model().updateFrames(rpcObjects)
+                self.__startUpdateStream()
 
         except opencue.exception.CueException as e:
             list(map(logger.warning, cuegui.Utils.exceptionOutput(e)))
 
     def _updateFrame(self, updatedFrame):
-        """Update the frame object on a WidgetItem with the values from a UpdatedFrame object.
+        """Update a frame of the model with the values from a UpdatedFrame object.
         @type updatedFrame: job_pb2.UpdatedFrame
         @param updatedFrame: UpdatedFrame to copy values from."""
-        logger.info("_updateFrame")
-        frameWidget = self._items.get('Frame.{}'.format(updatedFrame.id))
-        if frameWidget:
-            for field in list(job_pb2.UpdatedFrame.DESCRIPTOR.fields_by_name.keys()):
-                if field == "id":
-                    continue
-
-                if field == "frame_state_display_override":
-                    # In proto, cannot assign values to embedded message field.
-                    # Instead, assigning values to any field within the child
-                    # message implies setting the message field in the parent.
-                    # The CopyFrom() handles that assignment for us.
-                    if updatedFrame.HasField('frame_state_display_override'):
-                        frameWidget.rpcObject.data.frame_state_display_override.CopyFrom(
-                            updatedFrame.frame_state_display_override)
-                    else:
-                        # If there's no override in the update but the current
-                        # state has one, we need to remove the current override
-                        if frameWidget.rpcObject.hasFrameStateDisplayOverride():
-                            frameWidget.rpcObject.data.ClearField(
-                                "frame_state_display_override")
-                else:
-                    setattr(frameWidget.rpcObject.data, field, getattr(updatedFrame, field))
+        self.model().updateFrames([updatedFrame])
 
     def contextMenuEvent(self, e):
         """When right clicking on an item, this raises a context menu"""
@@ -683,193 +706,430 @@ class FrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
         self.handle_filter_layers_byLayer[str].emit(list(results.keys()))
 
 
-class FrameWidgetItem(cuegui.AbstractWidgetItem.AbstractWidgetItem):
-    """Widget item representing a single frame."""
-
-    __initialized = False
-
-    # pylint: disable=protected-access
-    def __init__(self, rpcObject, parent, job):
-        if not self.__initialized:
-            self.__class__.__initialized = True
-            self.__class__.__backgroundColor = cuegui.app().palette().color(QtGui.QPalette.Base)
-            self.__class__.__foregroundColor = cuegui.Style.ColorTheme.COLOR_JOB_FOREGROUND
-            self.__class__.__foregroundColorBlack = QCOLOR_BLACK
-            self.__class__.__foregroundColorGreen = QCOLOR_GREEN
-            self.__class__.__alignCenter = QtCore.Qt.AlignCenter
-            self.__class__.__alignRight = QtCore.Qt.AlignRight
-            self.__class__.__rgbFrameState = {}
-            # pylint: disable=consider-using-dict-items
-            for key in cuegui.Constants.RGB_FRAME_STATE:
-                self.__class__.__rgbFrameState[key] = cuegui.Constants.RGB_FRAME_STATE[key]
-            self.__class__.__type = cuegui.Constants.TYPE_FRAME
-        cuegui.AbstractWidgetItem.AbstractWidgetItem.__init__(
-            self, cuegui.Constants.TYPE_FRAME, rpcObject, parent, job)
-        # pylint: disable=unused-private-member
-        self.__show = job.data.show
+class FrameUpdateStream(QtCore.QObject):
+    """Receives the changed frames of a job from the cuebot on a background
+    thread and hands them to the gui thread.
+
+    Responses are passed to the update callback in the gui thread, and the
+    end callback is called once with the error that ended the stream, or None
+    when the job finished. Neither is called once stopped."""
+
+    frames_received = QtCore.Signal(object)
+    stream_ended = QtCore.Signal(object)
+
+    def __init__(self, job, lastUpdateTime, updateCallback, endCallback, parent=None):
+        """
+        @type  job: opencue.wrappers.job.Job
+        @param job: The job to receive the changed frames of
+        @type  lastUpdateTime: int
+        @param lastUpdateTime: Epoch time of the last update of the frames
+        @type  updateCallback: callable
+        @param updateCallback: Called with each JobStreamUpdatedFramesResponse
+        @type  endCallback: callable
+        @param endCallback: Called with the error ending the stream, or None"""
+        QtCore.QObject.__init__(self, parent)
+        self.__job = job
+        self.__lastUpdateTime = lastUpdateTime
+        self.__updateCallback = updateCallback
+        self.__endCallback = endCallback
+        self.__lock = threading.Lock()
+        self.__call = None
+        self.__stopped = False
+        self.__thread = threading.Thread(
+            target=self.__run, name="FrameUpdateStream", daemon=True)
+        # pylint: disable=no-member
+        self.frames_received.connect(self.__deliver, QtCore.Qt.QueuedConnection)
+        self.stream_ended.connect(self.__end, QtCore.Qt.QueuedConnection)
+        # pylint: enable=no-member
+
+    def start(self):
+        """Starts receiving the changed frames."""
+        self.__thread.start()
+
+    def stop(self):
+        """Cancels the stream."""
+        with self.__lock:
+            self.__stopped = True
+            call = self.__call
+        if call is not None:
+            call.cancel()
+
+    def wait(self, timeout=None):
+        """Waits for the background thread to exit."""
+        self.__thread.join(timeout)
+
+    def __run(self):
+        error = None
+        try:
+            with self.__lock:
+                if self.__stopped:
+                    return
+                self.__call = self.__job.streamUpdatedFrames(self.__lastUpdateTime)
+            for response in self.__call:
+                self.frames_received.emit(response)
+        # pylint: disable=broad-except
+        except Exception as e:
+            error = e
+        try:
+            self.stream_ended.emit(error)
+        except RuntimeError:
+            # The widget is gone
+            pass
+
+    def __deliver(self, response):
+        if not self.__stopped:
+            self.__updateCallback(response)
+
+    def __end(self, error):
+        if not self.__stopped:
+            self.__stopped = True
+            self.__endCallback(error)
+
+
+class FrameTableModel(QtCore.QAbstractTableModel):
+    """The frames of a job as a flat table, for FrameMonitorTree.
+
+    Frames are kept in lists indexed by row, along with their ids and states,
+    rather than in an item per frame. Updates only signal the rows that
+    changed, sorting compares keys computed once per frame, and cells are only
+    formatted when the view asks for them, which it does for the rows on
+    screen."""
+
+    def __init__(self, columnInfo, parent=None):
+        """
+        @type  columnInfo: list
+        @param columnInfo: The columns, as defined with addColumn()
+        @type  parent: QObject
+        @param parent: The parent of the model"""
+        QtCore.QAbstractTableModel.__init__(self, parent)
+        self.__columnInfo = columnInfo
+        self.__display = [column[cuegui.AbstractTreeWidget.COLUMN_FUNCTION]
+                          for column in columnInfo]
+        self.__job = None
+        self.__frames = []
+        self.__ids = []
+        self.__states = []
+        self.__rows = {}
+        self.__sortColumn = None
+        self.__order = QtCore.Qt.AscendingOrder
+        # Sort keys of the rows, for the sort column
+        self.__sortKeys = None
+
+        self.__foregroundColor = cuegui.Style.ColorTheme.COLOR_JOB_FOREGROUND
+        self.__rgbFrameState = dict(cuegui.Constants.RGB_FRAME_STATE)
+        self.__checkpointIcon = None
+
+    def setJob(self, job):
+        """Removes all frames and sets the job of the frames to come.
+        @type  job: opencue.wrappers.job.Job
+        @param job: The job, passed to the column callables"""
+        self.clear()
+        self.__job = job
+
+    def clear(self):
+        """Removes all frames."""
+        self.beginResetModel()
+        self.__setRows([])
+        self.endResetModel()
+
+    def objectAt(self, row):
+        """Returns the frame on a row.
+        @type  row: int
+        @rtype:  opencue.wrappers.frame.Frame"""
+        return self.__frames[row]
+
+    def frame(self, frameId):
+        """Returns the frame with an id, or None if it isn't in the table.
+        @type  frameId: str
+        @rtype:  opencue.wrappers.frame.Frame"""
+        row = self.__rows.get(frameId)
+        return self.__frames[row] if row is not None else None
+
+    def runningRows(self):
+        """Returns the rows of the running frames.
+        @rtype: list<int>"""
+        running = opencue.api.job_pb2.RUNNING
+        return [row for row, state in enumerate(self.__states) if state == running]
+
+    def matchingRows(self, column, text):
+        """Returns the rows whose cell in a column contains the text.
+        @type  column: int
+        @type  text: str
+        @rtype:  list<int>"""
+        display = self.__display[column]
+        job = self.__job
+        return [row for row, frame in enumerate(self.__frames)
+                if text in str(display(job, frame))]
+
+    def refreshRows(self, rows, firstColumn=0, lastColumn=None):
+        """Has the view fetch the cells of the rows again, for values that
+        change without the frames changing, like the runtime of running frames.
+        @type  rows: list<int>
+        @type  firstColumn: int
+        @type  lastColumn: int
+        @param lastColumn: The last column to fetch again, the last column by default"""
+        if lastColumn is None:
+            lastColumn = len(self.__columnInfo) - 1
+        for first, last in cuegui.AbstractTableView.rowRanges(rows):
+            self.dataChanged.emit(self.index(first, firstColumn), self.index(last, lastColumn))
+
+    def setFrames(self, frames):
+        """Replaces the frames of the table. Frames already in the table keep
+        their row and selection, and only those that changed are redrawn.
+        @type  frames: list<opencue.wrappers.frame.Frame>"""
+        if not self.__frames or not frames:
+            self.beginResetModel()
+            self.__setRows(frames)
+            self.__sort()
+            self.endResetModel()
+            return
 
-    def data(self, col, role):
-        """Returns the proper display data for the given column and role
-        @type  col: int
-        @param col: The column being displayed
+        newFrames = collections.OrderedDict((frame.id(), frame) for frame in frames)
+
+        removed = [row for row, frameId in enumerate(self.__ids) if frameId not in newFrames]
+        for first, last in reversed(cuegui.AbstractTableView.rowRanges(removed)):
+            self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+            for column in self.__columns():
+                del column[first:last + 1]
+            self.endRemoveRows()
+        if removed:
+            self.__rows = {frameId: row for row, frameId in enumerate(self.__ids)}
+
+        changed = []
+        for row, frameId in enumerate(self.__ids):
+            frame = newFrames.pop(frameId)
+            if frame.data != self.__frames[row].data:
+                changed.append(row)
+            self.__frames[row] = frame
+        self.__rowsChanged(changed)
+
+        if newFrames:
+            first = len(self.__frames)
+            self.beginInsertRows(QtCore.QModelIndex(), first, first + len(newFrames) - 1)
+            for frame in newFrames.values():
+                self.__appendRow(frame)
+            if self.__sortKeys is not None:
+                self.__sortKeys.extend(map(self.__sortKeyFunction(), newFrames.values()))
+            self.endInsertRows()
+            self.__resort()
+
+    def updateFrames(self, updatedFrames):
+        """Copies the values of UpdatedFrames to the frames with the same id.
+        @type  updatedFrames: list<job_pb2.UpdatedFrame>"""
+        changed = []
+        for updatedFrame in updatedFrames:
+            row = self.__rows.get(updatedFrame.id)
+            if row is None:
+                continue
+            data = self.__frames[row].data
+            for field in UPDATED_FRAME_FIELDS:
+                setattr(data, field, getattr(updatedFrame, field))
+
+            # In proto, cannot assign values to embedded message field.
+            # Instead, assigning values to any field within the child
+            # message implies setting the message field in the parent.
+            # The CopyFrom() handles that assignment for us.
+            if updatedFrame.HasField('frame_state_display_override'):
+                data.frame_state_display_override.CopyFrom(
+                    updatedFrame.frame_state_display_override)
+            elif data.HasField('frame_state_display_override'):
+                # If there's no override in the update but the current
+                # state has one, we need to remove the current override
+                data.ClearField("frame_state_display_override")
+            changed.append(row)
+        self.__rowsChanged(changed)
+
+    def __columns(self):
+        """The lists indexed by row."""
+        columns = [self.__frames, self.__ids, self.__states]
+        if self.__sortKeys is not None:
+            columns.append(self.__sortKeys)
+        return columns
+
+    def __setRows(self, frames):
+        self.__frames = list(frames)
+        self.__ids = [frame.id() for frame in self.__frames]
+        self.__states = [frame.data.state for frame in self.__frames]
+        self.__rows = {frameId: row for row, frameId in enumerate(self.__ids)}
+        self.__sortKeys = None
+
+    def __appendRow(self, frame):
+        self.__rows[frame.id()] = len(self.__frames)
+        self.__frames.append(frame)
+        self.__ids.append(frame.id())
+        self.__states.append(frame.data.state)
+
+    def __rowsChanged(self, rows):
+        """Updates what is kept about the frames on the rows and redraws them,
+        sorting again if they moved."""
+        if not rows:
+            return
+        resort = False
+        sortKey = self.__sortKeyFunction() if self.__sortKeys is not None else None
+        for row in rows:
+            frame = self.__frames[row]
+            self.__states[row] = frame.data.state
+            if sortKey is not None:
+                key = sortKey(frame)
+                resort = resort or key != self.__sortKeys[row]
+                self.__sortKeys[row] = key
+        self.refreshRows(rows)
+        if resort:
+            self.__resort()
+
+    def __sortKeyFunction(self):
+        """Returns the function returning the sort key of a frame, for the sort column."""
+        columnInfo = self.__columnInfo[self.__sortColumn]
+        sortBy = (columnInfo[cuegui.AbstractTreeWidget.COLUMN_SORTBY] or
+                  columnInfo[cuegui.AbstractTreeWidget.COLUMN_FUNCTION])
+        job = self.__job
+
+        def sortKey(frame):
+            value = sortBy(job, frame)
+            # None is less than anything, as it was in Python 2
+            return value is not None, value
+        return sortKey
+
+    def __computeSortKeys(self):
+        if self.__sortColumn is not None:
+            self.__sortKeys = list(map(self.__sortKeyFunction(), self.__frames))
+
+    def __sortOrder(self):
+        """Returns the old row of each row once sorted by the sort keys, or
+        None if the rows are in order."""
+        order = sorted(range(len(self.__frames)), key=self.__sortKeys.__getitem__,
+                       reverse=self.__order == QtCore.Qt.DescendingOrder)
+        if all(row == oldRow for row, oldRow in enumerate(order)):
+            return None
+        return order
+
+    def __permute(self, order):
+        """Moves the rows to the given order, a list of their old rows."""
+        for column in self.__columns():
+            column[:] = [column[oldRow] for oldRow in order]
+        self.__rows = {frameId: row for row, frameId in enumerate(self.__ids)}
+
+    def __sort(self):
+        """Sorts the rows by the sort column, computing its keys. Must be called
+        between the signals of a reset."""
+        self.__computeSortKeys()
+        if self.__sortKeys is not None:
+            order = self.__sortOrder()
+            if order is not None:
+                self.__permute(order)
+
+    def __resort(self):
+        """Moves the rows to their place in the order of the sort keys, as a
+        change of layout keeping the selection."""
+        if self.__sortKeys is None:
+            return
+        order = self.__sortOrder()
+        if order is None:
+            return
+        self.layoutAboutToBeChanged.emit()
+        self.__permute(order)
+        persistent = self.persistentIndexList()
+        if persistent:
+            newRows = [0] * len(order)
+            for row, oldRow in enumerate(order):
+                newRows[oldRow] = row
+            self.changePersistentIndexList(
+                persistent,
+                [self.index(newRows[index.row()], index.column()) for index in persistent])
+        self.layoutChanged.emit()
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        """Sorts the frames by a column, with keys computed once per frame. When
+        only the order changes, the keys kept up to date by updates are reused.
+        @type  column: int
+        @type  order: QtCore.Qt.SortOrder"""
+        if column != self.__sortColumn or self.__sortKeys is None:
+            self.__sortColumn = column
+            self.__computeSortKeys()
+        self.__order = order
+        self.__resort()
+
+    # pylint: disable=unused-argument
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        """Returns the number of frames."""
+        return 0 if parent.isValid() else len(self.__frames)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        """Returns the number of columns."""
+        return 0 if parent.isValid() else len(self.__columnInfo)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        """Returns the name or tooltip of a column."""
+        if orientation == QtCore.Qt.Horizontal and 0 <= section < len(self.__columnInfo):
+            if role == QtCore.Qt.DisplayRole:
+                name = self.__columnInfo[section][cuegui.AbstractTreeWidget.COLUMN_NAME]
+                return "" if name.startswith("_") else name
+            if role == QtCore.Qt.ToolTipRole:
+                return self.__columnInfo[section][cuegui.AbstractTreeWidget.COLUMN_TOOLTIP] or None
+        return cuegui.Constants.QVARIANT_NULL
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        """Returns the proper display data for the given cell and role
+        @type  index: QtCore.QModelIndex
+        @param index: The cell being displayed
         @type  role: QtCore.Qt.ItemDataRole
         @param role: The role being displayed
         @rtype:  object
         @return: The desired data"""
-        if role == QtCore.Qt.DisplayRole:
-            return self.column_info[col][cuegui.Constants.COLUMN_INFO_DISPLAY](
-                self._source, self.rpcObject)
+        if not index.isValid():
+            return cuegui.Constants.QVARIANT_NULL
+        col = index.column()
+        frame = self.__frames[index.row()]
+
+        if role == DISPLAY_ROLE:
+            return self.__display[col](self.__job, frame)
 
-        if role == QtCore.Qt.ForegroundRole:
+        if role == FOREGROUND_ROLE:
             if col == STATUS_COLUMN:
-                return self.__foregroundColorBlack
-            if col == PROC_COLUMN and self.rpcObject.data.last_resource.startswith(LOCALRESOURCE):
-                return self.__foregroundColorGreen
+                return QCOLOR_BLACK
+            if col == PROC_COLUMN and frame.data.last_resource.startswith(LOCALRESOURCE):
+                return QCOLOR_GREEN
             return self.__foregroundColor
 
-        if role == QtCore.Qt.BackgroundRole and col == STATUS_COLUMN:
+        if role == BACKGROUND_ROLE and col == STATUS_COLUMN:
             # This where the frame state color is determined
-            # This returns a QtGUI.QColor(r,g,b) object
-            # rpcObject is opencue.wrappers.frame.Frame
-            if self.rpcObject.hasFrameStateDisplayOverride():
-                return QtGui.QColor(self.rpcObject.frameStateDisplayOverride().color.red,
-                                    self.rpcObject.frameStateDisplayOverride().color.green,
-                                    self.rpcObject.frameStateDisplayOverride().color.blue)
-            return self.__rgbFrameState[self.rpcObject.data.state]
-
-        if role == QtCore.Qt.DecorationRole and col == CHECKPOINT_COLUMN:
-            if self.rpcObject.data.checkpoint_state == opencue.api.job_pb2.ENABLED:
-                return QtGui.QIcon(":markdone.png")
-        elif role == QtCore.Qt.TextAlignmentRole:
+            if frame.hasFrameStateDisplayOverride():
+                color = frame.frameStateDisplayOverride().color
+                return QtGui.QColor(color.red, color.green, color.blue)
+            return self.__rgbFrameState[frame.data.state]
+
+        if role == DECORATION_ROLE and col == CHECKPOINT_COLUMN:
+            if frame.data.checkpoint_state == opencue.api.job_pb2.ENABLED:
+                if self.__checkpointIcon is None:
+                    self.__checkpointIcon = QtGui.QIcon(":markdone.png")
+                return self.__checkpointIcon
+        elif role == TEXT_ALIGNMENT_ROLE:
             if col == STATUS_COLUMN:
-                return self.__alignCenter
+                return ALIGN_CENTER
 
             if col == PROC_COLUMN:
-                return self.__alignRight
+                return ALIGN_RIGHT
 
-        elif role == QtCore.Qt.UserRole:
-            return self.__type
+        elif role == USER_ROLE:
+            return cuegui.Constants.TYPE_FRAME
 
         return cuegui.Constants.QVARIANT_NULL
 
-    def __lt__(self, other):
-        """Custom sorting for columns that have a function defined for sorting"""
-        sortLambda = self.column_info[
-            self.treeWidget().sortColumn()][cuegui.AbstractWidgetItem.SORT_LAMBDA]
-        if sortLambda:
-            return sortLambda(self._source, self.rpcObject) < sortLambda(
-                other._source, other.rpcObject)
-
-        return QtWidgets.QTreeWidgetItem.__lt__(self, other)
-
 
 class FrameLogDataBuffer(object):
-    """A cached and threaded interface to reading the last log line"""
-    maxCacheTime = 5
-    maxThreads = 5
-    maxQueue = 500
+    """The last log line and LLU of frames, from the app-wide log data cache"""
 
     # Position of data from getLastLineData
     LASTLINE = 0
     LLU = 1
 
-    # Notes for percentage:
-    # PERCENT = 2
-    # go back 15 lines?
-    # default to "" prior to checking
-    # default to 0% if nothing found unless already a previous value
-
-    def __init__(self):
-        self.__threadPool = cuegui.ThreadPool.ThreadPool(self.maxThreads, self.maxQueue)
-        self.__currentJob = None
-        self.__cache = {}
-        self.__queue = {}
-
-        self.__defaultLine = ""
-        self.__defaultLLU = ""
-
-        # Position of data in self.__cache
-        self.__TIME = 0
-        self.__PATH = 1
-        self.__LINE = 2
-        self.__LLU = 3
-
-    # pylint: disable=inconsistent-return-statements
     def getLastLineData(self, job, frame):
-        """Returns the last line and LLU of the log file or queues a request to update
-        it"""
-        # pylint: disable=broad-except
-        try:
-            __now = time.time()
-            jobKey = cuegui.Utils.getObjectKey(job)
-            if self.__currentJob != jobKey:
-                # New job so clear cache
-                self.__cache.clear()
-                self.__queue.clear()
-                self.__currentJob = jobKey
-
-            # Prevent unbounded queue growth when threadpool is saturated
-            if len(self.__queue) > self.maxQueue:
-                self.__queue.clear()
-
-            frameKey = cuegui.Utils.getObjectKey(frame)
-            if frameKey in self.__cache:
-                # Last line is cached
-                __cached = self.__cache[frameKey]
-                if __cached[self.__TIME] < __now - self.maxCacheTime:
-                    # Its an old cache, queue an update
-                    self.__cache[frameKey][0] = __now + 60
-                    self.__queue[frameKey] = __cached[self.__PATH]
-                    self.__threadPool.queue(self.__doWork, self.__saveWork,
-                                            "getting data for %s" % self.__class__)
-                # Return the cached results anyway
-                return __cached[self.__LINE], __cached[self.__LLU]
-
-            __path = cuegui.Utils.getFrameLogFile(job, frame)
-            # Cache a blank entry until it is filled in
-            self.__cache[frameKey] = [__now + 60,
-                                         __path,
-                                         self.__defaultLine,
-                                         self.__defaultLLU]
-            # Queue an update
-            self.__queue[frameKey] = __path
-            self.__threadPool.queue(self.__doWork, self.__saveWork,
-                                    "getting data for %s" % self.__class__)
-            # Since nothing is updated yet, return an empty string
-            return self.__defaultLine, self.__defaultLLU
-        except Exception as e:
-            list(map(logger.warning, cuegui.Utils.exceptionOutput(e)))
-
-    # pylint: disable=inconsistent-return-statements
-    def __doWork(self):
-        """Pops work from the queue and returns the proxy and last log line"""
-        # pylint: disable=broad-except
-        try:
-            if self.__queue:
-                (proxy, path) = self.__queue.popitem()
-                if os.path.exists(path):
-                    return (proxy,
-                            cuegui.Utils.getLastLine(path),
-                            cuegui.Utils.secondsToHHMMSS(time.time() - os.stat(path).st_mtime))
-                return None
-        except Exception as e:
-            list(map(logger.warning, cuegui.Utils.exceptionOutput(e)))
-
-    def __saveWork(self, work, results):
-        """Stores the resulting last log line to the cache with the proxy key"""
-        del work
-        # pylint: disable=broad-except
-        try:
-            if results:
-                __cached = self.__cache[results[0]]
-                __cached[self.__TIME] = time.time()
-                __cached[self.__LINE] = results[1]
-                __cached[self.__LLU] = results[2]
-        except KeyError:
-            # Could happen while switching jobs with work in the queue
-            pass
-        except Exception as e:
-            list(map(logger.warning, cuegui.Utils.exceptionOutput(e)))
+        """Returns the last line and LLU of the log file of the frame as of when
+        it was last read, a read being queued if that is too long ago"""
+        data = cuegui.LogData.service().get(cuegui.Utils.getFrameLogFile(job, frame))
+        if data is None or data.mtime is None:
+            return "", ""
+        return data.lastLine, cuegui.Utils.secondsToHHMMSS(time.time() - data.mtime)
 
 
 class FrameEtaDataBuffer(object):
@@ -969,7 +1229,7 @@ class FrameContextMenu(QtWidgets.QMenu):
         self.__menuActions = cuegui.MenuActions.MenuActions(
             widget, widget.updateSoon, widget.selectedObjects, widget.getJob)
 
-        count = len(widget.selectedItems())
+        count = len(widget.selectedObjects())
 
         self.__menuActions.frames().addAction(self, "tail")
         self.__menuActions.frames().addAction(self, "view")
@@ -0,0 +1,324 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""An app-wide cache of the modification time and last line of render logs.
+
+Widgets showing the LLU or the last line of frames get them from service()
+instead of reading the logs themselves, so that:
+  - logs are read on a pool of threads, never in the GUI thread,
+  - a log asked for by several widgets at once is only read once,
+  - the last line of a log is only read again once the log changed,
+  - logs on local filesystems are watched for changes rather than checked
+    every Constants.LOG_DATA_MAX_AGE seconds; changes made by other hosts to
+    logs on network filesystems aren't reported, so those are checked again.
+
+Example code:
+# In a column of a tree, where waiting isn't an option:
+cuegui.LogData.lastLine(path)
+
+# Where the data has to be current, for many logs at once:
+for data in cuegui.LogData.service().fetch(paths):
+    print(data.path, data.mtime, data.lastLine)
+"""
+
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import collections
+from concurrent import futures
+import os
+import re
+import threading
+import time
+
+from qtpy import QtCore
+
+import cuegui.Constants
+import cuegui.Logger
+
+
+logger = cuegui.Logger.getLogger(__file__)
+
+# The mtime of a log that can't be read is None
+LogData = collections.namedtuple('LogData', ('path', 'mtime', 'size', 'lastLine'))
+
+# Filesystem types on which changes made by other hosts aren't reported to inotify
+NETWORK_FILESYSTEMS = frozenset([
+    'afs', 'ceph', 'cifs', 'fuse.sshfs', 'glusterfs', 'gpfs', 'lustre', 'nfs', 'nfs4',
+    'smb3', 'smbfs'])
+
+__mountTypes = None
+__service = None
+__serviceLock = threading.Lock()
+
+
+def readLogData(path, previous=None):
+    """Returns the modification time, size and last line of a log.
+
+    The last line is only read if the log changed since previous was read.
+    @type  path: str
+    @param path: The path of the log
+    @type  previous: LogData
+    @param previous: The data of the log read before, if any
+    @rtype:  LogData"""
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError, ValueError):
+        return LogData(path, None, 0, "")
+    if (previous is not None and previous.mtime == stat.st_mtime and
+            previous.size == stat.st_size):
+        return previous
+    return LogData(path, stat.st_mtime, stat.st_size, getLastLine(path))
+
+
+def getLastLine(path):
+    """Reads the last line from the file."""
+
+    ansiEscape = r'(\x9B|\x1B\[)[0-?]*[ -\/]*[@-~]'
+
+    try:
+        with open(path, 'rb') as fp:
+            fp.seek(0, 2)
+
+            backseek = min(4096, fp.tell())
+            fp.seek(-backseek, 1)
+            buf = fp.read(4096)
+
+            newline_pos = buf.rfind(b'\n', 0, len(buf)-1)
+
+        # The read may start inside a character, and logs aren't always utf-8
+        line = buf[newline_pos+1:].strip().decode("utf-8", errors="replace")
+
+        return re.sub(ansiEscape, "", line)
+    except IOError:
+        return ""
+
+
+def getMountTypes():
+    """Returns the mount points of the host and their filesystem types, the
+    deepest mount points first."""
+    # pylint: disable=global-statement
+    global __mountTypes
+    if __mountTypes is None:
+        mounts = []
+        try:
+            with open('/proc/mounts', encoding='utf-8') as fp:
+                for line in fp:
+                    fields = line.split()
+                    if len(fields) > 2:
+                        mounts.append((fields[1].replace('\\040', ' '), fields[2]))
+        except IOError:
+            pass
+        __mountTypes = sorted(mounts, key=lambda mount: len(mount[0]), reverse=True)
+    return __mountTypes
+
+
+def isLocalPath(path):
+    """Returns whether changes to the path are reported by inotify, that is
+    whether it isn't on a network filesystem. Paths are assumed to be remote
+    where the mount points can't be listed."""
+    path = os.path.abspath(path)
+    for mountPoint, fsType in getMountTypes():
+        if path == mountPoint or path.startswith(mountPoint.rstrip('/') + '/'):
+            return fsType not in NETWORK_FILESYSTEMS
+    return False
+
+
+class _CachedLog(object):
+    """The cached data of a log."""
+
+    __slots__ = ('data', 'checked', 'watched')
+
+    def __init__(self):
+        self.data = None
+        self.checked = 0
+        self.watched = False
+
+
+# pylint: disable=no-member
+class LogDataService(QtCore.QObject):
+    """A bounded LRU cache of LogData by path, filled by a pool of threads."""
+
+    _watch = QtCore.Signal(str)
+    _unwatch = QtCore.Signal(str)
+
+    def __init__(self, maxEntries=None, maxAge=None, threads=None, maxWatches=None,
+                 parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self.maxEntries = maxEntries or cuegui.Constants.LOG_DATA_CACHE_SIZE
+        self.maxAge = cuegui.Constants.LOG_DATA_MAX_AGE if maxAge is None else maxAge
+        self.maxWatches = (cuegui.Constants.LOG_DATA_MAX_WATCHES
+                           if maxWatches is None else maxWatches)
+        self.__pool = futures.ThreadPoolExecutor(
+            max_workers=threads or cuegui.Constants.LOG_DATA_THREADS)
+        self.__lock = threading.Lock()
+        self.__cache = collections.OrderedDict()
+        self.__reads = {}
+        self.__watchCount = 0
+
+        # The watcher is only ever touched in the thread of the service
+        self.__watcher = QtCore.QFileSystemWatcher(self)
+        self.__watcher.fileChanged.connect(self.invalidate)
+        self._watch.connect(self.__addWatch)
+        self._unwatch.connect(self.__removeWatch)
+
+    def get(self, path):
+        """Returns the cached data of a log right away, or None if it hasn't
+        been read yet. Data that is missing or out of date is read in the
+        background, for a later call to return.
+        @type  path: str
+        @rtype:  LogData"""
+        with self.__lock:
+            cached = self.__lookup(path)
+            if cached is None or not self.__isCurrent(cached):
+                self.__read(path, cached)
+            return cached.data if cached is not None else None
+
+    def fetch(self, paths):
+        """Returns current data of the logs, reading those out of date at the
+        same time, along with any read already underway.
+        @type  paths: list<str>
+        @rtype:  list<LogData>"""
+        results = []
+        with self.__lock:
+            for path in paths:
+                cached = self.__lookup(path)
+                if cached is not None and self.__isCurrent(cached):
+                    results.append(cached.data)
+                else:
+                    results.append(self.__read(path, cached))
+        return [result.result() if isinstance(result, futures.Future) else result
+                for result in results]
+
+    def invalidate(self, path):
+        """Marks the data of a log out of date, called when a watched log changed."""
+        with self.__lock:
+            cached = self.__cache.get(path)
+            if cached is None:
+                return
+            cached.checked = 0
+            if not cached.watched:
+                return
+            # Watched again once read, the log may have been replaced
+            cached.watched = False
+            self.__watchCount -= 1
+        self._unwatch.emit(path)
+
+    def __len__(self):
+        return len(self.__cache)
+
+    def __lookup(self, path):
+        cached = self.__cache.get(path)
+        if cached is not None:
+            self.__cache.move_to_end(path)
+        return cached
+
+    def __isCurrent(self, cached):
+        return cached.watched or time.time() - cached.checked < self.maxAge
+
+    def __read(self, path, cached):
+        """Returns the future of a read of the log, starting one unless one is
+        already underway. Must be called holding the lock."""
+        future = self.__reads.get(path)
+        if future is None:
+            future = self.__pool.submit(
+                self.__readLog, path, cached.data if cached is not None else None)
+            self.__reads[path] = future
+        return future
+
+    def __readLog(self, path, previous):
+        failed = False
+        try:
+            data = readLogData(path, previous)
+        # pylint: disable=broad-except
+        except Exception as e:
+            logger.warning("Failed to read %s: %s", path, e)
+            data = LogData(path, None, 0, "")
+            failed = True
+        watch = False
+        with self.__lock:
+            try:
+                # Not cached, so that the next call reads the log again
+                if failed:
+                    return data
+                cached = self.__cache.get(path)
+                if cached is None:
+                    cached = self.__cache[path] = _CachedLog()
+                    self.__evict()
+                cached.data = data
+                cached.checked = time.time()
+                if (data.mtime is not None and not cached.watched and
+                        self.__watchCount < self.maxWatches and isLocalPath(path)):
+                    cached.watched = watch = True
+                    self.__watchCount += 1
+            finally:
+                del self.__reads[path]
+        if watch:
+            self._watch.emit(path)
+        return data
+
+    def __evict(self):
+        """Drops the least recently used logs past maxEntries. Must be called
+        holding the lock."""
+        while len(self.__cache) > self.maxEntries:
+            path, cached = self.__cache.popitem(last=False)
+            if cached.watched:
+                self.__watchCount -= 1
+                self._unwatch.emit(path)
+
+    def __addWatch(self, path):
+        if path in self.__watcher.files() or self.__watcher.addPath(path):
+            return
+        with self.__lock:
+            cached = self.__cache.get(path)
+            if cached is not None and cached.watched:
+                cached.watched = False
+                cached.checked = 0
+                self.__watchCount -= 1
+
+    def __removeWatch(self, path):
+        if path in self.__watcher.files():
+            self.__watcher.removePath(path)
+
+
+def service():
+    """Returns the log data service of the application."""
+    # pylint: disable=global-statement
+    global __service
+    with __serviceLock:
+        if __service is None:
+            __service = LogDataService()
+            app = QtCore.QCoreApplication.instance()
+            if app is not None:
+                # Signals of the watcher are handled in the GUI thread
+                __service.moveToThread(app.thread())
+        return __service
+
+
+def lastLine(path):
+    """Returns the cached last line of a log, "" until it has been read."""
+    data = service().get(path)
+    return data.lastLine if data is not None else ""
+
+
+def lluTime(path):
+    """Returns the seconds since a log was last updated, per its cached data,
+    or None until it has been read or if it can't be."""
+    data = service().get(path)
+    if data is None or data.mtime is None:
+        return None
+    return time.time() - data.mtime
@@ -32,6 +32,7 @@ import cuegui.Constants
 import cuegui.Logger
 import cuegui.MainWindow
 import cuegui.SplashWindow
+import cuegui.StartupProfile
 import cuegui.Style
 import cuegui.ThreadPool
 import cuegui.Utils
@@ -40,6 +41,8 @@ import cuegui.GarbageCollector
 
 logger = cuegui.Logger.getLogger(__file__)
 
+PROFILE_STARTUP_FLAG = "--profile-startup"
+
 
 def cuetopia(argv):
     """Starts the Cuetopia window."""
@@ -52,13 +55,21 @@ def cuecommander(argv):
 
 
 def startup(app_name, app_version, argv):
-    """Starts an application window."""
+    """Starts an application window.
+
+    With --profile-startup, the time taken by every phase of the startup is
+    printed once the window is up."""
+    if PROFILE_STARTUP_FLAG in argv:
+        argv = [arg for arg in argv if arg != PROFILE_STARTUP_FLAG]
+        cuegui.StartupProfile.enable()
 
-    app = cuegui.create_app(argv)
+    with cuegui.StartupProfile.phase("create application"):
+        app = cuegui.create_app(argv)
 
     # Start splash screen
-    splash = cuegui.SplashWindow.SplashWindow(
-        app, app_name, app_version, cuegui.Constants.RESOURCE_PATH)
+    with cuegui.StartupProfile.phase("splash screen"):
+        splash = cuegui.SplashWindow.SplashWindow(
+            app, app_name, app_version, cuegui.Constants.RESOURCE_PATH)
 
     # Allow ctrl-c to kill the application
     signal.signal(signal.SIGINT, signal.SIG_DFL)
@@ -71,16 +82,21 @@ def startup(app_name, app_version, argv):
 
     app.threadpool = cuegui.ThreadPool.ThreadPool(3, parent=app)
 
-    settings = cuegui.Layout.startup(app_name)
+    with cuegui.StartupProfile.phase("load settings"):
+        settings = cuegui.Layout.startup(app_name)
     app.settings = settings
 
     __setup_sentry()
 
-    cuegui.Style.init()
+    with cuegui.StartupProfile.phase("style"):
+        cuegui.Style.init()
 
-    mainWindow = cuegui.MainWindow.MainWindow(app_name, app_version,  None)
+    with cuegui.StartupProfile.phase("main window"):
+        mainWindow = cuegui.MainWindow.MainWindow(app_name, app_version,  None)
     mainWindow.displayStartupNotice()
-    mainWindow.show()
+    with cuegui.StartupProfile.phase("show main window"):
+        mainWindow.show()
+    QtCore.QTimer.singleShot(0, cuegui.Style.loadIconTheme)
 
     # Allow ctrl-c to kill the application
     signal.signal(signal.SIGINT, mainWindow.handleExit)
@@ -91,13 +107,17 @@ def startup(app_name, app_version, argv):
 
 
     # Open all windows that were open when the app was last closed
-    for name in mainWindow.windows_names[1:]:
-        if settings.value("%s/Open" % name, "false").lower() == 'true':
-            mainWindow.windowMenuOpenWindow(name)
+    with cuegui.StartupProfile.phase("other windows"):
+        for name in mainWindow.windows_names[1:]:
+            if settings.value("%s/Open" % name, "false").lower() == 'true':
+                mainWindow.windowMenuOpenWindow(name)
 
     # End splash screen
     splash.hide()
 
+    # Reported once the plugins shown on startup have been started and painted
+    QtCore.QTimer.singleShot(0, cuegui.StartupProfile.report)
+
     # TODO(#609) Refactor the CueGUI classes to make this garbage collector
     #   replacement unnecessary.
     gc = cuegui.GarbageCollector.GarbageCollector(parent=app, debug=False)  # pylint: disable=unused-variable
@@ -39,6 +39,7 @@ import opencue
 import cuegui.Constants
 import cuegui.Logger
 import cuegui.Plugins
+import cuegui.StartupProfile
 import cuegui.Utils
 
 
@@ -110,7 +111,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.__plugins.setupPluginMenu(self.PluginMenu)
 
         # Restore saved settings
-        self.__restoreSettings()
+        with cuegui.StartupProfile.phase("restore layout"):
+            self.__restoreSettings()
 
         self.app.status.connect(self.showStatusBarMessage)
         self.showStatusBarMessage("Ready")
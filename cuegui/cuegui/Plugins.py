@@ -25,6 +25,11 @@ PLUGIN_REQUIRES    : (optional) The application name that the plugin requires
                    : to load. ex. "CueCommander"
 PLUGIN_PROVIDES    : The name of the class that the plugin provides.
 
+Plugins are registered by these constants, read from their source while they
+are plain strings, and only imported once first opened. Plugins restored
+from the saved layout are started once shown, or once
+Constants.PLUGIN_ACTIVATION_DELAY passed for those behind other docks.
+
 When a plugin is instantiated, a reference to the MainWindow is provided to the
 constructor.
 
@@ -47,12 +52,15 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import division
 
+import ast
+import functools
 import json
 
 from builtins import str
 from builtins import map
 from builtins import object
 import os
+import re
 import sys
 import traceback
 import pickle
@@ -62,6 +70,8 @@ from qtpy import QtWidgets
 
 import cuegui.Constants
 import cuegui.Logger
+import cuegui.StartupProfile
+import cuegui.Style
 import cuegui.Utils
 
 
@@ -70,6 +80,12 @@ logger = cuegui.Logger.getLogger(__file__)
 CLASS = "CLASS"
 DESCRIPTION = "DESCRIPTION"
 CATEGORY = "CATEGORY"
+MODULE = "MODULE"
+PATH = "PATH"
+PROVIDES = "PROVIDES"
+
+PLUGIN_METADATA = ("PLUGIN_NAME", "PLUGIN_CATEGORY", "PLUGIN_DESCRIPTION", "PLUGIN_REQUIRES",
+                   "PLUGIN_PROVIDES")
 
 SETTINGS_KEY = 0
 SETTINGS_GET = 1
@@ -81,10 +97,78 @@ except AttributeError:
     JSON_EXCEPTION_CLASS = ValueError
 
 
+def readPluginMetadata(path):
+    """Returns the PLUGIN_* constants of a plugin module, read from its source
+    without importing it.
+    @type  path: str
+    @param path: The path of the module
+    @rtype:  dict
+    @return: The constants by name, or None if the module doesn't define them
+             all as plain strings"""
+    try:
+        with open(path, "rb") as fp:
+            source = fp.read()
+    except IOError:
+        return None
+    # The constants come before the classes, which are slow to parse
+    header = re.split(br"^(?:class|def|@)\b", source, maxsplit=1, flags=re.MULTILINE)[0]
+    metadata = _readMetadata(header, path)
+    if metadata is None and len(header) < len(source):
+        metadata = _readMetadata(source, path)
+    return metadata
+
+
+def _readMetadata(source, path):
+    try:
+        tree = ast.parse(source, path)
+    except (SyntaxError, ValueError):
+        return None
+    metadata = {}
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1 and
+                isinstance(node.targets[0], ast.Name) and
+                node.targets[0].id in PLUGIN_METADATA):
+            try:
+                value = ast.literal_eval(node.value)
+            except ValueError:
+                return None
+            if not isinstance(value, str):
+                return None
+            metadata[node.targets[0].id] = value
+    if not all(name in metadata
+               for name in ("PLUGIN_NAME", "PLUGIN_DESCRIPTION", "PLUGIN_PROVIDES")):
+        return None
+    return metadata
+
+
+class PendingPlugin(QtWidgets.QDockWidget):
+    """Holds the place of a restored plugin in the layout of the window until
+    the plugin is started."""
+
+    closed = QtCore.Signal(object)
+
+    def __init__(self, mainWindow, name, state):
+        QtWidgets.QDockWidget.__init__(self, name, mainWindow)
+        self.name = name
+        self.state = state
+        self.setAllowedAreas(QtCore.Qt.AllDockWidgetAreas)
+        self.setFeatures(
+            QtWidgets.QDockWidget.DockWidgetClosable | QtWidgets.QDockWidget.DockWidgetMovable)
+        self.setObjectName(name)
+        self.setWidget(QtWidgets.QWidget())
+        mainWindow.addDockWidget(QtCore.Qt.LeftDockWidgetArea, self)
+
+    def closeEvent(self, event):
+        """Delete event and emit close signal"""
+        del event
+        self.closed.emit(self)
+
+
 class Plugins(object):
     """Main class responsible for loading and managing plugins."""
 
-    # Keyed to name. each is a dictionary with CLASS, DESCRIPTION and optionally CATEGORY
+    # Keyed to name. each is a dictionary with DESCRIPTION, PROVIDES, MODULE, PATH,
+    # optionally CATEGORY and, once imported, CLASS
     __plugins = {}
     _loadedPaths = []
 
@@ -95,20 +179,22 @@ class Plugins(object):
         @param name: Name of current window
         @type  name: string"""
         self.__running = []
+        self.__pending = []
         self.name = name
         self.mainWindow = mainWindow
         self.app = cuegui.app()
 
         self.__menu_separator = " \t-> "
 
-        # Load plugin paths from the config file
-        __pluginPaths = self.app.settings.value("Plugin_Paths", [])
-        for path in cuegui.Constants.DEFAULT_PLUGIN_PATHS + __pluginPaths:
-            self.loadPluginPath(str(path))
+        with cuegui.StartupProfile.phase("find plugins"):
+            # Load plugin paths from the config file
+            __pluginPaths = self.app.settings.value("Plugin_Paths", [])
+            for path in cuegui.Constants.DEFAULT_PLUGIN_PATHS + __pluginPaths:
+                self.loadPluginPath(str(path))
 
-        # Load plugins explicitly listed in the config file
-        self.loadConfigFilePlugins("General")
-        self.loadConfigFilePlugins(self.name)
+            # Load plugins explicitly listed in the config file
+            self.loadConfigFilePlugins("General")
+            self.loadConfigFilePlugins(self.name)
 
     def loadConfigFilePlugins(self, configGroup):
         """Loads plugins explicitly listed in the config file for the window.
@@ -165,11 +251,18 @@ class Plugins(object):
         @rtype:  list"""
         return self.__running
 
+    def pendingList(self):
+        """Lists the restored plugins that haven't been started yet.
+
+        @rtype:  list<PendingPlugin>"""
+        return self.__pending
+
     def saveState(self):
         """Saves the names of all open plugins.
 
-        Calls .saveSettings (if available) on all plugins."""
-        opened = []
+        Calls .saveSettings (if available) on all plugins. Plugins that haven't
+        been started yet keep the state they were restored with."""
+        opened = ["%s::%s" % (pending.name, pending.state) for pending in self.__pending]
         for plugin in self.__running:
             # pylint: disable=broad-except
             try:
@@ -189,39 +282,95 @@ class Plugins(object):
         for path in pluginPaths:
             self.loadPluginPath(str(path))
 
-        # Runs any plugins that were saved to the settings
+        # Holds the place of the plugins that were saved to the settings, which
+        # start once shown
         openPlugins = self.app.settings.value("%s/Plugins_Opened" % self.name) or []
         if isinstance(openPlugins, str):
             openPlugins = [openPlugins]
         for plugin in openPlugins:
             if '::' in plugin:
                 plugin_name, plugin_state = str(plugin).split("::")
-                self.launchPlugin(plugin_name, plugin_state)
+                if plugin_name not in self.__plugins:
+                    logger.warning("Unable to launch previously open plugin, it no longer "
+                                   "exists: %s", plugin_name)
+                    continue
+                pending = PendingPlugin(self.mainWindow, plugin_name, plugin_state)
+                pending.visibilityChanged.connect(
+                    functools.partial(self.__pendingVisibilityChanged, pending))
+                pending.closed.connect(self.__closePendingPlugin, QtCore.Qt.QueuedConnection)
+                self.__pending.append(pending)
+        if self.__pending:
+            QtCore.QTimer.singleShot(
+                cuegui.Constants.PLUGIN_ACTIVATION_DELAY, self.__activateNextPendingPlugin)
+
+    def __pendingVisibilityChanged(self, pending, visible):
+        if visible:
+            # Not while the layout is being shown
+            QtCore.QTimer.singleShot(0, functools.partial(self.activatePlugin, pending, True))
+
+    def __activateNextPendingPlugin(self):
+        """Starts the plugins left pending, one per pass of the event loop so
+        that the window stays responsive."""
+        if self.__pending:
+            self.activatePlugin(self.__pending[0])
+            QtCore.QTimer.singleShot(0, self.__activateNextPendingPlugin)
+
+    def __closePendingPlugin(self, pending):
+        if pending in self.__pending:
+            self.__pending.remove(pending)
+            self.mainWindow.removeDockWidget(pending)
+            pending.deleteLater()
+
+    def activatePlugin(self, pending, raiseDock=False):
+        """Starts a restored plugin in the place of the dock that held it.
+
+        @type  pending: PendingPlugin
+        @param pending: The dock holding the place of the plugin
+        @type  raiseDock: bool
+        @param raiseDock: Whether to raise the plugin above the docks it is tabbed with"""
+        if pending not in self.__pending:
+            return
+        self.__pending.remove(pending)
+        plugin_instance = self.launchPlugin(pending.name, pending.state)
+        if isinstance(plugin_instance, QtWidgets.QDockWidget):
+            if pending.isFloating():
+                plugin_instance.setFloating(True)
+                plugin_instance.setGeometry(pending.geometry())
+            else:
+                self.mainWindow.tabifyDockWidget(pending, plugin_instance)
+            if pending.isHidden():
+                plugin_instance.hide()
+            elif raiseDock:
+                plugin_instance.raise_()
+        self.mainWindow.removeDockWidget(pending)
+        pending.deleteLater()
 
     def launchPlugin(self, plugin_name, plugin_state):
-        """Launches the desired plugin.
+        """Launches the desired plugin, importing it if need be.
 
         @param plugin_name: The name of the plugin as provided by PLUGIN_NAME
         @type  plugin_name: string
         @param plugin_state: The state of the plugin's tab
-        @type  plugin_state: string"""
-        try:
-            plugin_class = self.__plugins[plugin_name][CLASS]
-        except KeyError:
+        @type  plugin_state: string
+        @return: The plugin instance, or None if it couldn't be launched"""
+        if plugin_name not in self.__plugins:
             logger.warning(
                 "Unable to launch previously open plugin, it no longer exists: %s", plugin_name)
-            return
+            return None
 
+        cuegui.Style.loadIconTheme()
         # pylint: disable=broad-except
         try:
-            plugin_instance = plugin_class(self.mainWindow)
+            plugin_class = self.__pluginClass(plugin_name)
+            with cuegui.StartupProfile.phase("start plugin %s" % plugin_name):
+                plugin_instance = plugin_class(self.mainWindow)
             self.__running.append((plugin_name, plugin_instance))
             plugin_instance.closed.connect(self.__closePlugin, QtCore.Qt.QueuedConnection)
         except Exception:
             logger.warning(
                 "Failed to load plugin module: %s\n%s",
                 plugin_name, ''.join(traceback.format_exception(*sys.exc_info())))
-            return
+            return None
 
         if hasattr(plugin_instance, "pluginRestoreState"):
             # pylint: disable=broad-except
@@ -250,6 +399,23 @@ class Plugins(object):
             except Exception as e:
                 logger.warning("Error restoring plugin state for: %s", plugin_name)
                 list(map(logger.warning, cuegui.Utils.exceptionOutput(e)))
+        return plugin_instance
+
+    def __pluginClass(self, plugin_name):
+        """Returns the class a plugin provides, importing its module if it
+        wasn't yet."""
+        plugin = self.__plugins[plugin_name]
+        if CLASS not in plugin:
+            with cuegui.StartupProfile.phase("import plugin %s" % plugin_name):
+                orig_sys_path = sys.path[:]
+                if plugin[PATH]:
+                    sys.path.append(plugin[PATH])
+                try:
+                    module = __import__(plugin[MODULE], globals(), locals())
+                finally:
+                    sys.path = orig_sys_path
+            plugin[CLASS] = getattr(module, plugin[PROVIDES])
+        return plugin[CLASS]
 
     def loadPluginPath(self, plugin_dir):
         """This will load all plugin modules located in the path provided
@@ -267,7 +433,12 @@ class Plugins(object):
             for p in os.listdir(plugin_dir):
                 name, ext = os.path.splitext(p)
                 if ext == ".py" and not name in ["__init__", "Manifest", "README"]:
-                    self.loadPlugin(name)
+                    metadata = readPluginMetadata(os.path.join(plugin_dir, p))
+                    if metadata is None:
+                        # Only known once imported
+                        self.loadPlugin(name)
+                    else:
+                        self.__registerPlugin(metadata, name, plugin_dir)
             sys.path = orig_sys_path
         else:
             logger.warning("Unable to read the plugin path: %s", plugin_dir)
@@ -284,26 +455,44 @@ class Plugins(object):
             logger.info("Name:     %s", module.PLUGIN_NAME)
             logger.info("Provides: %s", module.PLUGIN_PROVIDES)
 
-            # If a plugin requires a different app, do not use it
-            # TODO: accept a list also, log it
-            if hasattr(module, "PLUGIN_REQUIRES"):
-                if self.mainWindow.app_name != module.PLUGIN_REQUIRES:
-                    return
-
-            newPlugin = {}
-            newPlugin[CLASS] = getattr(module, module.PLUGIN_PROVIDES)
-            newPlugin[DESCRIPTION] = str(module.PLUGIN_DESCRIPTION)
-
-            if hasattr(module, "PLUGIN_CATEGORY"):
-                newPlugin[CATEGORY] = str(module.PLUGIN_CATEGORY)
-
-            self.__plugins[module.PLUGIN_NAME] = newPlugin
+            metadata = {attribute: getattr(module, attribute)
+                        for attribute in PLUGIN_METADATA if hasattr(module, attribute)}
+            self.__registerPlugin(metadata, name, None, getattr(module, module.PLUGIN_PROVIDES))
 
         except Exception:
             logger.warning(
                 "Failed to load plugin %s\n%s",
                 name, ''.join(traceback.format_exception(*sys.exc_info())))
 
+    def __registerPlugin(self, metadata, module, path, plugin_class=None):
+        """Adds a plugin to the menu by its PLUGIN_* constants.
+        @param metadata: The constants by name
+        @type  metadata: dict
+        @param module: The name of the module of the plugin
+        @type  module: string
+        @param path: The directory to import the module from, None if it is in the python path
+        @type  path: string
+        @param plugin_class: The class the plugin provides, if already imported
+        @type  plugin_class: type"""
+        # If a plugin requires a different app, do not use it
+        # TODO: accept a list also, log it
+        if "PLUGIN_REQUIRES" in metadata:
+            if self.mainWindow.app_name != metadata["PLUGIN_REQUIRES"]:
+                return
+
+        newPlugin = {}
+        newPlugin[MODULE] = module
+        newPlugin[PATH] = path
+        newPlugin[PROVIDES] = metadata["PLUGIN_PROVIDES"]
+        newPlugin[DESCRIPTION] = str(metadata["PLUGIN_DESCRIPTION"])
+        if plugin_class is not None:
+            newPlugin[CLASS] = plugin_class
+
+        if "PLUGIN_CATEGORY" in metadata:
+            newPlugin[CATEGORY] = str(metadata["PLUGIN_CATEGORY"])
+
+        self.__plugins[metadata["PLUGIN_NAME"]] = newPlugin
+
     def setupPluginMenu(self, menu):
         """Adds a plugin menu option to the supplied menubar
         @param menu: The menu to add the loaded plugins to
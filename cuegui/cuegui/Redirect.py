@@ -37,6 +37,7 @@ from qtpy import QtWidgets
 
 import opencue
 
+import cuegui.LogData
 import cuegui.Logger
 import cuegui.Utils
 
@@ -807,10 +808,8 @@ class RedirectWidget(QtWidgets.QWidget):
                                          self.__controls.getLimit(), self)
         progress.setWindowModality(QtCore.Qt.WindowModal)
 
+        candidates = []
         for proc in procs:
-            if progress.wasCanceled():
-                break
-
             # Stick with the target show
             if proc.data.show_name != show.data.name:
                 continue
@@ -822,9 +821,6 @@ class RedirectWidget(QtWidgets.QWidget):
             if proc.data.redirect_target:
                 continue
 
-            if ok >= self.__controls.getLimit():
-                break
-
             if jobRegexFilter:
                 if re.match(jobRegexFilter, proc.data.job_name):
                     continue
@@ -837,12 +833,24 @@ class RedirectWidget(QtWidgets.QWidget):
                 if proc.data.group_name not in groupFilter:
                     continue
 
+            candidates.append(proc)
+
+        # Read the logs of all the candidates at once rather than one per row
+        logs = cuegui.LogData.service().fetch([proc.data.log_path for proc in candidates])
+
+        for proc, log in zip(candidates, logs):
+            if progress.wasCanceled():
+                break
+
+            if ok >= self.__controls.getLimit():
+                break
+
             # pylint: disable=broad-except
             try:
                 name = proc.data.name.split("/")[0]
-                lluTime = cuegui.Utils.getLLU(proc)
+                lluTime = None if log.mtime is None else time.time() - log.mtime
                 job = proc.getJob()
-                logLines = cuegui.Utils.getLastLine(proc.data.log_path) or ""
+                logLines = log.lastLine
 
                 if name not in hosts:
                     cue_host = opencue.api.findHost(name)
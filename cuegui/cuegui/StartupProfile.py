@@ -0,0 +1,102 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+
+"""Timings of the phases of the startup of CueGUI, printed by --profile-startup.
+
+Phases are timed by wrapping them in phase(), which does nothing unless
+profiling was enabled. Phases may nest, and the report indents them under
+the phase they ran in.
+
+Example code:
+with cuegui.StartupProfile.phase("restore plugins"):
+    restorePlugins()
+"""
+
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import contextlib
+import sys
+import time
+
+
+__profile = None
+
+
+class StartupProfile(object):
+    """The phases timed so far, in the order they started."""
+
+    def __init__(self, clock=time.perf_counter):
+        self.__clock = clock
+        self.__start = clock()
+        self.__depth = 0
+        # [name, depth, seconds since the start, seconds taken or None while running]
+        self.phases = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Times the code run in the context as a phase of the startup."""
+        entry = [name, self.__depth, self.__clock() - self.__start, None]
+        self.phases.append(entry)
+        self.__depth += 1
+        try:
+            yield
+        finally:
+            self.__depth -= 1
+            entry[3] = self.__clock() - self.__start - entry[2]
+
+    def elapsed(self):
+        """Returns the seconds since profiling started."""
+        return self.__clock() - self.__start
+
+    def report(self):
+        """Returns the timings of the phases as text, one phase per line."""
+        lines = ['CueGUI started in %.1f ms' % (self.elapsed() * 1000)]
+        for name, depth, start, seconds in self.phases:
+            took = '%9.1f ms' % (seconds * 1000) if seconds is not None else '  running   '
+            lines.append('%s  at %8.1f ms  %s%s' % (took, start * 1000, '  ' * depth, name))
+        return '\n'.join(lines)
+
+
+def enable():
+    """Starts profiling, from now on."""
+    # pylint: disable=global-statement
+    global __profile
+    __profile = StartupProfile()
+    return __profile
+
+
+def profile():
+    """Returns the profile of the startup, or None unless profiling was enabled."""
+    return __profile
+
+
+def phase(name):
+    """Returns a context timing the code run in it as a phase of the startup
+    when profiling, one doing nothing otherwise.
+    @type  name: str
+    @param name: what the phase does"""
+    if __profile is None:
+        return contextlib.nullcontext()
+    return __profile.phase(name)
+
+
+def report(stream=None):
+    """Prints the timings of the phases so far, when profiling."""
+    if __profile is not None:
+        print(__profile.report(), file=stream or sys.stderr)
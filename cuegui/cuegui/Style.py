@@ -36,6 +36,7 @@ DEFAULT_FONT_SIZE = 10.0
 
 ColorTheme = None
 IconTheme = None
+IconThemeName = None
 Font = None
 
 
@@ -47,11 +48,23 @@ def loadColorTheme(name):
 
 
 def setIconTheme(name):
-    """Sets the icon theme for the app.
+    """Sets the icon theme for the app. Its resources are registered by
+    loadIconTheme(), once the window is up or a plugin starts.
 
     Not sure if this can be changed on the fly yet."""
+    global IconTheme, IconThemeName
+    IconThemeName = name
+    IconTheme = None
+
+
+def loadIconTheme():
+    """Registers the resources of the icon theme, if they aren't yet. Icons of
+    the theme, like QIcon(":kill.png"), are blank if created before."""
     global IconTheme
-    IconTheme = importlib.import_module('.icons_rcc', package='cuegui.images.%s' % name)
+    if IconTheme is None and IconThemeName is not None:
+        IconTheme = importlib.import_module(
+            '.icons_rcc', package='cuegui.images.%s' % IconThemeName)
+    return IconTheme
 
 
 def setFont(font):
@@ -43,6 +43,7 @@ import opencue.wrappers.group
 
 import cuegui.ConfirmationDialog
 import cuegui.Constants
+import cuegui.LogData
 import cuegui.Logger
 
 
@@ -438,46 +439,20 @@ def getFrameLogFile(job, frame):
 
 def getFrameLLU(job, frame):
     """Get a frame's last log update time."""
-    __now = time.time()
-    if __now - getattr(frame, "getFrameLLUTime", 0) >= 5:
-        # pylint: disable=bare-except
-        try:
-            frame.getFrameLLU = __now - os.stat(getFrameLogFile(job, frame)).st_mtime
-        except:
-            frame.getFrameLLU = 0
-        frame.getFrameLLUTime = __now
-    return frame.getFrameLLU
+    data = cuegui.LogData.service().fetch([getFrameLogFile(job, frame)])[0]
+    if data.mtime is None:
+        return 0
+    return time.time() - data.mtime
 
 
 def getFrameLastLine(job, frame):
     """Get the last line of a frame log."""
-    __now = time.time()
-    if __now - getattr(frame, "getFrameLastLineTime", 0) >= 5:
-        frame.getFrameLastLine = getLastLine(getFrameLogFile(job, frame))
-        frame.getFrameLastLineTime = __now
-    return frame.getFrameLastLine
+    return cuegui.LogData.service().fetch([getFrameLogFile(job, frame)])[0].lastLine
 
 
 def getLastLine(path):
-    """Reads the last line from the file."""
-
-    ansiEscape = r'(\x9B|\x1B\[)[0-?]*[ -\/]*[@-~]'
-
-    try:
-        with open(path, 'rb') as fp:
-            fp.seek(0, 2)
-
-            backseek = min(4096, fp.tell())
-            fp.seek(-backseek, 1)
-            buf = fp.read(4096)
-
-            newline_pos = buf.rfind(b'\n', 0, len(buf)-1)
-
-        line = buf[newline_pos+1:].strip().decode("utf-8")
-
-        return re.sub(ansiEscape, "", line)
-    except IOError:
-        return ""
+    """Reads the last line from the file, see cuegui.LogData.getLastLine."""
+    return cuegui.LogData.getLastLine(path)
 
 
 def popupTail(file, facility=None):
@@ -874,13 +849,12 @@ def getLLU(item):
         logFile = item.log_path
     else:
         return ""
-    try:
-        statInfo = os.path.getmtime(logFile)
-    except Exception as e:
-        logger.info("not able to extract LLU: %s", e)
+    data = cuegui.LogData.service().fetch([logFile])[0]
+    if data.mtime is None:
+        logger.info("not able to extract LLU of %s", logFile)
         return None
 
-    lluTime = time.time() - statInfo
+    lluTime = time.time() - data.mtime
 
     return lluTime
 
@@ -22,6 +22,7 @@ from __future__ import absolute_import
 
 from builtins import str
 from builtins import range
+import mmap
 import os
 import re
 import string
@@ -35,6 +36,10 @@ from qtpy import QtWidgets
 
 import cuegui.Constants
 import cuegui.AbstractDockWidget
+import cuegui.Logger
+
+
+logger = cuegui.Logger.getLogger(__file__)
 
 
 PLUGIN_NAME = 'LogView'
@@ -44,9 +49,54 @@ PLUGIN_PROVIDES = 'LogViewPlugin'
 PRINTABLE = set(string.printable)
 
 
+# Filesystems whose files are read with plain reads rather than mapped
+NETWORK_FILESYSTEMS = frozenset([
+    'nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'afs', 'ceph', 'glusterfs',
+    'fuse.glusterfs', 'fuse.sshfs', 'fuse.cephfs', 'lustre', 'gpfs', 'beegfs'])
+
+
+def _utf8_boundary(data):
+    """
+    Returns the length of data without a trailing incomplete UTF-8 character,
+    so data read from a file being written can be decoded on its own
+
+    @param data: The bytes to check
+    @type data: bytes
+    @rtype: int
+    """
+    for back in range(1, min(4, len(data)) + 1):
+        byte = data[-back]
+        if byte & 0xC0 == 0x80:
+            continue  # continuation byte
+        if byte >= 0xF0:
+            needed = 4
+        elif byte >= 0xE0:
+            needed = 3
+        elif byte >= 0xC0:
+            needed = 2
+        else:
+            needed = 1
+        return len(data) - back if back < needed else len(data)
+    return len(data)
+
+
+def decode_log(data):
+    """
+    Decodes log file bytes for display
+
+    @param data: The bytes to decode
+    @type data: bytes
+    @rtype: str
+    """
+    return data.decode('utf-8', errors='replace')
+
+
 class LogReader(object):
     """
-    Custom class to abstract reading log files from multiple backends
+    Custom class to abstract reading log files from multiple backends.
+    Logs are read by regions of bytes, so only the appended data or the part of
+    the file around the scroll position needs to be read. Files on local
+    filesystems are mapped rather than read.
     """
     filepath = None
     type = None
@@ -57,6 +107,7 @@ class LogReader(object):
            @param   filepath: The filepath to log to
         """
         self.filepath = filepath
+        self._local = None
 
     def size(self):
         """Return the size of the file"""
@@ -79,6 +130,193 @@ class LogReader(object):
 
         return content
 
+    def is_local(self):
+        """
+        Returns whether the file is on a local filesystem, according to the
+        mount table. Files are considered remote when it can't be read.
+
+        @rtype: bool
+        """
+        if self._local is None:
+            self._local = False
+            path = os.path.realpath(self.filepath)
+            mount_point = ''
+            try:
+                with open('/proc/self/mounts', 'r', encoding='utf-8') as mounts:
+                    for line in mounts:
+                        fields = line.split()
+                        if len(fields) < 3:
+                            continue
+                        mount = fields[1].replace('\\040', ' ')
+                        if (len(mount) >= len(mount_point) and
+                                (path == mount or
+                                 path.startswith(mount.rstrip('/') + '/'))):
+                            mount_point = mount
+                            self._local = fields[2] not in NETWORK_FILESYSTEMS
+            except (IOError, OSError):
+                self._local = False
+        return self._local
+
+    def read_region(self, start, end):
+        """
+        Returns the bytes of the file between two offsets
+
+        @param start: The offset of the first byte
+        @type start: int
+        @param end: The offset after the last byte
+        @type end: int
+        @rtype: bytes
+        """
+        if end <= start:
+            return b''
+        with open(self.filepath, 'rb') as fp:
+            if self.is_local():
+                try:
+                    with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        return mapped[start:end]
+                except (ValueError, OSError):
+                    pass  # Empty or special files can't be mapped
+            fp.seek(start)
+            return fp.read(end - start)
+
+    def read_tail(self, max_size):
+        """
+        Reads the end of the file, starting on a line
+
+        @param max_size: The maximum number of bytes to read
+        @type max_size: int
+        @return: The offset of the first byte read, the bytes read, the file size
+        @rtype: tuple(int, bytes, int)
+        """
+        size = self.size()
+        start = max(0, size - max_size)
+        data = self.read_region(start, size)
+        if start > 0:
+            newline = data.find(b'\n')
+            if newline != -1 and newline + 1 < len(data):
+                start += newline + 1
+                data = data[newline + 1:]
+        data = data[:_utf8_boundary(data)]
+        return start, data, size
+
+    def read_before(self, offset, max_size):
+        """
+        Reads the lines before an offset
+
+        @param offset: The offset to read up to, the start of a line
+        @type offset: int
+        @param max_size: The maximum number of bytes to read
+        @type max_size: int
+        @return: The offset of the first byte read, the bytes read, the file size
+        @rtype: tuple(int, bytes, int)
+        """
+        start = max(0, offset - max_size)
+        data = self.read_region(start, offset)
+        if start > 0:
+            newline = data.find(b'\n')
+            if newline != -1 and newline + 1 < len(data):
+                start += newline + 1
+                data = data[newline + 1:]
+        return start, data, self.size()
+
+    def read_after(self, offset, max_size):
+        """
+        Reads the data after an offset, up to the end of a line unless the end
+        of the file is reached
+
+        @param offset: The offset to read from
+        @type offset: int
+        @param max_size: The maximum number of bytes to read
+        @type max_size: int
+        @return: The bytes read and the file size
+        @rtype: tuple(bytes, int)
+        """
+        size = self.size()
+        end = min(size, offset + max_size)
+        data = self.read_region(offset, end)
+        if end < size:
+            newline = data.rfind(b'\n')
+            if newline != -1:
+                data = data[:newline + 1]
+        return data[:_utf8_boundary(data)], size
+
+    def search(self, pattern, chunk_size, is_cancelled=None):
+        """
+        Searches the file for a compiled regular expression, chunk by chunk so
+        the file never has to be loaded whole. Chunks are split on lines,
+        a match spanning two chunks isn't found.
+
+        @param pattern: The regular expression to search for
+        @type pattern: re.Pattern
+        @param chunk_size: The number of bytes to search at a time
+        @type chunk_size: int
+        @param is_cancelled: Called between chunks, stops the search when it
+                             returns True
+        @type is_cancelled: callable
+        @return: The offset and length in bytes of every match
+        @rtype: list<tuple(int, int)>
+        """
+        matches = []
+        size = self.size()
+        offset = 0
+        while offset < size:
+            if is_cancelled is not None and is_cancelled():
+                break
+            end = min(size, offset + chunk_size)
+            data = self.read_region(offset, end)
+            if not data:
+                break
+            if end < size:
+                newline = data.rfind(b'\n')
+                if newline != -1:
+                    data = data[:newline + 1]
+            # surrogateescape maps each undecodable byte to one character and back
+            text = data.decode('utf-8', errors='surrogateescape')
+            char_pos = 0
+            byte_pos = offset
+            for match in pattern.finditer(text):
+                byte_pos += len(text[char_pos:match.start()].encode('utf-8', 'surrogateescape'))
+                char_pos = match.start()
+                matches.append((byte_pos, len(match.group(0).encode('utf-8', 'surrogateescape'))))
+            offset += len(data)
+        return matches
+
+
+class LogChunk(object):
+    """Part of a log file read by a LogLoader"""
+
+    REPLACE = 'replace'
+    APPEND = 'append'
+    PREPEND = 'prepend'
+
+    def __init__(self, kind, start, data, size, mtime=0, generation=0, message=None):
+        """
+        @param kind: How the chunk updates the displayed window,
+                     REPLACE, APPEND or PREPEND
+        @type kind: str
+        @param start: The offset of the chunk in the file
+        @type start: int
+        @param data: The bytes of the chunk
+        @type data: bytes
+        @param size: The size of the file when it was read
+        @type size: int
+        @param mtime: The modification time of the file when it was read
+        @type mtime: float
+        @param generation: The log the chunk was read for, see
+                           LogViewWidget._log_generation
+        @type generation: int
+        @param message: The message to display when the file can't be read
+        @type message: str
+        """
+        self.kind = kind
+        self.start = start
+        self.data = data
+        self.size = size
+        self.mtime = mtime
+        self.generation = generation
+        self.message = message
+        self.text = decode_log(data) if message is None else message
+
 
 class LineNumberArea(QtWidgets.QWidget):
     """
@@ -145,7 +383,6 @@ class LogTextEdit(QtWidgets.QPlainTextEdit):
 
         self.update_line_number_area_width()
         self.setReadOnly(True)
-        self.setMaximumBlockCount(20000)
         self.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
         self.customContextMenuRequested.connect(self.context_menu)  # pylint: disable=no-member
 
@@ -325,7 +562,7 @@ class LogTextEdit(QtWidgets.QPlainTextEdit):
 class LogLoadSignals(QtCore.QObject):
     """Signals for the LoadLog action"""
     SIG_LOG_LOAD_ERROR = QtCore.Signal(tuple)
-    SIG_LOG_LOAD_RESULT = QtCore.Signal(str, str)
+    SIG_LOG_LOAD_RESULT = QtCore.Signal(object)
     SIG_LOG_LOAD_FINISHED = QtCore.Signal()
 
 class LogLoader(QtCore.QRunnable):
@@ -342,13 +579,13 @@ class LogLoader(QtCore.QRunnable):
         """Thread run action"""
         # pylint: disable=bare-except
         try:
-            content, log_mtime = self.fn(*self.args, **self.kwargs)
+            result = self.fn(*self.args, **self.kwargs)
         except:
             exctype, value = sys.exc_info()[:2]
             self.signals.SIG_LOG_LOAD_ERROR.emit(
                 (exctype, value, traceback.format_exc()))
         else:
-            self.signals.SIG_LOG_LOAD_RESULT.emit(content, log_mtime)
+            self.signals.SIG_LOG_LOAD_RESULT.emit(result)
         finally:
             self.signals.SIG_LOG_LOAD_FINISHED.emit()
 
@@ -512,10 +749,27 @@ class LogViewWidget(QtWidgets.QWidget):
         self._format.setBackground(QtCore.Qt.red)
         self._current_match = 0
         self._content_box.mousePressedSignal.connect(self._on_mouse_pressed)
+        self._log_scrollbar.valueChanged.connect(self._page_log)  # pylint: disable=no-member
+
+        # Only a window of the log file is displayed, _window_data holds the
+        # bytes of the file from _window_start that are in the content box
+        self._log_reader = None
+        self._log_size = 0
+        self._window_start = 0
+        self._window_data = b''
+        # Incremented for every log displayed, so late chunks are dropped
+        self._log_generation = 0
+        self._loading = False
+        self._pending_match = None
+        # Matches are offsets in the file, rather than in the content box
+        self._search_in_file = False
+        self._search_generation = 0
 
         self.SIG_CONTENT_UPDATED.connect(self._update_log_content)
         self.log_thread_pool = QtCore.QThreadPool()
-        self.log_thread_pool.waitForDone()
+        self._update_timer = QtCore.QTimer(self)
+        self._update_timer.setInterval(5000)
+        self._update_timer.timeout.connect(self._display_log_content)  # pylint: disable=no-member
 
     def _on_mouse_pressed(self, pos):
         """
@@ -531,9 +785,8 @@ class LogViewWidget(QtWidgets.QWidget):
         self._update_visible_indices()
         cursor_for_pos = self._content_box.cursorForPosition(pos)
         index = cursor_for_pos.position()
-        # pylint: disable=consider-using-enumerate
-        for i in range(0, len(self._matches)):
-            if index < self._matches[i][0]:
+        for i, position in enumerate(self._content_positions(self._matches)):
+            if position is not None and index < position[0]:
                 self._current_match = i
                 self._highlight_matches()
                 break
@@ -573,7 +826,15 @@ class LogViewWidget(QtWidgets.QWidget):
         self._content_box.setPlainText('')
         self._new_log = True
         self._log_file = self._log_files[self._current_log_index]
+        self._log_reader = LogReader(self._log_file)
+        self._log_generation += 1
+        self._loading = False
+        self._pending_match = None
+        self._log_size = 0
+        self._window_start = 0
+        self._window_data = b''
         self._display_log_content()
+        self._update_timer.start()
 
         prev_logs = self._current_log_index < len(self._log_files) - 1
         next_logs = self._current_log_index > 0
@@ -660,7 +921,32 @@ class LogViewWidget(QtWidgets.QWidget):
 
         @postcondition: The cursor is moved to pos, the characters between pos
                         and length are selected, and the content is scrolled
-                        up/down to ensure the cursor is visible
+                        up/down to ensure the cursor is visible. When the
+                        match is in a part of the log file that isn't
+                        displayed, that part is loaded first
+        """
+
+        self._matches_label.setText('%d:%d matches'
+                                    % (self._current_match + 1,
+                                       len(self._matches)))
+        position = self._content_positions([(pos, length)])[0]
+        if position is None:
+            if not self._loading:
+                self._pending_match = (pos, length)
+                self._start_log_loader(self._load_log_around, self._log_reader,
+                                       pos, self._log_generation)
+            return
+        self._select_text(*position)
+
+    def _select_text(self, pos, length):
+        """
+        Selects text in the content box and scrolls to it
+
+        @param pos: The position of the text in the content box
+        @type pos: int
+
+        @param length: The number of characters to select
+        @type length: int
         """
 
         self._cursor.setPosition(pos)
@@ -671,9 +957,6 @@ class LogViewWidget(QtWidgets.QWidget):
         self._content_box.ensureCursorVisible()
         self._scrollbar_value = self._log_scrollbar.value()
         self._highlight_matches()
-        self._matches_label.setText('%d:%d matches'
-                                    % (self._current_match + 1,
-                                       len(self._matches)))
 
     def _move_to_search_box(self):
         """
@@ -690,7 +973,8 @@ class LogViewWidget(QtWidgets.QWidget):
     def _find_text(self):
         """
         Finds and stores the list of text fragments matching the search pattern
-        entered in the search box.
+        entered in the search box. The log file is searched by a worker thread,
+        the content box is only searched when no log file is displayed.
 
         @postcondition: The text matching the search pattern is stored for
                         later access & processing
@@ -716,32 +1000,105 @@ class LogViewWidget(QtWidgets.QWidget):
         self._clear_search_data()
         self._last_search_case_stv = search_case_stv
         try:
-            search_gen = (re.finditer(str(self._search_text),
-                                      self._content_box.toPlainText())
-                          if search_case_stv else
-                          re.finditer(str(self._search_text),
-                                      self._content_box.toPlainText(),
-                                      re.IGNORECASE))
-
-            for match in search_gen:
-                index = match.start()
-                length = len(match.group(0))
-                self._matches.append((index, length))
-            if not self._matches:
-                self._matches_label.setStyleSheet('QLabel {color : gray}')
-                self._matches_label.setText('No Matches Found')
-            self._matches_to_highlight = set(self._matches)
-            self._update_visible_indices()
-            self._highlight_matches()
-            self._search_timestamp = time.time()
-            prev_search = self._search_text
-
-            # Start navigating
-            self._current_match = 0
-            self._move_to_next_match()
+            pattern = re.compile(str(self._search_text),
+                                 0 if search_case_stv else re.IGNORECASE)
         except re.error as err:
             self._matches_label.setText('ERROR: %s' % str(err))
             self._matches_label.setStyleSheet('QLabel {color : indianred}')
+            return
+
+        self._search_in_file = (self._log_file_exists
+                                and self._log_reader is not None)
+        if self._search_in_file:
+            generation = self._search_generation
+            searcher = LogLoader(self._search_log, self._log_reader, pattern,
+                                 generation,
+                                 lambda: generation != self._search_generation)
+            searcher.signals.SIG_LOG_LOAD_RESULT.connect(self._receive_search_results)
+            searcher.setAutoDelete(True)
+            self._matches_label.setStyleSheet('QLabel {color : gray}')
+            self._matches_label.setText('Searching...')
+            self.log_thread_pool.start(searcher)
+        else:
+            self._set_search_results(
+                [(match.start(), len(match.group(0)))
+                 for match in pattern.finditer(self._content_box.toPlainText())])
+
+    @staticmethod
+    def _search_log(log_reader, pattern, generation, is_cancelled):
+        """
+        Searches a log file, runs in a LogLoader
+
+        @return: The search generation and the offset and length in bytes of
+                 every match
+        @rtype: tuple(int, list<tuple(int, int)>)
+        """
+        try:
+            matches = log_reader.search(pattern,
+                                        cuegui.Constants.LOG_VIEW_SEARCH_CHUNK_SIZE,
+                                        is_cancelled)
+        except (IOError, OSError):
+            matches = []
+        return generation, matches
+
+    def _receive_search_results(self, result):
+        """
+        Receives the matches of a search from the LogLoader, ignoring the
+        results of a previous search
+
+        @param result: The search generation and the matches
+        @type result: tuple(int, list<tuple(int, int)>)
+        """
+        generation, matches = result
+        if generation == self._search_generation:
+            self._set_search_results(matches)
+
+    def _set_search_results(self, matches):
+        """
+        Stores and highlights the matches of a search, then moves the cursor
+        to the first one
+
+        @param matches: The position and length of every match
+        @type matches: list<tuple(int, int)>
+        """
+        self._matches = matches
+        if not self._matches:
+            self._matches_label.setStyleSheet('QLabel {color : gray}')
+            self._matches_label.setText('No Matches Found')
+        self._matches_to_highlight = set(self._matches)
+        self._update_visible_indices()
+        self._highlight_matches()
+        self._search_timestamp = time.time()
+
+        # Start navigating
+        self._current_match = 0
+        self._move_to_next_match()
+
+    def _content_positions(self, matches):
+        """
+        Returns the positions in the content box of matches, which are offsets
+        in bytes in the log file when it was searched
+
+        @param matches: The sorted offsets and lengths of the matches
+        @type matches: list<tuple(int, int)>
+        @return: The position and length in the content box of every match,
+                 None for matches outside of the displayed window
+        @rtype: list<tuple(int, int)>
+        """
+        if not self._search_in_file:
+            return list(matches)
+        positions = []
+        char_pos = byte_pos = 0
+        for offset, length in matches:
+            start = offset - self._window_start
+            if start < byte_pos or start + length > len(self._window_data):
+                positions.append(None)
+                continue
+            char_pos += len(decode_log(self._window_data[byte_pos:start]))
+            byte_pos = start
+            positions.append(
+                (char_pos, len(decode_log(self._window_data[start:start + length]))))
+        return positions
 
     def _highlight_matches(self):
         """
@@ -760,8 +1117,10 @@ class LogViewWidget(QtWidgets.QWidget):
         highlight = self._matches[max(self._current_match - 300, 0):
                                   min(self._current_match + 300, len(self._matches))]
 
-        matches = list(set(highlight).intersection(self._matches_to_highlight))
-        for match in matches:
+        matches = sorted(set(highlight).intersection(self._matches_to_highlight))
+        for match in self._content_positions(matches):
+            if match is None:
+                continue
             self._highlight_cursor.setPosition(match[0])
             self._highlight_cursor.movePosition(QtGui.QTextCursor.Right,
                                                 QtGui.QTextCursor.KeepAnchor,
@@ -788,15 +1147,19 @@ class LogViewWidget(QtWidgets.QWidget):
                         are also removed.
         """
 
+        # Drop the results of a search still running
+        self._search_generation += 1
         if not self._log_file:
             return
 
         # find matched text to "unhighlight" red by resetting the char format
         highlight = self._matches[max(self._current_match - 300, 0):
                                   min(self._current_match + 300, len(self._matches))]
-        matches = list(set(highlight).intersection(self._matches_to_highlight))
+        matches = sorted(set(highlight).intersection(self._matches_to_highlight))
 
-        for match in matches:
+        for match in self._content_positions(matches):
+            if match is None:
+                continue
             self._highlight_cursor.setPosition(match[0])
             self._highlight_cursor.movePosition(QtGui.QTextCursor.Right,
                                                 QtGui.QTextCursor.KeepAnchor,
@@ -822,6 +1185,29 @@ class LogViewWidget(QtWidgets.QWidget):
         self._scrollbar_value = val
         self._on_mouse_pressed(QtCore.QPoint(0, 0))
 
+    def _page_log(self, val):
+        """
+        Loads the part of the log file before or after the displayed window
+        when the content is scrolled to its top or bottom. This slot is
+        connected to the valueChanged event of the main scrollbar
+
+        @param val: The scrollbar value
+        @type val: int
+        """
+
+        if (self._loading or self._new_log or self._log_reader is None
+                or not self._log_file_exists):
+            return
+        page_size = cuegui.Constants.LOG_VIEW_PAGE_SIZE
+        window_end = self._window_start + len(self._window_data)
+        if val <= self._log_scrollbar.minimum() and self._window_start > 0:
+            self._start_log_loader(self._load_log_before, self._log_reader,
+                                   self._window_start, page_size,
+                                   self._log_generation)
+        elif val >= self._log_scrollbar.maximum() and window_end < self._log_size:
+            self._start_log_loader(self._load_log_after, self._log_reader,
+                                   window_end, page_size, self._log_generation)
+
     def _update_visible_indices(self):
         """
         Updates the stored first & last visible text content indices so we
@@ -845,55 +1231,220 @@ class LogViewWidget(QtWidgets.QWidget):
 
     def _display_log_content(self):
         """
-        Displays the log file content in the TextEdit field, and schedules the
-        next run of the update method
+        Loads the log file content in a worker thread: the end of the file for
+        a new log, then only the data appended since the last update while
+        the end of the log is displayed. This runs every 5 seconds.
 
-        @postcondition: The _update_log method is scheduled to run again
-                        after 5 seconds
+        @postcondition: A LogLoader is started when the log needs updating
         """
-        log_reader = LogReader(self._log_file)
+        if self._log_reader is None or self._loading:
+            return
 
-        try:
-            if log_reader.exists() is not True:
+        if self._log_reader.exists() is not True:
+            if self._new_log or self._log_file_exists:
                 self._log_file_exists = False
+                self._new_log = True
+                self._log_size = 0
+                self._window_start = 0
+                self._window_data = b''
                 content = 'Log file does not exist: %s' % self._log_file
                 self._content_timestamp = time.time()
                 self._update_log_content(content, self._log_mtime)
-            else:
-                # Creating the load logs process as qrunnables so
-                # that they don't block the ui while loading
-                log_loader = LogLoader(self._load_log, log_reader,
-                                       self._new_log, self._log_mtime)
-                log_loader.signals.SIG_LOG_LOAD_RESULT.connect(self._receive_log_results)
-                log_loader.setAutoDelete(True)
-                self.log_thread_pool.start(log_loader)
-                self.log_thread_pool.waitForDone()
-                self._new_log = False
+            return
+
+        if not self._log_file_exists:
+            self._log_file_exists = True
+            self._new_log = True
+        window_end = self._window_start + len(self._window_data)
+        if self._new_log:
+            self._start_log_loader(self._load_log, self._log_reader,
+                                   self._log_generation)
+        elif window_end == self._log_size:
+            self._start_log_loader(self._load_appended_log, self._log_reader,
+                                   window_end, self._log_generation)
+
+    def _start_log_loader(self, fn, *args):
+        """
+        Runs a function reading the log file as a LogLoader, so it doesn't
+        block the ui. Only one LogLoader runs at a time.
+
+        @param fn: The function returning a LogChunk
+        @type fn: callable
+        """
+        log_loader = LogLoader(fn, *args)
+        log_loader.signals.SIG_LOG_LOAD_RESULT.connect(self._receive_log_chunk)
+        log_loader.signals.SIG_LOG_LOAD_ERROR.connect(self._receive_log_error)
+        log_loader.setAutoDelete(True)
+        self._loading = True
+        self.log_thread_pool.start(log_loader)
+
+    @staticmethod
+    def _load_log(log_reader, generation):
+        """Reads the end of a log file, up to the size of the window"""
+        try:
+            mtime = log_reader.getMtime()
+            start, data, size = log_reader.read_tail(cuegui.Constants.LOG_VIEW_WINDOW_SIZE)
+        except (IOError, OSError):
+            return LogChunk(LogChunk.REPLACE, 0, b'', 0, generation=generation,
+                            message='Can not access log file: %s' % log_reader.filepath)
+        return LogChunk(LogChunk.REPLACE, start, data, size, mtime, generation)
+
+    @staticmethod
+    def _load_appended_log(log_reader, offset, generation):
+        """Reads the data appended to a log file after offset"""
+        try:
+            size = log_reader.size()
+            if size < offset or size - offset > cuegui.Constants.LOG_VIEW_WINDOW_SIZE:
+                # Truncated, or written faster than it's followed: start over
+                return LogViewWidget._load_log(log_reader, generation)
+            data, size = log_reader.read_after(offset, size - offset)
+            mtime = log_reader.getMtime() if data else 0
+        except (IOError, OSError):
+            return LogChunk(LogChunk.REPLACE, 0, b'', 0, generation=generation,
+                            message='Can not access log file: %s' % log_reader.filepath)
+        return LogChunk(LogChunk.APPEND, offset, data, size, mtime, generation)
+
+    @staticmethod
+    def _load_log_before(log_reader, offset, page_size, generation):
+        """Reads the page of a log file before offset"""
+        start, data, size = log_reader.read_before(offset, page_size)
+        return LogChunk(LogChunk.PREPEND, start, data, size, generation=generation)
+
+    @staticmethod
+    def _load_log_after(log_reader, offset, page_size, generation):
+        """Reads the page of a log file after offset"""
+        data, size = log_reader.read_after(offset, page_size)
+        return LogChunk(LogChunk.APPEND, offset, data, size, generation=generation)
+
+    @staticmethod
+    def _load_log_around(log_reader, offset, generation):
+        """Reads a window of a log file centered on offset"""
+        half_window = cuegui.Constants.LOG_VIEW_WINDOW_SIZE // 2
+        start, before, _ = log_reader.read_before(offset, half_window)
+        after, size = log_reader.read_after(offset, half_window)
+        return LogChunk(LogChunk.REPLACE, start, before + after, size,
+                        generation=generation)
+
+    def _receive_log_error(self, error):
+        """
+        Receives the exception raised by a LogLoader
+
+        @param error: The exception type, value and traceback
+        @type error: tuple
+        """
+        self._loading = False
+        logger.warning('Failed to read %s: %s', self._log_file, error[2])
+
+    def _receive_log_chunk(self, chunk):
+        """
+        Updates the displayed window with a chunk of the log file read by a
+        LogLoader, ignoring chunks of a previously displayed log
+
+        @param chunk: The chunk read
+        @type chunk: LogChunk
+        """
+        if chunk.generation != self._log_generation:
+            return
+        self._log_size = chunk.size
+        if chunk.mtime:
+            self._log_mtime = chunk.mtime
+        try:
+            self._apply_log_chunk(chunk)
         finally:
-            QtCore.QTimer.singleShot(5000, self._display_log_content)
+            # Not paging while the content box is updated
+            self._loading = False
 
-    @QtCore.Slot()
-    def _load_log(self, log_reader, new_log, curr_log_mtime):
-        content = None
-        log_size = log_reader.size()
-        if log_size > 1 * 1e6:
-            content = ('Log file size (%0.1f MB) exceeds the size '
-                       'threshold (1.0 MB).'
-                       % float(log_size / (1024 * 1024)))
-        elif not new_log and log_reader.exists():
-            log_mtime = log_reader.getMtime()
-            if log_mtime > curr_log_mtime:
-                curr_log_mtime = log_mtime  # no new updates
-                content = ''
-
-        if content is None:
-            content = ''
-            try:
-                content = log_reader.read()
-            except IOError:
-                content = 'Can not access log file: %s' % log_reader.filepath
+    def _apply_log_chunk(self, chunk):
+        """
+        Displays a chunk of the log file, then selects the match it was
+        loaded for (if any)
+
+        @param chunk: The chunk read
+        @type chunk: LogChunk
+        """
+        if chunk.message is not None:
+            # Reloaded once the file can be read again
+            self._log_file_exists = False
+            self._new_log = True
+            self._window_start = 0
+            self._window_data = b''
+            self._receive_log_results(chunk.message, self._log_mtime)
+            return
 
-        return content, curr_log_mtime
+        if chunk.kind == LogChunk.REPLACE:
+            self._new_log = True
+            self._window_start = chunk.start
+            self._window_data = chunk.data
+            self._receive_log_results(chunk.text, self._log_mtime)
+        elif chunk.kind == LogChunk.APPEND:
+            if chunk.data and chunk.start == self._window_start + len(self._window_data):
+                self._window_data += chunk.data
+                self._receive_log_results(chunk.text, self._log_mtime)
+                self._trim_log_window(top=True)
+        elif chunk.data and chunk.start + len(chunk.data) == self._window_start:
+            self._prepend_log_content(chunk)
+            self._trim_log_window(top=False)
+
+        if self._pending_match is not None:
+            position = self._content_positions([self._pending_match])[0]
+            self._pending_match = None
+            if position is not None:
+                self._select_text(*position)
+
+    def _prepend_log_content(self, chunk):
+        """
+        Inserts a chunk of the log file at the top of the content box, keeping
+        the same lines in view
+
+        @param chunk: The chunk read before the displayed window
+        @type chunk: LogChunk
+        """
+        scrollbar_value = self._log_scrollbar.value()
+        cursor = QtGui.QTextCursor(self._content_box.document())
+        cursor.setPosition(0)
+        cursor.insertText(chunk.text)
+        self._window_start = chunk.start
+        self._window_data = chunk.data + self._window_data
+        self._content_timestamp = time.time()
+        self._log_scrollbar.setValue(scrollbar_value + chunk.data.count(b'\n'))
+
+    def _trim_log_window(self, top):
+        """
+        Removes lines from the top or the bottom of the content box once the
+        displayed window grows past the window size
+
+        @param top: Whether to remove the first lines rather than the last ones
+        @type top: bool
+        """
+        excess = len(self._window_data) - cuegui.Constants.LOG_VIEW_WINDOW_SIZE
+        if excess <= 0:
+            return
+        if top:
+            newline = self._window_data.find(b'\n', excess - 1)
+            if newline == -1:
+                return
+            removed = self._window_data[:newline + 1]
+            self._window_data = self._window_data[newline + 1:]
+            self._window_start += len(removed)
+        else:
+            newline = self._window_data.rfind(b'\n', 0, len(self._window_data) - excess)
+            if newline == -1:
+                return
+            removed = self._window_data[newline + 1:]
+            self._window_data = self._window_data[:newline + 1]
+
+        scrollbar_value = self._log_scrollbar.value()
+        length = len(decode_log(removed))
+        cursor = QtGui.QTextCursor(self._content_box.document())
+        if top:
+            cursor.setPosition(0)
+            cursor.setPosition(length, QtGui.QTextCursor.KeepAnchor)
+        else:
+            cursor.movePosition(QtGui.QTextCursor.End)
+            cursor.setPosition(cursor.position() - length, QtGui.QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
+        if top:
+            self._log_scrollbar.setValue(max(0, scrollbar_value - removed.count(b'\n')))
 
     @QtCore.Slot()
     def _receive_log_results(self, content, log_mtime):
@@ -903,12 +1454,10 @@ class LogViewWidget(QtWidgets.QWidget):
     def _update_log_content(self, content, log_mtime):
         """
         Updates the content of the content box with the content of the log
-        file, if necessary. The full path to the log file will be populated in
-        the "log path" field.
-        If the log file isn't online, or couldn't be read for any reason,
-        a warning message will be displayed in the content box.
-        If the log file was not modified since the last time this plugin read
-        it, this method will do nothing.
+        file. The full path to the log file will be populated in the "log
+        path" field.
+        For a new log the content replaces the content box, otherwise it is
+        the data appended to the log file and is added at the end.
         By default, the cursor will automatically be moved to the end of the
         content and the scrollbar value will be adjusted to ensure the cursor
         is visible. However, if the content was previously scrolled up (the
@@ -922,29 +1471,20 @@ class LogViewWidget(QtWidgets.QWidget):
 
         self._log_mtime = log_mtime
 
-        self.app.processEvents()
-
         # Update the content in the gui (if necessary)
-        if self._new_log:
+        new_log = self._new_log
+        if new_log:
             self._content_box.setPlainText(content)
-        else:
-            current_text = (self._content_box.toPlainText() or '')
-
-            # ignore decoding higher order bytes outside ordinal range(128)
-            # ex: umlats, latin-1 etc.
-            try:
-                content = content.decode("utf-8", errors="ignore")
-                current_text = current_text.decode("utf-8", errors="ignore")
-            except AttributeError:
-                pass
-            new_text = content.lstrip(str(current_text))
-            if new_text:
-                self._content_box.appendPlainText(new_text)
+            self._new_log = False
+        elif content:
+            cursor = QtGui.QTextCursor(self._content_box.document())
+            cursor.movePosition(QtGui.QTextCursor.End)
+            cursor.insertText(content)
         self._content_timestamp = time.time()
         self._path.setText(self._log_file)
 
         scroll_to_end = (self._scrollbar_max == self._scrollbar_value
-                         or self._new_log)
+                         or new_log)
 
         # Adjust scrollbar value (if necessary)
         self._scrollbar_max = self._log_scrollbar.maximum()
@@ -23,6 +23,8 @@ from __future__ import absolute_import
 from builtins import str
 from builtins import map
 from future.utils import iteritems
+from concurrent import futures
+import contextlib
 import datetime
 import getpass
 import os
@@ -45,6 +47,7 @@ import cuegui.AbstractWidgetItem
 import cuegui.Action
 import cuegui.Constants
 import cuegui.JobMonitorTree
+import cuegui.LogData
 import cuegui.Logger
 import cuegui.MenuActions
 import cuegui.Style
@@ -66,6 +69,11 @@ LLU_COLUMN = 3
 RUNTIME_COLUMN = 4
 LASTLINE_COLUMN = 7
 DEFAULT_FRAME_KILL_REASON = "Manual Frame Kill Request in Cuegui by " + getpass.getuser()
+ALL_SERVICES_FILTERS = ("All (Click + to Add Specific Filter)", "All Other Types")
+# Frames running for less than this many seconds are never reported stuck
+MIN_STUCK_RUNTIME = 500
+# Workers looking up the layers and frames of jobs during a scan
+SCAN_WORKERS = 16
 
 class StuckWidget(cuegui.AbstractDockWidget.AbstractDockWidget):
     """This builds what is displayed on the dock widget"""
@@ -194,6 +202,9 @@ class StuckFrameControls(QtWidgets.QWidget):
         self.__progressLabel = QtWidgets.QLabel(self)
         self.__progressLabel.setText("Progress:  ")
 
+        self.__scanTimeLabel = QtWidgets.QLabel(self)
+        self.__scanTimeLabel.setToolTip("How long the last search took.")
+
         self.__group_filters = QtWidgets.QGroupBox("Search Filters")
 
         controls = QtWidgets.QHBoxLayout()
@@ -205,6 +216,8 @@ class StuckFrameControls(QtWidgets.QWidget):
         controls.addWidget(self.__auto_refresh_btn)
         controls.addWidget(self.__notification_btn)
         controls.addStretch()
+        controls.addWidget(self.__scanTimeLabel)
+        controls.addSpacing(10)
         controls.addWidget(self.__progressLabel)
         controls.addWidget(self.__progress)
         controls.addSpacing(10)
@@ -365,6 +378,10 @@ class StuckFrameControls(QtWidgets.QWidget):
         """Returns progress bar."""
         return self.__progress
 
+    def getScanTimeLabel(self):
+        """Returns the label showing how long the last search took."""
+        return self.__scanTimeLabel
+
     def getClearButton(self):
         """Returns clear button."""
         return self.__clear_btn
@@ -739,11 +756,268 @@ class StuckFrameWidget(QtWidgets.QWidget):
         return self.controls
 
 
+
+def findFilter(filters, service):
+    """Returns the filter that applies to frames of the given service.
+
+    Services without a filter of their own fall back on the filter for all
+    services, if there is one enabled. Filters are lists of the exclude
+    keywords, the % of the run since the LLU, the min LLU, the % of the
+    average completion time and the total runtime.
+    @rtype:  list or None"""
+    if service in filters:
+        return filters[service]
+    for key in ALL_SERVICES_FILTERS:
+        if key in filters:
+            return filters[key]
+    return None
+
+
+def getExcludes(frameFilter):
+    """Returns the exclude keywords of a filter."""
+    return [x.strip() for x in frameFilter[0].split(',') if x != ""]
+
+
+def isStuck(frameFilter, runTime, lluTime, avgFrameTime):
+    """Returns whether a frame is stuck according to a filter.
+    @type  runTime: float
+    @param runTime: Seconds the frame has been running
+    @type  lluTime: float
+    @param lluTime: Seconds since its log was last updated
+    @type  avgFrameTime: float
+    @param avgFrameTime: Average run time of the frames of its layer"""
+    percentStuck = lluTime / runTime if runTime > 0 else 0
+    return (lluTime > frameFilter[2] * 60 and
+            frameFilter[1] < percentStuck * 100 and percentStuck < 1.1 and
+            runTime > avgFrameTime * frameFilter[3] / 100 and
+            runTime > MIN_STUCK_RUNTIME)
+
+
+class ScannedProc(object):
+    """What a scan found out about a proc."""
+
+    def __init__(self, proc, frameFilter, runTime):
+        self.proc = proc
+        self.frameFilter = frameFilter
+        self.runTime = runTime
+        self.jobName = proc.data.job_name
+        self.layerName = proc.data.frame_name.split("-")[1]
+        self.avgFrameTime = None
+        self.lluTime = None
+        self.frame = None
+
+    def runsSameFrame(self, other):
+        """Returns whether both scans found the proc running the same frame."""
+        return (self.proc.data.frame_name == other.proc.data.frame_name and
+                self.proc.data.dispatch_time == other.proc.data.dispatch_time)
+
+
+class StuckFrameScanner(object):
+    """Finds the stuck frames of a show.
+
+    Rather than looking procs up one at a time, a scan goes through phases
+    that each work on all the procs at once: one request for the procs of the
+    show and one for their jobs, one request per job for its layers and
+    another for its frames, made on a pool of workers, and the logs of the
+    frames read all at once through cuegui.LogData. Procs still running the
+    frame they ran during the previous scan keep the layer average and the
+    frame found then, so a re-scan only looks up the frames that started since.
+
+    How long each phase of the last scan took is kept in timings."""
+
+    PHASES = ("procs", "jobs", "layers", "logs", "frames", "groups")
+
+    def __init__(self, workers=SCAN_WORKERS):
+        self.timings = []
+        self.__pool = futures.ThreadPoolExecutor(max_workers=workers)
+        self.__scanned = {}
+
+    @contextlib.contextmanager
+    def __phase(self, name):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.timings.append((name, time.time() - start))
+
+    @staticmethod
+    def lluTimes(logPaths):
+        """Returns the seconds since each log was last updated, reading them
+        concurrently. Logs that can't be read get None.
+        @type  logPaths: list<str>
+        @rtype:  list<float>"""
+        logs = cuegui.LogData.service().fetch(logPaths)
+        now = time.time()
+        return [None if log.mtime is None else now - log.mtime for log in logs]
+
+    def scan(self, show, filters, progress=None):
+        """Returns the stuck frames of a show, each preceded by its group and job.
+        @type  show: str
+        @param show: The show to search
+        @type  filters: dict
+        @param filters: The enabled filters by service
+        @type  progress: callable
+        @param progress: Called with the number of phases done
+        @rtype:  list"""
+        self.timings = []
+        previous = self.__scanned
+
+        with self.__phase("procs"):
+            procs = opencue.api.getProcs(show=[show])
+        now = time.time()
+        scanned = []
+        for proc in procs:
+            frameFilter = findFilter(filters, proc.data.services[0])
+            if frameFilter is None:
+                continue
+            item = ScannedProc(proc, frameFilter, now - proc.data.dispatch_time)
+            if item.runTime < frameFilter[4] * 60:
+                continue
+            if any(exclude in item.layerName or exclude in item.jobName
+                   for exclude in getExcludes(frameFilter)):
+                continue
+            last = previous.get(proc.id())
+            if last is not None and item.runsSameFrame(last):
+                item.avgFrameTime = last.avgFrameTime
+                item.frame = last.frame
+            scanned.append(item)
+        self.__progress(progress, "procs")
+
+        with self.__phase("jobs"):
+            jobNames = sorted(set(item.jobName for item in scanned))
+            jobs = {}
+            if jobNames:
+                jobs = {job.name(): job for job in opencue.api.getJobs(job=jobNames)}
+        # Jobs that are gone have finished since their procs were listed
+        scanned = [item for item in scanned if item.jobName in jobs]
+        self.__progress(progress, "jobs")
+
+        with self.__phase("layers"):
+            jobNames = sorted(set(item.jobName for item in scanned if item.avgFrameTime is None))
+            averages = dict(zip(jobNames, self.__pool.map(
+                self.__getLayerAverages, [jobs[jobName] for jobName in jobNames])))
+            for item in scanned:
+                if item.avgFrameTime is None:
+                    item.avgFrameTime = averages[item.jobName].get(item.layerName)
+        scanned = [item for item in scanned if item.avgFrameTime is not None]
+        self.__scanned = {item.proc.id(): item for item in scanned}
+        self.__progress(progress, "layers")
+
+        scanned = [item for item in scanned
+                   if item.runTime > item.avgFrameTime * item.frameFilter[3] / 100]
+        with self.__phase("logs"):
+            lluTimes = self.lluTimes([item.proc.data.log_path for item in scanned])
+        for item, lluTime in zip(scanned, lluTimes):
+            item.lluTime = lluTime
+        scanned = [item for item in scanned
+                   if item.lluTime is not None and
+                   isStuck(item.frameFilter, item.runTime, item.lluTime, item.avgFrameTime)]
+        self.__progress(progress, "logs")
+
+        with self.__phase("frames"):
+            frameNames = {}
+            for item in scanned:
+                if item.frame is None:
+                    frameNames.setdefault(item.jobName, []).append(item.proc.data.frame_name)
+            jobNames = sorted(frameNames)
+            frames = dict(zip(jobNames, self.__pool.map(
+                self.__getFrames, jobNames, [frameNames[jobName] for jobName in jobNames])))
+            for item in scanned:
+                if item.frame is None:
+                    item.frame = frames[item.jobName].get(item.proc.data.frame_name)
+        scanned = [item for item in scanned if item.frame is not None]
+        self.__progress(progress, "frames")
+
+        with self.__phase("groups"):
+            groups = {}
+            for groupName in sorted(set(jobs[item.jobName].data.group for item in scanned)):
+                # pylint: disable=broad-except
+                try:
+                    groups[groupName] = opencue.api.findGroup(show, groupName)
+                except Exception:
+                    pass
+        self.__progress(progress, "groups")
+
+        treeItems = []
+        for item in scanned:
+            job = jobs[item.jobName]
+            if job.data.group not in groups:
+                continue
+            # Injecting into rpcObjects extra data not available via client API
+            # to support cue3 iceObject backwards capability
+            frame = item.frame
+            frame.data.layer_name = item.layerName
+            frame.__dict__['job_name'] = item.jobName
+            frame.__dict__['log_path'] = item.proc.data.log_path
+            frame.__dict__['number'] = frame.data.number
+            frame.__dict__['lastLogUpdate'] = item.lluTime
+            frame.__dict__['averageFrameTime'] = item.avgFrameTime
+            frame.__dict__['stuckness'] = item.lluTime / item.runTime
+            frame.__dict__['timeRunning'] = item.runTime
+            frame.__dict__['lastResource'] = frame.data.last_resource
+            frame.__dict__['service'] = item.proc.data.services[0]
+
+            job.__dict__['log_path'] = job.data.log_dir
+            job.__dict__['lastLogUpdate'] = ""
+            job.__dict__['averageFrameTime'] = ""
+            job.__dict__['number'] = ""
+            job.__dict__['stuckness'] = ""
+            job.__dict__['timeRunning'] = ""
+            job.__dict__['lastResource'] = ""
+            job.__dict__['hostUsage'] = ""
+            job.__dict__['service'] = item.proc.data.services[0]
+
+            treeItems.extend([groups[job.data.group], job, frame])
+
+        logger.info("Found %d stuck frames among %d procs of %s in %s",
+                    len(scanned), len(procs), show, self.describeTimings())
+        return treeItems
+
+    def describeTimings(self):
+        """Returns how long each phase of the last scan took, as text."""
+        return ", ".join("%s %.2fs" % timing for timing in self.timings)
+
+    def totalTime(self):
+        """Returns how long the last scan took, in seconds."""
+        return sum(seconds for _, seconds in self.timings)
+
+    def __progress(self, progress, phase):
+        if progress is not None:
+            progress(self.PHASES.index(phase) + 1)
+
+    @staticmethod
+    def __getLayerAverages(job):
+        """Returns the average frame time of each layer of a job by layer name."""
+        # pylint: disable=broad-except
+        try:
+            return {layer.name(): layer.avgFrameTimeSeconds() for layer in job.getLayers()}
+        except Exception:
+            # The job may have finished since
+            return {}
+
+    @staticmethod
+    def __getFrames(jobName, frameNames):
+        """Returns the frames of a job with the given names, by name."""
+        frames = {}
+        limit = opencue.search.FrameSearch.max_limit
+        # pylint: disable=broad-except
+        try:
+            for start in range(0, len(frameNames), limit):
+                names = frameNames[start:start + limit]
+                for frame in opencue.api.getFrames(jobName, name=names, limit=len(names)):
+                    frames[frame.data.name] = frame
+        except Exception:
+            # The job may have finished since
+            pass
+        return frames
+
+
 class StuckFrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
     """Tree widget with stuck frames"""
 
     _updateProgress = QtCore.Signal(int)
     _updateProgressMax = QtCore.Signal(int)
+    _updateScanTimes = QtCore.Signal(float, str)
     _itemSingleClickedComment = QtCore.Signal(QtWidgets.QTreeWidgetItem, int)
 
     def __init__(self, parent):
@@ -774,7 +1048,7 @@ class StuckFrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
                        data=lambda item: (self.numFormat(item.averageFrameTime, "t") or ""),
                        tip="Average time for a frame of this type to complete")
         self.addColumn("Last Line", 250, id=9,
-                       data=lambda item: (cuegui.Utils.getLastLine(item.log_path) or ""),
+                       data=lambda item: (cuegui.LogData.lastLine(item.log_path) or ""),
                        tip="The last line of a running frame's log file.")
 
         self.startColumnsForType(cuegui.Constants.TYPE_GROUP)
@@ -790,7 +1064,7 @@ class StuckFrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
         self.addColumn("", 0, id=9)
 
         cuegui.AbstractTreeWidget.AbstractTreeWidget.__init__(self, parent)
-        self.procSearch = opencue.search.ProcSearch()
+        self.scanner = StuckFrameScanner()
 
         # Used to build right click context menus
         self.__menuActions = cuegui.MenuActions.MenuActions(self, self.updateSoon,
@@ -799,7 +1073,6 @@ class StuckFrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
         self.setDropIndicatorShown(True)
         self.setDragEnabled(True)
 
-        self.layer_cache = {}
         self.jobs_created = {}
         self.groups_created = {}
         self.currentHosts = []
@@ -813,6 +1086,9 @@ class StuckFrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
         # Set total number of procs for the progress bar max
         self._updateProgressMax.connect(self.updateProgressMax)
 
+        # Show how long the last scan took
+        self._updateScanTimes.connect(self.updateScanTimes)
+
         # Don't use the standard space bar to refres
         self.disconnect(self.app,
                         QtCore.SIGNAL('request_update()'),
@@ -829,12 +1105,6 @@ class StuckFrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
         self.completeRefresh = False
         self.enableNotification = False
 
-        self.runtime_filter = None
-        self.min_llu_filter = None
-        self.time_filter = None
-        self.avg_comp_filter = None
-        self.excludes = None
-        self.groups = None
         self.showData = None
         self.filters = None
 
@@ -919,6 +1189,12 @@ class StuckFrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
         """Send an update of the current value for the progress bar"""
         self.parent.getControls().getProgress().setValue(currentValue)
 
+    def updateScanTimes(self, totalTime, phaseTimes):
+        """Shows how long the last scan took, and each of its phases in the tooltip"""
+        label = self.parent.getControls().getScanTimeLabel()
+        label.setText("Last search: %.2fs" % totalTime)
+        label.setToolTip("How long the last search took: %s" % phaseTimes)
+
     def updateSoon(self):
         """Returns immediately. Causes an update to happen
         Constants.AFTER_ACTION_UPDATE_DELAY after calling this function."""
@@ -963,79 +1239,32 @@ class StuckFrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
             log_file = item.log_path
         else:
             return ""
-        # pylint: disable=broad-except
-        try:
-            stat_info = os.path.getmtime(log_file)
-        except Exception:
+        log = cuegui.LogData.service().fetch([log_file])[0]
+        if log.mtime is None:
             return "None"
         current_time = time.time()
-        llu_time = current_time - stat_info
+        llu_time = current_time - log.mtime
 
         return llu_time
 
-    def find_layer(self, proc):
-        """Return layer based on proc."""
-        jobName = proc.data.job_name
-        layerName = proc.data.frame_name.split("-")[1]
-        key = "%s/%s" % (jobName, layerName)
-
-        if not self.layer_cache.get(key, None):
-            # pylint: disable=broad-except
-            try:
-                self.layer_cache[key] = proc.getLayer()
-            except Exception:
-                return "None"
-
-        return self.layer_cache[key]
-
     def confirm(self, update):
         """Confirm frame filter."""
         currentHostsNew = []
-        nextIndex = 2
-        # pylint: disable=consider-using-enumerate
-        for index in range(len(self.currentHosts)):
-            if index == nextIndex:
-                frame = self.currentHosts[index]
-                nextIndex = nextIndex + 3
+        frames = self.currentHosts[2::3]
+        lluTimes = self.scanner.lluTimes([frame.log_path for frame in frames])
+        for index, (frame, lluTime) in enumerate(zip(frames, lluTimes)):
+            frameFilter = findFilter(self.filters, frame.service)
+            # Skip frames whose log can't be read anymore
+            if frameFilter is None or lluTime is None:
+                continue
 
-                if frame.service in self.filters.keys():
-                    self.runtime_filter = self.filters[frame.service][4]
-                    self.min_llu_filter = self.filters[frame.service][2]
-                    self.time_filter = self.filters[frame.service][1]
-                    self.avg_comp_filter = self.filters[frame.service][3]
-                    self.excludes = [x.strip() for x in self.filters[frame.service][0].split(',')
-                                     if x != ""]
-                else:
-                    if "All (Click + to Add Specific Filter)" in self.filters.keys():
-                        key = "All (Click + to Add Specific Filter)"
-                    elif "All Other Types" in self.filters.keys():
-                        key = "All Other Types"
-                    else:
-                        continue
-                    self.runtime_filter = self.filters[key][4]
-                    self.min_llu_filter = self.filters[key][2]
-                    self.time_filter = self.filters[key][1]
-                    self.avg_comp_filter = self.filters[key][3]
-                    self.excludes = [x.strip() for x in self.filters[key][0].split(',') if x != ""]
-
-                # layerName = frame.data.layer_name
-                frameRunTime = self.get_frame_run_time(frame)
-                # jobName = frame.data.name
-                lluTime = self.get_llu_time(frame)
-                avgFrameTime = frame.averageFrameTime
-                percentStuck = lluTime / frameRunTime
-
-                frame.stuckness = percentStuck
-                frame.lastLogUpdate = lluTime
-                frame.timeRunning = frameRunTime
-
-                if ((lluTime > (self.min_llu_filter * 60)) and
-                        (percentStuck * 100 > self.time_filter) and
-                        (frameRunTime > (avgFrameTime * self.avg_comp_filter / 100) and
-                         percentStuck < 1.1 and frameRunTime > 500)):
-                    currentHostsNew.append(self.currentHosts[index - 2])
-                    currentHostsNew.append(self.currentHosts[index - 1])
-                    currentHostsNew.append(frame)
+            frameRunTime = self.get_frame_run_time(frame)
+            frame.stuckness = lluTime / frameRunTime if frameRunTime > 0 else 0
+            frame.lastLogUpdate = lluTime
+            frame.timeRunning = frameRunTime
+
+            if isStuck(frameFilter, frameRunTime, lluTime, frame.averageFrameTime):
+                currentHostsNew.extend(self.currentHosts[index * 3:index * 3 + 3])
 
         self.currentHosts[:] = []
         self.currentHosts = currentHostsNew
@@ -1045,124 +1274,15 @@ class StuckFrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
 
     def _getUpdate(self):
         """Returns the proper data from the cuebot"""
-        # pylint: disable=broad-except,too-many-nested-blocks
+        # pylint: disable=broad-except
         try:
-            treeItems = []
-            self.groups = []
-            self.procSearch.hosts = []
-            self.procSearch.shows = [self.show]
-            procs = []
-            shows = opencue.api.getShows()
-            for show in shows:
-                procs.extend(opencue.api.getProcs(show=[show.name()]))
-
-            current_prog = 0
-            self.emit(QtCore.SIGNAL("updatedProgressMax"), (len(procs)))
-            self._updateProgressMax.emit(len(procs))
-            for proc in procs:
-                if proc.data.services[0] in self.filters.keys():
-                    self.runtime_filter = self.filters[proc.data.services[0]][4]
-                    self.min_llu_filter = self.filters[proc.data.services[0]][2]
-                    self.time_filter = self.filters[proc.data.services[0]][1]
-                    self.avg_comp_filter = self.filters[proc.data.services[0]][3]
-                    self.excludes = [x.strip()
-                                     for x in self.filters[proc.data.services[0]][0].split(',')
-                                     if x != ""]
-                else:
-                    if "All (Click + to Add Specific Filter)" in self.filters.keys():
-                        key = "All (Click + to Add Specific Filter)"
-                    elif "All Other Types" in self.filters.keys():
-                        key = "All Other Types"
-                    else:
-                        continue
-                    self.runtime_filter = self.filters[key][4]
-                    self.min_llu_filter = self.filters[key][2]
-                    self.time_filter = self.filters[key][1]
-                    self.avg_comp_filter = self.filters[key][3]
-                    self.excludes = [x.strip() for x in self.filters[key][0].split(',') if x != ""]
-
-                jobName = proc.data.job_name
-                (frameNumber, layerName) = proc.data.frame_name.split("-")
-
-                frameRunTime = self.get_frame_run_time(proc)
-
-                if frameRunTime >= self.runtime_filter * 60:
-                    # Get average completion time of the layer
-                    layer = self.find_layer(proc)
-                    # Skip processing if the layer obj doesn't exist. i.e frame finished
-                    if layer == "None":
-                        continue
-                    avgFrameTime = layer.avgFrameTimeSeconds()
-
-                    if frameRunTime > (avgFrameTime * self.avg_comp_filter / 100):
-                        # log_path = proc.data.log_path  # Get the log file path for last line
-                        lluTime = self.get_llu_time(proc)
-                        if lluTime == "None":
-                            # Skip processing if there was any error with reading
-                            # the log file(path did not exist,permissions)
-                            continue
-                        if lluTime > self.min_llu_filter * 60:
-                            percentStuck = 0
-                            if frameRunTime > 0:
-                                percentStuck = lluTime / frameRunTime
-
-                            if percentStuck * 100 > self.time_filter and percentStuck < 1.1:
-                                please_exclude = False
-                                for exclude in self.excludes:
-                                    if (exclude in layerName or
-                                            exclude in jobName):
-                                        please_exclude = True
-                                        continue
-
-                                if please_exclude:
-                                    continue
-
-                                # Job may have finished/killed put in a try
-                                # Injecting into rpcObjects extra data not available via client API
-                                # to support cue3 iceObject backwards capability
-                                try:
-                                    frame = opencue.api.findFrame(jobName,
-                                                                  layerName, int(frameNumber))
-                                    frame.data.layer_name = layerName
-                                    frame.__dict__['job_name'] = jobName
-                                    frame.__dict__['log_path'] = proc.data.log_path
-                                    frame.__dict__['number'] = frame.data.number
-                                    frame.__dict__['lastLogUpdate'] = lluTime
-                                    frame.__dict__['averageFrameTime'] = avgFrameTime
-                                    frame.__dict__['stuckness'] = percentStuck
-                                    frame.__dict__['timeRunning'] = frameRunTime
-                                    frame.__dict__['lastResource'] = frame.data.last_resource
-                                    frame.__dict__['service'] = proc.data.services[0]
-
-                                    job = opencue.api.findJob(jobName)
-                                    job.__dict__['log_path'] = job.data.log_dir
-                                    job.__dict__['lastLogUpdate'] = ""
-                                    job.__dict__['averageFrameTime'] = ""
-                                    job.__dict__['number'] = ""
-                                    job.__dict__['stuckness'] = ""
-                                    job.__dict__['timeRunning'] = ""
-                                    job.__dict__['lastResource'] = ""
-                                    job.__dict__['hostUsage'] = ""
-                                    job.__dict__['service'] = proc.data.services[0]
-                                    if self.show == job.data.show:
-                                        group = opencue.api.findGroup(self.show, job.data.group)
-
-                                        treeItems.append(group)
-                                        treeItems.append(job)
-                                        treeItems.append(frame)
-                                except Exception:
-                                    # Can safely ignore if a Job has already completed
-                                    pass
-
-                current_prog = current_prog + 1
-                self._updateProgress.emit(current_prog)
-
-            self._updateProgress.emit(len(procs))
+            self._updateProgressMax.emit(len(StuckFrameScanner.PHASES))
+            treeItems = self.scanner.scan(self.show, self.filters, self._updateProgress.emit)
+            self._updateScanTimes.emit(self.scanner.totalTime(), self.scanner.describeTimings())
+
             self.currentHosts[:] = []
             self.currentHosts = treeItems
 
-            self.confirm(0)
-
             return self.currentHosts
         except Exception as e:
             print(cuegui.Utils.exceptionOutput(e))
@@ -1416,14 +1536,17 @@ class StuckFrameMonitorTree(cuegui.AbstractTreeWidget.AbstractTreeWidget):
         self.ticksSinceLogFlush = 0
         currentJob = self.selectedObjects()[0].data.name
         framesForJob = {}
-        for frame in self.selectedObjects():
+        frames = self.selectedObjects()
+        logs = cuegui.LogData.service().fetch([frame.log_path for frame in frames])
+        now = time.time()
+        for frame, log in zip(frames, logs):
             frameData = {}
             frameData['layer'] = frame.job_name
             frameData['host'] = frame.lastResource
-            frameData['llu'] = self.get_llu_time(frame)
+            frameData['llu'] = "None" if log.mtime is None else now - log.mtime
             frameData['runtime'] = self.get_frame_run_time(frame)
             frameData['average'] = frame.averageFrameTime
-            frameData['log'] = cuegui.Utils.getLastLine(frame.log_path)
+            frameData['log'] = log.lastLine
             framesForJob[str(frame.data.number) + '-' + str(time.time())] = frameData
 
         self.frames[currentJob] = framesForJob
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Times the frame list of the job details, on a job of --frames synthetic
+frames: loading them, applying full and changed-frame updates, sorting by a
+few columns and painting the rows on screen.
+
+Updates change --changed frames, spread over the job. The best of --repeat
+runs is reported. Runs on the offscreen platform unless QT_QPA_PLATFORM says
+otherwise.
+
+Usage, from the cuegui directory:
+    python -m tests.benchmarks.bench_frame_table --frames 100000 --changed 1000
+"""
+
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+
+import argparse
+import os
+import timeit
+
+import mock
+from qtpy import QtCore
+from qtpy import QtWidgets
+
+from opencue_proto import job_pb2
+import opencue.wrappers.frame
+import opencue.wrappers.job
+
+import cuegui.FrameMonitorTree
+import cuegui.Style
+
+from tests import test_utils
+
+
+STATES = (job_pb2.SUCCEEDED, job_pb2.SUCCEEDED, job_pb2.WAITING, job_pb2.DEPEND, job_pb2.DEAD)
+LAYERS = ('render', 'comp', 'preprocess', 'cache')
+
+
+def make_frames(count, retries=0):
+    """Returns frames of several layers and states, none running so that
+    painting doesn't read logs."""
+    frames = []
+    for number in range(count):
+        layer = LAYERS[number % len(LAYERS)]
+        frames.append(opencue.wrappers.frame.Frame(job_pb2.Frame(
+            id='frame-%d' % number, name='%04d-%s' % (number, layer), layer_name=layer,
+            number=number, dispatch_order=number, state=STATES[number % len(STATES)],
+            retry_count=retries, last_resource='host%d/%d.0/0' % (number % 97, number % 8 + 1),
+            start_time=1700000000 + number, stop_time=1700000600 + number % 3600,
+            max_rss=number * 1024)))
+    return frames
+
+
+def copy_frames(frames):
+    """Returns copies of the frames, which changed updates modify."""
+    copies = [opencue.wrappers.frame.Frame(job_pb2.Frame()) for _ in frames]
+    for copy, frame in zip(copies, frames):
+        copy.data.CopyFrom(frame.data)
+    return copies
+
+
+def changed_frames(frames, changed):
+    """Returns the frames with every n-th one retried, and the matching UpdatedFrames."""
+    step = max(len(frames) // max(changed, 1), 1)
+    updated = copy_frames(frames)
+    updatedFrames = []
+    for row, frame in enumerate(frames):
+        if row % step == 0:
+            updated[row].data.retry_count += 1
+            updated[row].data.state = job_pb2.WAITING
+            updatedFrames.append(job_pb2.UpdatedFrame(
+                id=frame.data.id, state=job_pb2.WAITING, retry_count=frame.data.retry_count + 1,
+                last_resource=frame.data.last_resource, start_time=frame.data.start_time,
+                stop_time=frame.data.stop_time, max_rss=frame.data.max_rss))
+    return updated, updatedFrames
+
+
+def cases(tree, frames, changed):
+    """Yields the name, the setup and the function of every case."""
+    model = tree.model()
+    updated, updatedFrames = changed_frames(frames, changed)
+
+    def reset(newFrames=None, column=0):
+        def run():
+            tree.sortByColumn(column, QtCore.Qt.AscendingOrder)
+            model.clear()
+            if newFrames is not None:
+                model.setFrames(copy_frames(newFrames))
+        return run
+
+    def sort(column, order=QtCore.Qt.AscendingOrder):
+        return lambda: tree.sortByColumn(column, order)
+
+    yield 'load', reset(), lambda: model.setFrames(frames)
+    yield 'full update, nothing changed', reset(frames), lambda: model.setFrames(frames)
+    yield 'full update, %d changed' % changed, reset(frames), lambda: model.setFrames(updated)
+    yield ('changed update, %d frames' % len(updatedFrames), reset(frames),
+           lambda: model.updateFrames(updatedFrames))
+    yield ('changed update, sorted by retries', reset(frames, 7),
+           lambda: model.updateFrames(updatedFrames))
+    yield 'sort by frame, descending', reset(frames), sort(1, QtCore.Qt.DescendingOrder)
+    yield 'sort by layer', reset(frames), sort(2)
+    yield 'sort by status', reset(frames), sort(cuegui.FrameMonitorTree.STATUS_COLUMN)
+    yield 'sort by runtime', reset(frames), sort(cuegui.FrameMonitorTree.RUNTIME_COLUMN)
+    yield 'paint visible rows', reset(frames), lambda: tree.viewport().grab()
+
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=100000, help='frames in the job')
+    parser.add_argument('--changed', type=int, default=1000, help='frames changed by updates')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of every case')
+    args = parser.parse_args()
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    app = test_utils.createApplication()
+    app.settings = QtCore.QSettings()
+    cuegui.Style.init()
+
+    with mock.patch('opencue.cuebot.Cuebot.getStub'):
+        parent = QtWidgets.QWidget()
+        tree = cuegui.FrameMonitorTree.FrameMonitorTree(parent)
+        tree.resize(1600, 1000)
+        tree.model().setJob(opencue.wrappers.job.Job(job_pb2.Job(id='job', name='bench')))
+        frames = make_frames(args.frames)
+
+        print('%d frames, %d changed by updates' % (args.frames, args.changed))
+        for name, setup, case in cases(tree, frames, args.changed):
+            elapsed = min(timeit.repeat(case, setup=setup, number=1, repeat=args.repeat))
+            print('  %-38s %10.3f ms' % (name, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -17,6 +17,7 @@
 
 
 import os
+import re
 import unittest
 
 import mock
@@ -141,6 +142,72 @@ class LogViewPluginTests(pyfakefs.fake_filesystem_unittest.TestCase):
             self.__isHighlighted(
                 self.logViewPlugin.logview_widget._content_box, matches[0][0], matches[0][1]))
 
+    def test_shouldAppendNewLogContent(self):
+        widget = self.logViewPlugin.logview_widget
+        cuegui.app().display_log_file_content.emit([self.logPath1, self.logPath2])
+        self.__waitForLoader()
+        self.assertEqual(_LOG_TEXT_1, widget._content_box.toPlainText())
+
+        self.log1.set_contents(_LOG_TEXT_1 + '\nanother line at the end')
+        widget._display_log_content()
+        self.__waitForLoader()
+
+        self.assertEqual(_LOG_TEXT_1 + '\nanother line at the end',
+                         widget._content_box.toPlainText())
+        self.assertEqual(len(_LOG_TEXT_1) + 24, widget._log_size)
+
+    def test_shouldReloadTruncatedLog(self):
+        widget = self.logViewPlugin.logview_widget
+        cuegui.app().display_log_file_content.emit([self.logPath1, self.logPath2])
+        self.__waitForLoader()
+
+        self.log1.set_contents('restarted')
+        widget._display_log_content()
+        self.__waitForLoader()
+
+        self.assertEqual('restarted', widget._content_box.toPlainText())
+
+    @mock.patch('cuegui.Constants.LOG_VIEW_PAGE_SIZE', new=96)
+    @mock.patch('cuegui.Constants.LOG_VIEW_WINDOW_SIZE', new=128)
+    def test_shouldDisplayWindowOfLargeLog(self):
+        widget = self.logViewPlugin.logview_widget
+        cuegui.app().display_log_file_content.emit([self.logPath2])
+        self.__waitForLoader()
+
+        lines = _LOG_TEXT_2.split('\n')
+        self.assertEqual(lines[-1], widget._content_box.toPlainText())
+
+        widget._page_log(widget._log_scrollbar.minimum())
+        self.__waitForLoader()
+
+        # The window is full, the last line was dropped
+        self.assertEqual(lines[-2] + '\n', widget._content_box.toPlainText())
+        start = widget._window_start
+        self.assertEqual(_LOG_TEXT_2.encode('utf-8')[start:start + len(widget._window_data)],
+                         widget._window_data)
+
+        widget._page_log(widget._log_scrollbar.maximum())
+        self.__waitForLoader()
+
+        self.assertEqual(lines[-1], widget._content_box.toPlainText())
+
+    def test_shouldSearchLogFile(self):
+        widget = self.logViewPlugin.logview_widget
+        cuegui.app().display_log_file_content.emit([self.logPath1, self.logPath2])
+        self.__waitForLoader()
+        widget._case_stv_checkbox.setCheckState(qtpy.QtCore.Qt.CheckState.Unchecked)
+
+        widget._search_box.setText('lorem')
+        widget._search_button.click()
+        self.__waitForLoader()
+
+        self.assertEqual([(0, 5), (127, 5)], widget._matches)
+        self.assertTrue(self.__isHighlighted(widget._content_box, 127, 5))
+
+    def __waitForLoader(self):
+        self.logViewPlugin.logview_widget.log_thread_pool.waitForDone()
+        qtpy.QtCore.QCoreApplication.processEvents()
+
     @staticmethod
     def __isHighlighted(textBox, startPosition, selectionLength):
         cursor = textBox.cursorForPosition(qtpy.QtCore.QPoint(0, 0))
@@ -151,5 +218,50 @@ class LogViewPluginTests(pyfakefs.fake_filesystem_unittest.TestCase):
         return cursor.charFormat().background() == qtpy.QtCore.Qt.red
 
 
+class LogReaderTests(pyfakefs.fake_filesystem_unittest.TestCase):
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.logPath = '/some/log/file'
+        self.log = self.fs.create_file(self.logPath, contents=_LOG_TEXT_1)
+        self.reader = cuegui.plugins.LogViewPlugin.LogReader(self.logPath)
+
+    def test_shouldReadTailFromLineStart(self):
+        start, data, size = self.reader.read_tail(80)
+
+        self.assertEqual(len(_LOG_TEXT_1), size)
+        self.assertEqual(_LOG_TEXT_1.rsplit('\n', maxsplit=1)[-1].encode('utf-8'), data)
+        self.assertEqual(size - len(data), start)
+
+    def test_shouldReadLinesBefore(self):
+        lines = _LOG_TEXT_1.split('\n')
+        offset = len(lines[0]) + len(lines[1]) + 2
+
+        start, data, _ = self.reader.read_before(offset, 70)
+
+        self.assertEqual(len(lines[0]) + 1, start)
+        self.assertEqual((lines[1] + '\n').encode('utf-8'), data)
+
+    def test_shouldReadAfterUpToLineEnd(self):
+        lines = _LOG_TEXT_1.split('\n')
+
+        data, _ = self.reader.read_after(0, len(lines[0]) + 10)
+
+        self.assertEqual((lines[0] + '\n').encode('utf-8'), data)
+
+    def test_shouldNotSplitUtf8Characters(self):
+        self.log.set_contents('caf\xe9'.encode('utf-8')[:-1], encoding=None)
+
+        data, _ = self.reader.read_after(0, 10)
+
+        self.assertEqual(b'caf', data)
+
+    def test_shouldSearchInChunks(self):
+        self.log.set_contents(('x\xe9 lorem\n' * 10).encode('utf-8'), encoding=None)
+
+        matches = self.reader.search(re.compile('lorem'), 16)
+
+        self.assertEqual([(i * 10 + 4, 5) for i in range(10)], matches)
+
+
 if __name__ == '__main__':
     unittest.main()
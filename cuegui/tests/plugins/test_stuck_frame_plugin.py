@@ -0,0 +1,212 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Tests for cuegui.plugins.StuckFramePlugin."""
+
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import mock
+
+import opencue_proto.host_pb2
+import opencue_proto.job_pb2
+import opencue.wrappers.frame
+import opencue.wrappers.group
+import opencue.wrappers.job
+import opencue.wrappers.layer
+import opencue.wrappers.proc
+
+import cuegui.plugins.StuckFramePlugin
+
+
+# Exclude keywords, % of run since LLU, min LLU, % of average completion time, runtime
+FILTERS = {'All Other Types': ['', 50, 1, 10, 1]}
+
+
+@mock.patch('opencue.api.findGroup')
+@mock.patch('opencue.api.getFrames')
+@mock.patch('opencue.api.getJobs')
+@mock.patch('opencue.api.getProcs')
+class StuckFrameScannerTests(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch('opencue.cuebot.Cuebot.getStub')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.logDir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.logDir)
+        self.now = time.time()
+        self.layers = {'job1': [self.newLayer('render', 600)],
+                       'job2': [self.newLayer('comp', 600)]}
+        self.getLayers = mock.Mock(side_effect=lambda jobName: self.layers[jobName])
+        self.scanner = cuegui.plugins.StuckFramePlugin.StuckFrameScanner(workers=4)
+
+    @staticmethod
+    def newLayer(name, avgFrameSec):
+        return opencue.wrappers.layer.Layer(opencue_proto.job_pb2.Layer(
+            name=name, layer_stats=opencue_proto.job_pb2.LayerStats(avg_frame_sec=avgFrameSec)))
+
+    def newJob(self, name):
+        job = opencue.wrappers.job.Job(opencue_proto.job_pb2.Job(
+            id=name + '-id', name=name, show='pipe', group='grp', log_dir=self.logDir))
+        job.getLayers = lambda: self.getLayers(name)
+        return job
+
+    def newProc(self, procId, jobName, frameName, runTime, lluTime, service='shell'):
+        logPath = os.path.join(self.logDir, '%s.%s.rqlog' % (jobName, frameName))
+        if lluTime is not None:
+            with open(logPath, 'w', encoding='utf-8') as log:
+                log.write('rendering\n')
+            os.utime(logPath, (self.now - lluTime, self.now - lluTime))
+        return opencue.wrappers.proc.Proc(opencue_proto.host_pb2.Proc(
+            id=procId, job_name=jobName, frame_name=frameName, show_name='pipe',
+            dispatch_time=int(self.now - runTime), log_path=logPath, services=[service]))
+
+    @staticmethod
+    def getFrames(jobName, name=None, limit=None):
+        del limit
+        return [opencue.wrappers.frame.Frame(opencue_proto.job_pb2.Frame(
+            id='%s/%s' % (jobName, frameName), name=frameName, layer_name=frameName.split('-')[1],
+            number=int(frameName.split('-')[0]), last_resource='host/1.0/0'))
+                for frameName in name]
+
+    def mockCue(self, getProcsMock, getJobsMock, getFramesMock, findGroupMock, procs):
+        getProcsMock.return_value = procs
+        getJobsMock.side_effect = lambda job: [self.newJob(name) for name in job]
+        getFramesMock.side_effect = self.getFrames
+        findGroupMock.side_effect = lambda show, group: opencue.wrappers.group.Group(
+            opencue_proto.job_pb2.Group(id=group + '-id', name=group))
+
+    def test_scan(self, getProcsMock, getJobsMock, getFramesMock, findGroupMock):
+        self.mockCue(getProcsMock, getJobsMock, getFramesMock, findGroupMock, [
+            self.newProc('p1', 'job1', '0001-render', 3600, 3000),
+            self.newProc('p2', 'job1', '0002-render', 3600, 10),
+            self.newProc('p3', 'job1', '0003-render', 3600, None),
+            self.newProc('p4', 'job2', '0001-comp', 3600, 3000)])
+        progress = mock.Mock()
+
+        treeItems = self.scanner.scan('pipe', FILTERS, progress)
+
+        self.assertEqual(['grp', 'job1', '0001-render', 'grp', 'job2', '0001-comp'],
+                         [item.name() for item in treeItems])
+        frame = treeItems[2]
+        self.assertEqual('job1', frame.job_name)
+        self.assertEqual('render', frame.data.layer_name)
+        self.assertEqual(600, frame.averageFrameTime)
+        self.assertAlmostEqual(3000, frame.lastLogUpdate, delta=5)
+        self.assertAlmostEqual(3000 / 3600, frame.stuckness, places=2)
+        self.assertEqual('shell', frame.service)
+        self.assertEqual(self.logDir, treeItems[1].log_path)
+        getProcsMock.assert_called_once_with(show=['pipe'])
+        getJobsMock.assert_called_once_with(job=['job1', 'job2'])
+        getFramesMock.assert_any_call('job1', name=['0001-render'], limit=1)
+        self.assertEqual(2, getFramesMock.call_count)
+        findGroupMock.assert_called_once_with('pipe', 'grp')
+        progress.assert_called_with(
+            len(cuegui.plugins.StuckFramePlugin.StuckFrameScanner.PHASES))
+        self.assertEqual(list(cuegui.plugins.StuckFramePlugin.StuckFrameScanner.PHASES),
+                         [phase for phase, _ in self.scanner.timings])
+
+    def test_scanAppliesFilters(self, getProcsMock, getJobsMock, getFramesMock, findGroupMock):
+        self.mockCue(getProcsMock, getJobsMock, getFramesMock, findGroupMock, [
+            self.newProc('p1', 'job1', '0001-render', 3600, 3000),
+            self.newProc('p2', 'job2', '0001-comp', 3600, 3000, service='nuke'),
+            self.newProc('p3', 'job1', '0002-render', 30, 20)])
+        filters = {'shell': ['render', 50, 1, 10, 1], 'nuke': ['', 50, 1, 10, 1]}
+
+        treeItems = self.scanner.scan('pipe', filters)
+
+        self.assertEqual(['grp', 'job2', '0001-comp'], [item.name() for item in treeItems])
+        getJobsMock.assert_called_once_with(job=['job2'])
+
+    def test_scanWithoutMatchingFilter(self, getProcsMock, getJobsMock, getFramesMock,
+                                       findGroupMock):
+        self.mockCue(getProcsMock, getJobsMock, getFramesMock, findGroupMock, [
+            self.newProc('p1', 'job1', '0001-render', 3600, 3000)])
+
+        self.assertEqual([], self.scanner.scan('pipe', {'nuke': ['', 50, 1, 10, 1]}))
+        getJobsMock.assert_not_called()
+
+    def test_scanSkipsFinishedJobs(self, getProcsMock, getJobsMock, getFramesMock,
+                                   findGroupMock):
+        self.mockCue(getProcsMock, getJobsMock, getFramesMock, findGroupMock, [
+            self.newProc('p1', 'job1', '0001-render', 3600, 3000)])
+        getJobsMock.side_effect = None
+        getJobsMock.return_value = []
+
+        self.assertEqual([], self.scanner.scan('pipe', FILTERS))
+        self.getLayers.assert_not_called()
+        getFramesMock.assert_not_called()
+
+    def test_scanBelowAverageFrameTime(self, getProcsMock, getJobsMock, getFramesMock,
+                                       findGroupMock):
+        self.layers['job1'] = [self.newLayer('render', 100000)]
+        self.mockCue(getProcsMock, getJobsMock, getFramesMock, findGroupMock, [
+            self.newProc('p1', 'job1', '0001-render', 3600, 3000)])
+
+        self.assertEqual([], self.scanner.scan('pipe', FILTERS))
+        getFramesMock.assert_not_called()
+
+    def test_rescanOnlyRevisitsChangedProcs(self, getProcsMock, getJobsMock, getFramesMock,
+                                            findGroupMock):
+        procs = [self.newProc('p1', 'job1', '0001-render', 3600, 3000),
+                 self.newProc('p2', 'job2', '0001-comp', 3600, 3000)]
+        self.mockCue(getProcsMock, getJobsMock, getFramesMock, findGroupMock, procs)
+        first = self.scanner.scan('pipe', FILTERS)
+        self.getLayers.reset_mock()
+        getFramesMock.reset_mock()
+
+        second = self.scanner.scan('pipe', FILTERS)
+
+        self.assertIs(first[2], second[2])
+        self.assertEqual(2, getJobsMock.call_count)
+        self.getLayers.assert_not_called()
+        getFramesMock.assert_not_called()
+
+        procs[1] = self.newProc('p2', 'job2', '0002-comp', 3000, 2500)
+        third = self.scanner.scan('pipe', FILTERS)
+
+        self.assertEqual(['0001-render', '0002-comp'], [item.name() for item in third[2::3]])
+        self.getLayers.assert_called_once_with('job2')
+        getFramesMock.assert_called_once_with('job2', name=['0002-comp'], limit=1)
+
+    def test_lluTimes(self, getProcsMock, getJobsMock, getFramesMock, findGroupMock):
+        del getProcsMock, getJobsMock, getFramesMock, findGroupMock
+        logPath = self.newProc('p1', 'job1', '0001-render', 3600, 100).data.log_path
+
+        lluTimes = self.scanner.lluTimes([logPath, os.path.join(self.logDir, 'missing')])
+
+        self.assertAlmostEqual(100, lluTimes[0], delta=5)
+        self.assertIsNone(lluTimes[1])
+
+
+class FindFilterTests(unittest.TestCase):
+
+    def test_findFilter(self):
+        filters = {'shell': ['', 1, 2, 3, 4], 'All Other Types': ['', 5, 6, 7, 8]}
+
+        self.assertEqual(filters['shell'],
+                         cuegui.plugins.StuckFramePlugin.findFilter(filters, 'shell'))
+        self.assertEqual(filters['All Other Types'],
+                         cuegui.plugins.StuckFramePlugin.findFilter(filters, 'nuke'))
+        self.assertIsNone(cuegui.plugins.StuckFramePlugin.findFilter({}, 'nuke'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -218,6 +218,8 @@ class MatcherMonitorTreeTests(unittest.TestCase):
         self.matcherWrappers = [
             opencue.wrappers.filter.Matcher(matcher) for matcher in self.matchers]
         self.filter = opencue.wrappers.filter.Filter(opencue_proto.filter_pb2.Filter())
+        # Wrappers look their stub up on first use, not when they are created
+        self.filter.stub = getStubMock.return_value
 
         self.parentWidget = qtpy.QtWidgets.QWidget()
         self.matcherMonitorTree = cuegui.FilterDialog.MatcherMonitorTree(None, self.parentWidget)
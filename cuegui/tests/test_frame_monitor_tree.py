@@ -16,8 +16,10 @@
 """Tests for cuegui.FrameMonitorTree."""
 
 
+import time
 import unittest
 
+import grpc
 import mock
 import qtpy.QtCore
 import qtpy.QtGui
@@ -117,6 +119,116 @@ class FrameMonitorTreeTests(unittest.TestCase):
         getFramesMock.assert_called_with(self.job)
         getUpdatedFramesMock.assert_not_called()
 
+    def __waitForStreamEnd(self):
+        """Processes the events of the update stream until it's over."""
+        for _ in range(500):
+            qtpy.QtCore.QCoreApplication.processEvents()
+            # pylint: disable=protected-access
+            if self.frameMonitorTree._FrameMonitorTree__updateStream is None:
+                return
+            time.sleep(0.01)
+        self.fail("update stream didn't end")
+
+    @mock.patch.object(opencue.wrappers.job.Job, 'streamUpdatedFrames')
+    @mock.patch.object(opencue.wrappers.job.Job, 'getUpdatedFrames')
+    @mock.patch.object(opencue.wrappers.job.Job, 'getFrames')
+    def test_streamedUpdatesAreApplied(
+            self, getFramesMock, getUpdatedFramesMock, streamUpdatedFramesMock):
+        getFramesMock.return_value = [
+            opencue.wrappers.frame.Frame(
+                opencue_proto.job_pb2.Frame(id='foo', state=opencue_proto.job_pb2.WAITING))]
+        streamUpdatedFramesMock.return_value = iter([
+            opencue_proto.job_pb2.JobStreamUpdatedFramesResponse(
+                state=opencue_proto.job_pb2.FINISHED,
+                server_time=1000,
+                updated_frames=opencue_proto.job_pb2.UpdatedFrameSeq(
+                    updated_frames=[opencue_proto.job_pb2.UpdatedFrame(
+                        id='foo', state=opencue_proto.job_pb2.SUCCEEDED, retry_count=2)]))])
+
+        # Initial load.
+        self.frameMonitorTree.tick()
+        self.__waitForStreamEnd()
+
+        streamUpdatedFramesMock.assert_called_once_with(mock.ANY)
+        frame = self.frameMonitorTree.model().frame('foo').data
+        self.assertEqual(opencue_proto.job_pb2.SUCCEEDED, frame.state)
+        self.assertEqual(2, frame.retry_count)
+        self.frameMonitorTree.ticksWithoutUpdate = self.frameMonitorTree.updateInterval + 1
+        self.frameMonitorTree.tick()
+        getUpdatedFramesMock.assert_not_called()
+
+    @mock.patch.object(opencue.wrappers.job.Job, 'streamUpdatedFrames')
+    @mock.patch.object(opencue.wrappers.job.Job, 'getUpdatedFrames')
+    @mock.patch.object(opencue.wrappers.job.Job, 'getFrames')
+    def test_tickPollsWhenStreamIsUnimplemented(
+            self, getFramesMock, getUpdatedFramesMock, streamUpdatedFramesMock):
+        class UnimplementedError(grpc.RpcError):
+            def code(self):
+                return grpc.StatusCode.UNIMPLEMENTED
+
+        def unimplemented(_):
+            raise UnimplementedError()
+
+        getFramesMock.return_value = []
+        getUpdatedFramesMock.return_value = opencue_proto.job_pb2.JobGetUpdatedFramesResponse(
+            state=opencue_proto.job_pb2.RUNNING, server_time=1000)
+        streamUpdatedFramesMock.side_effect = unimplemented
+
+        # Initial load.
+        self.frameMonitorTree.tick()
+        self.__waitForStreamEnd()
+        self.frameMonitorTree.ticksWithoutUpdate = self.frameMonitorTree.updateInterval + 1
+        self.frameMonitorTree.tick()
+        self.frameMonitorTree.updateRequest()
+        self.frameMonitorTree.tick()
+
+        getUpdatedFramesMock.assert_called_once_with(mock.ANY)
+        streamUpdatedFramesMock.assert_called_once_with(mock.ANY)
+
+    @mock.patch.object(opencue.wrappers.job.Job, 'streamUpdatedFrames')
+    @mock.patch.object(opencue.wrappers.job.Job, 'getUpdatedFrames')
+    @mock.patch.object(opencue.wrappers.job.Job, 'getFrames')
+    def test_fullUpdateWhenStreamFallsBehind(
+            self, getFramesMock, getUpdatedFramesMock, streamUpdatedFramesMock):
+        class AbortedError(grpc.RpcError):
+            def code(self):
+                return grpc.StatusCode.ABORTED
+
+        def aborted(_):
+            raise AbortedError()
+
+        getFramesMock.return_value = []
+        streamUpdatedFramesMock.side_effect = aborted
+
+        # Initial load.
+        self.frameMonitorTree.tick()
+        self.__waitForStreamEnd()
+        self.frameMonitorTree.tick()
+
+        self.assertEqual(2, getFramesMock.call_count)
+        getUpdatedFramesMock.assert_not_called()
+
+    @mock.patch.object(opencue.wrappers.job.Job, 'streamUpdatedFrames', new=mock.Mock())
+    @mock.patch.object(opencue.wrappers.job.Job, 'getFrames')
+    def test_updateFrameCopiesFields(self, getFramesMock):
+        getFramesMock.return_value = [opencue.wrappers.frame.Frame(
+            opencue_proto.job_pb2.Frame(
+                id='foo', state=opencue_proto.job_pb2.RUNNING,
+                frame_state_display_override=opencue_proto.job_pb2.FrameStateDisplayOverride(
+                    state=opencue_proto.job_pb2.RUNNING, text='rendering')))]
+        # Initial load.
+        self.frameMonitorTree.tick()
+
+        # pylint: disable=protected-access
+        self.frameMonitorTree._updateFrame(opencue_proto.job_pb2.UpdatedFrame(
+            id='foo', state=opencue_proto.job_pb2.DEAD, exit_status=1, last_resource='host/2'))
+
+        data = self.frameMonitorTree.model().frame('foo').data
+        self.assertEqual(opencue_proto.job_pb2.DEAD, data.state)
+        self.assertEqual(1, data.exit_status)
+        self.assertEqual('host/2', data.last_resource)
+        self.assertFalse(data.HasField('frame_state_display_override'))
+
     def test_getCores(self):
         frame = opencue.wrappers.frame.Frame(
             opencue_proto.job_pb2.Frame(last_resource='foo/125.82723/0'))
@@ -140,16 +252,39 @@ class FrameMonitorTreeTests(unittest.TestCase):
         execMock.assert_called_with(mouse_position)
 
 
-class FrameWidgetItemTests(unittest.TestCase):
+    @mock.patch.object(opencue.wrappers.job.Job, 'streamUpdatedFrames', new=mock.Mock())
+    @mock.patch.object(opencue.wrappers.job.Job, 'getFrames')
+    def test_selectByStatus(self, getFramesMock):
+        getFramesMock.return_value = [
+            opencue.wrappers.frame.Frame(opencue_proto.job_pb2.Frame(
+                id='frame%d' % number, number=number, dispatch_order=number, state=state))
+            for number, state in enumerate([opencue_proto.job_pb2.DEAD,
+                                            opencue_proto.job_pb2.DEAD,
+                                            opencue_proto.job_pb2.WAITING,
+                                            opencue_proto.job_pb2.DEAD])]
+        # Initial load.
+        self.frameMonitorTree.tick()
+
+        self.frameMonitorTree.selectByStatus('DEAD')
+
+        self.assertEqual(['frame0', 'frame1', 'frame3'],
+                         [frame.id() for frame in self.frameMonitorTree.selectedObjects()])
+
+
+class FrameTableModelTests(unittest.TestCase):
+    host_name = 'arbitrary-hostname'
+    dispatch_order = 285
+    state = opencue_proto.job_pb2.RUNNING
 
     @mock.patch('opencue.cuebot.Cuebot.getStub', new=mock.Mock())
     def setUp(self):
-        self.host_name = 'arbitrary-hostname'
-        self.dispatch_order = 285
-        self.state = opencue_proto.job_pb2.RUNNING
+        app = test_utils.createApplication()
+        app.settings = qtpy.QtCore.QSettings()
+        cuegui.Style.init()
 
         self.frame = opencue.wrappers.frame.Frame(
             opencue_proto.job_pb2.Frame(
+                id='frame1-id',
                 name='frame1',
                 last_resource='{}/foo'.format(self.host_name),
                 dispatch_order=self.dispatch_order,
@@ -157,59 +292,129 @@ class FrameWidgetItemTests(unittest.TestCase):
                 checkpoint_state=opencue_proto.job_pb2.ENABLED))
 
         # The widget needs a var, otherwise it gets garbage-collected before tests can run.
-        parentWidget = qtpy.QtWidgets.QWidget()
-
-        self.frameWidgetItem = cuegui.FrameMonitorTree.FrameWidgetItem(
-            self.frame,
-            cuegui.FrameMonitorTree.FrameMonitorTree(parentWidget),
-            opencue.wrappers.job.Job(opencue_proto.job_pb2.Job(id='unused-job-id')))
+        self.parentWidget = qtpy.QtWidgets.QWidget()
+        self.tree = cuegui.FrameMonitorTree.FrameMonitorTree(self.parentWidget)
+        self.model = self.tree.model()
+        self.model.setJob(opencue.wrappers.job.Job(opencue_proto.job_pb2.Job(id='unused-job-id')))
+        self.model.setFrames([self.frame])
+        # Keeps restyling in later tests from fetching the ETA of the running frame
+        self.addCleanup(self.model.clear)
+        self.dataChanged = []
+        self.model.dataChanged.connect(
+            lambda first, last: self.dataChanged.append((first.row(), last.row())))
+
+    @staticmethod
+    def newFrame(number, **kwargs):
+        return opencue.wrappers.frame.Frame(opencue_proto.job_pb2.Frame(
+            id='frame%d-id' % number, number=number, dispatch_order=number, **kwargs))
+
+    def rowIds(self):
+        return [self.model.objectAt(row).id() for row in range(self.model.rowCount())]
 
     def test_data(self):
         cuegui.FrameMonitorTree.LOCALRESOURCE = '{}/'.format(self.host_name)
         dispatch_order_col = 0
 
+        def data(col, role):
+            return self.model.data(self.model.index(0, col), role)
+
         self.assertEqual(
-            self.dispatch_order,
-            self.frameWidgetItem.data(dispatch_order_col, qtpy.QtCore.Qt.DisplayRole))
+            self.dispatch_order, data(dispatch_order_col, qtpy.QtCore.Qt.DisplayRole))
 
         self.assertEqual(
             cuegui.Style.ColorTheme.COLOR_JOB_FOREGROUND,
-            self.frameWidgetItem.data(dispatch_order_col, qtpy.QtCore.Qt.ForegroundRole))
+            data(dispatch_order_col, qtpy.QtCore.Qt.ForegroundRole))
 
         self.assertEqual(
             cuegui.FrameMonitorTree.QCOLOR_BLACK,
-            self.frameWidgetItem.data(
-                cuegui.FrameMonitorTree.STATUS_COLUMN, qtpy.QtCore.Qt.ForegroundRole))
+            data(cuegui.FrameMonitorTree.STATUS_COLUMN, qtpy.QtCore.Qt.ForegroundRole))
 
         self.assertEqual(
             cuegui.FrameMonitorTree.QCOLOR_GREEN,
-            self.frameWidgetItem.data(
-                cuegui.FrameMonitorTree.PROC_COLUMN, qtpy.QtCore.Qt.ForegroundRole))
+            data(cuegui.FrameMonitorTree.PROC_COLUMN, qtpy.QtCore.Qt.ForegroundRole))
 
         self.assertEqual(
             cuegui.Constants.RGB_FRAME_STATE[self.state],
-            self.frameWidgetItem.data(
-                cuegui.FrameMonitorTree.STATUS_COLUMN, qtpy.QtCore.Qt.BackgroundRole))
+            data(cuegui.FrameMonitorTree.STATUS_COLUMN, qtpy.QtCore.Qt.BackgroundRole))
 
         self.assertEqual(
             qtpy.QtGui.QIcon,
-            self.frameWidgetItem.data(
-                cuegui.FrameMonitorTree.CHECKPOINT_COLUMN,
-                qtpy.QtCore.Qt.DecorationRole).__class__)
+            data(cuegui.FrameMonitorTree.CHECKPOINT_COLUMN,
+                 qtpy.QtCore.Qt.DecorationRole).__class__)
 
         self.assertEqual(
             qtpy.QtCore.Qt.AlignCenter,
-            self.frameWidgetItem.data(
-                cuegui.FrameMonitorTree.STATUS_COLUMN, qtpy.QtCore.Qt.TextAlignmentRole))
+            data(cuegui.FrameMonitorTree.STATUS_COLUMN, qtpy.QtCore.Qt.TextAlignmentRole))
 
         self.assertEqual(
             qtpy.QtCore.Qt.AlignRight,
-            self.frameWidgetItem.data(
-                cuegui.FrameMonitorTree.PROC_COLUMN, qtpy.QtCore.Qt.TextAlignmentRole))
+            data(cuegui.FrameMonitorTree.PROC_COLUMN, qtpy.QtCore.Qt.TextAlignmentRole))
 
         self.assertEqual(
-            cuegui.Constants.TYPE_FRAME,
-            self.frameWidgetItem.data(dispatch_order_col, qtpy.QtCore.Qt.UserRole))
+            cuegui.Constants.TYPE_FRAME, data(dispatch_order_col, qtpy.QtCore.Qt.UserRole))
+
+    def test_headerData(self):
+        self.assertEqual('Order', self.model.headerData(
+            0, qtpy.QtCore.Qt.Horizontal, qtpy.QtCore.Qt.DisplayRole))
+        self.assertEqual('', self.model.headerData(
+            cuegui.FrameMonitorTree.CHECKPOINT_COLUMN, qtpy.QtCore.Qt.Horizontal,
+            qtpy.QtCore.Qt.DisplayRole))
+
+    def test_setFramesOnlySignalsChangedRows(self):
+        self.model.setFrames([self.newFrame(number) for number in range(6)])
+        self.dataChanged.clear()
+        frames = [self.newFrame(number) for number in range(6)]
+        frames[2].data.retry_count = 1
+        frames[3].data.retry_count = 1
+        frames[5].data.retry_count = 1
+
+        self.model.setFrames(frames)
+
+        self.assertEqual([(2, 3), (5, 5)], self.dataChanged)
+        self.assertIs(frames[2], self.model.frame('frame2-id'))
+
+    def test_setFramesKeepsSelection(self):
+        self.model.setFrames([self.newFrame(number) for number in range(4)])
+        self.tree.selectRows([2])
+
+        self.model.setFrames([self.newFrame(number) for number in (0, 2, 3, 4)])
+
+        self.assertEqual(['frame0-id', 'frame2-id', 'frame3-id', 'frame4-id'], self.rowIds())
+        self.assertEqual(['frame2-id'], [frame.id() for frame in self.tree.selectedObjects()])
+
+    def test_sort(self):
+        self.model.setFrames([self.newFrame(number, retry_count=number % 3)
+                              for number in range(6)])
+        retriesColumn = 7
+
+        self.tree.sortByColumn(retriesColumn, qtpy.QtCore.Qt.DescendingOrder)
+
+        self.assertEqual(['frame2-id', 'frame5-id', 'frame1-id', 'frame4-id', 'frame0-id',
+                          'frame3-id'], self.rowIds())
+
+    def test_sortNoneFirst(self):
+        self.model.setFrames([self.newFrame(0, last_resource='host/2.0/0'),
+                              self.newFrame(1),
+                              self.newFrame(2, last_resource='host/1.0/0')])
+        coresColumn = 4
+
+        self.model.sort(coresColumn)
+
+        self.assertEqual(['frame1-id', 'frame2-id', 'frame0-id'], self.rowIds())
+
+    def test_updateFramesKeepsOrder(self):
+        self.model.setFrames([self.newFrame(number) for number in range(4)])
+        self.model.sort(7)
+        self.tree.selectRows([0])
+        self.dataChanged.clear()
+
+        self.model.updateFrames([opencue_proto.job_pb2.UpdatedFrame(
+            id='frame0-id', retry_count=5, state=opencue_proto.job_pb2.RUNNING)])
+
+        self.assertEqual([(0, 0)], self.dataChanged)
+        self.assertEqual(['frame1-id', 'frame2-id', 'frame3-id', 'frame0-id'], self.rowIds())
+        self.assertEqual(['frame0-id'], [frame.id() for frame in self.tree.selectedObjects()])
+        self.assertEqual([3], self.model.runningRows())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,180 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Tests for cuegui.LogData."""
+
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import mock
+
+import cuegui.LogData
+
+from . import test_utils
+
+
+class LogDataTests(unittest.TestCase):
+
+    def setUp(self):
+        test_utils.createApplication()
+        self.logDir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.logDir)
+
+    def writeLog(self, name, text, mtime=None):
+        path = os.path.join(self.logDir, name)
+        with open(path, 'w', encoding='utf-8') as fp:
+            fp.write(text)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def newService(self, **kwargs):
+        kwargs.setdefault('maxWatches', 0)
+        return cuegui.LogData.LogDataService(**kwargs)
+
+    def test_readLogData(self):
+        path = self.writeLog('frame.rqlog', 'first\nsecond\n', mtime=1000)
+
+        data = cuegui.LogData.readLogData(path)
+
+        self.assertEqual(cuegui.LogData.LogData(path, 1000, 13, 'second'), data)
+
+    def test_readLogDataUnchanged(self):
+        path = self.writeLog('frame.rqlog', 'first\n', mtime=1000)
+        previous = cuegui.LogData.readLogData(path)
+
+        with mock.patch('cuegui.LogData.getLastLine') as getLastLineMock:
+            self.assertIs(previous, cuegui.LogData.readLogData(path, previous))
+            getLastLineMock.assert_not_called()
+
+    def test_readLogDataMissing(self):
+        path = os.path.join(self.logDir, 'missing.rqlog')
+
+        self.assertEqual(cuegui.LogData.LogData(path, None, 0, ''),
+                         cuegui.LogData.readLogData(path))
+
+    def test_readLogDataNotUtf8(self):
+        path = os.path.join(self.logDir, 'frame.rqlog')
+        with open(path, 'wb') as fp:
+            fp.write(b'first\nr\xe9sum\xe9\n')
+
+        self.assertEqual('r\ufffdsum\ufffd', cuegui.LogData.readLogData(path).lastLine)
+
+    def test_fetchRetriesFailedReads(self):
+        path = self.writeLog('frame.rqlog', 'rendering\n')
+        service = self.newService()
+
+        with mock.patch('cuegui.LogData.readLogData', side_effect=ValueError('bad log')):
+            self.assertEqual(cuegui.LogData.LogData(path, None, 0, ''), service.fetch([path])[0])
+        self.assertIsNone(service.get(path))
+        self.assertEqual('rendering', service.fetch([path])[0].lastLine)
+
+    def test_get(self):
+        path = self.writeLog('frame.rqlog', 'rendering\n')
+        service = self.newService()
+
+        self.assertIsNone(service.get(path))
+        service.fetch([path])
+        self.assertEqual('rendering', service.get(path).lastLine)
+
+    def test_fetchCoalescesReads(self):
+        paths = [self.writeLog('%d.rqlog' % i, 'line %d\n' % i) for i in range(4)]
+        service = self.newService(threads=4)
+        readLogData = cuegui.LogData.readLogData
+        reads = []
+
+        def slowRead(path, previous=None):
+            reads.append(path)
+            time.sleep(0.05)
+            return readLogData(path, previous)
+
+        results = []
+        with mock.patch('cuegui.LogData.readLogData', side_effect=slowRead):
+            threads = [threading.Thread(target=lambda: results.append(service.fetch(paths * 2)))
+                       for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(sorted(paths), sorted(reads))
+        for result in results:
+            self.assertEqual(['line %d' % i for i in range(4)] * 2,
+                             [data.lastLine for data in result])
+
+    def test_fetchReadsOnlyChangedLogs(self):
+        path = self.writeLog('frame.rqlog', 'first\n', mtime=1000)
+        service = self.newService(maxAge=0)
+        service.fetch([path])
+
+        with mock.patch('cuegui.LogData.getLastLine', return_value='second') as getLastLineMock:
+            self.assertEqual('first', service.fetch([path])[0].lastLine)
+            getLastLineMock.assert_not_called()
+            self.writeLog('frame.rqlog', 'first\nsecond\n', mtime=2000)
+            self.assertEqual('second', service.fetch([path])[0].lastLine)
+            getLastLineMock.assert_called_once_with(path)
+
+    def test_cacheIsBounded(self):
+        paths = [self.writeLog('%d.rqlog' % i, 'line\n') for i in range(3)]
+        service = self.newService(maxEntries=2)
+
+        service.fetch(paths[:2])
+        service.get(paths[0])
+        service.fetch(paths[2:])
+
+        self.assertEqual(2, len(service))
+        with mock.patch('cuegui.LogData.readLogData') as readLogDataMock:
+            service.get(paths[0])
+            service.get(paths[2])
+            readLogDataMock.assert_not_called()
+
+    def test_invalidate(self):
+        path = self.writeLog('frame.rqlog', 'first\n', mtime=1000)
+        service = self.newService(maxAge=3600)
+        service.fetch([path])
+        self.writeLog('frame.rqlog', 'first\nsecond\n', mtime=2000)
+
+        self.assertEqual('first', service.fetch([path])[0].lastLine)
+        service.invalidate(path)
+        self.assertEqual('second', service.fetch([path])[0].lastLine)
+
+    def test_watchedLogsStayCurrent(self):
+        path = self.writeLog('frame.rqlog', 'first\n')
+        service = self.newService(maxAge=0, maxWatches=1)
+
+        with mock.patch('cuegui.LogData.isLocalPath', return_value=True):
+            service.fetch([path])
+        with mock.patch('cuegui.LogData.readLogData') as readLogDataMock:
+            service.fetch([path])
+            readLogDataMock.assert_not_called()
+
+    @mock.patch('cuegui.LogData.getMountTypes')
+    def test_isLocalPath(self, getMountTypesMock):
+        getMountTypesMock.return_value = [
+            ('/shots/local', 'xfs'), ('/shots', 'nfs4'), ('/', 'ext4')]
+
+        self.assertTrue(cuegui.LogData.isLocalPath('/tmp/frame.rqlog'))
+        self.assertTrue(cuegui.LogData.isLocalPath('/shots/local/frame.rqlog'))
+        self.assertFalse(cuegui.LogData.isLocalPath('/shots/pipe/frame.rqlog'))
+        self.assertTrue(cuegui.LogData.isLocalPath('/shotsx/frame.rqlog'))
+
+
+if __name__ == '__main__':
+    unittest.main()
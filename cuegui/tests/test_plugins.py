@@ -0,0 +1,195 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+
+"""Tests for cuegui.Plugins."""
+
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+import unittest
+
+from qtpy import QtCore
+from qtpy import QtWidgets
+
+import cuegui.Plugins
+import cuegui.Style
+
+from . import test_utils
+
+
+PLUGIN_SOURCE = '''
+import cuegui.AbstractDockWidget
+
+PLUGIN_NAME = "%(name)s"
+PLUGIN_CATEGORY = "Other"
+PLUGIN_DESCRIPTION = "A plugin for tests"
+PLUGIN_PROVIDES = "TestDockWidget"
+%(extra)s
+
+class TestDockWidget(cuegui.AbstractDockWidget.AbstractDockWidget):
+
+    def __init__(self, parent):
+        cuegui.AbstractDockWidget.AbstractDockWidget.__init__(self, parent, PLUGIN_NAME)
+        self.restored = None
+
+    def pluginRestoreState(self, saved_settings):
+        self.restored = saved_settings
+
+    def pluginSaveState(self):
+        return self.restored
+'''
+
+
+class ReadPluginMetadataTests(unittest.TestCase):
+
+    def setUp(self):
+        self.pluginDir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pluginDir)
+
+    def writeModule(self, source):
+        path = os.path.join(self.pluginDir, 'module.py')
+        with open(path, 'w', encoding='utf-8') as fp:
+            fp.write(textwrap.dedent(source))
+        return path
+
+    def test_readPluginMetadata(self):
+        path = self.writeModule(PLUGIN_SOURCE % {'name': 'Test', 'extra': ''})
+
+        self.assertEqual({'PLUGIN_NAME': 'Test',
+                          'PLUGIN_CATEGORY': 'Other',
+                          'PLUGIN_DESCRIPTION': 'A plugin for tests',
+                          'PLUGIN_PROVIDES': 'TestDockWidget'},
+                         cuegui.Plugins.readPluginMetadata(path))
+
+    def test_readPluginMetadataAfterClasses(self):
+        path = self.writeModule('''
+            class Widget(object):
+                pass
+
+            PLUGIN_NAME = "Test"
+            PLUGIN_DESCRIPTION = "A plugin for tests"
+            PLUGIN_PROVIDES = "Widget"
+            ''')
+
+        self.assertEqual('Widget', cuegui.Plugins.readPluginMetadata(path)['PLUGIN_PROVIDES'])
+
+    def test_readPluginMetadataNotPlainStrings(self):
+        path = self.writeModule('''
+            NAME = "Test"
+            PLUGIN_NAME = NAME
+            PLUGIN_DESCRIPTION = "A plugin for tests"
+            PLUGIN_PROVIDES = "Widget"
+            ''')
+
+        self.assertIsNone(cuegui.Plugins.readPluginMetadata(path))
+
+    def test_readPluginMetadataNotPlugin(self):
+        path = self.writeModule('import os\n')
+
+        self.assertIsNone(cuegui.Plugins.readPluginMetadata(path))
+
+
+class PluginsTests(unittest.TestCase):
+
+    def setUp(self):
+        app = test_utils.createApplication()
+        self.pluginDir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.pluginDir)
+        app.settings = QtCore.QSettings(
+            os.path.join(self.pluginDir, 'settings.ini'), QtCore.QSettings.IniFormat)
+        app.settings.setValue('Plugin_Paths', [self.pluginDir])
+        cuegui.Style.init()
+        self.mainWindow = QtWidgets.QMainWindow()
+        self.mainWindow.setCentralWidget(QtWidgets.QWidget())
+        self.mainWindow.app_name = 'Cuetopia'
+        self.addCleanup(self.mainWindow.close)
+
+    def writePlugin(self, extra=''):
+        """Writes a plugin of a name and module unique to the test."""
+        module = 'plugin_%s' % self.id().rsplit('.', 1)[-1]
+        name = 'Plugin %s' % self.id().rsplit('.', 1)[-1]
+        with open(os.path.join(self.pluginDir, module + '.py'), 'w', encoding='utf-8') as fp:
+            fp.write(PLUGIN_SOURCE % {'name': name, 'extra': extra})
+        self.addCleanup(sys.modules.pop, module, None)
+        return module, name
+
+    def test_registersPluginsWithoutImportingThem(self):
+        module, name = self.writePlugin()
+
+        plugins = cuegui.Plugins.Plugins(self.mainWindow, 'Cuetopia')
+        menu = plugins.setupPluginMenu(QtWidgets.QMenu())
+
+        self.assertNotIn(module, sys.modules)
+        self.assertIn(name, [action.text() for submenu in menu.actions()
+                             for action in submenu.menu().actions()])
+        instance = plugins.launchPlugin(name, '')
+        self.assertIn(module, sys.modules)
+        self.assertEqual([(name, instance)], plugins.runningList())
+
+    def test_skipsPluginsForOtherApps(self):
+        _, name = self.writePlugin(extra='PLUGIN_REQUIRES = "CueCommander"')
+
+        plugins = cuegui.Plugins.Plugins(self.mainWindow, 'Cuetopia')
+
+        self.assertIsNone(plugins.launchPlugin(name, ''))
+
+    def test_restoredPluginsStartOnceShown(self):
+        _, name = self.writePlugin()
+        cuegui.app().settings.setValue(
+            'Cuetopia/Plugins_Opened', ['%s::%s' % (name, json.dumps({'jobs': ['a']}))])
+        plugins = cuegui.Plugins.Plugins(self.mainWindow, 'Cuetopia')
+
+        plugins.restoreState()
+        self.assertEqual([], plugins.runningList())
+        pending = plugins.pendingList()[0]
+        self.mainWindow.show()
+        # Started on the first pass, laid out in the place of the pending dock on the next
+        QtWidgets.QApplication.processEvents()
+        QtWidgets.QApplication.processEvents()
+
+        self.assertEqual([], plugins.pendingList())
+        instance = plugins.runningList()[0][1]
+        self.assertEqual({'jobs': ['a']}, instance.restored)
+        self.assertTrue(instance.isVisible())
+        self.assertNotIn(pending, self.mainWindow.findChildren(QtWidgets.QDockWidget))
+
+    def test_hiddenPluginsKeepTheirState(self):
+        _, name = self.writePlugin()
+        state = json.dumps({'jobs': ['a']})
+        cuegui.app().settings.setValue('Cuetopia/Plugins_Opened', ['%s::%s' % (name, state)])
+        plugins = cuegui.Plugins.Plugins(self.mainWindow, 'Cuetopia')
+        plugins.restoreState()
+        pending = plugins.pendingList()[0]
+        pending.hide()
+        self.mainWindow.show()
+        QtWidgets.QApplication.processEvents()
+
+        plugins.saveState()
+        self.assertEqual(['%s::%s' % (name, state)],
+                         cuegui.app().settings.value('Cuetopia/Plugins_Opened'))
+        self.assertEqual([], plugins.runningList())
+
+        plugins.activatePlugin(pending)
+        self.assertEqual([], plugins.pendingList())
+        self.assertFalse(plugins.runningList()[0][1].isVisible())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+
+"""Tests for cuegui.StartupProfile."""
+
+
+import itertools
+import unittest
+
+import cuegui.StartupProfile
+
+
+class StartupProfileTests(unittest.TestCase):
+
+    def test_nestedPhases(self):
+        ticks = itertools.count(0, 0.5)
+        profile = cuegui.StartupProfile.StartupProfile(clock=lambda: next(ticks))
+
+        with profile.phase('main window'):
+            with profile.phase('find plugins'):
+                pass
+
+        self.assertEqual([['main window', 0, 0.5, 1.5], ['find plugins', 1, 1.0, 0.5]],
+                         profile.phases)
+        report = profile.report().splitlines()
+        self.assertEqual('CueGUI started in 2500.0 ms', report[0])
+        self.assertTrue(report[2].endswith('    find plugins'))
+
+    def test_phaseDoesNothingUnlessEnabled(self):
+        self.assertIsNone(cuegui.StartupProfile.profile())
+
+        with cuegui.StartupProfile.phase('main window'):
+            pass
+
+        self.assertIsNone(cuegui.StartupProfile.profile())
+
+
+if __name__ == '__main__':
+    unittest.main()
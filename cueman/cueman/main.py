@@ -30,6 +30,7 @@ import cueadmin.output
 import cueadmin.util
 import opencue
 import opencue.api
+import opencue.batch
 from cueadmin import common
 
 # Import version for --version flag
@@ -410,42 +411,26 @@ def handleArgs(args):
                 logger.error("Error retrieving info for job '%s': %s", args.info, e)
             sys.exit(1)
     elif args.pause:
-        job_names = format_nargs_input(args.pause)
-        try:
-            for job_name in job_names:
-                job = opencue.api.findJob(job_name)
-                if not job.isPaused():
-                    job.pause()
-                    logger.info("Pausing Job: %s", job.name())
-                else:
-                    logger.info("Job: %s is already paused", job.name())
-                logger.info("---")
-        except Exception as e:
-            if (
-                "does not exist" in str(e).lower()
-                or "incorrect result size" in str(e).lower()
-            ):
-                logger.error("Error: Job '%s' does not exist.", job_name)
+
+        def pauseJob(job_name):
+            job = opencue.api.findJob(job_name)
+            if not job.isPaused():
+                job.pause()
+                logger.info("Pausing Job: %s", job.name())
             else:
-                logger.error("Error pausing job '%s': %s", job_name, e)
-            sys.exit(1)
+                logger.info("Job: %s is already paused", job.name())
+            logger.info("---")
+
+        runJobBatch(pauseJob, format_nargs_input(args.pause), "pausing")
 
     elif args.resume:
-        job_names = format_nargs_input(args.resume)
-        try:
-            for job_name in job_names:
-                job = opencue.api.findJob(job_name)
-                job.resume()
-                logger.info("Resumed Job: %s", job.name())
-        except Exception as e:
-            if (
-                "does not exist" in str(e).lower()
-                or "incorrect result size" in str(e).lower()
-            ):
-                logger.error("Error: Job '%s' does not exist.", job_name)
-            else:
-                logger.error("Error resuming job '%s': %s", job_name, e)
-            sys.exit(1)
+
+        def resumeJob(job_name):
+            job = opencue.api.findJob(job_name)
+            job.resume()
+            logger.info("Resumed Job: %s", job.name())
+
+        runJobBatch(resumeJob, format_nargs_input(args.resume), "resuming")
 
     elif args.term:
         job_names = format_nargs_input(args.term)
@@ -619,41 +604,50 @@ def handleArgs(args):
                 logger.error("Error reordering frames for job '%s': %s", name, e)
             sys.exit(1)
     elif args.autoeaton:
-        job_names = format_nargs_input(args.autoeaton)
-        try:
-            for job_name in job_names:
-                job = opencue.api.findJob(job_name)
-                job.setAutoEat(True)
-                if job_pb2 and hasattr(job_pb2, "DEAD"):
-                    job.eatFrames(state=[job_pb2.DEAD])
-                else:
-                    job.eatFrames(state=["DEAD"])
-                logger.info("Enabled auto-eat for job: %s", job.name())
-        except Exception as e:
-            if (
-                "does not exist" in str(e).lower()
-                or "incorrect result size" in str(e).lower()
-            ):
-                logger.error("Error: Job '%s' does not exist.", job_name)
+
+        def enableAutoEat(job_name):
+            job = opencue.api.findJob(job_name)
+            job.setAutoEat(True)
+            if job_pb2 and hasattr(job_pb2, "DEAD"):
+                job.eatFrames(state=[job_pb2.DEAD])
             else:
-                logger.error("Error enabling auto-eat for job '%s': %s", job_name, e)
-            sys.exit(1)
+                job.eatFrames(state=["DEAD"])
+            logger.info("Enabled auto-eat for job: %s", job.name())
+
+        runJobBatch(enableAutoEat, format_nargs_input(args.autoeaton), "enabling auto-eat for")
     elif args.autoeatoff:
-        job_names = format_nargs_input(args.autoeatoff)
-        try:
-            for job_name in job_names:
-                job = opencue.api.findJob(job_name)
-                job.setAutoEat(False)
-                logger.info("Disabled auto-eat for job: %s", job.name())
-        except Exception as e:
-            if (
-                "does not exist" in str(e).lower()
-                or "incorrect result size" in str(e).lower()
-            ):
-                logger.error("Error: Job '%s' does not exist.", job_name)
-            else:
-                logger.error("Error disabling auto-eat for job '%s': %s", job_name, e)
-            sys.exit(1)
+
+        def disableAutoEat(job_name):
+            job = opencue.api.findJob(job_name)
+            job.setAutoEat(False)
+            logger.info("Disabled auto-eat for job: %s", job.name())
+
+        runJobBatch(
+            disableAutoEat, format_nargs_input(args.autoeatoff), "disabling auto-eat for"
+        )
+
+
+def runJobBatch(func, job_names, action):
+    """Apply an action to jobs concurrently, exiting with an error if any failed.
+
+    Every job is processed even when some fail, each failure is logged.
+
+    Args:
+        func: Callable taking a job name
+        job_names: Names of the jobs
+        action: What is done to the jobs, for the error messages
+    """
+    result = opencue.batch.BatchExecutor().run(func, job_names)
+    for job_name, e in result.failed:
+        if (
+            "does not exist" in str(e).lower()
+            or "incorrect result size" in str(e).lower()
+        ):
+            logger.error("Error: Job '%s' does not exist.", job_name)
+        else:
+            logger.error("Error %s job '%s': %s", action, job_name, e)
+    if result.failed:
+        sys.exit(1)
 
 
 def _validate_range_filter(value_str, filter_name, converter, use_int=False):
@@ -942,7 +936,10 @@ def terminateJobs(jobs):
     Args:
         jobs: List of job objects to terminate
     """
-    for job in jobs:
+
+    def killJob(job):
         job.kill(reason=KILL_REASON)
         logger.info(KILL_REASON, job.name(), getpass.getuser())
         logger.info("---")
+
+    opencue.batch.BatchExecutor().run(killJob, jobs).raiseFirstError()
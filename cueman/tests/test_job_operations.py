@@ -379,5 +379,28 @@ class TestJobOperations(unittest.TestCase):
             cueman_main.handleArgs(args)
         mock_logger.error.assert_called()
 
+    @patch('opencue.api.findJob')
+    @patch('cueman.main.logger')
+    def test_pause_command_continues_after_missing_job(self, mock_logger, mock_find):
+        """Test pause command pauses every found job before exiting on a missing one."""
+        jobs = {}
+        for name in ('job1', 'job3'):
+            jobs[name] = MagicMock()
+            jobs[name].isPaused.return_value = False
+            jobs[name].name.return_value = name
+
+        def find(name):
+            if name not in jobs:
+                raise Exception('does not exist')
+            return jobs[name]
+
+        mock_find.side_effect = find
+        args = self._ns(pause=['job1,job2,job3'])
+        with self.assertRaises(SystemExit):
+            cueman_main.handleArgs(args)
+        jobs['job1'].pause.assert_called_once()
+        jobs['job3'].pause.assert_called_once()
+        mock_logger.error.assert_called_once_with("Error: Job '%s' does not exist.", 'job2')
+
 if __name__ == '__main__':
     unittest.main()
@@ -23,15 +23,24 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import absolute_import
 
-from builtins import str
 from builtins import range
-from builtins import object
-import re
 from collections import OrderedDict
+import math
+import re
+
+from .FrameSegment import FrameSegment
+from .FrameSegment import FrameSegments
+from .FrameSegment import appendSegment
+from .FrameSegment import combineSegments
+from .FrameSegment import segmentsOf
 
 
-class FrameRange(object):
-    """Represents a sequence of frame numbers."""
+class FrameRange(FrameSegments):
+    """Represents a sequence of frame numbers.
+
+    The frames are stored as segments of arithmetic progressions rather than a
+    list, see FrameSegments.
+    """
 
     SINGLE_FRAME_PATTERN = re.compile(r'^(-?)\d+$')
     SIMPLE_FRAME_RANGE_PATTERN = re.compile(r'^(?P<sf>(-?)\d+)-(?P<ef>(-?)\d+)$')
@@ -74,59 +83,33 @@ class FrameRange(object):
 
         Example: 1-10:5 == 1, 6, 2, 4, 8, 10, 3, 5, 7, 9.
         """
-        self.frameList = self.parseFrameRange(frameRange)
-
-    def __str__(self):
-        # TODO(bcipriano) Make this smarter, group frame ranges and by step. (Issue #83)
-        return ','.join([str(frame) for frame in self.frameList])
-
-    def __getitem__(self, key):
-        return self.frameList[key]
-
-    def __len__(self):
-        return self.size()
-
-    def size(self):
-        """Gets the number of frames contained in this sequence."""
-        return len(self.frameList)
-
-    def get(self, idx):
-        """Gets an individual entry in the sequence, by numerical position."""
-        return self.frameList[idx]
-
-    def index(self, idx):
-        """Query index of frame number in frame set.
+        self._setSegments(self.parseSegments(frameRange))
 
-        Returns:
-            int, index of frame. -1 if frame set does not contain frame.
+    @classmethod
+    def parseFrameRange(cls, frameRange):
         """
-        try:
-            return self.frameList.index(idx)
-        except ValueError:
-            return -1
-
-    def getAll(self):
-        """Gets the full numerical sequence."""
-        return self.frameList
+        Parse a string representation into a numerical sequence.
 
-    def normalize(self):
-        """Sorts and deduplicates the sequence."""
-        self.frameList = list(set(self.frameList))
-        self.frameList.sort()
+        :type frameRange: str
+        :param frameRange: String representation of the frame range.
+        :rtype: list<int>
+        :return: every frame of the range, in order.
+        """
+        return [frame for segment in cls.parseSegments(frameRange) for frame in segment]
 
     @classmethod
-    def parseFrameRange(cls, frameRange):
+    def parseSegments(cls, frameRange):
         """
-        Parse a string representation into a numerical sequence.
+        Parse a string representation into the segments of its frames.
 
         :type frameRange: str
         :param frameRange: String representation of the frame range.
-        :rtype: FrameRange
-        :return: FrameRange representing the numerical sequence.
+        :rtype: list<FrameSegment>
+        :return: the segments of the frames, in order.
         """
         singleFrameMatcher = re.match(cls.SINGLE_FRAME_PATTERN, frameRange)
         if singleFrameMatcher:
-            return [int(frameRange)]
+            return [FrameSegment.progression(int(frameRange), 1, 1)]
 
         simpleRangeMatcher = re.match(cls.SIMPLE_FRAME_RANGE_PATTERN, frameRange)
         if simpleRangeMatcher:
@@ -153,28 +136,54 @@ class FrameRange(object):
 
     @staticmethod
     def __getIntRange(start, end, step):
-        return list(range(start, end+(step // abs(step)), step))
+        count = len(range(start, end+(step // abs(step)), step))
+        return [FrameSegment.progression(start, step, count)] if count else []
 
     @classmethod
     def __getSteppedRange(cls, start, end, step, inverseStep):
         cls.__validateStepSign(start, end, step)
-        steppedRange = cls.__getIntRange(start, end, step)
         if inverseStep:
-            fullRange = cls.__getIntRange(start, end, (-1 if step < 0 else 1))
-            return [frame for frame in fullRange if frame not in steppedRange]
-        return steppedRange
+            direction = -1 if step < 0 else 1
+            count = (len(range(start, end + direction, direction)) -
+                     len(range(start, end + direction, step)))
+            if count <= 0:
+                return []
+            # Every frame but the first of each step
+            return [FrameSegment(start, direction, abs(step), range(1, abs(step)), count)]
+        return cls.__getIntRange(start, end, step)
 
     @classmethod
     def __getInterleavedRange(cls, start, end, step):
         cls.__validateStepSign(start, end, step)
-        interleavedFrames = OrderedDict()
+        passes = []
+        span = abs(end - start)
         incrValue = step // abs(step)
+        period = 1
         while abs(step) > 0:
-            interleavedFrames.update(
-                [(frame, None) for frame in cls.__getIntRange(start, end, step)])
+            passes.append(cls.__getIntRange(start, end, step))
+            period = period * abs(step) // math.gcd(period, abs(step))
             start += incrValue
             step = int(step / 2.0)
-        return list(interleavedFrames.keys())
+
+        if period > span:
+            # The passes don't repeat within the range, their frames are
+            # listed once instead of compared segment by segment.
+            interleavedFrames = OrderedDict()
+            for currentPass in passes:
+                for segment in currentPass:
+                    interleavedFrames.update(dict.fromkeys(segment))
+            return segmentsOf(interleavedFrames)
+
+        segments = []
+        for index, currentPass in enumerate(passes):
+            newFrames = combineSegments(
+                [currentPass, [segment for previous in passes[:index] for segment in previous]],
+                lambda found: found[0] and not found[1])
+            if incrValue < 0:
+                newFrames = [segment.reversed() for segment in reversed(newFrames)]
+            for segment in newFrames:
+                appendSegment(segments, segment)
+        return segments
 
     @staticmethod
     def __validateStepSign(start, end, step):
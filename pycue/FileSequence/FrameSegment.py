@@ -0,0 +1,452 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Compact storage of frame sequences.
+
+A sequence is kept as a list of FrameSegments, runs of frames following a
+pattern that repeats every `period` frames, so that ranges like 1-100000 take
+the same space as 1-10. FrameSegments is the base of FrameRange and FrameSet.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+from builtins import object
+from builtins import range
+from builtins import str
+import bisect
+import itertools
+
+
+def _gcd(a, b):
+    while b:
+        a, b = b, a % b
+    return a
+
+
+def _lcm(a, b):
+    return a // _gcd(a, b) * b
+
+
+class FrameSegment(object):
+    """A monotonic run of frames.
+
+    The frames are base + direction * (q * period + offset) for q = 0, 1, ...
+    and each offset of offsets, in that order, stopping after count frames.
+    Segments are canonical: base is the first frame, offsets start at 0 and
+    the period is the smallest the pattern repeats at. A plain range has one
+    offset, an inverted step all offsets but one.
+    """
+
+    __slots__ = ('base', 'direction', 'period', 'offsets', 'count', '_ranks')
+
+    def __init__(self, base, direction, period, offsets, count):
+        offsets = sorted(offsets)
+        if offsets[0]:
+            base += direction * offsets[0]
+            offsets = sorted((offset - offsets[0]) % period for offset in offsets)
+        if count == 1:
+            direction, period, offsets = 1, 1, [0]
+        period, offsets = self.__reducePeriod(period, offsets)
+        self.base = base
+        self.direction = direction
+        self.period = period
+        self.offsets = tuple(offsets)
+        self.count = count
+        self._ranks = {offset: rank for rank, offset in enumerate(offsets)}
+
+    @classmethod
+    def progression(cls, first, step, count):
+        """Returns the segment first, first + step, ... of count frames."""
+        return cls(first, -1 if step < 0 else 1, abs(step) or 1, [0], count)
+
+    @staticmethod
+    def __reducePeriod(period, offsets):
+        """Returns the shortest period repeating the pattern, and its offsets."""
+        offsetSet = set(offsets)
+        common = _gcd(period, len(offsets))
+        for repeats in range(common, 1, -1):
+            if common % repeats:
+                continue
+            divisor = period // repeats
+            head = [offset for offset in offsets if offset < divisor]
+            if len(head) * repeats == len(offsets) and all(
+                    offset + n * divisor in offsetSet for offset in head for n in range(repeats)):
+                return divisor, head
+        return period, offsets
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        if len(self.offsets) == 1:
+            step = self.direction * self.period
+            return iter(range(self.base, self.base + step * self.count, step))
+        return (self.frame(index) for index in range(self.count))
+
+    def __contains__(self, frame):
+        return self.index(frame) >= 0
+
+    def frame(self, index):
+        """Returns the frame at a position of the segment."""
+        cycle, rank = divmod(index, len(self.offsets))
+        return self.base + self.direction * (cycle * self.period + self.offsets[rank])
+
+    @property
+    def last(self):
+        """The last frame of the segment."""
+        return self.frame(self.count - 1)
+
+    @property
+    def low(self):
+        """The smallest frame of the segment."""
+        return self.base if self.direction > 0 else self.last
+
+    @property
+    def high(self):
+        """The largest frame of the segment."""
+        return self.last if self.direction > 0 else self.base
+
+    @property
+    def step(self):
+        """The difference between consecutive frames, None when it varies."""
+        return self.direction * self.period if len(self.offsets) == 1 else None
+
+    def index(self, frame):
+        """Returns the position of a frame in the segment, -1 if it isn't in it."""
+        distance = (frame - self.base) * self.direction
+        if distance < 0:
+            return -1
+        cycle, offset = divmod(distance, self.period)
+        rank = self._ranks.get(offset)
+        if rank is None:
+            return -1
+        index = cycle * len(self.offsets) + rank
+        return index if index < self.count else -1
+
+    def between(self, low, end):
+        """Yields the frames of an ascending segment from low to end, excluded."""
+        cycle = max(0, (low - self.base) // self.period)
+        end = min(end, self.high + 1)
+        while True:
+            cycleBase = self.base + cycle * self.period
+            for offset in self.offsets:
+                frame = cycleBase + offset
+                if frame >= end:
+                    return
+                if frame >= low:
+                    yield frame
+            cycle += 1
+
+    def matches(self, frame):
+        """Returns whether a frame between low and high follows the pattern."""
+        return (frame - self.base) % self.period in self._ranks
+
+    def reversed(self):
+        """Returns the segment of the same frames in the opposite order."""
+        if self.count == 1:
+            return self
+        last = self.last
+        distance = (last - self.base) * self.direction
+        return FrameSegment(last, -self.direction, self.period,
+                            [(distance - offset) % self.period for offset in self.offsets],
+                            self.count)
+
+    def ascending(self):
+        """Returns the segment of the same frames from lowest to highest."""
+        return self if self.direction > 0 else self.reversed()
+
+    def followedBy(self, other):
+        """Returns a segment of the frames of this one then the other, or None
+        when they don't make a single progression."""
+        if len(self.offsets) != 1 or len(other.offsets) != 1:
+            return None
+        if self.count == 1:
+            step = other.base - self.base
+        else:
+            step = self.step
+        if not step or other.base != self.last + step:
+            return None
+        if other.count > 1 and other.step != step:
+            return None
+        return FrameSegment.progression(self.base, step, self.count + other.count)
+
+    def __str__(self):
+        if self.count == 1:
+            return str(self.base)
+        step = self.step
+        if step is not None:
+            if self.count == 2 and abs(step) > 1:
+                return '%d,%d' % (self.base, self.last)
+            if abs(step) == 1:
+                return '%d-%d' % (self.base, self.last)
+            return '%d-%dx%d' % (self.base, self.last, step)
+        if len(self.offsets) == self.period - 1 and self.count >= 2 * len(self.offsets):
+            return self.__invertedStepString()
+        return formatSegments(segmentsOf(self))
+
+    def __invertedStepString(self):
+        """Formats a segment missing one frame per period with the y syntax,
+        whose frames start right after the first frame left out."""
+        skipped = next(offset for offset in range(self.period) if offset not in self._ranks)
+        if skipped == self.period - 1:
+            return '%d-%dy%d' % (self.base - self.direction, self.last,
+                                 self.direction * self.period)
+        anchor = self.base + self.direction * skipped
+        head = FrameSegment.progression(self.base, self.direction, skipped)
+        return '%s,%d-%dy%d' % (head, anchor, self.last, self.direction * self.period)
+
+    def __repr__(self):
+        return 'FrameSegment(%s)' % self
+
+
+def appendSegment(segments, segment):
+    """Appends a segment to a list, merging it into the last one when the
+    frames of both make a single progression."""
+    if segments:
+        last = segments[-1]
+        merged = last.followedBy(segment)
+        if merged is not None:
+            segments[-1] = merged
+            return
+        if last.count == 2 and last.step is not None:
+            # Two frames hardly make a progression; the second one may
+            # start a longer one with the new segment.
+            merged = FrameSegment.progression(last.last, 1, 1).followedBy(segment)
+            if merged is not None:
+                segments.pop()
+                appendSegment(segments, FrameSegment.progression(last.base, 1, 1))
+                appendSegment(segments, merged)
+                return
+    segments.append(segment)
+
+
+def segmentsOf(frames):
+    """Returns the segments of an iterable of frame numbers, consecutive
+    frames of a progression grouped together.
+
+    :rtype: list<FrameSegment>
+    """
+    segments = []
+    first = previous = step = None
+    count = 0
+    for frame in frames:
+        if count == 1 and frame != first:
+            step = frame - first
+            count = 2
+        elif count > 1 and frame - previous == step:
+            count += 1
+        else:
+            if count:
+                appendSegment(segments, FrameSegment.progression(first, step or 1, count))
+            first, step, count = frame, None, 1
+        previous = frame
+    if count:
+        appendSegment(segments, FrameSegment.progression(first, step or 1, count))
+    return segments
+
+
+def formatSegments(segments):
+    """Returns the frame range spec of a list of segments."""
+    return ','.join(str(segment) for segment in segments)
+
+
+def combineSegments(groups, keep):
+    """Computes a set operation on groups of segments.
+
+    The number line is cut at the ends of every segment. Between two cuts
+    each segment is either absent or repeats with its period, so the result
+    repeats with the lowest common multiple of the periods and only one
+    period of it is computed.
+
+    :type  groups: list<list<FrameSegment>>
+    :param groups: the operands, in any order and possibly overlapping
+    :type  keep: callable
+    :param keep: called with a tuple of whether a frame is in each group,
+                 returns whether it's in the result, never true when the
+                 frame is in no group
+    :rtype:  list<FrameSegment>
+    :return: the frames of the result, in ascending order without duplicates
+    """
+    groups = [sorted((segment.ascending() for segment in group), key=lambda s: s.low)
+              for group in groups]
+    cuts = sorted(set(itertools.chain.from_iterable(
+        (segment.low, segment.high + 1) for group in groups for segment in group)))
+    pending = [0] * len(groups)
+    active = [[] for _ in groups]
+    result = []
+    for low, end in zip(cuts, cuts[1:]):
+        for position, group in enumerate(groups):
+            while pending[position] < len(group) and group[pending[position]].low <= low:
+                active[position].append(group[pending[position]])
+                pending[position] += 1
+            active[position] = [segment for segment in active[position] if segment.high >= low]
+        if not any(active):
+            continue
+
+        def kept(frame):
+            return keep(tuple(any(segment.matches(frame) for segment in segments)
+                              for segments in active))
+
+        length = end - low
+        period = 1
+        for segment in itertools.chain.from_iterable(active):
+            period = _lcm(period, segment.period)
+        if period >= length:
+            # No repetition to take advantage of, only the frames of the
+            # operands can be in the result
+            frames = sorted(set(itertools.chain.from_iterable(
+                segment.between(low, end) for segment in itertools.chain.from_iterable(active))))
+            for segment in segmentsOf(frame for frame in frames if kept(frame)):
+                appendSegment(result, segment)
+            continue
+        offsets = [offset for offset in range(period) if kept(low + offset)]
+        if not offsets:
+            continue
+        count = length // period * len(offsets) + sum(
+            1 for offset in offsets if offset < length % period)
+        segment = FrameSegment(low, 1, period, offsets, count)
+        if len(segment.offsets) > 1 and segment.count < 2 * len(segment.offsets):
+            # Shorter than two periods, plain progressions read better
+            for part in segmentsOf(segment):
+                appendSegment(result, part)
+        else:
+            appendSegment(result, segment)
+    return result
+
+
+class FrameSegments(object):
+    """An ordered sequence of frames stored as FrameSegments.
+
+    Length, membership, lookups by position and by frame cost one step per
+    segment at most, whatever the number of frames.
+    """
+
+    segments = ()
+    _starts = (0,)
+
+    def _setSegments(self, segments):
+        self.segments = segments
+        starts = [0]
+        for segment in segments:
+            starts.append(starts[-1] + segment.count)
+        self._starts = starts
+
+    @classmethod
+    def fromSegments(cls, segments):
+        """Creates a sequence of the frames of a list of segments."""
+        sequence = cls.__new__(cls)
+        sequence._setSegments(list(segments))
+        return sequence
+
+    @classmethod
+    def fromFrames(cls, frames):
+        """Creates a sequence of the frames of an iterable of frame numbers."""
+        return cls.fromSegments(segmentsOf(frames))
+
+    def __str__(self):
+        return formatSegments(self.segments)
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, str(self))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.get(index) for index in range(*key.indices(self.size()))]
+        return self.get(key)
+
+    def __len__(self):
+        return self.size()
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self.segments)
+
+    def __contains__(self, frame):
+        return any(frame in segment for segment in self.segments)
+
+    def size(self):
+        """Gets the number of frames contained in this sequence."""
+        return self._starts[-1]
+
+    def get(self, idx):
+        """Gets an individual entry in the sequence, by numerical position."""
+        size = self.size()
+        if idx < 0:
+            idx += size
+        if not 0 <= idx < size:
+            raise IndexError('frame index out of range')
+        position = bisect.bisect_right(self._starts, idx) - 1
+        return self.segments[position].frame(idx - self._starts[position])
+
+    def index(self, idx):
+        """Query index of frame number in frame set.
+
+        Returns:
+            int, index of frame. -1 if frame set does not contain frame.
+        """
+        for start, segment in zip(self._starts, self.segments):
+            index = segment.index(idx)
+            if index >= 0:
+                return start + index
+        return -1
+
+    def getAll(self):
+        """Gets the full numerical sequence."""
+        return list(self)
+
+    @property
+    def frameList(self):
+        """The full numerical sequence, prefer iterating to building it."""
+        return self.getAll()
+
+    def normalize(self):
+        """Sorts and deduplicates the sequence."""
+        self._setSegments(combineSegments([self.segments], any))
+
+    def __operand(self, other):
+        if isinstance(other, FrameSegments):
+            return other.segments
+        return type(self)(other).segments
+
+    def union(self, other):
+        """Returns the sorted frames in this sequence or the other.
+
+        :type  other: FrameSegments or str
+        :param other: a sequence or its spec
+        """
+        return self.fromSegments(combineSegments([self.segments, self.__operand(other)], any))
+
+    def intersection(self, other):
+        """Returns the sorted frames in both this sequence and the other.
+
+        :type  other: FrameSegments or str
+        :param other: a sequence or its spec
+        """
+        return self.fromSegments(combineSegments(
+            [self.segments, self.__operand(other)], all))
+
+    def difference(self, other):
+        """Returns the sorted frames in this sequence but not in the other.
+
+        :type  other: FrameSegments or str
+        :param other: a sequence or its spec
+        """
+        return self.fromSegments(combineSegments(
+            [self.segments, self.__operand(other)], lambda found: found[0] and not found[1]))
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
@@ -18,12 +18,12 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import division
 
-from builtins import str
-from builtins import object
 from .FrameRange import FrameRange
+from .FrameSegment import FrameSegments
+from .FrameSegment import appendSegment
 
 
-class FrameSet(object):
+class FrameSet(FrameSegments):
     """Represents a sequence of `FileSequence.FrameRange`."""
 
     def __init__(self, frameRange):
@@ -32,57 +32,35 @@ class FrameSet(object):
         See FrameRange for the supported syntax. A FrameSet follows the same syntax,
         with the addition that it may be a comma-separated list of different FrameRanges.
         """
-        self.frameList = self.parseFrameRange(frameRange)
+        self._setSegments(self.parseSegments(frameRange))
 
-    def __str__(self):
-        # TODO(bcipriano) Make this smarter, group frame ranges and by step. (Issue #83)
-        return ','.join([str(frame) for frame in self.frameList])
-
-    def __getitem__(self, key):
-        return self.frameList[key]
-
-    def __len__(self):
-        return self.size()
-
-    def size(self):
-        """Gets the number of frames contained in this sequence."""
-        return len(self.frameList)
-
-    def get(self, idx):
-        """Gets an individual entry in the sequence, by numerical position."""
-        return self.frameList[idx]
-
-    def index(self, idx):
-        """Query index of frame number in frame set.
-
-        Returns:
-            int, index of frame. -1 if frame set does not contain frame.
+    @staticmethod
+    def parseFrameRange(frameRange):
         """
-        try:
-            return self.frameList.index(idx)
-        except ValueError:
-            return -1
-
-    def getAll(self):
-        """Gets the full numerical sequence."""
-        return self.frameList
+        Parses a string representation of a frame range into its frames.
 
-    def normalize(self):
-        """Sorts and dedeuplicates the sequence."""
-        self.frameList = list(set(self.frameList))
-        self.frameList.sort()
+        :type frameRange: str
+        :param frameRange: String representation of the frame range.
+        :rtype: list<int>
+        :return: every frame of the FrameSet, in order.
+        """
+        return [frame for segment in FrameSet.parseSegments(frameRange) for frame in segment]
 
     @staticmethod
-    def parseFrameRange(frameRange):
+    def parseSegments(frameRange):
         """
-        Parses a string representation of a frame range into a FrameSet.
+        Parses a string representation of a frame range into the segments of its frames.
+
+        Consecutive sections continuing the same progression are merged, 1-5,6-10 is
+        stored as 1-10.
 
         :type frameRange: str
         :param frameRange: String representation of the frame range.
-        :rtype: FrameSet
-        :return: The FrameSet representing the same sequence.
+        :rtype: list<FrameSegment>
+        :return: the segments of the frames, in order.
         """
-        frameList = []
+        segments = []
         for frameRangeSection in frameRange.split(','):
-            frameList.extend(FrameRange.parseFrameRange(frameRangeSection))
-        return frameList
+            for segment in FrameRange.parseSegments(frameRangeSection):
+                appendSegment(segments, segment)
+        return segments
@@ -18,13 +18,11 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import division
 
+import importlib
 import logging
 
 # pylint: disable=cyclic-import
 from .cuebot import Cuebot
-from . import api
-from . import wrappers
-from . import search
 
 from .exception import CueException
 from .exception import EntityNotFoundException
@@ -35,6 +33,20 @@ from .util import logPath
 from .util import proxy
 from .util import rep
 
+# Importing these builds the descriptors of every proto, they are imported on
+# first use instead so a script only pays for the modules it uses.
+_LAZY_SUBMODULES = ('api', 'batch', 'cache', 'paging', 'search', 'wrappers')
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_SUBMODULES))
+
 
 class __NullHandler(logging.Handler):
     def emit(self, record):
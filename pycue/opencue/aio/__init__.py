@@ -0,0 +1,27 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""An asyncio client of OpenCue, built on gRPC asyncio.
+
+opencue.aio.api holds the queries of opencue.api as coroutine functions
+and opencue.aio.search the searches of opencue.search, both returning the
+wrappers of opencue.wrappers. See opencue.aio.api for an example.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+from .cuebot import AioChannelPool
+from .cuebot import Cuebot
@@ -0,0 +1,604 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""The OpenCue static API, with asyncio.
+
+The queries of opencue.api as coroutine functions, returning the same
+wrapper types, so that many can run at once on a single thread::
+
+    import asyncio
+    import opencue.aio.api
+
+    async def main():
+        shows = await opencue.aio.api.getActiveShows()
+        jobsByShow = await asyncio.gather(*[
+            opencue.aio.api.getJobs(show=[show.name()]) for show in shows])
+
+    asyncio.run(main())
+
+Calls go through the channels of opencue.aio.cuebot.Cuebot, which fail over
+and back off like those of opencue.cuebot.Cuebot, and raise the exceptions
+of opencue.exception after the same retries as opencue.api. The methods of
+the wrappers returned, like Job.kill(), are synchronous.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import grpc
+
+from opencue_proto import cue_pb2
+from opencue_proto import department_pb2
+from opencue_proto import depend_pb2
+from opencue_proto import facility_pb2
+from opencue_proto import filter_pb2
+from opencue_proto import host_pb2
+from opencue_proto import job_pb2
+from opencue_proto import limit_pb2
+from opencue_proto import service_pb2
+from opencue_proto import show_pb2
+from opencue_proto import subscription_pb2
+from opencue.wrappers.allocation import Allocation
+from opencue.wrappers.depend import Depend
+from opencue.wrappers.filter import Filter
+from opencue.wrappers.frame import Frame
+from opencue.wrappers.group import Group
+from opencue.wrappers.host import Host, NestedHost
+from opencue.wrappers.job import Job
+from opencue.wrappers.layer import Layer
+from opencue.wrappers.limit import Limit
+from opencue.wrappers.owner import Owner
+from opencue.wrappers.proc import Proc
+from opencue.wrappers.service import Service
+from opencue.wrappers.show import Show
+from opencue.wrappers.subscription import Subscription
+from .cuebot import Cuebot
+from . import paging
+from . import search
+from . import util
+
+
+#
+# Services
+#
+@util.grpcExceptionParser
+async def getDefaultServices():
+    """Return the default service list.
+
+    :rtype: list
+    :return: List of Service objects"""
+    response = await Cuebot.getStub('service').GetDefaultServices(
+        service_pb2.ServiceGetDefaultServicesRequest(), timeout=Cuebot.timeout())
+    return [Service(data) for data in response.services.services]
+
+
+@util.grpcExceptionParser
+async def getService(name):
+    """Return the service with the provided name, or None.
+
+    :type name: str
+    :param name: the name of the service
+    :rtype: Service"""
+    try:
+        response = await Cuebot.getStub('service').GetService(
+            service_pb2.ServiceGetServiceRequest(name=name), timeout=Cuebot.timeout())
+    except grpc.RpcError as e:
+        # pylint: disable=no-member
+        if e.code() == grpc.StatusCode.NOT_FOUND:
+            return None
+        # pylint: enable=no-member
+        raise e
+    return Service(response.service)
+
+
+@util.grpcExceptionParser
+async def getSystemStats():
+    """Returns the system stats for a random OpenCue server in the cluster.
+
+    :rtype: SystemStats
+    :return: a struct of OpenCue application information."""
+    return (await Cuebot.getStub('cue').GetSystemStats(
+        cue_pb2.CueGetSystemStatsRequest(), timeout=Cuebot.timeout())).stats
+
+
+#
+# Facility
+#
+@util.grpcExceptionParser
+async def getFacility(name):
+    """Return a given facility by name or unique ID.
+
+    :type name: str
+    :param name: a facility name or unique ID
+    :rtype: Facility
+    :return: a facility object"""
+    return (await Cuebot.getStub('facility').Get(
+        facility_pb2.FacilityGetRequest(name=name), timeout=Cuebot.timeout())).facility
+
+
+#
+# Departments
+#
+@util.grpcExceptionParser
+async def getDepartmentNames():
+    """Return a list of the known department names.
+
+    :rtype: list
+    :return: a list of str department names"""
+    return list((await Cuebot.getStub('department').GetDepartmentNames(
+        department_pb2.DeptGetDepartmentNamesRequest(), timeout=Cuebot.timeout())).names)
+
+
+#
+# Shows
+#
+@util.grpcExceptionParser
+async def getShows():
+    """Returns a list of show objects.
+
+    :rtype:  list
+    :return: a list of Show objects"""
+    response = await Cuebot.getStub('show').GetShows(
+        show_pb2.ShowGetShowsRequest(), timeout=Cuebot.timeout())
+    return [Show(s) for s in response.shows.shows]
+
+
+@util.grpcExceptionParser
+async def getActiveShows():
+    """Returns a list of all active shows.
+
+    :rtype:  list
+    :return: a list of Show objects"""
+    response = await Cuebot.getStub('show').GetActiveShows(
+        show_pb2.ShowGetActiveShowsRequest(), timeout=Cuebot.timeout())
+    return [Show(s) for s in response.shows.shows]
+
+
+@util.grpcExceptionParser
+async def findShow(name):
+    """Returns the show of the given name.
+
+    :type  name: str
+    :param name: a string that represents a show to return
+    :rtype:  Show
+    :return: the matching Show object"""
+    return Show((await Cuebot.getStub('show').FindShow(
+        show_pb2.ShowFindShowRequest(name=name), timeout=Cuebot.timeout())).show)
+
+
+#
+# Groups
+#
+@util.grpcExceptionParser
+async def findGroup(show, group):
+    """Returns a group object.
+
+    :type  show: str
+    :param show: the name of a show
+    :type  group: str
+    :param group: the name of a group
+    :rtype:  Group
+    :return: the matching group object"""
+    return Group((await Cuebot.getStub('group').FindGroup(
+        job_pb2.GroupFindGroupRequest(show=show, name=group), timeout=Cuebot.timeout())).group)
+
+
+@util.grpcExceptionParser
+async def getGroup(uniq):
+    """Returns a Group object from its unique ID.
+
+    :type  uniq: str
+    :param uniq: a unique group identifier
+    :rtype:  Group
+    :return: the matching group object"""
+    return Group((await Cuebot.getStub('group').GetGroup(
+        job_pb2.GroupGetGroupRequest(id=uniq), timeout=Cuebot.timeout())).group)
+
+
+#
+# Jobs
+#
+@util.grpcExceptionParser
+async def findJob(name):
+    """Returns a Job object for the given job name.
+    This will only return one or zero active job.
+
+    :type  name: str
+    :param name: a job name
+    :rtype:  Job
+    :return: a Job object"""
+    return Job((await Cuebot.getStub('job').FindJob(
+        job_pb2.JobFindJobRequest(name=name), timeout=Cuebot.timeout())).job)
+
+
+@util.grpcExceptionParser
+async def getJob(uniq):
+    """Returns a Job object for the given job ID.
+
+    :type  uniq: str
+    :param uniq: a unique job identifier
+    :rtype:  Job
+    :return: a Job object"""
+    return Job((await Cuebot.getStub('job').GetJob(
+        job_pb2.JobGetJobRequest(id=uniq), timeout=Cuebot.timeout())).job)
+
+
+@util.grpcExceptionParser
+async def getJobs(**options):
+    """Returns a list of Job objects matching the search criteria of
+    opencue.api.getJobs.
+
+    :rtype:  list
+    :return: a list of Job objects"""
+    response = await search.JobSearch.byOptions(**options)
+    return [Job(j) for j in response.jobs.jobs]
+
+
+@util.grpcExceptionParser
+async def isJobPending(name):
+    """Returns true if there is an active job in the cue
+    in the pending state.
+
+    :type  name: str
+    :param name: a job name
+    :rtype: bool
+    :return: true if the job exists"""
+    return (await Cuebot.getStub('job').IsJobPending(
+        job_pb2.JobIsJobPendingRequest(name=name), timeout=Cuebot.timeout())).value
+
+
+@util.grpcExceptionParser
+async def getJobNames(**options):
+    """Returns a list of job names that match the search parameters.
+    See opencue.api.getJobs for the job query options.
+
+    :rtype:  list
+    :return: List of matching str job names"""
+    criteria = search.JobSearch.criteriaFromOptions(**options)
+    return (await Cuebot.getStub('job').GetJobNames(
+        job_pb2.JobGetJobNamesRequest(r=criteria), timeout=Cuebot.timeout())).names
+
+
+#
+# Layers
+#
+@util.grpcExceptionParser
+async def findLayer(job, layer):
+    """Finds and returns a layer from the specified pending job.
+
+    :type job: str
+    :param job: the job name
+    :type layer: str
+    :param layer: the layer name
+    :rtype: opencue.wrappers.layer.Layer
+    :return: the layer matching the query"""
+    return Layer((await Cuebot.getStub('layer').FindLayer(
+        job_pb2.LayerFindLayerRequest(job=job, layer=layer), timeout=Cuebot.timeout())).layer)
+
+
+@util.grpcExceptionParser
+async def getLayer(uniq):
+    """Returns a Layer object for the given layer ID.
+
+    :type  uniq: str
+    :param uniq: a unique layer identifier
+    :rtype:  opencue.wrappers.layer.Layer
+    :return: a Layer object"""
+    return Layer((await Cuebot.getStub('layer').GetLayer(
+        job_pb2.LayerGetLayerRequest(id=uniq), timeout=Cuebot.timeout())).layer)
+
+
+#
+# Frames
+#
+@util.grpcExceptionParser
+async def findFrame(job, layer, number):
+    """Finds and returns a frame from the specified pending job.
+
+    :type job: str
+    :param job: the job name
+    :type layer: str
+    :param layer: the layer name
+    :type number: int
+    :param number: the frame number
+    :rtype: opencue.wrappers.frame.Frame
+    :return: the frame matching the query"""
+    return Frame((await Cuebot.getStub('frame').FindFrame(
+        job_pb2.FrameFindFrameRequest(job=job, layer=layer, frame=number),
+        timeout=Cuebot.timeout())).frame)
+
+
+@util.grpcExceptionParser
+async def getFrame(uniq):
+    """Returns a Frame object from the unique ID.
+
+    :type  uniq: str
+    :param uniq: a unique frame identifier
+    :rtype:  opencue.wrappers.frame.Frame
+    :return: a Frame object"""
+    return Frame((await Cuebot.getStub('frame').GetFrame(
+        job_pb2.FrameGetFrameRequest(id=uniq), timeout=Cuebot.timeout())).frame)
+
+
+@util.grpcExceptionParser
+async def getFrames(job, **options):
+    """Finds frames in a job that match the search criteria.
+
+    :type job: str
+    :param job: the job name
+    :rtype: list
+    :return: a list of matching Frame objects"""
+    response = await search.FrameSearch.byOptions(job, **options)
+    return [Frame(f) for f in response.frames.frames]
+
+
+def iterFrames(job, pageSize=None, **options):
+    """Iterates asynchronously over all the frames in a job that match the
+    search criteria, fetching them pageSize at a time like
+    opencue.api.iterFrames.
+
+    :type  job: str
+    :param job: the job name
+    :type  pageSize: int
+    :param pageSize: frames per request, at most search.FrameSearch.max_limit
+    :rtype:  async generator
+    :return: the matching Frame objects, the page and limit options are ignored"""
+    options.pop('page', None)
+    options.pop('limit', None)
+    return paging.iterPages(
+        lambda page, limit: getFrames(job, page=page, limit=limit, **options),
+        min(pageSize or paging.DEFAULT_PAGE_SIZE, search.FrameSearch.max_limit))
+
+
+#
+# Depends
+#
+@util.grpcExceptionParser
+async def getDepend(uniq):
+    """Finds a dependency from its unique ID.
+
+    :type uniq: str
+    :param uniq: the unique ID of the Depend object
+    :rtype: opencue.wrappers.depend.Depend
+    :return: a dependency"""
+    return Depend((await Cuebot.getStub('depend').GetDepend(
+        depend_pb2.DependGetDependRequest(id=uniq), timeout=Cuebot.timeout())).depend)
+
+
+#
+# Hosts
+#
+@util.grpcExceptionParser
+async def getHostWhiteboard():
+    """
+    :rtype:  list<NestedHost>
+    :return: the hosts, nested in their allocations"""
+    response = await Cuebot.getStub('host').GetHostWhiteboard(
+        host_pb2.HostGetHostWhiteboardRequest(), timeout=Cuebot.timeout())
+    return [NestedHost(nh) for nh in response.nested_hosts.nested_hosts]
+
+
+@util.grpcExceptionParser
+async def getHosts(**options):
+    """Returns a list of Host objects matching the search criteria of
+    opencue.api.getHosts.
+
+    :rtype:  list
+    :return: a list of Host objects"""
+    return await search.HostSearch.byOptions(**options)
+
+
+def iterHosts(pageSize=None, **options):
+    """Iterates asynchronously over all the hosts that match the search
+    criteria, which are the same as getHosts, pageSize at a time.
+
+    :type  pageSize: int
+    :param pageSize: hosts per request
+    :rtype:  async generator
+    :return: the matching Host objects, the offset and limit options are ignored"""
+    options.pop('offset', None)
+    options.pop('limit', None)
+    return paging.iterPages(
+        lambda page, limit: getHosts(offset=(page - 1) * limit + 1, limit=limit, **options),
+        pageSize or paging.DEFAULT_PAGE_SIZE)
+
+
+@util.grpcExceptionParser
+async def findHost(name):
+    """Returns the host for the matching hostname.
+
+    :type  name: str
+    :param name: the unique name of a host
+    :rtype:  Host
+    :return: The matching host object"""
+    return Host((await Cuebot.getStub('host').FindHost(
+        host_pb2.HostFindHostRequest(name=name), timeout=Cuebot.timeout())).host)
+
+
+@util.grpcExceptionParser
+async def getHost(uniq):
+    """Returns a Host object from a unique identifier.
+
+    :type  uniq: str
+    :param uniq: a unique host identifier
+    :rtype:  Host
+    :return: A Host object"""
+    return Host((await Cuebot.getStub('host').GetHost(
+        host_pb2.HostGetHostRequest(id=uniq), timeout=Cuebot.timeout())).host)
+
+
+#
+# Owners
+#
+@util.grpcExceptionParser
+async def getOwner(owner_id):
+    """Return an Owner object from the ID or name.
+
+    :type  owner_id: str
+    :param owner_id: a unique owner identifier or name
+    :rtype:  Owner
+    :return: An Owner object"""
+    return Owner((await Cuebot.getStub('owner').GetOwner(
+        host_pb2.OwnerGetOwnerRequest(name=owner_id), timeout=Cuebot.timeout())).owner)
+
+
+#
+# Filters
+#
+@util.grpcExceptionParser
+async def findFilter(show_name, filter_name):
+    """Returns the matching filter.
+
+    :type  show_name: str
+    :param show_name: a show name
+    :type  filter_name: str
+    :param filter_name: a filter name
+    :rtype:  Filter
+    :return: the matching Filter object"""
+    return Filter((await Cuebot.getStub('filter').FindFilter(
+        filter_pb2.FilterFindFilterRequest(show=show_name, name=filter_name),
+        timeout=Cuebot.timeout())).filter)
+
+
+#
+# Allocation
+#
+@util.grpcExceptionParser
+async def getAllocations():
+    """Returns a list of allocation objects.
+
+    :rtype:  list
+    :return: a list of Allocation objects"""
+    response = await Cuebot.getStub('allocation').GetAll(
+        facility_pb2.AllocGetAllRequest(), timeout=Cuebot.timeout())
+    return [Allocation(a) for a in response.allocations.allocations]
+
+
+@util.grpcExceptionParser
+async def findAllocation(name):
+    """Returns the Allocation object that matches the name.
+
+    :type  name: str
+    :param name: fully qualified name of the allocation (facility.allocation)
+    :rtype:  Allocation
+    :return: an Allocation object"""
+    return Allocation((await Cuebot.getStub('allocation').Find(
+        facility_pb2.AllocFindRequest(name=name), timeout=Cuebot.timeout())).allocation)
+
+
+@util.grpcExceptionParser
+async def getAllocation(allocId):
+    """Returns the Allocation object that matches the ID.
+
+    :type  allocId: str
+    :param allocId: the ID of the allocation
+    :rtype:  Allocation
+    :return: an Allocation object"""
+    return Allocation((await Cuebot.getStub('allocation').Get(
+        facility_pb2.AllocGetRequest(id=allocId), timeout=Cuebot.timeout())).allocation)
+
+
+@util.grpcExceptionParser
+async def getDefaultAllocation():
+    """Get the default allocation.
+
+    :rtype:  Allocation
+    :return: an Allocation object"""
+    return Allocation((await Cuebot.getStub('allocation').GetDefault(
+        facility_pb2.AllocGetDefaultRequest(), timeout=Cuebot.timeout())).allocation)
+
+
+#
+# Subscriptions
+#
+@util.grpcExceptionParser
+async def getSubscription(uniq):
+    """Returns a Subscription object from a unique identifier.
+
+    :type  uniq: str
+    :param uniq: a unique subscription identifier
+    :rtype:  Subscription
+    :return: a Subscription object"""
+    return Subscription((await Cuebot.getStub('subscription').Get(
+        subscription_pb2.SubscriptionGetRequest(id=uniq),
+        timeout=Cuebot.timeout())).subscription)
+
+
+@util.grpcExceptionParser
+async def findSubscription(name):
+    """Returns the subscription object that matches the name.
+
+    :type  name: str
+    :param name: the name of the subscription
+    :rtype:  Subscription
+    :return: a Subscription object"""
+    return Subscription((await Cuebot.getStub('subscription').Find(
+        subscription_pb2.SubscriptionFindRequest(name=name),
+        timeout=Cuebot.timeout())).subscription)
+
+
+#
+# Procs
+#
+@util.grpcExceptionParser
+async def getProcs(**options):
+    """Returns a list of Proc objects matching the search criteria of
+    opencue.api.getProcs.
+
+    :rtype:  list[opencue.wrapper.proc.Proc]
+    :return: a list of Proc objects"""
+    response = await search.ProcSearch.byOptions(**options)
+    return [Proc(p) for p in response.procs.procs]
+
+
+def iterProcs(pageSize=None, **options):
+    """Iterates asynchronously over all the procs that match the search
+    criteria, which are the same as getProcs, pageSize at a time.
+
+    :type  pageSize: int
+    :param pageSize: procs per request
+    :rtype:  async generator
+    :return: the matching Proc objects, the offset and limit options are ignored"""
+    options.pop('offset', None)
+    options.pop('limit', None)
+    return paging.iterPages(
+        lambda page, limit: getProcs(offset=(page - 1) * limit + 1, limit=limit, **options),
+        pageSize or paging.DEFAULT_PAGE_SIZE)
+
+
+#
+# Limits
+#
+@util.grpcExceptionParser
+async def getLimits():
+    """Return a list of all known Limit objects.
+
+    :rtype: list
+    :return: a list of Limit objects"""
+    response = await Cuebot.getStub('limit').GetAll(
+        limit_pb2.LimitGetAllRequest(), timeout=Cuebot.timeout())
+    return [Limit(limit) for limit in response.limits]
+
+
+@util.grpcExceptionParser
+async def findLimit(name):
+    """Returns the Limit object that matches the name.
+
+    :type  name: str
+    :param name: a string that represents a limit to return
+    :rtype:  Limit
+    :return: the matching Limit object"""
+    return Limit((await Cuebot.getStub('limit').Find(
+        limit_pb2.LimitFindRequest(name=name), timeout=Cuebot.timeout())).limit)
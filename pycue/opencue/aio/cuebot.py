@@ -0,0 +1,286 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""The asyncio counterpart of opencue.cuebot: the channels to the Cuebot
+server(s) used by opencue.aio, and their stubs."""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import asyncio
+import logging
+from random import shuffle
+import time
+
+import grpc
+from grpc import aio
+
+import opencue.cuebot
+
+
+__all__ = ["AioChannelPool", "Cuebot"]
+
+logger = logging.getLogger("opencue")
+
+
+class Cuebot(object):
+    """Manages the asyncio channel to the Cuebot.
+
+    The hosts, config and timeout are those of opencue.cuebot.Cuebot, set
+    with its setHosts, setHostWithFacility and setTimeout or read from the
+    environment and config like it does. The channel is made on first use,
+    in the running event loop; gRPC asyncio channels belong to the loop they
+    were made in, so another channel is made for calls in another loop."""
+    RpcChannel = None
+    Loop = None
+    # Stubs on RpcChannel by name, created on first use
+    Stubs = {}
+
+    @staticmethod
+    def setChannel():
+        """Sets the gRPC channel connection, in the running event loop."""
+        syncCuebot = opencue.cuebot.Cuebot
+        hosts = list(syncCuebot.Hosts or syncCuebot.configuredHosts())
+        shuffle(hosts)
+        maxMessageBytes = syncCuebot.Config.get(
+            'cuebot.max_message_bytes', opencue.cuebot.DEFAULT_MAX_MESSAGE_BYTES)
+        targets = [syncCuebot.getTarget(host) for host in hosts]
+        logger.debug('connecting to gRPC asyncio at %s', ', '.join(targets))
+        Cuebot.RpcChannel = AioChannelPool(
+            targets,
+            options=[('grpc.max_send_message_length', maxMessageBytes),
+                     ('grpc.max_receive_message_length', maxMessageBytes)],
+            max_attempts=4,
+            sleeping_policy=opencue.cuebot.ExponentialBackoff(init_backoff_ms=100,
+                                                              max_backoff_ms=1600,
+                                                              multiplier=2),
+            probe=Cuebot._probe,
+            probe_interval=syncCuebot.Config.get(
+                'cuebot.probe_interval', opencue.cuebot.DEFAULT_PROBE_INTERVAL))
+        Cuebot.Loop = asyncio.get_running_loop()
+        Cuebot.Stubs.clear()
+
+    @staticmethod
+    async def closeChannel():
+        """Closes the gRPC channel and resets it to None. A channel made in
+        another event loop is only dropped, it can't be closed from this one."""
+        channel = Cuebot.RpcChannel
+        if channel is None:
+            return
+        Cuebot.RpcChannel = None
+        Cuebot.Stubs.clear()
+        if Cuebot.Loop is asyncio.get_running_loop():
+            await channel.close()
+        Cuebot.Loop = None
+
+    @staticmethod
+    def timeout():
+        """Returns the network timeout of the calls, that of opencue.cuebot.Cuebot."""
+        return opencue.cuebot.Cuebot.Timeout
+
+    @classmethod
+    def getStub(cls, name):
+        """Get the matching stub from the SERVICE_MAP of opencue.cuebot.Cuebot,
+        with asyncio methods. Must be called in a coroutine.
+
+        :param name: name of stub key for SERVICE_MAP
+        :type name: str"""
+        if Cuebot.Loop is not asyncio.get_running_loop():
+            cls.setChannel()
+        stub = Cuebot.Stubs.get(name)
+        if stub is None:
+            stub = Cuebot.Stubs[name] = opencue.cuebot.Cuebot.getService(name)(
+                Cuebot.RpcChannel)
+        return stub
+
+    @staticmethod
+    async def _probe(channel):
+        """Checks that the cuebot at the other end of a channel answers,
+        raising grpc.RpcError if it doesn't."""
+        syncCuebot = opencue.cuebot.Cuebot
+        await syncCuebot.getService('cue')(channel).GetSystemStats(
+            syncCuebot.getProto('cue').CueGetSystemStatsRequest(),
+            timeout=syncCuebot.Config.get(
+                'cuebot.probe_timeout', opencue.cuebot.DEFAULT_PROBE_TIMEOUT))
+
+
+class AioChannelPool(opencue.cuebot.BaseChannelPool, aio.Channel):
+    """The asyncio counterpart of opencue.cuebot.ChannelPool: a gRPC asyncio
+    channel spreading calls over channels to several cuebots, failing over
+    and probing the channels the same way, with a task of the event loop in
+    place of the background thread."""
+
+    def __init__(self, targets, options=None, max_attempts=4, sleeping_policy=None,
+                 probe=None, probe_interval=opencue.cuebot.DEFAULT_PROBE_INTERVAL,
+                 weight=0.3):
+        """
+        :type  targets: list<str>
+        :param targets: host:port of the cuebots, preferred in that order until measured
+        :type  options: list<tuple>
+        :param options: options of the channels
+        :type  max_attempts: int
+        :param max_attempts: attempts of a call before giving up, at least one per channel
+        :type  sleeping_policy: opencue.cuebot.SleepingPolicy
+        :param sleeping_policy: gives the delay before every channel is tried again
+        :type  probe: coroutine function
+        :param probe: called with a channel, raises if its cuebot isn't healthy
+        :type  probe_interval: float
+        :param probe_interval: seconds between probes of the channels that are down,
+                               and before the latency of an idle channel is forgotten
+        :type  weight: float
+        :param weight: weight of the latest call in the running averages"""
+        opencue.cuebot.BaseChannelPool.__init__(
+            self,
+            # pylint: disable=protected-access
+            [opencue.cuebot._PooledChannel(
+                target, aio.insecure_channel(target, options=options or []))
+             for target in targets],
+            max_attempts, sleeping_policy, probe, probe_interval, weight)
+        self._closed = False
+        self._prober = None
+
+    async def call(self, method, invoke, timeout=None):
+        """Awaits invoke with the healthiest channel, and with the next ones
+        while it fails in a way that allows failing over.
+
+        :type  method: str
+        :param method: full name of the gRPC method
+        :type  invoke: callable
+        :param invoke: called with a _PooledChannel and the seconds left for the
+                       call, returns an awaitable call
+        :type  timeout: float
+        :param timeout: seconds all the attempts may take together, None for no limit
+        :return: the response of the call"""
+        statuses = self.failoverStatuses(method)
+        deadline = None if timeout is None else time.time() + timeout
+        tried = set()
+        rounds = 0
+        for attempt in range(self._max_attempts):
+            pooled = self._acquire(tried)
+            start = time.time()
+            try:
+                result = await invoke(pooled, self._remaining(deadline))
+            except grpc.RpcError as error:
+                # pylint: disable=no-member
+                failover = self._releaseFailed(
+                    pooled, time.time() - start,
+                    error.code() if hasattr(error, 'code') else None, statuses, tried)
+                if (not failover or attempt == self._max_attempts - 1 or
+                        self._expired(deadline)):
+                    raise
+                logger.warning('gRPC call %s to %s failed with %s, failing over',
+                               method, pooled.target, error.code())
+                tried.add(pooled)
+                if len(tried) == len(self._channels):
+                    # Every channel failed once, give them some time before trying them again
+                    if self._sleeping_policy is not None:
+                        await asyncio.sleep(self._sleeping_policy.delay(rounds))
+                        if self._expired(deadline):
+                            raise
+                    rounds += 1
+                    tried.clear()
+                continue
+            except BaseException:
+                # Cancelled, the channel isn't to blame
+                with self._lock:
+                    pooled.inflight -= 1
+                raise
+            self._release(pooled, time.time() - start, False)
+            return result
+        return None
+
+    def _startProber(self):
+        if self._probe is None or self._prober is not None or self._closed:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._prober = loop.create_task(self._probeLoop())
+
+    async def _probeLoop(self):
+        while True:
+            await asyncio.sleep(self._probe_interval)
+            for pooled in self._probeCandidates():
+                start = time.time()
+                try:
+                    await self._probe(pooled.channel)
+                # pylint: disable=broad-except
+                except Exception as error:
+                    self._probed(pooled, None, error)
+                else:
+                    self._probed(pooled, time.time() - start, None)
+
+    def unary_unary(self, method, *args, **kwargs):
+        return _AioPooledMultiCallable(self, 'unary_unary', method, args, kwargs,
+                                       failover=True)
+
+    def unary_stream(self, method, *args, **kwargs):
+        return _AioPooledMultiCallable(self, 'unary_stream', method, args, kwargs)
+
+    def stream_unary(self, method, *args, **kwargs):
+        return _AioPooledMultiCallable(self, 'stream_unary', method, args, kwargs)
+
+    def stream_stream(self, method, *args, **kwargs):
+        return _AioPooledMultiCallable(self, 'stream_stream', method, args, kwargs)
+
+    def get_state(self, try_to_connect=False):
+        return self._healthiest().channel.get_state(try_to_connect)
+
+    async def wait_for_state_change(self, last_observed_state):
+        await self._healthiest().channel.wait_for_state_change(last_observed_state)
+
+    async def channel_ready(self):
+        await self._healthiest().channel.channel_ready()
+
+    async def close(self, grace=None):
+        self._closed = True
+        if self._prober is not None:
+            self._prober.cancel()
+        for pooled in self._channels:
+            await pooled.channel.close(grace)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+class _AioPooledMultiCallable(object):
+    """A multi-callable of an AioChannelPool. Unary calls return a coroutine
+    to await for the response, streaming calls the call of the healthiest
+    channel."""
+
+    def __init__(self, pool, kind, method, args, kwargs, failover=False):
+        self._pool = pool
+        self._kind = kind
+        self._method = method
+        self._args = args
+        self._kwargs = kwargs
+        self._failover = failover
+
+    def __call__(self, request, *args, **kwargs):
+        # Shared by the attempts of the call, each gets what is left of it
+        timeout = kwargs.pop('timeout', None)
+
+        def invoke(pooled, remaining):
+            return pooled.getCallable(self._kind, self._method, self._args, self._kwargs)(
+                request, *args, timeout=remaining, **kwargs)
+
+        if self._failover:
+            return self._pool.call(self._method, invoke, timeout)
+        # pylint: disable=protected-access
+        return invoke(self._pool._healthiest(), timeout)
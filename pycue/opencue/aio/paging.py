@@ -0,0 +1,75 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Asynchronous iteration over search results one page at a time.
+
+Example::
+
+    async for frame in opencue.aio.api.iterFrames(job.name(), pageSize=1000):
+        print(frame.name(), frame.state())
+
+Like opencue.paging, only the page being consumed and the next one, fetched
+in the meantime, are held in memory.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import asyncio
+
+from opencue.paging import DEFAULT_PAGE_SIZE
+
+
+__all__ = ["DEFAULT_PAGE_SIZE", "iterPages"]
+
+
+async def iterPages(fetchPage, pageSize, prefetch=True):
+    """Yields the items of a paged query until a page comes back short.
+
+    A page holding more than pageSize items means the server ignored the
+    paging, it is then the whole result and the last page.
+
+    :type  fetchPage: coroutine function
+    :param fetchPage: called as fetchPage(page, pageSize) with pages numbered
+                      from 1, returns the list of items of the page
+    :type  pageSize: int
+    :param pageSize: number of items to ask for per page
+    :type  prefetch: bool
+    :param prefetch: whether to fetch the next page while the current one
+                     is consumed
+    :rtype:  async generator
+    :return: the items of every page, in order
+    """
+    if pageSize < 1:
+        raise ValueError('pageSize must be positive, got %s' % pageSize)
+    page = 1
+    pending = asyncio.ensure_future(fetchPage(page, pageSize))
+    try:
+        while pending is not None:
+            items = await pending
+            page += 1
+            pending = None
+            if len(items) == pageSize:
+                nextPage = fetchPage(page, pageSize)
+                pending = asyncio.ensure_future(nextPage) if prefetch else nextPage
+            for item in items:
+                yield item
+            del items
+    finally:
+        # The caller stopped early, a page still in flight is dropped
+        if isinstance(pending, asyncio.Future):
+            pending.cancel()
+        elif pending is not None:
+            pending.close()
@@ -0,0 +1,94 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Client side implementation of search criteria, with asyncio.
+
+The searches of opencue.search, whose byOptions and by* methods return
+awaitables here::
+
+    jobs = await JobSearch.byUser(["chambers", "jwelborn"])
+
+    s = HostSearch(alloc=["local.general"])
+    hosts = await s.search()
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+from opencue_proto import host_pb2
+from opencue_proto import job_pb2
+import opencue.search
+import opencue.wrappers.host
+from .cuebot import Cuebot
+
+
+__all__ = ["ProcSearch",
+           "FrameSearch",
+           "HostSearch",
+           "JobSearch"]
+
+
+class ProcSearch(opencue.search.ProcSearch):
+    """Class for searching for procs.
+
+    See: help(opencue.aio.api.getProcs)"""
+
+    @classmethod
+    def byOptions(cls, **options):
+        """Executes the search using the given options."""
+        criteria = cls.criteriaFromOptions(**options)
+        return Cuebot.getStub('proc').GetProcs(
+            host_pb2.ProcGetProcsRequest(r=criteria), timeout=Cuebot.timeout())
+
+
+class FrameSearch(opencue.search.FrameSearch):
+    """Class for searching for frames."""
+
+    # pylint: disable=arguments-differ
+    @classmethod
+    def byOptions(cls, job, **options):
+        criteria = cls.criteriaFromOptions(**options)
+        return Cuebot.getStub('frame').GetFrames(
+            job_pb2.FrameGetFramesRequest(job=job, r=criteria), timeout=Cuebot.timeout())
+
+    @classmethod
+    def byRange(cls, job, val):
+        """Executes a search by frame range."""
+        return cls.byOptions(job, frame_range=val)
+
+
+class HostSearch(opencue.search.HostSearch):
+    """Class for searching for hosts."""
+
+    @classmethod
+    def byOptions(cls, **options):
+        criteria = cls.criteriaFromOptions(**options)
+        return _wrapHosts(Cuebot.getStub('host').GetHosts(
+            host_pb2.HostGetHostsRequest(r=criteria), timeout=Cuebot.timeout()))
+
+
+class JobSearch(opencue.search.JobSearch):
+    """Class for searching for jobs."""
+
+    @classmethod
+    def byOptions(cls, **options):
+        criteria = cls.criteriaFromOptions(**options)
+        return Cuebot.getStub('job').GetJobs(
+            job_pb2.JobGetJobsRequest(r=criteria), timeout=Cuebot.timeout())
+
+
+async def _wrapHosts(call):
+    response = await call
+    return [opencue.wrappers.host.Host(host) for host in response.hosts.hosts]
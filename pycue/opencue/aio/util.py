@@ -0,0 +1,48 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Utility methods used throughout the opencue.aio module."""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import asyncio
+import functools
+
+import grpc
+
+import opencue.exception
+import opencue.util
+
+
+def grpcExceptionParser(grpcFunc):
+    """Decorator to wrap coroutine functions making GRPC calls.
+    Retries and raises like opencue.util.grpcExceptionParser, waiting
+    without blocking the event loop."""
+    async def _decorator(*args, **kwargs):
+        try:
+            return await grpcFunc(*args, **kwargs)
+        except grpc.RpcError as exc:
+            error = exc
+        triesRemaining = opencue.exception.getRetryCount()
+        while True:
+            await asyncio.sleep(opencue.util.retryBackoff(error, triesRemaining))
+            triesRemaining -= 1
+            try:
+                return await grpcFunc(*args, **kwargs)
+            except grpc.RpcError as exc:
+                error = exc
+
+    return functools.wraps(grpcFunc)(_decorator)
@@ -55,6 +55,8 @@ from .wrappers.service import Service
 from .wrappers.show import Show
 from .wrappers.subscription import Subscription
 from .wrappers.task import Task
+from . import cache
+from . import paging
 from . import search
 from . import util
 
@@ -253,8 +255,9 @@ def getActiveShows():
 
     :rtype:  list
     :return: a list of Show objects"""
-    showSeq = Cuebot.getStub('show').GetActiveShows(
-        show_pb2.ShowGetActiveShowsRequest(), timeout=Cuebot.Timeout).shows
+    showSeq = cache.cached(
+        'show', ('getActiveShows',), lambda: Cuebot.getStub('show').GetActiveShows(
+            show_pb2.ShowGetActiveShowsRequest(), timeout=Cuebot.Timeout).shows)
     return [Show(s) for s in showSeq.shows]
 
 
@@ -266,8 +269,8 @@ def findShow(name):
     :param name: a string that represents a show to return
     :rtype:  Show
     :return: the matching Show object"""
-    return Show(Cuebot.getStub('show').FindShow(
-        show_pb2.ShowFindShowRequest(name=name), timeout=Cuebot.Timeout).show)
+    return Show(cache.cached('show', ('findShow', name), lambda: Cuebot.getStub('show').FindShow(
+        show_pb2.ShowFindShowRequest(name=name), timeout=Cuebot.Timeout).show))
 
 
 #
@@ -283,8 +286,9 @@ def findGroup(show, group):
     :param group: the name of a group
     :rtype:  Group
     :return: the matching group object"""
-    return Group(Cuebot.getStub('group').FindGroup(
-        job_pb2.GroupFindGroupRequest(show=show, name=group), timeout=Cuebot.Timeout).group)
+    return Group(cache.cached(
+        'group', ('findGroup', show, group), lambda: Cuebot.getStub('group').FindGroup(
+            job_pb2.GroupFindGroupRequest(show=show, name=group), timeout=Cuebot.Timeout).group))
 
 
 @util.grpcExceptionParser
@@ -311,8 +315,8 @@ def findJob(name):
     :param name: a job name
     :rtype:  Job
     :return: a Job object"""
-    return Job(Cuebot.getStub('job').FindJob(
-        job_pb2.JobFindJobRequest(name=name), timeout=Cuebot.Timeout).job)
+    return Job(cache.cached('job', ('findJob', name), lambda: Cuebot.getStub('job').FindJob(
+        job_pb2.JobFindJobRequest(name=name), timeout=Cuebot.Timeout).job))
 
 
 @util.grpcExceptionParser
@@ -493,6 +497,30 @@ def getFrames(job, **options):
     return [Frame(f) for f in framesSeq.frames]
 
 
+def iterFrames(job, pageSize=None, **options):
+    """Iterates over all the frames in a job that match the search criteria.
+
+    Unlike getFrames the result isn't capped, frames are fetched pageSize at
+    a time and the next page is requested while the current one is consumed.
+
+    For example::
+
+        for frame in iterFrames(job.name(), pageSize=1000, state=[job_pb2.DEAD]):
+            frame.retry()
+
+    :type  job: str
+    :param job: the job name
+    :type  pageSize: int
+    :param pageSize: frames per request, at most search.FrameSearch.max_limit
+    :rtype:  generator
+    :return: the matching Frame objects, the page and limit options are ignored"""
+    options.pop('page', None)
+    options.pop('limit', None)
+    return paging.iterPages(
+        lambda page, limit: getFrames(job, page=page, limit=limit, **options),
+        min(pageSize or paging.DEFAULT_PAGE_SIZE, search.FrameSearch.max_limit))
+
+
 #
 # Depends
 #
@@ -547,6 +575,24 @@ def getHosts(**options):
     return search.HostSearch.byOptions(**options)
 
 
+def iterHosts(pageSize=None, **options):
+    """Iterates over all the hosts that match the search criteria, which
+    are the same as getHosts.
+
+    Hosts are fetched pageSize at a time, the next page is requested while
+    the current one is consumed.
+
+    :type  pageSize: int
+    :param pageSize: hosts per request
+    :rtype:  generator
+    :return: the matching Host objects, the offset and limit options are ignored"""
+    options.pop('offset', None)
+    options.pop('limit', None)
+    return paging.iterPages(
+        lambda page, limit: getHosts(offset=(page - 1) * limit + 1, limit=limit, **options),
+        pageSize or paging.DEFAULT_PAGE_SIZE)
+
+
 @util.grpcExceptionParser
 def findHost(name):
     """Returns the host for the matching hostname.
@@ -627,8 +673,9 @@ def getAllocations():
 
     :rtype:  list
     :return: a list of Allocation objects"""
-    allocationSeq = Cuebot.getStub('allocation').GetAll(
-        facility_pb2.AllocGetAllRequest(), timeout=Cuebot.Timeout).allocations
+    allocationSeq = cache.cached(
+        'allocation', ('getAllocations',), lambda: Cuebot.getStub('allocation').GetAll(
+            facility_pb2.AllocGetAllRequest(), timeout=Cuebot.Timeout).allocations)
     return [Allocation(a) for a in allocationSeq.allocations]
 
 
@@ -794,6 +841,24 @@ def getProcs(**options):
     procSeq = search.ProcSearch.byOptions(**options).procs
     return [Proc(p) for p in procSeq.procs]
 
+
+def iterProcs(pageSize=None, **options):
+    """Iterates over all the procs that match the search criteria, which
+    are the same as getProcs.
+
+    Procs are fetched pageSize at a time, the next page is requested while
+    the current one is consumed.
+
+    :type  pageSize: int
+    :param pageSize: procs per request
+    :rtype:  generator
+    :return: the matching Proc objects, the offset and limit options are ignored"""
+    options.pop('offset', None)
+    options.pop('limit', None)
+    return paging.iterPages(
+        lambda page, limit: getProcs(offset=(page - 1) * limit + 1, limit=limit, **options),
+        pageSize or paging.DEFAULT_PAGE_SIZE)
+
 #
 # Limits
 #
@@ -0,0 +1,179 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Concurrent execution of an action on many hosts, jobs or other objects.
+
+Example::
+
+    result = opencue.batch.BatchExecutor().run(lambda host: host.lock(), hosts)
+    for host, error in result.failed:
+        print('failed to lock %s: %s' % (host.name(), error))
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+from builtins import object
+from concurrent import futures
+import logging
+import threading
+import time
+
+from opencue.cuebot import Cuebot
+
+
+logger = logging.getLogger("opencue")
+
+DEFAULT_MAX_WORKERS = 16
+
+
+class RateLimiter(object):
+    """Spaces out calls, shared by the threads of a batch."""
+
+    def __init__(self, rate):
+        """
+        :type  rate: float
+        :param rate: maximum calls per second, 0 or None for no limit
+        """
+        self.__interval = 1.0 / rate if rate else 0
+        self.__lock = threading.Lock()
+        self.__next = 0.0
+
+    def acquire(self):
+        """Waits until the next call is allowed to start."""
+        if not self.__interval:
+            return
+        with self.__lock:
+            now = time.monotonic()
+            start = max(now, self.__next)
+            self.__next = start + self.__interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class BatchResult(object):
+    """The outcome of a batch, in the order of its items."""
+
+    def __init__(self, outcomes):
+        """
+        :type  outcomes: list<tuple>
+        :param outcomes: (<item>, <returned value>, <raised exception or None>) of each item
+        """
+        self.outcomes = outcomes
+
+    def __len__(self):
+        return len(self.outcomes)
+
+    @property
+    def succeeded(self):
+        """(item, returned value) of the items that succeeded.
+
+        :rtype: list<tuple>"""
+        return [(item, value) for item, value, error in self.outcomes if error is None]
+
+    @property
+    def failed(self):
+        """(item, exception) of the items that failed.
+
+        :rtype: list<tuple>"""
+        return [(item, error) for item, _, error in self.outcomes if error is not None]
+
+    @property
+    def values(self):
+        """The values returned for each item, None for failed ones.
+
+        :rtype: list"""
+        return [value for _, value, _ in self.outcomes]
+
+    def ok(self):
+        """Returns whether every item succeeded.
+
+        :rtype: bool"""
+        return all(error is None for _, _, error in self.outcomes)
+
+    def raiseFirstError(self):
+        """Raises the exception of the first item that failed, if any."""
+        for _, _, error in self.outcomes:
+            if error is not None:
+                raise error
+
+
+class BatchExecutor(object):
+    """Applies a function to many items from a bounded pool of threads.
+
+    The gRPC channel is shared by the threads, so a batch over thousands of
+    hosts costs a few round-trips of latency instead of one per host. Every
+    item is processed even when some fail, the errors are collected in the
+    BatchResult.
+
+    The defaults come from the batch.max_workers and batch.rate_limit
+    settings of the pycue config.
+    """
+
+    def __init__(self, maxWorkers=None, rateLimit=None, progress=None):
+        """
+        :type  maxWorkers: int
+        :param maxWorkers: maximum concurrent calls
+        :type  rateLimit: float
+        :param rateLimit: maximum calls started per second, 0 for no limit
+        :type  progress: callable
+        :param progress: called as progress(done, total, item, error) after
+                         each item, from the worker threads but never concurrently
+        """
+        config = Cuebot.getConfig()
+        self.maxWorkers = maxWorkers or config.get('batch.max_workers', DEFAULT_MAX_WORKERS)
+        self.rateLimit = rateLimit if rateLimit is not None else \
+            config.get('batch.rate_limit', 0)
+        self.__progress = progress
+
+    def run(self, func, items, *args, **kwargs):
+        """Calls func(item, *args, **kwargs) for every item.
+
+        :type  func: callable
+        :param func: the action to apply
+        :type  items: iterable
+        :param items: the objects to apply it to
+        :rtype:  BatchResult
+        :return: the value returned or the exception raised for each item
+        """
+        items = list(items)
+        outcomes = [None] * len(items)
+        limiter = RateLimiter(self.rateLimit)
+        progressLock = threading.Lock()
+        done = [0]
+
+        def call(index):
+            item = items[index]
+            limiter.acquire()
+            try:
+                outcomes[index] = (item, func(item, *args, **kwargs), None)
+            # pylint: disable=broad-except
+            except Exception as e:
+                logger.debug("batch call failed for %s: %s", item, e)
+                outcomes[index] = (item, None, e)
+            if self.__progress is not None:
+                with progressLock:
+                    done[0] += 1
+                    self.__progress(done[0], len(items), item, outcomes[index][2])
+
+        workers = min(self.maxWorkers, len(items))
+        if workers <= 1:
+            for index in range(len(items)):
+                call(index)
+        else:
+            with futures.ThreadPoolExecutor(max_workers=workers) as pool:
+                for future in [pool.submit(call, index) for index in range(len(items))]:
+                    future.result()
+        return BatchResult(outcomes)
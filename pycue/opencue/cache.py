@@ -0,0 +1,266 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""An opt-in client-side cache of the lookups scripts and GUIs repeat the most.
+
+Once enabled, opencue.api.findShow, getActiveShows, getAllocations,
+getDefaultServices, findGroup and findJob answer from the cache until their
+response expires, after a number of seconds set by kind of object. Any call
+made through the same client that may change a kind of object drops what is
+cached of that kind, as does connecting to other cuebots. Changes made by
+other clients are only seen once entries expire.
+
+The cache is enabled by cache.enabled in the pycue config, or with enable().
+
+Example::
+
+    opencue.cache.enable(ttls={'job': 10})
+    show = opencue.api.findShow('pipe')    # asks the cuebot
+    show = opencue.api.findShow('pipe')    # from the cache
+    print(opencue.cache.stats()['show'].hits)
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+from builtins import object
+import collections
+import logging
+import threading
+import time
+
+from opencue.cuebot import Cuebot
+
+
+logger = logging.getLogger("opencue")
+
+DEFAULT_MAX_ENTRIES = 1024
+
+# Seconds responses are cached for, by kind of object
+DEFAULT_TTLS = {
+    'allocation': 300,
+    'group': 60,
+    'job': 30,
+    'service': 600,
+    'show': 300,
+}
+
+# The kinds of objects a write through each gRPC service may change
+INVALIDATED_BY = {
+    'facility.AllocationInterface': ('allocation',),
+    'facility.FacilityInterface': ('allocation',),
+    'host.HostInterface': ('allocation',),
+    'host.ProcInterface': ('allocation', 'job'),
+    'job.FrameInterface': ('job',),
+    'job.GroupInterface': ('group', 'job'),
+    'job.JobInterface': ('group', 'job'),
+    'job.LayerInterface': ('job',),
+    'service.ServiceInterface': ('service',),
+    'show.ShowInterface': ('group', 'show'),
+    'subscription.SubscriptionInterface': ('allocation', 'show'),
+}
+
+CacheStats = collections.namedtuple('CacheStats', ('hits', 'misses', 'entries'))
+
+__cache = None
+__configured = False
+__lock = threading.Lock()
+
+
+def _copy(message):
+    """Returns a copy of a protobuf message, for callers to change as they like."""
+    copy = type(message)()
+    copy.CopyFrom(message)
+    return copy
+
+
+class ResponseCache(object):
+    """A bounded LRU cache of protobuf responses by kind of object and key.
+
+    Responses are cached and handed out as copies, so that wrappers changing
+    their data can't change what other callers get."""
+
+    def __init__(self, maxEntries=DEFAULT_MAX_ENTRIES, ttls=None):
+        """
+        :type  maxEntries: int
+        :param maxEntries: responses kept at most, the least recently used are dropped
+        :type  ttls: dict
+        :param ttls: seconds responses are cached for by kind, over DEFAULT_TTLS;
+                     kinds cached for 0 seconds aren't cached"""
+        self.maxEntries = maxEntries
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.__lock = threading.Lock()
+        self.__entries = collections.OrderedDict()
+        self.__hits = collections.Counter()
+        self.__misses = collections.Counter()
+        # Bumped by invalidation, so that loads started before don't store stale responses
+        self.__generations = collections.Counter()
+
+    def get(self, kind, key, load):
+        """Returns the cached response, or else the one returned by load,
+        caching it.
+
+        :type  kind: str
+        :param kind: the kind of object, which sets its ttl
+        :type  key: tuple
+        :param key: what the response is for, the lookup and its arguments
+        :type  load: callable
+        :param load: returns the response when it isn't cached
+        :rtype:  google.protobuf.message.Message"""
+        entryKey = (kind, key)
+        with self.__lock:
+            entry = self.__entries.get(entryKey)
+            if entry is not None and entry[0] > time.monotonic():
+                self.__entries.move_to_end(entryKey)
+                self.__hits[kind] += 1
+                return _copy(entry[1])
+            self.__misses[kind] += 1
+            generation = self.__generations[kind]
+        response = load()
+        ttl = self.ttls.get(kind, 0)
+        if ttl > 0:
+            with self.__lock:
+                if self.__generations[kind] == generation:
+                    self.__entries[entryKey] = (time.monotonic() + ttl, _copy(response))
+                    self.__entries.move_to_end(entryKey)
+                    while len(self.__entries) > self.maxEntries:
+                        self.__entries.popitem(last=False)
+        return response
+
+    def invalidate(self, kind=None):
+        """Drops the cached responses of a kind of object, or all of them.
+
+        :type  kind: str
+        :param kind: the kind of object, None for all of them"""
+        with self.__lock:
+            if kind is None:
+                for cachedKind in set(self.ttls) | set(self.__generations):
+                    self.__generations[cachedKind] += 1
+                self.__entries.clear()
+                return
+            self.__generations[kind] += 1
+            for entryKey in [entryKey for entryKey in self.__entries if entryKey[0] == kind]:
+                del self.__entries[entryKey]
+
+    def written(self, method):
+        """Drops the kinds of objects a call may have changed.
+
+        :type  method: str
+        :param method: full name of the gRPC method, like /show.ShowInterface/SetActive,
+                       or None to drop everything"""
+        if method is None:
+            self.invalidate()
+            return
+        for kind in INVALIDATED_BY.get(method.split('/')[1], ()):
+            self.invalidate(kind)
+
+    def stats(self):
+        """Returns the hits, misses and cached responses of every kind.
+
+        :rtype: dict<str, CacheStats>"""
+        with self.__lock:
+            entries = collections.Counter(kind for kind, _ in self.__entries)
+            return {kind: CacheStats(self.__hits[kind], self.__misses[kind], entries[kind])
+                    for kind in set(self.ttls) | set(self.__hits) | set(self.__misses)}
+
+    def __len__(self):
+        return len(self.__entries)
+
+
+def _written(method):
+    cache = __cache
+    if cache is not None:
+        cache.written(method)
+
+
+def enable(maxEntries=None, ttls=None):
+    """Enables the cache, replacing any cache enabled before.
+
+    :type  maxEntries: int
+    :param maxEntries: responses kept at most, cache.max_entries of the config by default
+    :type  ttls: dict
+    :param ttls: seconds responses are cached for by kind, over cache.ttl of the config
+    :rtype:  ResponseCache
+    :return: the cache"""
+    # pylint: disable=global-statement
+    global __cache, __configured
+    configTtls = dict(Cuebot.Config.get('cache.ttl') or {})
+    configTtls.update(ttls or {})
+    cache = ResponseCache(
+        maxEntries or Cuebot.Config.get('cache.max_entries', DEFAULT_MAX_ENTRIES), configTtls)
+    with __lock:
+        __cache = cache
+        __configured = True
+        if _written not in Cuebot.WriteListeners:
+            Cuebot.WriteListeners.append(_written)
+    logger.debug('caching responses for %s', cache.ttls)
+    return cache
+
+
+def disable():
+    """Disables the cache, dropping what it cached."""
+    # pylint: disable=global-statement
+    global __cache, __configured
+    with __lock:
+        __cache = None
+        __configured = True
+        if _written in Cuebot.WriteListeners:
+            Cuebot.WriteListeners.remove(_written)
+
+
+def getCache():
+    """Returns the cache, or None while it isn't enabled.
+
+    :rtype: ResponseCache"""
+    if not __configured and Cuebot.Config.get('cache.enabled', False):
+        enable()
+    return __cache
+
+
+def cached(kind, key, load):
+    """Returns the response of a lookup, from the cache when it is enabled.
+
+    :type  kind: str
+    :param kind: the kind of object looked up
+    :type  key: tuple
+    :param key: the lookup and its arguments
+    :type  load: callable
+    :param load: asks the cuebot for the response
+    :rtype:  google.protobuf.message.Message"""
+    cache = getCache()
+    if cache is None:
+        return load()
+    return cache.get(kind, key, load)
+
+
+def invalidate(kind=None):
+    """Drops the cached responses of a kind of object, or all of them, for
+    changes made by other clients to show up right away.
+
+    :type  kind: str
+    :param kind: the kind of object, like show or job, None for all of them"""
+    cache = getCache()
+    if cache is not None:
+        cache.invalidate(kind)
+
+
+def stats():
+    """Returns the hits, misses and cached responses of every kind of object,
+    or an empty dict while the cache isn't enabled.
+
+    :rtype: dict<str, CacheStats>"""
+    cache = getCache()
+    return cache.stats() if cache is not None else {}
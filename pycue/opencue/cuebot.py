@@ -21,57 +21,33 @@ from __future__ import absolute_import
 from builtins import object
 from random import shuffle
 import abc
+import collections
+import importlib
 import time
 import atexit
 import logging
 import os
 import platform
+import threading
 
 import grpc
 
-from opencue_proto import comment_pb2
-from opencue_proto import comment_pb2_grpc
-from opencue_proto import criterion_pb2
-from opencue_proto import cue_pb2
-from opencue_proto import cue_pb2_grpc
-from opencue_proto import department_pb2
-from opencue_proto import department_pb2_grpc
-from opencue_proto import depend_pb2
-from opencue_proto import depend_pb2_grpc
-from opencue_proto import facility_pb2
-from opencue_proto import facility_pb2_grpc
-from opencue_proto import filter_pb2
-from opencue_proto import filter_pb2_grpc
-from opencue_proto import host_pb2
-from opencue_proto import host_pb2_grpc
-from opencue_proto import job_pb2
-from opencue_proto import job_pb2_grpc
-from opencue_proto import limit_pb2
-from opencue_proto import limit_pb2_grpc
-from opencue_proto import renderPartition_pb2
-from opencue_proto import renderPartition_pb2_grpc
-from opencue_proto import service_pb2
-from opencue_proto import service_pb2_grpc
-from opencue_proto import show_pb2
-from opencue_proto import show_pb2_grpc
-from opencue_proto import subscription_pb2
-from opencue_proto import subscription_pb2_grpc
-from opencue_proto import task_pb2
-from opencue_proto import task_pb2_grpc
-from opencue_proto import monitoring_pb2
-from opencue_proto import monitoring_pb2_grpc
 from opencue.exception import ConnectionException
 from opencue.exception import CueException
 import opencue.config
 
 
-__all__ = ["Cuebot"]
+__all__ = ["ChannelPool", "Cuebot"]
 
 logger = logging.getLogger("opencue")
 
 
 DEFAULT_MAX_MESSAGE_BYTES = 1024 ** 2 * 10
 DEFAULT_GRPC_PORT = 8443
+# Seconds between checks of the cuebots a channel pool stopped sending calls to
+DEFAULT_PROBE_INTERVAL = 5.0
+# Seconds a cuebot has to answer those checks
+DEFAULT_PROBE_TIMEOUT = 5.0
 
 if platform.system() != 'Darwin':
     # Avoid spamming users with epoll fork warning messages
@@ -88,62 +64,69 @@ class Cuebot(object):
        to a comma delimited list of host names."""
     RpcChannel = None
     Hosts = []
+    # Stubs on RpcChannel by name, created on first use
     Stubs = {}
+    # Called with the full name of the gRPC method of every call that may have
+    # changed data on the cuebot, or with None once the channel changed, so
+    # that opencue.cache drops what went stale
+    WriteListeners = []
     Config = opencue.config.load_config_from_file()
     Timeout = Config.get('cuebot.timeout', 10000)
 
+    # Protos and stubs are named by their opencue_proto module and imported on
+    # first use, so scripts don't build the descriptors of every proto.
     PROTO_MAP = {
-        'action': filter_pb2,
-        'allocation': facility_pb2,
-        'comment': comment_pb2,
-        'criterion': criterion_pb2,
-        'cue': cue_pb2,
-        'department': department_pb2,
-        'depend': depend_pb2,
-        'facility': facility_pb2,
-        'filter': filter_pb2,
-        'frame': job_pb2,
-        'group': job_pb2,
-        'host': host_pb2,
-        'job': job_pb2,
-        'layer': job_pb2,
-        'limit': limit_pb2,
-        'matcher': filter_pb2,
-        'monitoring': monitoring_pb2,
-        'owner': host_pb2,
-        'proc': host_pb2,
-        'renderPartition': renderPartition_pb2,
-        'service': service_pb2,
-        'show': show_pb2,
-        'subscription': subscription_pb2,
-        'task': task_pb2
+        'action': 'filter_pb2',
+        'allocation': 'facility_pb2',
+        'comment': 'comment_pb2',
+        'criterion': 'criterion_pb2',
+        'cue': 'cue_pb2',
+        'department': 'department_pb2',
+        'depend': 'depend_pb2',
+        'facility': 'facility_pb2',
+        'filter': 'filter_pb2',
+        'frame': 'job_pb2',
+        'group': 'job_pb2',
+        'host': 'host_pb2',
+        'job': 'job_pb2',
+        'layer': 'job_pb2',
+        'limit': 'limit_pb2',
+        'matcher': 'filter_pb2',
+        'monitoring': 'monitoring_pb2',
+        'owner': 'host_pb2',
+        'proc': 'host_pb2',
+        'renderPartition': 'renderPartition_pb2',
+        'service': 'service_pb2',
+        'show': 'show_pb2',
+        'subscription': 'subscription_pb2',
+        'task': 'task_pb2'
     }
 
     SERVICE_MAP = {
-        'action': filter_pb2_grpc.ActionInterfaceStub,
-        'allocation': facility_pb2_grpc.AllocationInterfaceStub,
-        'comment': comment_pb2_grpc.CommentInterfaceStub,
-        'cue': cue_pb2_grpc.CueInterfaceStub,
-        'depend': depend_pb2_grpc.DependInterfaceStub,
-        'department': department_pb2_grpc.DepartmentInterfaceStub,
-        'facility': facility_pb2_grpc.FacilityInterfaceStub,
-        'filter': filter_pb2_grpc.FilterInterfaceStub,
-        'frame': job_pb2_grpc.FrameInterfaceStub,
-        'group': job_pb2_grpc.GroupInterfaceStub,
-        'host': host_pb2_grpc.HostInterfaceStub,
-        'job': job_pb2_grpc.JobInterfaceStub,
-        'layer': job_pb2_grpc.LayerInterfaceStub,
-        'limit': limit_pb2_grpc.LimitInterfaceStub,
-        'matcher': filter_pb2_grpc.MatcherInterfaceStub,
-        'monitoring': monitoring_pb2_grpc.MonitoringInterfaceStub,
-        'owner': host_pb2_grpc.OwnerInterfaceStub,
-        'proc': host_pb2_grpc.ProcInterfaceStub,
-        'renderPartition': renderPartition_pb2_grpc.RenderPartitionInterfaceStub,
-        'service': service_pb2_grpc.ServiceInterfaceStub,
-        'serviceOverride': service_pb2_grpc.ServiceOverrideInterfaceStub,
-        'show': show_pb2_grpc.ShowInterfaceStub,
-        'subscription': subscription_pb2_grpc.SubscriptionInterfaceStub,
-        'task': task_pb2_grpc.TaskInterfaceStub
+        'action': 'filter_pb2_grpc.ActionInterfaceStub',
+        'allocation': 'facility_pb2_grpc.AllocationInterfaceStub',
+        'comment': 'comment_pb2_grpc.CommentInterfaceStub',
+        'cue': 'cue_pb2_grpc.CueInterfaceStub',
+        'depend': 'depend_pb2_grpc.DependInterfaceStub',
+        'department': 'department_pb2_grpc.DepartmentInterfaceStub',
+        'facility': 'facility_pb2_grpc.FacilityInterfaceStub',
+        'filter': 'filter_pb2_grpc.FilterInterfaceStub',
+        'frame': 'job_pb2_grpc.FrameInterfaceStub',
+        'group': 'job_pb2_grpc.GroupInterfaceStub',
+        'host': 'host_pb2_grpc.HostInterfaceStub',
+        'job': 'job_pb2_grpc.JobInterfaceStub',
+        'layer': 'job_pb2_grpc.LayerInterfaceStub',
+        'limit': 'limit_pb2_grpc.LimitInterfaceStub',
+        'matcher': 'filter_pb2_grpc.MatcherInterfaceStub',
+        'monitoring': 'monitoring_pb2_grpc.MonitoringInterfaceStub',
+        'owner': 'host_pb2_grpc.OwnerInterfaceStub',
+        'proc': 'host_pb2_grpc.ProcInterfaceStub',
+        'renderPartition': 'renderPartition_pb2_grpc.RenderPartitionInterfaceStub',
+        'service': 'service_pb2_grpc.ServiceInterfaceStub',
+        'serviceOverride': 'service_pb2_grpc.ServiceOverrideInterfaceStub',
+        'show': 'show_pb2_grpc.ShowInterfaceStub',
+        'subscription': 'subscription_pb2_grpc.SubscriptionInterfaceStub',
+        'task': 'task_pb2_grpc.TaskInterfaceStub'
     }
 
     @staticmethod
@@ -154,16 +137,10 @@ class Cuebot(object):
         :type config: dict
         :param config: config dictionary, this will override the config read from disk
         """
-        hosts_env = os.getenv("CUEBOT_HOSTS")
-
         if config:
             Cuebot.Config = config
             Cuebot.Timeout = config.get('cuebot.timeout', Cuebot.Timeout)
-        if hosts_env:
-            Cuebot.setHosts(hosts_env.split(","))
-        else:
-            facility = os.getenv("CUEBOT_FACILITY", Cuebot.Config.get("cuebot.facility_default"))
-            Cuebot.setHostWithFacility(facility)
+        Cuebot.setHosts(Cuebot.configuredHosts())
         if Cuebot.Hosts is None:
             raise CueException('Cuebot host not set. Please ensure CUEBOT_HOSTS is set ' +
                                'or a facility_default host is set in the yaml pycue config.')
@@ -171,50 +148,61 @@ class Cuebot(object):
     @staticmethod
     def setChannel():
         """Sets the gRPC channel connection"""
-        # gRPC must specify a single host. Randomize host list to balance load across cuebots.
+        # Randomize host list to balance load across cuebots, the pool prefers the first
+        # of the channels it knows nothing about yet.
         hosts = list(Cuebot.Hosts)
         shuffle(hosts)
         maxMessageBytes = Cuebot.Config.get('cuebot.max_message_bytes', DEFAULT_MAX_MESSAGE_BYTES)
 
-        # create interceptors
-        interceptors = (
-            RetryOnRpcErrorClientInterceptor(
-                max_attempts=4,
-                sleeping_policy=ExponentialBackoff(init_backoff_ms=100,
-                                                   max_backoff_ms=1600,
-                                                   multiplier=2),
-                status_for_retry=(grpc.StatusCode.UNAVAILABLE,),
-            ),
-        )
+        targets = [Cuebot.getTarget(host) for host in hosts]
+        connectStr = ', '.join(targets) or "Not Defined"
+        logger.debug('connecting to gRPC at %s', connectStr)
+        # TODO(bcipriano) Configure gRPC TLS. (Issue #150)
+        Cuebot.RpcChannel = ChannelPool(
+            targets,
+            options=[('grpc.max_send_message_length', maxMessageBytes),
+                     ('grpc.max_receive_message_length', maxMessageBytes)],
+            max_attempts=4,
+            sleeping_policy=ExponentialBackoff(init_backoff_ms=100,
+                                               max_backoff_ms=1600,
+                                               multiplier=2),
+            probe=Cuebot._probe,
+            probe_interval=Cuebot.Config.get('cuebot.probe_interval', DEFAULT_PROBE_INTERVAL))
+        Cuebot.Stubs.clear()
+        _notifyWrite(None)
+        try:
+            # Test the connection, failing over to the other cuebots if need be
+            Cuebot.getStub('cue').GetSystemStats(
+                Cuebot.getProto('cue').CueGetSystemStatsRequest(), timeout=Cuebot.Timeout)
+        # pylint: disable=broad-except
+        except Exception:
+            logger.warning('Could not establish grpc channel with %s', connectStr)
+            raise ConnectionException('No grpc connection could be established. ' +
+                                      'Please check configured cuebot hosts: ' + connectStr)
+        atexit.register(Cuebot.closeChannel)
 
-        connectStr = "Not Defined"
-        for host in hosts:
-            if ':' in host:
-                connectStr = host
-            else:
-                connectStr = '%s:%s' % (
-                    host, Cuebot.Config.get('cuebot.grpc_port', DEFAULT_GRPC_PORT))
-            # pylint: disable=logging-not-lazy
-            logger.debug('connecting to gRPC at %s' % connectStr)
-            # pylint: enable=logging-not-lazy
-            # TODO(bcipriano) Configure gRPC TLS. (Issue #150)
-            try:
-                Cuebot.RpcChannel = grpc.intercept_channel(
-                    grpc.insecure_channel(connectStr, options=[
-                        ('grpc.max_send_message_length', maxMessageBytes),
-                        ('grpc.max_receive_message_length', maxMessageBytes)]),
-                    *interceptors)
-                # Test the connection
-                Cuebot.getStub('cue').GetSystemStats(
-                    cue_pb2.CueGetSystemStatsRequest(), timeout=Cuebot.Timeout)
-            # pylint: disable=broad-except
-            except Exception:
-                logger.warning('Could not establish grpc channel with %s', connectStr)
-                continue
-            atexit.register(Cuebot.closeChannel)
-            return None
-        raise ConnectionException('No grpc connection could be established. ' +
-                                  'Please check configured cuebot hosts: ' + connectStr)
+    @staticmethod
+    def getTarget(host):
+        """Returns the host:port to connect to for a cuebot host, which is on
+        cuebot.grpc_port unless it names its port.
+
+        :type  host: str
+        :param host: a cuebot host name, with or without a port"""
+        if ':' in host:
+            return host
+        return '%s:%s' % (host, Cuebot.Config.get('cuebot.grpc_port', DEFAULT_GRPC_PORT))
+
+    @staticmethod
+    def _probe(channel):
+        """Checks that the cuebot at the other end of a channel answers, raising
+        grpc.RpcError if it doesn't. Used by the channel pool to find out when
+        cuebots that failed are back.
+
+        :type  channel: grpc.Channel
+        :param channel: channel to a single cuebot"""
+        Cuebot.getService('cue')(channel).GetSystemStats(
+            Cuebot.getProto('cue').CueGetSystemStatsRequest(),
+            timeout=Cuebot.Config.get('cuebot.probe_timeout', DEFAULT_PROBE_TIMEOUT))
 
     @staticmethod
     def closeChannel():
@@ -223,6 +211,8 @@ class Cuebot(object):
             Cuebot.RpcChannel.close()
             del Cuebot.RpcChannel
             Cuebot.RpcChannel = None
+            Cuebot.Stubs.clear()
+            _notifyWrite(None)
 
     @staticmethod
     def resetChannel():
@@ -231,20 +221,42 @@ class Cuebot(object):
         Cuebot.setChannel()
 
     @staticmethod
-    def setHostWithFacility(facility):
-        """Sets hosts to connect to based on the provided facility.
+    def configuredHosts():
+        """Returns the hosts listed by CUEBOT_HOSTS, or else the hosts of the
+        facility named by CUEBOT_FACILITY or by cuebot.facility_default.
+
+        :rtype: list<str>"""
+        hosts_env = os.getenv("CUEBOT_HOSTS")
+        if hosts_env:
+            return hosts_env.split(",")
+        facility = os.getenv("CUEBOT_FACILITY", Cuebot.Config.get("cuebot.facility_default"))
+        return Cuebot.getFacilityHosts(facility)
+
+    @staticmethod
+    def getFacilityHosts(facility):
+        """Returns the hosts of a facility.
         If an unknown facility is provided, it will fall back to the one listed
         in cuebot.facility_default
 
         :type  facility: str
-        :param facility: a facility named in the config file"""
+        :param facility: a facility named in the config file
+        :rtype: list<str>"""
         if facility not in list(Cuebot.Config.get("cuebot.facility").keys()):
             default = Cuebot.Config.get("cuebot.facility_default")
             logger.warning("The facility '%s' does not exist, defaulting to %s", facility, default)
             facility = default
         logger.debug("setting facility to: %s", facility)
-        hosts = Cuebot.Config.get("cuebot.facility")[facility]
-        Cuebot.setHosts(hosts)
+        return Cuebot.Config.get("cuebot.facility")[facility]
+
+    @staticmethod
+    def setHostWithFacility(facility):
+        """Sets hosts to connect to based on the provided facility.
+        If an unknown facility is provided, it will fall back to the one listed
+        in cuebot.facility_default
+
+        :type  facility: str
+        :param facility: a facility named in the config file"""
+        Cuebot.setHosts(Cuebot.getFacilityHosts(facility))
 
     @staticmethod
     def setHosts(hosts):
@@ -274,6 +286,8 @@ class Cuebot(object):
         proto = cls.PROTO_MAP.get(name)
         if proto is None:
             raise ValueError("Could not find proto for {}.".format(name))
+        if isinstance(proto, str):
+            proto = cls.PROTO_MAP[name] = _importProto(proto)
         return proto
 
     @classmethod
@@ -282,20 +296,26 @@ class Cuebot(object):
         service = cls.SERVICE_MAP.get(name)
         if service is None:
             raise ValueError("Could not find stub interface for {}.".format(name))
+        if isinstance(service, str):
+            service = cls.SERVICE_MAP[name] = _importProto(service)
         return service
 
     @classmethod
     def getStub(cls, name):
         """Get the matching stub from the SERVICE_MAP.
-        Reuse an existing one if possible.
+        Stubs are created once per channel and reused until the channel is
+        closed or reset.
 
         :param name: name of stub key for SERVICE_MAP
         :type name: str"""
+        stub = Cuebot.Stubs.get(name)
+        if stub is not None:
+            return stub
         if Cuebot.RpcChannel is None:
             cls.init()
 
-        service = cls.getService(name)
-        return service(Cuebot.RpcChannel)
+        stub = Cuebot.Stubs[name] = cls.getService(name)(Cuebot.RpcChannel)
+        return stub
 
     @staticmethod
     def getConfig():
@@ -303,6 +323,29 @@ class Cuebot(object):
         return Cuebot.Config
 
 
+def _importProto(path):
+    """Imports an opencue_proto module.
+
+    :type  path: str
+    :param path: name of the module, or <module>.<attribute> to get one of its attributes
+    :rtype:  module or object"""
+    moduleName, _, attribute = path.partition('.')
+    module = importlib.import_module('opencue_proto.' + moduleName)
+    if attribute:
+        return getattr(module, attribute)
+    return module
+
+
+def __getattr__(name):
+    """Resolves the proto modules this module used to import eagerly."""
+    if name.endswith('_pb2') or name.endswith('_pb2_grpc'):
+        try:
+            return _importProto(name)
+        except ImportError:
+            pass
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
 # Python 2/3 compatible implementation of ABC
 ABC = abc.ABCMeta('ABC', (object,), {'__slots__': ()})
 
@@ -319,6 +362,15 @@ class SleepingPolicy(ABC):
         """
         assert attempt >= 0
 
+    @abc.abstractmethod
+    def delay(self, attempt):
+        """
+        How long to sleep in seconds, for callers that can't block and wait
+        themselves, like asyncio code.
+        :param attempt: the number of attempt (starting from zero)
+        """
+        assert attempt >= 0
+
 
 class ExponentialBackoff(SleepingPolicy):
     """
@@ -336,60 +388,392 @@ class ExponentialBackoff(SleepingPolicy):
         self._multiplier = multiplier
 
     def sleep(self, attempt):
+        time.sleep(self.delay(attempt))
+
+    def delay(self, attempt):
         sleep_time_ms = min(
             self._init_backoff * self._multiplier ** attempt,
             self._max_backoff
         )
-        time.sleep(sleep_time_ms / 1000.0)
+        return sleep_time_ms / 1000.0
+
+
+# Health of a channel of a channel pool; latency is None until a call completed on it
+ChannelHealth = collections.namedtuple(
+    'ChannelHealth', ('target', 'latency', 'errors', 'inflight', 'down'))
+
+
+class _PooledChannel(object):
+    """A channel to one cuebot, along with running averages of its calls."""
+
+    __slots__ = ('target', 'channel', 'latency', 'errors', 'inflight', 'down', 'lastUsed',
+                 'callables')
+
+    def __init__(self, target, channel):
+        self.target = target
+        self.channel = channel
+        self.latency = None
+        self.errors = 0.0
+        self.inflight = 0
+        self.down = False
+        self.lastUsed = 0.0
+        # Multi-callables of this channel by kind and method
+        self.callables = {}
+
+    def score(self):
+        """Lower is healthier: the expected wait of one more call, longer for
+        a channel whose recent calls failed. Channels not used yet score 0 so
+        that they get tried."""
+        return (self.latency or 0.0) * (self.inflight + 1) / (1.0 - 0.9 * self.errors)
+
+    def record(self, elapsed, failed, weight):
+        """Adds a call, or a probe, to the running averages."""
+        self.latency = elapsed if self.latency is None else (
+            self.latency + weight * (elapsed - self.latency))
+        self.errors += weight * ((1.0 if failed else 0.0) - self.errors)
+
+    def getCallable(self, kind, method, args, kwargs):
+        """Returns the multi-callable of a method, made once per channel."""
+        key = (kind, method)
+        multiCallable = self.callables.get(key)
+        if multiCallable is None:
+            multiCallable = self.callables[key] = getattr(self.channel, kind)(
+                method, *args, **kwargs)
+        return multiCallable
+
+
+def _notifyWrite(method):
+    for listener in list(Cuebot.WriteListeners):
+        listener(method)
+
+
+def _isReadMethod(method):
+    """Returns whether a gRPC method only reads, by its name, so that calling
+    it again on another cuebot after a deadline went by can't do any harm."""
+    name = method.rpartition('/')[2]
+    return name.startswith(('Get', 'Find', 'Is', 'Has'))
+
+
+class BaseChannelPool(ABC):
+    """The bookkeeping of a pool of channels to several cuebots, shared by
+    ChannelPool and its asyncio counterpart in opencue.aio.
+
+    Calls go to the healthiest channel, by the running averages of the
+    latency and the errors of its calls and the number of calls it is running.
+    Channels whose calls failed in a way that allows failing over are marked
+    down and not used, unless none is left, until they pass their probe again.
+    A call past its deadline doesn't mark the channel down, the cuebot may
+    only be busy.
+    Only channels that are down are probed. A channel left idle for
+    probe_interval forgets its latency instead, so that the next call measures
+    it again and a cuebot that got slow isn't avoided once it recovered."""
+
+    FAILOVER_STATUSES = (grpc.StatusCode.UNAVAILABLE,)
+    READ_FAILOVER_STATUSES = (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED)
+
+    def __init__(self, channels, max_attempts, sleeping_policy, probe, probe_interval, weight):
+        """
+        :type  channels: list<_PooledChannel>
+        :param channels: the channels, preferred in that order until measured"""
+        if not channels:
+            raise ValueError('A channel pool needs at least one target')
+        self._channels = channels
+        self._max_attempts = max(max_attempts, len(self._channels))
+        self._sleeping_policy = sleeping_policy
+        self._probe = probe
+        self._probe_interval = probe_interval
+        self._weight = weight
+        self._lock = threading.Lock()
+
+    def health(self):
+        """Returns the health of the channels, in the order of the targets.
+
+        :rtype: list<ChannelHealth>"""
+        with self._lock:
+            return [ChannelHealth(pooled.target, pooled.latency, pooled.errors,
+                                  pooled.inflight, pooled.down)
+                    for pooled in self._channels]
+
+    def failoverStatuses(self, method):
+        """Returns the status codes a call of the method fails over on."""
+        if _isReadMethod(method):
+            return self.READ_FAILOVER_STATUSES
+        return self.FAILOVER_STATUSES
 
+    @abc.abstractmethod
+    def _startProber(self):
+        """Starts probing the channels in the background, if it isn't already."""
+
+    def _pick(self, exclude=()):
+        """Returns the healthiest channel not excluded, or None. Must be
+        called holding the lock."""
+        return min((pooled for pooled in self._channels if pooled not in exclude),
+                   key=lambda pooled: (pooled.down, pooled.score()), default=None)
+
+    def _forgetIdleLatencies(self):
+        """Makes the channels left idle score as unmeasured. Must be called
+        holding the lock."""
+        idleSince = time.time() - self._probe_interval
+        for pooled in self._channels:
+            if not pooled.down and pooled.inflight == 0 and pooled.lastUsed < idleSince:
+                pooled.latency = None
+
+    def _acquire(self, exclude):
+        with self._lock:
+            self._forgetIdleLatencies()
+            pooled = self._pick(exclude)
+            if pooled is not None:
+                pooled.inflight += 1
+                pooled.lastUsed = time.time()
+            return pooled
+
+    def _release(self, pooled, elapsed, failed):
+        with self._lock:
+            pooled.inflight -= 1
+            pooled.record(elapsed, failed, self._weight)
+            if failed:
+                pooled.down = True
+        if failed:
+            self._startProber()
+
+    def _healthiest(self):
+        with self._lock:
+            self._forgetIdleLatencies()
+            pooled = self._pick()
+            pooled.lastUsed = time.time()
+            return pooled
+
+    def _releaseFailed(self, pooled, elapsed, code, statuses, tried):
+        """Releases a channel whose call failed with the status code, returns
+        whether the call may be made again on another channel."""
+        if code == grpc.StatusCode.DEADLINE_EXCEEDED and code in statuses:
+            # Only worth it if another cuebot is up, a deadline doesn't make this one down
+            self._release(pooled, elapsed, False)
+            with self._lock:
+                return any(not other.down for other in self._channels
+                           if other is not pooled and other not in tried)
+        failed = code in statuses
+        self._release(pooled, elapsed, failed)
+        return failed
 
-class RetryOnRpcErrorClientInterceptor(
-    grpc.UnaryUnaryClientInterceptor,
-    grpc.StreamUnaryClientInterceptor
-):
-    """
-    Implement Client/Stream interceptors for GRPC channels to retry
-    calls that failed with retry-able states. This is required for
-    handling server interruptions that are not automatically handled
-    by grpc.insecure_channel
-    """
-    def __init__(self,
-                 max_attempts,
-                 sleeping_policy,
-                 status_for_retry=None):
-        self._max_attempts = max_attempts
-        self._sleeping_policy = sleeping_policy
-        self._retry_statuses = status_for_retry
+    @staticmethod
+    def _remaining(deadline):
+        """Returns the seconds left until the deadline, None if there is none."""
+        return None if deadline is None else deadline - time.time()
 
-    # pylint: disable=inconsistent-return-statements
-    def _intercept_call(self, continuation, client_call_details,
-                        request_or_iterator):
+    @staticmethod
+    def _expired(deadline):
+        """Returns whether the deadline, if there is one, went by."""
+        return deadline is not None and time.time() >= deadline
+
+    def _probeCandidates(self):
+        """Returns the channels that are down."""
+        with self._lock:
+            return [pooled for pooled in self._channels if pooled.down]
+
+    def _probed(self, pooled, elapsed, error):
+        """Records the outcome of the probe of a channel."""
+        if error is not None:
+            logger.debug('cuebot %s failed its health check: %s', pooled.target, error)
+            with self._lock:
+                pooled.down = True
+            return
+        with self._lock:
+            pooled.record(elapsed, False, self._weight)
+            pooled.lastUsed = time.time()
+            if pooled.down:
+                logger.info('cuebot %s passed its health check, using it again',
+                            pooled.target)
+                pooled.down = False
+
+
+class ChannelPool(BaseChannelPool, grpc.Channel):
+    """A gRPC channel spreading calls over channels to several cuebots.
+
+    Unary calls failing with UNAVAILABLE are made again on the next healthiest
+    channel, and once every channel failed, on all of them again after
+    sleeping_policy waited. Calls that only read and went past their deadline
+    are made again on another channel that isn't down, if there is one. All
+    the attempts of a call share its timeout. Once a channel failed, a
+    background thread probes the channels that are down.
+
+    Streaming calls go to the healthiest channel, without failing over."""
+
+    def __init__(self, targets, options=None, max_attempts=4, sleeping_policy=None,
+                 probe=None, probe_interval=DEFAULT_PROBE_INTERVAL, weight=0.3):
+        """
+        :type  targets: list<str>
+        :param targets: host:port of the cuebots, preferred in that order until measured
+        :type  options: list<tuple>
+        :param options: options of the channels
+        :type  max_attempts: int
+        :param max_attempts: attempts of a call before giving up, at least one per channel
+        :type  sleeping_policy: SleepingPolicy
+        :param sleeping_policy: waits before every channel is tried again, if given
+        :type  probe: callable
+        :param probe: called with a channel, raises if its cuebot isn't healthy
+        :type  probe_interval: float
+        :param probe_interval: seconds between probes of the channels that are down,
+                               and before the latency of an idle channel is forgotten
+        :type  weight: float
+        :param weight: weight of the latest call in the running averages"""
+        BaseChannelPool.__init__(
+            self,
+            [_PooledChannel(target, grpc.insecure_channel(target, options=options or []))
+             for target in targets],
+            max_attempts, sleeping_policy, probe, probe_interval, weight)
+        self._closed = threading.Event()
+        self._prober = None
+
+    def call(self, method, invoke, timeout=None):
+        """Calls invoke with the healthiest channel, and with the next ones while
+        it fails in a way that allows failing over.
+
+        :type  method: str
+        :param method: full name of the gRPC method
+        :type  invoke: callable
+        :param invoke: called with a _PooledChannel and the seconds left for the
+                       call, returns the result of the call
+        :type  timeout: float
+        :param timeout: seconds all the attempts may take together, None for no limit
+        :return: the result of invoke"""
+        statuses = self.failoverStatuses(method)
+        deadline = None if timeout is None else time.time() + timeout
+        tried = set()
+        rounds = 0
         for attempt in range(self._max_attempts):
+            pooled = self._acquire(tried)
+            start = time.time()
             try:
-                return continuation(client_call_details,
-                                    request_or_iterator)
-            except grpc.RpcError as response:
-                # Return if it was last attempt
-                if attempt == (self._max_attempts - 1):
-                    return response
-
-                # If status code is not in retryable status codes
+                result = invoke(pooled, self._remaining(deadline))
+            except grpc.RpcError as error:
                 # pylint: disable=no-member
-                if self._retry_statuses \
-                        and hasattr(response, 'code') \
-                        and response.code() \
-                        not in self._retry_statuses:
-                    return response
-
-                self._sleeping_policy.sleep(attempt)
-
-    def intercept_unary_unary(self, continuation, client_call_details,
-                              request):
-        return self._intercept_call(continuation, client_call_details,
-                                    request)
-
-    def intercept_stream_unary(
-            self, continuation, client_call_details, request_iterator
-    ):
-        return self._intercept_call(continuation, client_call_details,
-                                    request_iterator)
+                failover = self._releaseFailed(
+                    pooled, time.time() - start,
+                    error.code() if hasattr(error, 'code') else None, statuses, tried)
+                if (not failover or attempt == self._max_attempts - 1 or
+                        self._expired(deadline)):
+                    raise
+                logger.warning('gRPC call %s to %s failed with %s, failing over',
+                               method, pooled.target, error.code())
+                tried.add(pooled)
+                if len(tried) == len(self._channels):
+                    # Every channel failed once, give them some time before trying them again
+                    if self._sleeping_policy is not None:
+                        self._sleeping_policy.sleep(rounds)
+                        if self._expired(deadline):
+                            raise
+                    rounds += 1
+                    tried.clear()
+                continue
+            self._release(pooled, time.time() - start, False)
+            return result
+        return None
+
+    def _startProber(self):
+        with self._lock:
+            if self._probe is None or self._prober is not None or self._closed.is_set():
+                return
+            self._prober = threading.Thread(
+                target=self._probeLoop, name='opencue-channel-prober')
+            self._prober.daemon = True
+        self._prober.start()
+
+    def _probeLoop(self):
+        while not self._closed.wait(self._probe_interval):
+            for pooled in self._probeCandidates():
+                start = time.time()
+                try:
+                    self._probe(pooled.channel)
+                # pylint: disable=broad-except
+                except Exception as error:
+                    self._probed(pooled, None, error)
+                else:
+                    self._probed(pooled, time.time() - start, None)
+
+    def subscribe(self, callback, try_to_connect=False):
+        for pooled in self._channels:
+            pooled.channel.subscribe(callback, try_to_connect=try_to_connect)
+
+    def unsubscribe(self, callback):
+        for pooled in self._channels:
+            pooled.channel.unsubscribe(callback)
+
+    def unary_unary(self, method, *args, **kwargs):
+        return _PooledMultiCallable(self, 'unary_unary', method, args, kwargs, failover=True)
+
+    def unary_stream(self, method, *args, **kwargs):
+        return _PooledMultiCallable(self, 'unary_stream', method, args, kwargs)
+
+    def stream_unary(self, method, *args, **kwargs):
+        return _PooledMultiCallable(self, 'stream_unary', method, args, kwargs)
+
+    def stream_stream(self, method, *args, **kwargs):
+        return _PooledMultiCallable(self, 'stream_stream', method, args, kwargs)
+
+    def close(self):
+        self._closed.set()
+        for pooled in self._channels:
+            pooled.channel.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+class _PooledMultiCallable(object):
+    """A multi-callable of a ChannelPool, calling the matching multi-callable
+    of the channel of the healthiest cuebot."""
+
+    def __init__(self, pool, kind, method, args, kwargs, failover=False):
+        self._pool = pool
+        self._kind = kind
+        self._method = method
+        self._args = args
+        self._kwargs = kwargs
+        self._failover = failover
+        self._write = not _isReadMethod(method)
+
+    def _invoke(self, attribute, request, args, kwargs, failover):
+        # Shared by the attempts of the call, each gets what is left of it
+        timeout = kwargs.pop('timeout', None)
+
+        def invoke(pooled, remaining):
+            multiCallable = pooled.getCallable(self._kind, self._method, self._args,
+                                               self._kwargs)
+            if attribute is not None:
+                multiCallable = getattr(multiCallable, attribute)
+            return multiCallable(request, *args, timeout=remaining, **kwargs)
+
+        if not self._write or not Cuebot.WriteListeners:
+            return self._call(invoke, failover, timeout)
+        if attribute == 'future':
+            future = self._call(invoke, failover, timeout)
+            future.add_done_callback(lambda _: _notifyWrite(self._method))
+            return future
+        try:
+            return self._call(invoke, failover, timeout)
+        finally:
+            # Whether or not it failed, the call may have changed something
+            _notifyWrite(self._method)
+
+    def _call(self, invoke, failover, timeout):
+        if failover:
+            return self._pool.call(self._method, invoke, timeout)
+        # pylint: disable=protected-access
+        return invoke(self._pool._healthiest(), timeout)
+
+    def __call__(self, request, *args, **kwargs):
+        return self._invoke(None, request, args, kwargs, self._failover)
+
+    def with_call(self, request, *args, **kwargs):
+        """Calls the method, returning the response and the call."""
+        return self._invoke('with_call', request, args, kwargs, self._failover)
+
+    def future(self, request, *args, **kwargs):
+        """Starts an asynchronous call of the method on the healthiest channel,
+        which doesn't fail over."""
+        return self._invoke('future', request, args, kwargs, False)
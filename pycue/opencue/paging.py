@@ -0,0 +1,79 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Iteration over search results one page at a time.
+
+Example::
+
+    for frame in opencue.api.iterFrames(job.name(), pageSize=1000):
+        print(frame.name(), frame.state())
+
+Only the page being consumed and the next one, fetched on a background
+thread in the meantime, are held in memory.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+from concurrent import futures
+
+
+DEFAULT_PAGE_SIZE = 500
+
+
+def iterPages(fetchPage, pageSize, prefetch=True):
+    """Yields the items of a paged query until a page comes back short.
+
+    A page holding more than pageSize items means the server ignored the
+    paging, it is then the whole result and the last page.
+
+    :type  fetchPage: callable
+    :param fetchPage: called as fetchPage(page, pageSize) with pages numbered
+                      from 1, returns the list of items of the page
+    :type  pageSize: int
+    :param pageSize: number of items to ask for per page
+    :type  prefetch: bool
+    :param prefetch: whether to fetch the next page while the current one
+                     is consumed
+    :rtype:  generator
+    :return: the items of every page, in order
+    """
+    if pageSize < 1:
+        raise ValueError('pageSize must be positive, got %s' % pageSize)
+    if not prefetch:
+        page = 1
+        while True:
+            items = fetchPage(page, pageSize)
+            for item in items:
+                yield item
+            if len(items) != pageSize:
+                return
+            page += 1
+
+    pool = futures.ThreadPoolExecutor(max_workers=1)
+    try:
+        page = 1
+        pending = pool.submit(fetchPage, page, pageSize)
+        while pending is not None:
+            items = pending.result()
+            page += 1
+            pending = pool.submit(fetchPage, page, pageSize) if len(items) == pageSize else None
+            for item in items:
+                yield item
+            del items
+    finally:
+        # Returns right away when the caller stops early, a page still in
+        # flight finishes in the background and is dropped.
+        pool.shutdown(wait=False)
@@ -113,6 +113,8 @@ class FrameSearch(BaseSearch):
 
     page = 1
     limit = 500
+    # Cuebot returns at most this many frames per page
+    max_limit = 1000
     change_date = 0
 
     @classmethod
@@ -387,7 +389,12 @@ def _setOptions(criteria, options):
                 criteria.duration_range.append(
                     _createCriterion(v, int, lambda duration: (60 * 60 * duration)))
         elif k == "limit":
-            criteria.max_results = int(v)
+            if isinstance(criteria, host_pb2.ProcSearchCriteria):
+                # A repeated field of which Cuebot only reads the first value
+                del criteria.max_results[:]
+                criteria.max_results.append(int(v))
+            else:
+                criteria.max_results = int(v)
         elif k == "page" and isinstance(criteria, job_pb2.FrameSearchCriteria):
             criteria.page = int(v)
         elif k == "offset":
@@ -36,32 +36,55 @@ def grpcExceptionParser(grpcFunc):
     """Decorator to wrap functions making GRPC calls.
     Attempts to throw the appropriate exception based on grpc status code."""
     def _decorator(*args, **kwargs):
-        triesRemaining = opencue.exception.getRetryCount() + 1
-        while triesRemaining > 0:
-            triesRemaining -= 1
-            try:
-                return grpcFunc(*args, **kwargs)
-            except grpc.RpcError as exc:
-                # pylint: disable=no-member
-                code = exc.code()
-                details = exc.details() or "No details found. Check server logs."
-                # pylint: enable=no-member
-                exception = opencue.exception.EXCEPTION_MAP.get(code)
-                if exception:
-                    if exception.retryable and triesRemaining >= 1:
-                        logger.warning(exception.retryMsg)
-                        time.sleep(exception.retryBackoff)
-                    else:
-                        future.utils.raise_with_traceback(
-                            exception(exception.failMsg.format(details=details)))
-                else:
-                    future.utils.raise_with_traceback(opencue.exception.CueException(
-                        "Encountered a server error. {code} : {details}".format(
-                            code=code, details=details)))
+        try:
+            return grpcFunc(*args, **kwargs)
+        except grpc.RpcError as exc:
+            return _retryGrpcCall(grpcFunc, args, kwargs, exc)
 
     return functools.wraps(grpcFunc)(_decorator)
 
 
+def _retryGrpcCall(grpcFunc, args, kwargs, exc):
+    """Calls again a function wrapped by grpcExceptionParser while it fails
+    with retryable errors, up to the configured number of retries, and raises
+    the exception matching the status code of its last error otherwise.
+    Calls that succeed the first time never get here."""
+    triesRemaining = opencue.exception.getRetryCount()
+    while True:
+        time.sleep(retryBackoff(exc, triesRemaining))
+        triesRemaining -= 1
+        try:
+            return grpcFunc(*args, **kwargs)
+        except grpc.RpcError as retryExc:
+            exc = retryExc
+
+
+def retryBackoff(exc, triesRemaining):
+    """Returns the seconds to wait before making again a call that failed
+    with a gRPC error, or raises the opencue exception matching the status
+    code of the error if the call can't be retried.
+
+    :type  exc: grpc.RpcError
+    :param exc: the error of the call
+    :type  triesRemaining: int
+    :param triesRemaining: retries the call has left
+    :rtype:  float"""
+    # pylint: disable=no-member
+    code = exc.code()
+    details = exc.details() or "No details found. Check server logs."
+    # pylint: enable=no-member
+    exception = opencue.exception.EXCEPTION_MAP.get(code)
+    if not exception:
+        future.utils.raise_with_traceback(opencue.exception.CueException(
+            "Encountered a server error. {code} : {details}".format(
+                code=code, details=details)), exc.__traceback__)
+    if not exception.retryable or triesRemaining < 1:
+        future.utils.raise_with_traceback(
+            exception(exception.failMsg.format(details=details)), exc.__traceback__)
+    logger.warning(exception.retryMsg)
+    return exception.retryBackoff
+
+
 # pylint: disable=redefined-builtin
 def id(value):
     """extract(entity)
@@ -92,12 +115,14 @@ def proxy(idOrObject, cls):
     :rtype:  protobuf Message or list
     :return: Cue object or list of objects"""
     def _proxy(idString):
-        proto = opencue.Cuebot.PROTO_MAP.get(cls.lower())
-        if proto:
-            requestor = getattr(proto, "{cls}Get{cls}Request".format(cls=cls))
-            getMethod = getattr(opencue.Cuebot.getStub(cls.lower()), "Get{}".format(cls))
-            return getMethod(requestor(id=idString))
-        raise AttributeError('Could not find a proto for {}'.format(cls))
+        try:
+            proto = opencue.Cuebot.getProto(cls.lower())
+        except ValueError:
+            # pylint: disable=raise-missing-from
+            raise AttributeError('Could not find a proto for {}'.format(cls))
+        requestor = getattr(proto, "{cls}Get{cls}Request".format(cls=cls))
+        getMethod = getattr(opencue.Cuebot.getStub(cls.lower()), "Get{}".format(cls))
+        return getMethod(requestor(id=idString))
 
     def _proxies(entities):
         messages = []
@@ -11,3 +11,27 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+
+
+"""Wrappers around the protos returned by the Cuebot.
+
+The wrapper modules are imported on first use, so ``opencue.wrappers.job``
+works after a plain ``import opencue``.
+"""
+
+import importlib
+
+
+_SUBMODULES = ('allocation', 'comment', 'deed', 'department', 'depend', 'filter', 'frame',
+               'group', 'host', 'job', 'layer', 'limit', 'monitoring', 'owner', 'proc',
+               'render_partition', 'service', 'show', 'subscription', 'task', 'util')
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES))
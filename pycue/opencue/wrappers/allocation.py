@@ -17,6 +17,7 @@
 from opencue_proto import facility_pb2
 from opencue_proto import host_pb2
 from opencue.cuebot import Cuebot
+from opencue.wrappers.util import stubProperty
 import opencue.wrappers.host
 import opencue.wrappers.subscription
 
@@ -24,9 +25,10 @@ import opencue.wrappers.subscription
 class Allocation(object):
     """This class contains the grpc implementation related to an Allocation."""
 
+    stub = stubProperty('allocation')
+
     def __init__(self, allocation=None):
         self.data = allocation
-        self.stub = Cuebot.getStub('allocation')
 
     def delete(self):
         """Deletes the allocation."""
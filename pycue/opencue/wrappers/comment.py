@@ -16,14 +16,16 @@
 
 from opencue_proto import comment_pb2
 from opencue.cuebot import Cuebot
+from opencue.wrappers.util import stubProperty
 
 
 class Comment(object):
     """This class contains the grpc implementation related to a Comment."""
 
+    stub = stubProperty('comment')
+
     def __init__(self, comment=None):
         self.data = comment
-        self.stub = Cuebot.getStub('comment')
 
     def delete(self):
         """Deletes this comment."""
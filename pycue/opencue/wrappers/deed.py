@@ -16,6 +16,7 @@
 
 from opencue_proto import host_pb2
 from opencue.cuebot import Cuebot
+from opencue.wrappers.util import stubProperty
 # pylint: disable=cyclic-import
 import opencue.wrappers.host
 import opencue.wrappers.owner
@@ -24,9 +25,10 @@ import opencue.wrappers.owner
 class Deed(object):
     """This class contains the grpc implementation related to a Deed."""
 
+    stub = stubProperty('comment')
+
     def __init__(self, deed=None):
         self.data = deed
-        self.stub = Cuebot.getStub('comment')
 
     def delete(self):
         """Deletes the deed."""
@@ -16,15 +16,17 @@
 
 from opencue_proto import department_pb2
 from opencue.cuebot import Cuebot
+from opencue.wrappers.util import stubProperty
 import opencue.wrappers.task
 
 
 class Department(object):
     """This class contains the grpc implementation related to a Department."""
 
+    stub = stubProperty('department')
+
     def __init__(self, department=None):
         self.data = department
-        self.stub = Cuebot.getStub('department')
 
     def addTask(self, shot, minCores):
         """Adds a task to the department and returns it.
@@ -18,11 +18,14 @@ import enum
 
 from opencue_proto import depend_pb2
 from opencue.cuebot import Cuebot
+from opencue.wrappers.util import stubProperty
 
 
 class Depend(object):
     """This class contains the grpc implementation related to a Depend."""
 
+    stub = stubProperty('depend')
+
     class DependType(enum.IntEnum):
         """Enum representing the type of dependency between subject and object."""
         JOB_ON_JOB = depend_pb2.JOB_ON_JOB
@@ -46,7 +49,6 @@ class Depend(object):
 
     def __init__(self, depend=None):
         self.data = depend
-        self.stub = Cuebot.getStub('depend')
 
     def satisfy(self):
         """Satisfies the dependency.
@@ -27,6 +27,7 @@ from opencue_proto.filter_pb2 import MatchSubject
 from opencue_proto.filter_pb2 import MatchType
 from opencue_proto.filter_pb2 import Matcher as MatcherData
 from opencue import Cuebot
+from opencue.wrappers.util import stubProperty
 import opencue.wrappers.group
 
 
@@ -39,6 +40,8 @@ __all__ = ["Filter", "Action", "Matcher",
 class Filter(object):
     """This class contains the grpc implementation related to a Filter."""
 
+    stub = stubProperty('filter')
+
     class FilterType(enum.IntEnum):
         """The type of match used to determine if objects pass the filter."""
         MATCH_ANY = filter_pb2.MATCH_ANY
@@ -47,7 +50,6 @@ class Filter(object):
     # pylint: disable=redefined-builtin
     def __init__(self, filter=None):
         self.data = filter
-        self.stub = Cuebot.getStub('filter')
 
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
@@ -260,6 +262,8 @@ class Filter(object):
 class Action(object):
     """This class contains the grpc implementation related to an Action."""
 
+    stub = stubProperty('action')
+
     class ActionType(enum.IntEnum):
         """Enum representing the type of Action to be performed."""
         MOVE_JOB_TO_GROUP = filter_pb2.MOVE_JOB_TO_GROUP
@@ -293,7 +297,6 @@ class Action(object):
 
     def __init__(self, action=None):
         self.data = action
-        self.stub = Cuebot.getStub('action')
 
     def getParentFilter(self):
         """Returns the filter the action belongs to.
@@ -440,6 +443,8 @@ class Matcher(object):
     satisfy that filter, i.e. if it will trigger the actions in that filter.
     """
 
+    stub = stubProperty('matcher')
+
     class MatchSubject(enum.IntEnum):
         """Enum representing the type of the subject; the thing being matched."""
         JOB_NAME = filter_pb2.JOB_NAME
@@ -463,7 +468,6 @@ class Matcher(object):
 
     def __init__(self, matcher=None):
         self.data = matcher
-        self.stub = Cuebot.getStub('matcher')
 
     def getParentFilter(self):
         """Returns the filter the matcher belongs to.
@@ -22,12 +22,15 @@ import platform
 
 from opencue_proto import job_pb2
 from opencue import Cuebot
+from opencue.wrappers.util import stubProperty
 import opencue.wrappers.depend
 
 
 class Frame(object):
     """This class contains the grpc implementation related to a Frame."""
 
+    stub = stubProperty('frame')
+
     class CheckpointState(enum.IntEnum):
         """Possible states for a frame's checkpointing status, if it uses that."""
         DISABLED = job_pb2.DISABLED
@@ -65,7 +68,6 @@ class Frame(object):
 
     def __init__(self, frame=None):
         self.data = frame
-        self.stub = Cuebot.getStub('frame')
 
     def eat(self):
         """Eats the frame."""
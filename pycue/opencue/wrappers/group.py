@@ -16,15 +16,17 @@
 
 from opencue_proto import job_pb2
 from opencue import Cuebot
+from opencue.wrappers.util import stubProperty
 import opencue.wrappers.job
 
 
 class Group(object):
     """This class contains the grpc implementation related to a Group."""
 
+    stub = stubProperty('group')
+
     def __init__(self, group=None):
         self.data = group
-        self.stub = Cuebot.getStub('group')
 
     def createSubGroup(self, name):
         """Creates a subgroup under this group.
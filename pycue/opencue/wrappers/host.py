@@ -23,6 +23,7 @@ import grpc
 from opencue_proto import comment_pb2
 from opencue_proto import host_pb2
 from opencue import Cuebot
+from opencue.wrappers.util import stubProperty
 from opencue import util
 from opencue import search
 import opencue.wrappers.comment
@@ -35,6 +36,8 @@ import opencue.wrappers.render_partition
 class Host(object):
     """This class contains the grpc implementation related to a Host."""
 
+    stub = stubProperty('host')
+
     class HardwareState(enum.IntEnum):
         """Enum representing the hardware state of the host."""
         UP = host_pb2.UP
@@ -65,7 +68,6 @@ class Host(object):
     def __init__(self, host=None):
         self.data = host
         self.__id = host.id
-        self.stub = Cuebot.getStub('host')
 
     def lock(self):
         """Locks the host so that it no longer accepts new frames"""
@@ -23,7 +23,8 @@ import time
 from opencue_proto import comment_pb2
 from opencue_proto import job_pb2
 from opencue import Cuebot
-import opencue.api
+from opencue.wrappers.util import stubProperty
+import opencue.paging
 import opencue.search
 import opencue.wrappers.comment
 import opencue.wrappers.depend
@@ -34,6 +35,8 @@ import opencue.wrappers.layer
 class Job(object):
     """This class contains the ice implementation related to a job."""
 
+    stub = stubProperty('job')
+
     class JobState(enum.IntEnum):
         """Enum representing the state of a job."""
         PENDING = job_pb2.PENDING
@@ -44,7 +47,6 @@ class Job(object):
 
     def __init__(self, job=None):
         self.data = job
-        self.stub = Cuebot.getStub('job')
         self.__frameStateTotals = {}
 
     def kill(self, username=None, pid=None, host_kill=None, reason=None):
@@ -215,6 +217,26 @@ class Job(object):
         frameSeq = response.frames
         return [opencue.wrappers.frame.Frame(frm) for frm in frameSeq.frames]
 
+    def iterFrames(self, pageSize=None, **options):
+        """Iterates over all the frames of the job matching the options.
+
+        Frames are fetched pageSize at a time, the next page is requested
+        while the current one is consumed::
+
+            for frame in job.iterFrames(pageSize=1000, state=[job_pb2.DEAD]):
+                frame.retry()
+
+        :type  pageSize: int
+        :param pageSize: frames per request, at most FrameSearch.max_limit
+        :rtype:  generator
+        :return: the matching frames, the page and limit options are ignored
+        """
+        options.pop('page', None)
+        options.pop('limit', None)
+        return opencue.paging.iterPages(
+            lambda page, limit: self.getFrames(page=page, limit=limit, **options),
+            min(pageSize or opencue.paging.DEFAULT_PAGE_SIZE, opencue.search.FrameSearch.max_limit))
+
     def getUpdatedFrames(self, lastCheck, layers=None):
         """Returns a list of state information for frames that have been recently updated.
 
@@ -241,6 +263,34 @@ class Job(object):
                                                layer_filter=layerSeq),
             timeout=Cuebot.Timeout)
 
+    def streamUpdatedFrames(self, lastCheck, layers=None):
+        """Streams state information for frames as they are updated.
+
+        The first response holds the frames that have changed since the last update time, then
+        a response is received whenever frames of the job change. Iteration ends after the
+        response reporting the job as finished. If layer proxies are provided in the layers list,
+        only frames from those layers will be returned.
+
+        The stream has no deadline, call its cancel() method to stop it from another thread.
+
+        :type  lastCheck: int
+        :param lastCheck: epoch when last updated
+        :type  layers: list<job_pb2.Layer>
+        :param layers: list of layers to watch, empty list watches all
+        :rtype:  iterator<job_pb2.JobStreamUpdatedFramesResponse>
+        :return: iterator of job states and lists of updated frames
+        """
+        if layers is not None:
+            layerSeq = job_pb2.LayerSeq()
+            # pylint: disable=no-member
+            layerSeq.layers.extend(layers)
+            # pylint: enable=no-member
+        else:
+            layerSeq = None
+        return self.stub.StreamUpdatedFrames(
+            job_pb2.JobStreamUpdatedFramesRequest(job=self.data, last_check=lastCheck,
+                                                  layer_filter=layerSeq))
+
     def setAutoEating(self, value):
         """Sets the job autoeat field.
 
@@ -983,6 +1033,15 @@ class NestedJob(Job):
         :return: list of matching frames"""
         return self.asJob().getFrames(**options)
 
+    def iterFrames(self, pageSize=None, **options):
+        """Iterates over all the frames of the job matching the options.
+
+        :type  pageSize: int
+        :param pageSize: frames per request
+        :rtype:  generator
+        :return: the matching frames"""
+        return self.asJob().iterFrames(pageSize=pageSize, **options)
+
     def getUpdatedFrames(self, lastCheck, layers=None):
         """Returns a list of state information for frames that have been recently updated.
 
@@ -999,6 +1058,18 @@ class NestedJob(Job):
         """
         return self.asJob().getUpdatedFrames(lastCheck, layers)
 
+    def streamUpdatedFrames(self, lastCheck, layers=None):
+        """Streams state information for frames as they are updated.
+
+        :type  lastCheck: int
+        :param lastCheck: epoch when last updated
+        :type  layers: list<job_pb2.Layer>
+        :param layers: list of layers to watch, empty list watches all
+        :rtype:  iterator<job_pb2.JobStreamUpdatedFramesResponse>
+        :return: iterator of job states and lists of updated frames
+        """
+        return self.asJob().streamUpdatedFrames(lastCheck, layers)
+
     def setAutoEating(self, value):
         """If set to true, any frames that would become dead, will become eaten.
 
@@ -21,8 +21,9 @@ import platform
 import time
 
 from opencue_proto import job_pb2
-import opencue.api
 from opencue.cuebot import Cuebot
+from opencue.wrappers.util import stubProperty
+import opencue.paging
 import opencue.search
 import opencue.wrappers.depend
 import opencue.wrappers.frame
@@ -32,6 +33,8 @@ import opencue.wrappers.limit
 class Layer(object):
     """This class contains the grpc implementation related to a Layer."""
 
+    stub = stubProperty('layer')
+
     class LayerType(enum.IntEnum):
         """Represents the type of layer."""
         PRE = job_pb2.PRE
@@ -47,7 +50,6 @@ class Layer(object):
 
     def __init__(self, layer=None):
         self.data = layer
-        self.stub = Cuebot.getStub('layer')
 
     def kill(self, username=None, pid=None, host_kill=None, reason=None):
         """Kills the entire layer."""
@@ -110,6 +112,25 @@ class Layer(object):
                                        timeout=Cuebot.Timeout)
         return [opencue.wrappers.frame.Frame(frameData) for frameData in response.frames.frames]
 
+    def iterFrames(self, pageSize=None, **options):
+        """Iterates over all the frames of the layer matching the options.
+
+        Frames are fetched pageSize at a time, the next page is requested
+        while the current one is consumed.
+
+        :type  pageSize: int
+        :param pageSize: frames per request, at most FrameSearch.max_limit
+        :type  options: dict
+        :param options: FrameSearch options, page and limit are ignored
+        :rtype:  generator
+        :return: the matching frames
+        """
+        options.pop('page', None)
+        options.pop('limit', None)
+        return opencue.paging.iterPages(
+            lambda page, limit: self.getFrames(page=page, limit=limit, **options),
+            min(pageSize or opencue.paging.DEFAULT_PAGE_SIZE, opencue.search.FrameSearch.max_limit))
+
     def getOutputPaths(self):
         """Return the output paths for this layer.
 
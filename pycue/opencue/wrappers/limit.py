@@ -16,14 +16,16 @@
 
 from opencue_proto import limit_pb2
 from opencue import Cuebot
+from opencue.wrappers.util import stubProperty
 
 
 class Limit(object):
     """This class contains the grpc implementation related to a Limit."""
 
+    stub = stubProperty('limit')
+
     def __init__(self, limit=None):
         self.data = limit
-        self.stub = Cuebot.getStub('limit')
 
     def create(self):
         """Creates a new Limit from the current Limit object.
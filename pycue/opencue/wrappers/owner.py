@@ -16,6 +16,7 @@
 
 from opencue_proto import host_pb2
 from opencue import Cuebot
+from opencue.wrappers.util import stubProperty
 import opencue.wrappers.deed
 import opencue.wrappers.host
 
@@ -23,9 +24,10 @@ import opencue.wrappers.host
 class Owner(object):
     """This class contains the grpc implementation related to an Owner."""
 
+    stub = stubProperty('owner')
+
     def __init__(self, owner=None):
         self.data = owner
-        self.stub = Cuebot.getStub('owner')
 
     def delete(self):
         """Deletes the owner record."""
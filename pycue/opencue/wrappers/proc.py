@@ -18,6 +18,7 @@ import enum
 
 from opencue_proto import host_pb2
 from opencue.cuebot import Cuebot
+from opencue.wrappers.util import stubProperty
 import opencue.wrappers.frame
 import opencue.wrappers.host
 import opencue.wrappers.job
@@ -30,6 +31,8 @@ class Proc(object):
     A proc is a bookable unit of a host. Hosts may contain many procs; each proc can be assigned
     a different frame to work on."""
 
+    stub = stubProperty('proc')
+
     class RedirectType(enum.IntEnum):
         """Represents the type of a proc redirect."""
         JOB_REDIRECT = host_pb2.JOB_REDIRECT
@@ -42,7 +45,6 @@ class Proc(object):
 
     def __init__(self, proc=None):
         self.data = proc
-        self.stub = Cuebot.getStub('proc')
 
     def kill(self):
         """Kills the frame running on this proc."""
@@ -16,14 +16,16 @@
 
 from opencue_proto import renderPartition_pb2
 from opencue.cuebot import Cuebot
+from opencue.wrappers.util import stubProperty
 
 
 class RenderPartition(object):
     """This class contains the grpc implementation related to a Task."""
 
+    stub = stubProperty('renderPartition')
+
     def __init__(self, render_partition=None):
         self.data = render_partition
-        self.stub = Cuebot.getStub('renderPartition')
 
     def delete(self):
         """Deletes the render partition."""
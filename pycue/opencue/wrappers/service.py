@@ -17,15 +17,18 @@
 import grpc
 
 from opencue_proto import service_pb2
+import opencue.cache
 from opencue.cuebot import Cuebot
+from opencue.wrappers.util import stubProperty
 
 
 class Service(object):
     """This class contains the grpc implementation related to a Service."""
 
+    stub = stubProperty('service')
+
     def __init__(self, service=None):
         self.data = service or service_pb2.Service()
-        self.stub = Cuebot.getStub('service')
 
     def create(self):
         """Creates a service in the database using the current instance data."""
@@ -47,10 +50,11 @@ class Service(object):
     @staticmethod
     def getDefaultServices():
         """Returns the default services."""
-        response = Cuebot.getStub('service').GetDefaultServices(
-            service_pb2.ServiceGetDefaultServicesRequest(),
-            timeout=Cuebot.Timeout)
-        return [Service(data) for data in response.services.services]
+        services = opencue.cache.cached(
+            'service', ('getDefaultServices',),
+            lambda: Cuebot.getStub('service').GetDefaultServices(
+                service_pb2.ServiceGetDefaultServicesRequest(), timeout=Cuebot.Timeout).services)
+        return [Service(data) for data in services.services]
 
     @staticmethod
     def getService(name):
@@ -271,6 +275,8 @@ class Service(object):
 
 class ServiceOverride(object):
     """Represents a display override of a service assigned to a show"""
+
+    stub = stubProperty('serviceOverride')
     def __init__(self, serviceOverride=None):
         defaultServiceOverride = service_pb2.ServiceOverride()
         # pylint: disable=no-member
@@ -279,7 +285,6 @@ class ServiceOverride(object):
         if serviceOverride:
             self.id = serviceOverride.id
             self.data = serviceOverride.data or service_pb2.Service().data
-        self.stub = Cuebot.getStub("serviceOverride")
         # pylint: enable=no-member
 
     def delete(self):
@@ -16,6 +16,7 @@
 
 from opencue_proto import show_pb2
 from opencue.cuebot import Cuebot
+from opencue.wrappers.util import stubProperty
 import opencue.wrappers.department
 import opencue.wrappers.filter
 import opencue.wrappers.group
@@ -26,9 +27,10 @@ from opencue.wrappers.service import ServiceOverride
 class Show(object):
     """This class contains the grpc implementation related to a Show."""
 
+    stub = stubProperty('show')
+
     def __init__(self, show=None):
         self.data = show
-        self.stub = Cuebot.getStub('show')
 
     def createOwner(self, user):
         """Creates a new owner for the show.
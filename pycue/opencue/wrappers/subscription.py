@@ -16,6 +16,7 @@
 
 from opencue_proto import subscription_pb2
 from opencue.cuebot import Cuebot
+from opencue.wrappers.util import stubProperty
 
 
 class Subscription(object):
@@ -25,9 +26,10 @@ class Subscription(object):
     within that allocation and determines the amount of resources the show is allowed to use at
     any given time."""
 
+    stub = stubProperty('subscription')
+
     def __init__(self, subscription=None):
         self.data = subscription
-        self.stub = Cuebot.getStub('subscription')
 
     def find(self, name):
         """Returns a subscription by name.
@@ -16,14 +16,16 @@
 
 from opencue_proto import task_pb2
 from opencue.cuebot import Cuebot
+from opencue.wrappers.util import stubProperty
 
 
 class Task(object):
     """This class contains the grpc implementation related to a Task."""
 
+    stub = stubProperty('task')
+
     def __init__(self, task=None):
         self.data = task
-        self.stub = Cuebot.getStub('task')
 
     def id(self):
         """Returns the unique id of the task.
@@ -16,6 +16,8 @@
 
 import time
 
+from opencue.cuebot import Cuebot
+
 
 # pylint: disable=redefined-builtin
 def format_time(epoch, format="%m/%d %H:%M", default="--/-- --:--"):
@@ -120,3 +122,23 @@ def convert_mem(kmem, unit=None):
     if unit == 'G' or (unit is None and kmem < pow(k, 3)):
         return '%.01fG' % (float(kmem) / pow(k, 2))
     return str(kmem)
+
+
+def stubProperty(name):
+    """Returns a property holding the gRPC stub of a wrapper, looked up with
+    Cuebot.getStub on first use so that wrapping a list of results or
+    wrapping them in a coroutine doesn't connect to the Cuebot.
+
+    :type  name: str
+    :param name: name of the stub in Cuebot.SERVICE_MAP
+    :rtype: property"""
+    def getStub(self):
+        stub = self.__dict__.get('_stub')
+        if stub is None:
+            stub = self.__dict__['_stub'] = Cuebot.getStub(name)
+        return stub
+
+    def setStub(self, stub):
+        self.__dict__['_stub'] = stub
+
+    return property(getStub, setStub, doc="The gRPC stub, created on first use.")
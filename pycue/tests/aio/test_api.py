@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Tests for `opencue.aio.api`."""
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import asyncio
+import unittest
+
+import grpc
+import mock
+
+from opencue_proto import host_pb2
+from opencue_proto import job_pb2
+from opencue_proto import service_pb2
+from opencue_proto import show_pb2
+import opencue.aio.api
+import opencue.exception
+import opencue.wrappers.frame
+import opencue.wrappers.host
+import opencue.wrappers.job
+import opencue.wrappers.show
+
+
+TEST_SHOW_NAME = 'pipe'
+TEST_JOB_NAME = 'pipe-dev.cue-chambers_shell_v6'
+TEST_HOST_NAME = 'wolf1001'
+
+
+def asyncReturn(*values):
+    """Returns a mock of a method of an asyncio stub, whose calls return
+    values one after the other, raising those that are exceptions."""
+    results = list(values)
+
+    async def call(*args, **kwargs):
+        result = results.pop(0) if len(results) > 1 else results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return mock.Mock(side_effect=call)
+
+
+def rpcError(code):
+    error = grpc.RpcError()
+    error.code = lambda: code
+    error.details = lambda: 'testing %s' % code
+    return error
+
+
+class ApiTests(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        patcher = mock.patch('opencue.aio.cuebot.Cuebot.getStub')
+        self.getStubMock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def testGetShows(self):
+        stubMock = self.getStubMock.return_value
+        stubMock.GetShows = asyncReturn(show_pb2.ShowGetShowsResponse(
+            shows=show_pb2.ShowSeq(shows=[show_pb2.Show(name=TEST_SHOW_NAME)])))
+
+        shows = await opencue.aio.api.getShows()
+
+        stubMock.GetShows.assert_called_with(show_pb2.ShowGetShowsRequest(), timeout=mock.ANY)
+        self.assertIsInstance(shows[0], opencue.wrappers.show.Show)
+        self.assertEqual([TEST_SHOW_NAME], [show.name() for show in shows])
+
+    async def testFindJob(self):
+        stubMock = self.getStubMock.return_value
+        stubMock.FindJob = asyncReturn(job_pb2.JobFindJobResponse(
+            job=job_pb2.Job(name=TEST_JOB_NAME)))
+
+        job = await opencue.aio.api.findJob(TEST_JOB_NAME)
+
+        self.getStubMock.assert_called_with('job')
+        stubMock.FindJob.assert_called_with(
+            job_pb2.JobFindJobRequest(name=TEST_JOB_NAME), timeout=mock.ANY)
+        self.assertIsInstance(job, opencue.wrappers.job.Job)
+        self.assertEqual(TEST_JOB_NAME, job.name())
+
+    async def testGetJobs(self):
+        stubMock = self.getStubMock.return_value
+        stubMock.GetJobs = asyncReturn(job_pb2.JobGetJobsResponse(
+            jobs=job_pb2.JobSeq(jobs=[job_pb2.Job(name=TEST_JOB_NAME)])))
+
+        jobs = await opencue.aio.api.getJobs(show=[TEST_SHOW_NAME], include_finished=True)
+
+        stubMock.GetJobs.assert_called_with(
+            job_pb2.JobGetJobsRequest(r=opencue.search.JobSearch.criteriaFromOptions(
+                show=[TEST_SHOW_NAME], include_finished=True)), timeout=mock.ANY)
+        self.assertEqual([TEST_JOB_NAME], [job.name() for job in jobs])
+
+    async def testGetHosts(self):
+        stubMock = self.getStubMock.return_value
+        stubMock.GetHosts = asyncReturn(host_pb2.HostGetHostsResponse(
+            hosts=host_pb2.HostSeq(hosts=[host_pb2.Host(name=TEST_HOST_NAME)])))
+
+        hosts = await opencue.aio.api.getHosts(alloc=['pipe.General'])
+
+        self.assertIsInstance(hosts[0], opencue.wrappers.host.Host)
+        self.assertEqual([TEST_HOST_NAME], [host.name() for host in hosts])
+
+    async def testIterFrames(self):
+        stubMock = self.getStubMock.return_value
+        stubMock.GetFrames = asyncReturn(*[
+            job_pb2.FrameGetFramesResponse(frames=job_pb2.FrameSeq(frames=[
+                job_pb2.Frame(number=number, layer_name='render') for number in numbers]))
+            for numbers in ((1, 2), (3, 4), (5,))])
+
+        frames = [frame async for frame in opencue.aio.api.iterFrames(
+            TEST_JOB_NAME, pageSize=2, layer=['render'])]
+
+        self.assertIsInstance(frames[0], opencue.wrappers.frame.Frame)
+        self.assertEqual(['%04d-render' % number for number in range(1, 6)],
+                         [frame.name() for frame in frames])
+        self.assertEqual(
+            [1, 2, 3], [call[0][0].r.page for call in stubMock.GetFrames.call_args_list])
+
+    async def testGetServiceNotFound(self):
+        self.getStubMock.return_value.GetService = asyncReturn(rpcError(grpc.StatusCode.NOT_FOUND))
+
+        self.assertIsNone(await opencue.aio.api.getService('unknown'))
+
+    async def testGetDefaultServices(self):
+        self.getStubMock.return_value.GetDefaultServices = asyncReturn(
+            service_pb2.ServiceGetDefaultServicesResponse(services=service_pb2.ServiceSeq(
+                services=[service_pb2.Service(name='shell')])))
+
+        services = await opencue.aio.api.getDefaultServices()
+
+        self.assertEqual(['shell'], [service.name() for service in services])
+
+    async def testRetriesRetryableErrors(self):
+        stubMock = self.getStubMock.return_value
+        stubMock.FindShow = asyncReturn(
+            rpcError(grpc.StatusCode.UNAVAILABLE),
+            show_pb2.ShowFindShowResponse(show=show_pb2.Show(name=TEST_SHOW_NAME)))
+
+        with mock.patch('asyncio.sleep', side_effect=asyncReturn(None)) as sleepMock:
+            show = await opencue.aio.api.findShow(TEST_SHOW_NAME)
+
+        self.assertEqual(TEST_SHOW_NAME, show.name())
+        self.assertEqual(2, stubMock.FindShow.call_count)
+        sleepMock.assert_called_once_with(opencue.exception.ConnectionException.retryBackoff)
+
+    async def testRaisesMatchingException(self):
+        self.getStubMock.return_value.FindShow = asyncReturn(rpcError(grpc.StatusCode.NOT_FOUND))
+
+        with self.assertRaises(opencue.exception.EntityNotFoundException):
+            await opencue.aio.api.findShow(TEST_SHOW_NAME)
+
+    async def testQueriesRunConcurrently(self):
+        started = []
+        release = asyncio.Event()
+
+        async def findShow(request, timeout=None):
+            started.append(request.name)
+            await release.wait()
+            return show_pb2.ShowFindShowResponse(show=show_pb2.Show(name=request.name))
+        self.getStubMock.return_value.FindShow = findShow
+        names = ['show%d' % number for number in range(10)]
+
+        gathered = asyncio.gather(*[opencue.aio.api.findShow(name) for name in names])
+        while len(started) < len(names):
+            await asyncio.sleep(0)
+        release.set()
+
+        self.assertEqual(names, [show.name() for show in await gathered])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Tests for `opencue.aio.cuebot`."""
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import asyncio
+from concurrent import futures
+import unittest
+
+import grpc
+import mock
+
+from opencue_proto import cue_pb2
+from opencue_proto import cue_pb2_grpc
+from opencue_proto import job_pb2_grpc
+import opencue.aio.api
+import opencue.aio.cuebot
+import opencue.cuebot
+
+from ..test_cuebot import FakeCuebot
+
+
+def startCuebot(testCase):
+    """Serves a FakeCuebot until the end of the test, returns it and its address."""
+    cuebot = FakeCuebot()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=8))
+    cue_pb2_grpc.add_CueInterfaceServicer_to_server(cuebot, server)
+    job_pb2_grpc.add_JobInterfaceServicer_to_server(cuebot, server)
+    port = server.add_insecure_port('localhost:0')
+    server.start()
+    testCase.addCleanup(server.stop, None)
+    return cuebot, 'localhost:%d' % port
+
+
+class AioChannelPoolTests(unittest.IsolatedAsyncioTestCase):
+
+    async def newPool(self, targets, **kwargs):
+        kwargs.setdefault('probe', opencue.aio.cuebot.Cuebot._probe)
+        kwargs.setdefault('probe_interval', 3600)
+        pool = opencue.aio.cuebot.AioChannelPool(targets, **kwargs)
+        self.addAsyncCleanup(pool.close)
+        return pool
+
+    @staticmethod
+    async def getSystemStats(pool, timeout=5):
+        return await cue_pb2_grpc.CueInterfaceStub(pool).GetSystemStats(
+            cue_pb2.CueGetSystemStatsRequest(), timeout=timeout)
+
+    async def test__should_route_calls_to_fastest_cuebot(self):
+        slow, slowTarget = startCuebot(self)
+        fast, fastTarget = startCuebot(self)
+        slow.delay = 0.05
+        pool = await self.newPool([slowTarget, fastTarget])
+
+        for _ in range(10):
+            await self.getSystemStats(pool)
+
+        self.assertEqual(1, slow.calls)
+        self.assertEqual(9, fast.calls)
+
+    async def test__should_fail_over_on_unavailable(self):
+        failing, failingTarget = startCuebot(self)
+        healthy, healthyTarget = startCuebot(self)
+        failing.status = grpc.StatusCode.UNAVAILABLE
+        pool = await self.newPool([failingTarget, healthyTarget])
+
+        for _ in range(5):
+            await self.getSystemStats(pool)
+
+        self.assertEqual(1, failing.calls)
+        self.assertEqual(5, healthy.calls)
+        self.assertEqual([True, False], [health.down for health in pool.health()])
+
+    async def test__should_back_off_before_retrying_every_cuebot(self):
+        cuebots = [startCuebot(self) for _ in range(2)]
+        for cuebot, _ in cuebots:
+            cuebot.status = grpc.StatusCode.UNAVAILABLE
+        pool = await self.newPool(
+            [target for _, target in cuebots], max_attempts=4,
+            sleeping_policy=opencue.cuebot.ExponentialBackoff(init_backoff_ms=10,
+                                                              max_backoff_ms=10))
+
+        with self.assertRaises(grpc.RpcError) as context:
+            await self.getSystemStats(pool)
+
+        self.assertEqual(grpc.StatusCode.UNAVAILABLE, context.exception.code())
+        self.assertEqual([2, 2], [cuebot.calls for cuebot, _ in cuebots])
+
+    async def test__should_use_cuebot_again_once_it_recovered(self):
+        failing, failingTarget = startCuebot(self)
+        _, healthyTarget = startCuebot(self)
+        failing.status = grpc.StatusCode.UNAVAILABLE
+        pool = await self.newPool([failingTarget, healthyTarget], probe_interval=0.05)
+        await self.getSystemStats(pool)
+        self.assertTrue(pool.health()[0].down)
+
+        failing.status = None
+        for _ in range(100):
+            if not pool.health()[0].down:
+                break
+            await asyncio.sleep(0.05)
+
+        self.assertFalse(pool.health()[0].down)
+
+
+class CuebotTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cuebot, target = startCuebot(self)
+        hostsPatcher = mock.patch.object(opencue.cuebot.Cuebot, 'Hosts', [target])
+        hostsPatcher.start()
+        self.addCleanup(hostsPatcher.stop)
+
+    async def getStubs(self):
+        stubs = (opencue.aio.cuebot.Cuebot.getStub('cue'),
+                 opencue.aio.cuebot.Cuebot.getStub('cue'))
+        await opencue.aio.api.getSystemStats()
+        return stubs
+
+    def test__should_reuse_stubs_in_an_event_loop(self):
+        first, second = asyncio.run(self.getStubs())
+        third, _ = asyncio.run(self.getStubs())
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, third)
+        self.assertEqual(2, self.cuebot.calls)
+
+    def test__should_gather_queries_on_one_thread(self):
+        self.cuebot.delay = 0.05
+
+        async def gather():
+            try:
+                return await asyncio.gather(
+                    *[opencue.aio.api.getSystemStats() for _ in range(8)])
+            finally:
+                await opencue.aio.cuebot.Cuebot.closeChannel()
+
+        stats = asyncio.run(gather())
+
+        self.assertEqual(8, len(stats))
+        self.assertEqual(8, self.cuebot.calls)
+        self.assertIsNone(opencue.aio.cuebot.Cuebot.RpcChannel)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Measures what pycue adds to every call on top of gRPC itself, against a
+stub cuebot served in-process.
+
+A call made on a stub created beforehand is the baseline, then the same call
+made through Cuebot.getStub and through opencue.api, which also goes through
+grpcExceptionParser and wraps the response. Creating wrappers and going
+through grpcExceptionParser are also timed on their own, without any call.
+The best of --repeat runs of --calls calls is reported, per call.
+
+Usage, from the pycue directory:
+    python -m tests.benchmarks.bench_client_overhead --calls 2000
+"""
+
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+
+import argparse
+from concurrent import futures
+import timeit
+
+import grpc
+
+from opencue_proto import cue_pb2
+from opencue_proto import cue_pb2_grpc
+from opencue_proto import job_pb2
+from opencue_proto import job_pb2_grpc
+
+import opencue.api
+from opencue.cuebot import Cuebot
+import opencue.util
+import opencue.wrappers.job
+
+
+JOB = job_pb2.Job(id='00000000-0000-0000-0000-000000000001', name='bench-job')
+
+
+class JobServicer(job_pb2_grpc.JobInterfaceServicer):
+    """Returns the same job to every request."""
+
+    def GetJob(self, request, context):
+        return job_pb2.JobGetJobResponse(job=JOB)
+
+
+# pylint: disable=too-few-public-methods
+class CueServicer(cue_pb2_grpc.CueInterfaceServicer):
+    """Answers the connection check of opencue."""
+
+    def GetSystemStats(self, request, context):
+        return cue_pb2.CueGetSystemStatsResponse()
+
+
+def serve():
+    """Starts the stub cuebot, returning the server and its port."""
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    job_pb2_grpc.add_JobInterfaceServicer_to_server(JobServicer(), server)
+    cue_pb2_grpc.add_CueInterfaceServicer_to_server(CueServicer(), server)
+    port = server.add_insecure_port('localhost:0')
+    server.start()
+    return server, port
+
+
+def cases():
+    """Yields the name and the function of every case."""
+    request = job_pb2.JobGetJobRequest(id=JOB.id)
+    stub = job_pb2_grpc.JobInterfaceStub(Cuebot.RpcChannel)
+    noop = opencue.util.grpcExceptionParser(lambda: None)
+
+    yield 'stub call', lambda: stub.GetJob(request, timeout=Cuebot.Timeout)
+    yield 'Cuebot.getStub and call', lambda: Cuebot.getStub('job').GetJob(
+        request, timeout=Cuebot.Timeout)
+    yield 'opencue.api.getJob', lambda: opencue.api.getJob(JOB.id)
+    yield 'Cuebot.getStub, no call', lambda: Cuebot.getStub('job')
+    yield 'Job wrapper, no call', lambda: opencue.wrappers.job.Job(JOB)
+    yield 'grpcExceptionParser, no call', noop
+
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=2000, help='calls per run')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of every case')
+    args = parser.parse_args()
+
+    server, port = serve()
+    try:
+        Cuebot.setHosts('localhost:%d' % port)
+        print('%d calls per run, best of %d' % (args.calls, args.repeat))
+        for name, case in cases():
+            elapsed = min(timeit.repeat(case, number=args.calls, repeat=args.repeat))
+            print('  %-38s %10.2f us' % (name, elapsed / args.calls * 1000000))
+    finally:
+        server.stop(None)
+        Cuebot.closeChannel()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Measures the import cost of opencue with `python -X importtime`, in fresh
+interpreters so nothing is cached between runs.
+
+The median cumulative time of each statement is reported with the modules
+costing the most on their own and the number of opencue_proto modules loaded.
+With --max-ms the exit status is 1 when `import opencue` gets slower, so CI
+can track it.
+
+Usage, from the pycue directory:
+    python -m tests.benchmarks.bench_import --runs 20
+"""
+
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$')
+
+
+def timeImport(statement):
+    """Runs a statement in a new interpreter.
+
+    :rtype:  tuple
+    :return: total microseconds of its imports, [(<self microseconds>, <module>), ...]"""
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE).stderr.decode('utf-8')
+    total = 0
+    modules = []
+    for line in output.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        selfTime, cumulative, indent, module = match.groups()
+        modules.append((int(selfTime), module))
+        # Imports at the top level are the ones done by the statement itself
+        if not indent:
+            total += int(cumulative)
+    return total, modules
+
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help='interpreters to start per statement')
+    parser.add_argument('--statement', action='append',
+                        help='statement to time, `import opencue` and `import opencue.api` '
+                             'by default')
+    parser.add_argument('--top', type=int, default=10, help='slowest modules to list')
+    parser.add_argument('--max-ms', type=float,
+                        help='fail when the median of the first statement is slower')
+    args = parser.parse_args()
+
+    statements = args.statement or ['import opencue', 'import opencue.api']
+    medians = []
+    for statement in statements:
+        runs = [timeImport(statement) for _ in range(args.runs)]
+        totals = sorted(total for total, _ in runs)
+        median = statistics.median(totals) / 1000
+        medians.append(median)
+        _, modules = min(runs, key=lambda run, median=median: abs(run[0] / 1000 - median))
+        protos = [module for _, module in modules if module.startswith('opencue_proto.')]
+
+        print(statement)
+        print('  median %.1f ms, min %.1f ms, max %.1f ms, %d opencue_proto modules' % (
+            median, totals[0] / 1000, totals[-1] / 1000, len(protos)))
+        for selfTime, module in sorted(modules, reverse=True)[:args.top]:
+            print('  %8.1f ms  %s' % (selfTime / 1000, module))
+
+    if args.max_ms is not None and medians[0] > args.max_ms:
+        print('%s took %.1f ms, over %.1f ms' % (statements[0], medians[0], args.max_ms))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
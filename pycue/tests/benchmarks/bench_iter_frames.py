@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Compares reading every frame of a large job with getFrames, which holds
+them all in memory at once, and iterFrames, which pages through them.
+
+The frames are served by a stub FrameInterface in a child process, paging
+like Cuebot does, with an optional delay per request to stand in for the
+database and network, and the client can spend some time on every frame,
+which is when fetching the next page in the background pays off. Wall time
+and the peak memory allocated by the client (tracemalloc) are reported for
+each way of reading the frames.
+
+Usage, from the pycue directory:
+    python -m tests.benchmarks.bench_iter_frames --frames 100000 --latency-ms 20 --work-us 20
+"""
+
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+
+import argparse
+from concurrent import futures
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import grpc
+
+from opencue_proto import cue_pb2
+from opencue_proto import cue_pb2_grpc
+from opencue_proto import job_pb2
+from opencue_proto import job_pb2_grpc
+
+MAX_MESSAGE_BYTES = 1024 ** 3
+JOB_NAME = 'bench-job'
+
+
+class FrameServicer(job_pb2_grpc.FrameInterfaceServicer):
+    """Serves the pages of a job of generated frames."""
+
+    def __init__(self, frameCount, latency):
+        self.frames = [
+            job_pb2.Frame(id='%08d-0000-0000-0000-000000000000' % number,
+                          name='%04d-render' % number, layer_name='render', number=number,
+                          state=job_pb2.SUCCEEDED, retry_count=1, max_rss=1024 * 1024,
+                          last_resource='host%03d/8.00/0' % (number % 500))
+            for number in range(1, frameCount + 1)]
+        self.latency = latency
+
+    def GetFrames(self, request, context):
+        page = max(request.r.page, 1)
+        limit = request.r.limit
+        time.sleep(self.latency)
+        return job_pb2.FrameGetFramesResponse(frames=job_pb2.FrameSeq(
+            frames=self.frames[(page - 1) * limit:page * limit]))
+
+
+# pylint: disable=too-few-public-methods
+class CueServicer(cue_pb2_grpc.CueInterfaceServicer):
+    """Answers the connection check of opencue."""
+
+    def GetSystemStats(self, request, context):
+        return cue_pb2.CueGetSystemStatsResponse()
+
+
+def serve(frameCount, latency):
+    """Runs the stub server, printing its port once it's ready."""
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4), options=[
+        ('grpc.max_send_message_length', MAX_MESSAGE_BYTES),
+        ('grpc.max_receive_message_length', MAX_MESSAGE_BYTES)])
+    job_pb2_grpc.add_FrameInterfaceServicer_to_server(FrameServicer(frameCount, latency), server)
+    cue_pb2_grpc.add_CueInterfaceServicer_to_server(CueServicer(), server)
+    port = server.add_insecure_port('localhost:0')
+    server.start()
+    print(port, flush=True)
+    server.wait_for_termination()
+
+
+def measure(read):
+    """Runs read() twice, once for its wall time and once traced.
+
+    :rtype:  tuple
+    :return: (<frames read>, <seconds>, <peak bytes allocated>)"""
+    start = time.perf_counter()
+    count = read()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    read()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=100000, help='frames in the job')
+    parser.add_argument('--page-size', type=int, default=1000, help='frames per page')
+    parser.add_argument('--latency-ms', type=float, default=0, help='delay of every request')
+    parser.add_argument('--work-us', type=float, default=0,
+                        help='time the client spends on every frame')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.frames, args.latency_ms / 1000)
+        return
+
+    with subprocess.Popen(
+            [sys.executable, '-m', 'tests.benchmarks.bench_iter_frames', '--serve',
+             '--frames', str(args.frames), '--latency-ms', str(args.latency_ms)],
+            stdout=subprocess.PIPE) as server:
+        try:
+            port = int(server.stdout.readline())
+
+            # pylint: disable=import-outside-toplevel
+            import opencue.api
+            import opencue.paging
+            from opencue.cuebot import Cuebot
+            Cuebot.Config['cuebot.max_message_bytes'] = MAX_MESSAGE_BYTES
+            Cuebot.setHosts('localhost:%d' % port)
+
+            work = args.work_us / 1000000
+
+            def consume(frames):
+                count = 0
+                for frame in frames:
+                    frame.state()
+                    count += 1
+                    if work:
+                        deadline = time.perf_counter() + work
+                        while time.perf_counter() < deadline:
+                            pass
+                return count
+
+            def getFrames():
+                return consume(opencue.api.getFrames(JOB_NAME, page=1, limit=args.frames))
+
+            def iterFramesSerially():
+                return consume(opencue.paging.iterPages(
+                    lambda page, limit: opencue.api.getFrames(JOB_NAME, page=page, limit=limit),
+                    args.page_size, prefetch=False))
+
+            def iterFrames():
+                return consume(opencue.api.iterFrames(JOB_NAME, pageSize=args.page_size))
+
+            print('%d frames, pages of %d, %.0f ms per request, %.0f us per frame' % (
+                args.frames, args.page_size, args.latency_ms, args.work_us))
+            for name, read in (('getFrames', getFrames),
+                               ('iterFrames without prefetch', iterFramesSerially),
+                               ('iterFrames', iterFrames)):
+                count, elapsed, peak = measure(read)
+                print('  %-28s %7d frames %8.2f s %10.1f MiB peak' % (
+                    name, count, elapsed, peak / 1024 ** 2))
+        finally:
+            server.kill()
+
+
+if __name__ == '__main__':
+    main()
@@ -372,6 +372,26 @@ class FrameTests(unittest.TestCase):
         self.assertTrue(all((frame.layer() == TEST_LAYER_NAME for frame in frames)))
         self.assertEqual([1, 2, 3, 4, 5], [frame.number() for frame in frames])
 
+    @mock.patch('opencue.cuebot.Cuebot.getStub')
+    def testIterFrames(self, getStubMock):
+        def getFrames(request, timeout):
+            del timeout
+            start = (request.r.page - 1) * request.r.limit
+            return job_pb2.FrameGetFramesResponse(frames=job_pb2.FrameSeq(frames=[
+                job_pb2.Frame(number=number)
+                for number in range(start + 1, min(start + request.r.limit, 5) + 1)]))
+        stubMock = mock.Mock()
+        stubMock.GetFrames.side_effect = getFrames
+        getStubMock.return_value = stubMock
+
+        frames = opencue.api.iterFrames(TEST_JOB_NAME, pageSize=2, range="1-5", page=4)
+
+        self.assertEqual([1, 2, 3, 4, 5], [frame.number() for frame in frames])
+        self.assertEqual(
+            [(1, 2, "1-5"), (2, 2, "1-5"), (3, 2, "1-5")],
+            [(call[0][0].r.page, call[0][0].r.limit, call[0][0].r.frame_range)
+             for call in stubMock.GetFrames.call_args_list])
+
 
 class ServiceTests(unittest.TestCase):
     testName = 'unittesting'
@@ -510,6 +530,25 @@ class HostTests(unittest.TestCase):
         self.assertEqual(1, len(hosts))
         self.assertEqual(TEST_HOST_NAME, hosts[0].name())
 
+    @mock.patch('opencue.cuebot.Cuebot.getStub')
+    def testIterHosts(self, getStubMock):
+        stubMock = mock.Mock()
+        stubMock.GetHosts.side_effect = [
+            host_pb2.HostGetHostsResponse(hosts=host_pb2.HostSeq(hosts=[
+                host_pb2.Host(name='host1'), host_pb2.Host(name='host2')])),
+            host_pb2.HostGetHostsResponse(hosts=host_pb2.HostSeq(hosts=[
+                host_pb2.Host(name='host3')])),
+        ]
+        getStubMock.return_value = stubMock
+
+        hosts = list(opencue.api.iterHosts(pageSize=2, alloc=[TEST_ALLOC_NAME]))
+
+        self.assertEqual(['host1', 'host2', 'host3'], [host.name() for host in hosts])
+        stubMock.GetHosts.assert_called_with(
+            host_pb2.HostGetHostsRequest(r=host_pb2.HostSearchCriteria(
+                allocs=[TEST_ALLOC_NAME], first_result=3, max_results=2)),
+            timeout=mock.ANY)
+
     @mock.patch('opencue.cuebot.Cuebot.getStub')
     def testFindHost(self, getStubMock):
         stubMock = mock.Mock()
@@ -867,6 +906,24 @@ class ProcTests(unittest.TestCase):
             timeout=mock.ANY)
         self.assertEqual([TEST_PROC_NAME], [proc.name() for proc in procs])
 
+    @mock.patch('opencue.cuebot.Cuebot.getStub')
+    def testIterProcs(self, getStubMock):
+        stubMock = mock.Mock()
+        stubMock.GetProcs.side_effect = [
+            host_pb2.ProcGetProcsResponse(procs=host_pb2.ProcSeq(procs=[
+                host_pb2.Proc(name='proc1'), host_pb2.Proc(name='proc2')])),
+            host_pb2.ProcGetProcsResponse(procs=host_pb2.ProcSeq()),
+        ]
+        getStubMock.return_value = stubMock
+
+        procs = list(opencue.api.iterProcs(pageSize=2, show=[TEST_SHOW_NAME], limit=10))
+
+        self.assertEqual(['proc1', 'proc2'], [proc.name() for proc in procs])
+        stubMock.GetProcs.assert_called_with(
+            host_pb2.ProcGetProcsRequest(r=host_pb2.ProcSearchCriteria(
+                shows=[TEST_SHOW_NAME], first_result=3, max_results=[2])),
+            timeout=mock.ANY)
+
 
 class LimitTests(unittest.TestCase):
 
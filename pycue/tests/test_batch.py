@@ -0,0 +1,122 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Tests for `opencue.batch`."""
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import threading
+import time
+import unittest
+
+import opencue.batch
+
+
+class BatchExecutorTests(unittest.TestCase):
+
+    def testRunsEveryItemInOrder(self):
+        result = opencue.batch.BatchExecutor(maxWorkers=4).run(lambda x: x * 2, range(10))
+
+        self.assertTrue(result.ok())
+        self.assertEqual(10, len(result))
+        self.assertEqual([x * 2 for x in range(10)], result.values)
+
+    def testPassesArguments(self):
+        result = opencue.batch.BatchExecutor().run(
+            lambda x, y, z=0: x + y + z, [1, 2], 10, z=100)
+
+        self.assertEqual([111, 112], result.values)
+
+    def testCollectsErrors(self):
+        def fail(x):
+            if x % 2:
+                raise ValueError(x)
+            return x
+
+        result = opencue.batch.BatchExecutor(maxWorkers=4).run(fail, range(6))
+
+        self.assertFalse(result.ok())
+        self.assertEqual([(0, 0), (2, 2), (4, 4)], result.succeeded)
+        self.assertEqual([1, 3, 5], [item for item, _ in result.failed])
+        with self.assertRaises(ValueError) as context:
+            result.raiseFirstError()
+        self.assertEqual(1, context.exception.args[0])
+
+    def testRunsConcurrently(self):
+        barrier = threading.Barrier(4, timeout=5)
+
+        result = opencue.batch.BatchExecutor(maxWorkers=4).run(
+            lambda _: barrier.wait(), range(4))
+
+        self.assertTrue(result.ok())
+
+    def testLimitsWorkers(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def call(_):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+
+        opencue.batch.BatchExecutor(maxWorkers=3).run(call, range(12))
+
+        self.assertLessEqual(running[1], 3)
+
+    def testReportsProgress(self):
+        progress = []
+
+        opencue.batch.BatchExecutor(
+            maxWorkers=4, progress=lambda *args: progress.append(args)).run(
+                lambda x: 1 // x, [1, 0, 2])
+
+        self.assertEqual([1, 2, 3], [done for done, _, _, _ in progress])
+        self.assertEqual({3}, {total for _, total, _, _ in progress})
+        self.assertEqual([0], [item for _, _, item, error in progress if error is not None])
+
+    def testEmptyBatch(self):
+        result = opencue.batch.BatchExecutor().run(lambda x: x, [])
+
+        self.assertTrue(result.ok())
+        self.assertEqual([], result.values)
+        result.raiseFirstError()
+
+
+class RateLimiterTests(unittest.TestCase):
+
+    def testSpacesOutCalls(self):
+        limiter = opencue.batch.RateLimiter(100)
+        start = time.monotonic()
+
+        for _ in range(6):
+            limiter.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+    def testNoLimit(self):
+        limiter = opencue.batch.RateLimiter(0)
+        start = time.monotonic()
+
+        for _ in range(1000):
+            limiter.acquire()
+
+        self.assertLess(time.monotonic() - start, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,234 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Tests for `opencue.cache`."""
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import unittest
+
+import mock
+
+from opencue_proto import facility_pb2
+from opencue_proto import job_pb2
+from opencue_proto import service_pb2
+from opencue_proto import show_pb2
+import opencue.api
+import opencue.cache
+
+
+def show(name):
+    return show_pb2.Show(id='%s-id' % name, name=name)
+
+
+class ResponseCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        monotonicPatcher = mock.patch('time.monotonic', side_effect=lambda: self.now)
+        monotonicPatcher.start()
+        self.addCleanup(monotonicPatcher.stop)
+
+    def testReturnsCopiesOfCachedResponse(self):
+        cache = opencue.cache.ResponseCache()
+        load = mock.Mock(return_value=show('pipe'))
+
+        first = cache.get('show', ('findShow', 'pipe'), load)
+        first.name = 'changed'
+        second = cache.get('show', ('findShow', 'pipe'), load)
+
+        load.assert_called_once_with()
+        self.assertEqual('pipe', second.name)
+        self.assertEqual(opencue.cache.CacheStats(1, 1, 1), cache.stats()['show'])
+
+    def testExpiresByKind(self):
+        cache = opencue.cache.ResponseCache(ttls={'show': 60, 'job': 10})
+        loadShow = mock.Mock(return_value=show('pipe'))
+        loadJob = mock.Mock(return_value=job_pb2.Job(name='pipe-shot-job'))
+        cache.get('show', ('findShow', 'pipe'), loadShow)
+        cache.get('job', ('findJob', 'pipe-shot-job'), loadJob)
+
+        self.now += 30
+        cache.get('show', ('findShow', 'pipe'), loadShow)
+        cache.get('job', ('findJob', 'pipe-shot-job'), loadJob)
+
+        self.assertEqual(1, loadShow.call_count)
+        self.assertEqual(2, loadJob.call_count)
+
+    def testDoesNotCacheKindsWithoutTtl(self):
+        cache = opencue.cache.ResponseCache(ttls={'show': 0})
+        load = mock.Mock(return_value=show('pipe'))
+
+        cache.get('show', ('findShow', 'pipe'), load)
+        cache.get('show', ('findShow', 'pipe'), load)
+
+        self.assertEqual(2, load.call_count)
+        self.assertEqual(0, len(cache))
+
+    def testDropsLeastRecentlyUsed(self):
+        cache = opencue.cache.ResponseCache(maxEntries=2)
+        for name in ('one', 'two'):
+            cache.get('show', ('findShow', name), lambda name=name: show(name))
+        cache.get('show', ('findShow', 'one'), mock.Mock())
+
+        cache.get('show', ('findShow', 'three'), lambda: show('three'))
+        load = mock.Mock(return_value=show('two'))
+        cache.get('show', ('findShow', 'one'), mock.Mock())
+        cache.get('show', ('findShow', 'two'), load)
+
+        self.assertEqual(2, len(cache))
+        load.assert_called_once_with()
+
+    def testInvalidatesKind(self):
+        cache = opencue.cache.ResponseCache()
+        cache.get('show', ('findShow', 'pipe'), lambda: show('pipe'))
+        cache.get('job', ('findJob', 'pipe-shot-job'), job_pb2.Job)
+
+        cache.invalidate('show')
+
+        self.assertEqual(1, cache.stats()['job'].entries)
+        self.assertEqual(0, cache.stats()['show'].entries)
+
+    def testInvalidatesKindsChangedByWrites(self):
+        cache = opencue.cache.ResponseCache()
+        cache.get('show', ('findShow', 'pipe'), lambda: show('pipe'))
+        cache.get('group', ('findGroup', 'pipe', 'pipe'), job_pb2.Group)
+        cache.get('allocation', ('getAllocations',), facility_pb2.AllocationSeq)
+
+        cache.written('/job.GroupInterface/SetDefaultJobPriority')
+        self.assertEqual(2, len(cache))
+        cache.written('/show.ShowInterface/SetActive')
+        self.assertEqual(1, len(cache))
+        cache.written(None)
+        self.assertEqual(0, len(cache))
+
+    def testInvalidatesJobsAndAllocationsChangedThroughTheirParts(self):
+        cache = opencue.cache.ResponseCache()
+        cache.get('job', ('findJob', 'pipe-shot-job'), job_pb2.Job)
+        cache.get('allocation', ('getAllocations',), facility_pb2.AllocationSeq)
+
+        cache.written('/job.FrameInterface/Retry')
+        self.assertEqual(0, cache.stats()['job'].entries)
+        self.assertEqual(1, cache.stats()['allocation'].entries)
+        cache.written('/host.HostInterface/SetAllocation')
+        self.assertEqual(0, len(cache))
+
+    def testDoesNotStoreResponseLoadedDuringInvalidation(self):
+        cache = opencue.cache.ResponseCache()
+
+        def load():
+            cache.invalidate('show')
+            return show('pipe')
+
+        cache.get('show', ('findShow', 'pipe'), load)
+
+        self.assertEqual(0, len(cache))
+
+
+@mock.patch('opencue.cuebot.Cuebot.getStub')
+class ApiCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(opencue.cache.disable)
+
+    def testDisabledByDefault(self, getStubMock):
+        getStubMock.return_value.FindShow.return_value = show_pb2.ShowFindShowResponse(
+            show=show('pipe'))
+
+        opencue.api.findShow('pipe')
+        opencue.api.findShow('pipe')
+
+        self.assertEqual(2, getStubMock.return_value.FindShow.call_count)
+        self.assertEqual({}, opencue.cache.stats())
+
+    def testEnabledByConfig(self, getStubMock):
+        getStubMock.return_value.FindShow.return_value = show_pb2.ShowFindShowResponse(
+            show=show('pipe'))
+
+        with mock.patch('opencue.cache.__configured', False), \
+                mock.patch.dict(opencue.cuebot.Cuebot.Config,
+                                {'cache.enabled': True, 'cache.ttl': {'show': 5}}):
+            opencue.api.findShow('pipe')
+            opencue.api.findShow('pipe')
+
+        getStubMock.return_value.FindShow.assert_called_once()
+        self.assertEqual(5, opencue.cache.getCache().ttls['show'])
+
+    def testCachesLookups(self, getStubMock):
+        stub = getStubMock.return_value
+        stub.FindShow.return_value = show_pb2.ShowFindShowResponse(show=show('pipe'))
+        stub.GetActiveShows.return_value = show_pb2.ShowGetActiveShowsResponse(
+            shows=show_pb2.ShowSeq(shows=[show('pipe')]))
+        stub.GetAll.return_value = facility_pb2.AllocGetAllResponse(
+            allocations=facility_pb2.AllocationSeq(
+                allocations=[facility_pb2.Allocation(name='local.general')]))
+        stub.GetDefaultServices.return_value = service_pb2.ServiceGetDefaultServicesResponse(
+            services=service_pb2.ServiceSeq(services=[service_pb2.Service(name='maya')]))
+        stub.FindGroup.return_value = job_pb2.GroupFindGroupResponse(
+            group=job_pb2.Group(name='pipe'))
+        stub.FindJob.return_value = job_pb2.JobFindJobResponse(
+            job=job_pb2.Job(name='pipe-shot-job'))
+        opencue.cache.enable()
+
+        for _ in range(3):
+            self.assertEqual('pipe', opencue.api.findShow('pipe').name())
+            self.assertEqual(['pipe'], [s.name() for s in opencue.api.getActiveShows()])
+            self.assertEqual(['local.general'],
+                             [a.name() for a in opencue.api.getAllocations()])
+            self.assertEqual(['maya'], [s.name() for s in opencue.api.getDefaultServices()])
+            self.assertEqual('pipe', opencue.api.findGroup('pipe', 'pipe').name())
+            self.assertEqual('pipe-shot-job', opencue.api.findJob('pipe-shot-job').name())
+
+        for method in ('FindShow', 'GetActiveShows', 'GetAll', 'GetDefaultServices',
+                       'FindGroup', 'FindJob'):
+            getattr(stub, method).assert_called_once()
+        stats = opencue.cache.stats()
+        self.assertEqual(opencue.cache.CacheStats(4, 2, 2), stats['show'])
+        self.assertEqual(opencue.cache.CacheStats(2, 1, 1), stats['job'])
+
+    def testWrappersDoNotChangeCachedResponse(self, getStubMock):
+        getStubMock.return_value.GetDefaultServices.return_value = \
+            service_pb2.ServiceGetDefaultServicesResponse(
+                services=service_pb2.ServiceSeq(services=[service_pb2.Service(name='maya')]))
+        opencue.cache.enable()
+
+        opencue.api.getDefaultServices()[0].setName('nuke')
+
+        self.assertEqual('maya', opencue.api.getDefaultServices()[0].name())
+
+    def testWritesInvalidate(self, getStubMock):
+        getStubMock.return_value.FindJob.return_value = job_pb2.JobFindJobResponse(
+            job=job_pb2.Job(name='pipe-shot-job'))
+        opencue.cache.enable()
+        opencue.api.findJob('pipe-shot-job')
+
+        for listener in opencue.cuebot.Cuebot.WriteListeners:
+            listener('/job.JobInterface/Kill')
+        opencue.api.findJob('pipe-shot-job')
+
+        self.assertEqual(2, getStubMock.return_value.FindJob.call_count)
+
+    def testDisableStopsListening(self, getStubMock):
+        opencue.cache.enable()
+        opencue.cache.disable()
+
+        opencue.api.findJob('pipe-shot-job')
+        opencue.api.findJob('pipe-shot-job')
+
+        self.assertEqual(2, getStubMock.return_value.FindJob.call_count)
+        self.assertEqual([], opencue.cuebot.Cuebot.WriteListeners)
+
+
+if __name__ == '__main__':
+    unittest.main()
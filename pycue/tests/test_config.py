@@ -33,6 +33,19 @@ EXPECTED_DEFAULT_CONFIG = {
     'cuebot.timeout': 10000,
     'cuebot.max_message_bytes': 104857600,
     'cuebot.exception_retries': 3,
+    'cuebot.probe_interval': 5,
+    'cuebot.probe_timeout': 5,
+    'batch.max_workers': 16,
+    'batch.rate_limit': 0,
+    'cache.enabled': False,
+    'cache.max_entries': 1024,
+    'cache.ttl': {
+        'allocation': 300,
+        'group': 60,
+        'job': 30,
+        'service': 600,
+        'show': 300,
+    },
     'cuebot.facility_default': 'local',
     'cuebot.facility': {
         'local': ['localhost:8443'],
@@ -16,11 +16,22 @@
 
 """Tests for `opencue.cuebot`."""
 
+from concurrent import futures
 import os
+import subprocess
+import sys
+import time
 import unittest
+
+import grpc
 import mock
 
+from opencue_proto import cue_pb2
+from opencue_proto import cue_pb2_grpc
+from opencue_proto import job_pb2
+from opencue_proto import job_pb2_grpc
 import opencue
+import opencue.cuebot
 
 
 TESTING_CONFIG = {
@@ -72,5 +83,286 @@ class CuebotTests(unittest.TestCase):
         self.assertEqual(['fake-cuebot-01'], self.cuebot.Hosts)
 
 
+    def test__should_reuse_stubs_until_channel_reset(self):
+        self.cuebot.init(config=TESTING_CONFIG)
+        stub = self.cuebot.getStub('job')
+
+        self.assertIs(stub, self.cuebot.getStub('job'))
+        self.cuebot.resetChannel()
+        self.assertIsNot(stub, self.cuebot.getStub('job'))
+
+    def test__should_import_proto_on_first_use(self):
+        self.assertIs(job_pb2, self.cuebot.getProto('frame'))
+        self.assertIs(job_pb2, self.cuebot.PROTO_MAP['frame'])
+
+    def test__should_import_service_on_first_use(self):
+        self.assertIs(job_pb2_grpc.LayerInterfaceStub, self.cuebot.getService('layer'))
+        self.assertIs(job_pb2_grpc.LayerInterfaceStub, self.cuebot.SERVICE_MAP['layer'])
+
+    def test__should_fail_on_unknown_proto(self):
+        self.assertRaises(ValueError, self.cuebot.getProto, 'unknown')
+        self.assertRaises(ValueError, self.cuebot.getService, 'unknown')
+
+
+class FakeCuebot(cue_pb2_grpc.CueInterfaceServicer, job_pb2_grpc.JobInterfaceServicer):
+    """Answers health checks and job kills, after delay seconds, or fails with status."""
+
+    def __init__(self):
+        self.calls = 0
+        self.delay = 0
+        self.status = None
+
+    def __answer(self, context, response):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.status is not None:
+            context.abort(self.status, 'fake cuebot failure')
+        return response
+
+    def GetSystemStats(self, request, context):
+        return self.__answer(context, cue_pb2.CueGetSystemStatsResponse())
+
+    def Kill(self, request, context):
+        return self.__answer(context, job_pb2.JobKillResponse())
+
+
+class ChannelPoolTests(unittest.TestCase):
+
+    def startCuebot(self):
+        cuebot = FakeCuebot()
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+        cue_pb2_grpc.add_CueInterfaceServicer_to_server(cuebot, server)
+        job_pb2_grpc.add_JobInterfaceServicer_to_server(cuebot, server)
+        port = server.add_insecure_port('localhost:0')
+        server.start()
+        self.addCleanup(server.stop, None)
+        return cuebot, 'localhost:%d' % port
+
+    def newPool(self, targets, **kwargs):
+        kwargs.setdefault('probe', opencue.Cuebot._probe)
+        kwargs.setdefault('probe_interval', 3600)
+        pool = opencue.cuebot.ChannelPool(targets, **kwargs)
+        self.addCleanup(pool.close)
+        return pool
+
+    @staticmethod
+    def getSystemStats(pool, timeout=5):
+        return cue_pb2_grpc.CueInterfaceStub(pool).GetSystemStats(
+            cue_pb2.CueGetSystemStatsRequest(), timeout=timeout)
+
+    def test__should_route_calls_to_fastest_cuebot(self):
+        slow, slowTarget = self.startCuebot()
+        fast, fastTarget = self.startCuebot()
+        slow.delay = 0.05
+        pool = self.newPool([slowTarget, fastTarget])
+
+        for _ in range(10):
+            self.getSystemStats(pool)
+
+        self.assertEqual(1, slow.calls)
+        self.assertEqual(9, fast.calls)
+        health = pool.health()
+        self.assertGreater(health[0].latency, health[1].latency)
+
+    def test__should_fail_over_on_unavailable(self):
+        failing, failingTarget = self.startCuebot()
+        healthy, healthyTarget = self.startCuebot()
+        failing.status = grpc.StatusCode.UNAVAILABLE
+        pool = self.newPool([failingTarget, healthyTarget])
+
+        for _ in range(5):
+            self.getSystemStats(pool)
+
+        self.assertEqual(1, failing.calls)
+        self.assertEqual(5, healthy.calls)
+        self.assertEqual([True, False], [health.down for health in pool.health()])
+
+    def test__should_fail_over_from_stopped_cuebot(self):
+        _, healthyTarget = self.startCuebot()
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=1))
+        stoppedTarget = 'localhost:%d' % server.add_insecure_port('localhost:0')
+        server.start()
+        server.stop(None).wait()
+        pool = self.newPool([stoppedTarget, healthyTarget])
+
+        self.getSystemStats(pool)
+
+        self.assertTrue(pool.health()[0].down)
+
+    def test__should_fail_over_reads_past_deadline(self):
+        busy, busyTarget = self.startCuebot()
+        healthy, healthyTarget = self.startCuebot()
+        # The cuebot gave up on the query itself, before the call timed out
+        busy.status = grpc.StatusCode.DEADLINE_EXCEEDED
+        pool = self.newPool([busyTarget, healthyTarget])
+
+        self.getSystemStats(pool)
+
+        self.assertEqual(1, healthy.calls)
+        # Busy isn't down
+        self.assertEqual([False, False], [health.down for health in pool.health()])
+
+    def test__should_share_timeout_between_attempts(self):
+        slow, slowTarget = self.startCuebot()
+        _, otherTarget = self.startCuebot()
+        slow.delay = 0.5
+        pool = self.newPool([slowTarget, otherTarget])
+
+        start = time.time()
+        with self.assertRaises(grpc.RpcError) as context:
+            self.getSystemStats(pool, timeout=0.2)
+
+        self.assertEqual(grpc.StatusCode.DEADLINE_EXCEEDED, context.exception.code())
+        self.assertLess(time.time() - start, 0.4)
+        self.assertFalse(pool.health()[0].down)
+
+    def test__should_not_retry_deadline_without_other_cuebot(self):
+        busy, busyTarget = self.startCuebot()
+        busy.status = grpc.StatusCode.DEADLINE_EXCEEDED
+        pool = self.newPool([busyTarget], max_attempts=4)
+
+        with self.assertRaises(grpc.RpcError):
+            self.getSystemStats(pool)
+
+        self.assertEqual(1, busy.calls)
+        self.assertFalse(pool.health()[0].down)
+
+    def test__should_not_repeat_writes_past_deadline(self):
+        slow, slowTarget = self.startCuebot()
+        healthy, healthyTarget = self.startCuebot()
+        slow.delay = 0.5
+        pool = self.newPool([slowTarget, healthyTarget])
+
+        with self.assertRaises(grpc.RpcError) as context:
+            job_pb2_grpc.JobInterfaceStub(pool).Kill(job_pb2.JobKillRequest(), timeout=0.2)
+
+        self.assertEqual(grpc.StatusCode.DEADLINE_EXCEEDED, context.exception.code())
+        self.assertEqual(0, healthy.calls)
+
+    def test__should_not_fail_over_on_other_errors(self):
+        failing, failingTarget = self.startCuebot()
+        healthy, healthyTarget = self.startCuebot()
+        failing.status = grpc.StatusCode.NOT_FOUND
+        pool = self.newPool([failingTarget, healthyTarget])
+
+        with self.assertRaises(grpc.RpcError) as context:
+            self.getSystemStats(pool)
+
+        self.assertEqual(grpc.StatusCode.NOT_FOUND, context.exception.code())
+        self.assertEqual(0, healthy.calls)
+        self.assertFalse(pool.health()[0].down)
+
+    def test__should_retry_every_cuebot_before_failing(self):
+        cuebots = [self.startCuebot() for _ in range(2)]
+        for cuebot, _ in cuebots:
+            cuebot.status = grpc.StatusCode.UNAVAILABLE
+        sleepingPolicy = mock.Mock()
+        pool = self.newPool([target for _, target in cuebots], max_attempts=4,
+                            sleeping_policy=sleepingPolicy)
+
+        with self.assertRaises(grpc.RpcError) as context:
+            self.getSystemStats(pool)
+
+        self.assertEqual(grpc.StatusCode.UNAVAILABLE, context.exception.code())
+        self.assertEqual([2, 2], [cuebot.calls for cuebot, _ in cuebots])
+        sleepingPolicy.sleep.assert_called_once_with(0)
+
+    def test__should_use_cuebot_again_once_it_recovered(self):
+        failing, failingTarget = self.startCuebot()
+        _, healthyTarget = self.startCuebot()
+        failing.status = grpc.StatusCode.UNAVAILABLE
+        pool = self.newPool([failingTarget, healthyTarget], probe_interval=0.05)
+        self.getSystemStats(pool)
+        self.assertTrue(pool.health()[0].down)
+
+        failing.status = None
+        deadline = time.time() + 5
+        while pool.health()[0].down and time.time() < deadline:
+            time.sleep(0.05)
+
+        self.assertFalse(pool.health()[0].down)
+
+    def test__should_not_probe_healthy_cuebots(self):
+        cuebots = [self.startCuebot() for _ in range(2)]
+        pool = self.newPool([target for _, target in cuebots], probe_interval=0.05)
+
+        self.getSystemStats(pool)
+        time.sleep(0.2)
+
+        self.assertEqual(1, sum(cuebot.calls for cuebot, _ in cuebots))
+
+    def test__should_measure_idle_cuebot_again(self):
+        slow, slowTarget = self.startCuebot()
+        _, fastTarget = self.startCuebot()
+        slow.delay = 0.05
+        pool = self.newPool([slowTarget, fastTarget], probe_interval=0.2)
+        for _ in range(5):
+            self.getSystemStats(pool)
+        self.assertEqual(1, slow.calls)
+
+        slow.delay = 0
+        deadline = time.time() + 0.5
+        while time.time() < deadline:
+            self.getSystemStats(pool)
+            time.sleep(0.01)
+
+        self.assertGreater(slow.calls, 1)
+
+    def test__should_tell_listeners_about_writes(self):
+        cuebot, target = self.startCuebot()
+        cuebot.status = grpc.StatusCode.INTERNAL
+        pool = self.newPool([target])
+        listener = mock.Mock()
+        listenersPatcher = mock.patch.object(opencue.Cuebot, 'WriteListeners', [listener])
+        listenersPatcher.start()
+        self.addCleanup(listenersPatcher.stop)
+
+        with self.assertRaises(grpc.RpcError):
+            self.getSystemStats(pool)
+        listener.assert_not_called()
+        with self.assertRaises(grpc.RpcError):
+            job_pb2_grpc.JobInterfaceStub(pool).Kill(job_pb2.JobKillRequest(), timeout=5)
+        listener.assert_called_once_with('/job.JobInterface/Kill')
+
+
+class SleepingPolicyTests(unittest.TestCase):
+
+    def test__should_require_delay(self):
+        class SleepOnly(opencue.cuebot.SleepingPolicy):  # pylint: disable=abstract-method
+            def sleep(self, attempt):
+                pass
+
+        # pylint: disable=abstract-class-instantiated
+        self.assertRaises(TypeError, SleepOnly)
+
+    def test__should_delay_exponentially(self):
+        policy = opencue.cuebot.ExponentialBackoff(100, 300)
+
+        self.assertEqual([0.1, 0.2, 0.3], [policy.delay(attempt) for attempt in range(3)])
+
+
+class LazyImportTests(unittest.TestCase):
+
+    def __importedModules(self, code):
+        output = subprocess.check_output([
+            sys.executable, '-c',
+            code + '\nimport sys\nprint("\\n".join(sys.modules))'])
+        return output.decode('utf-8').splitlines()
+
+    def test__should_not_import_protos_with_opencue(self):
+        modules = self.__importedModules('import opencue')
+
+        self.assertNotIn('opencue.api', modules)
+        self.assertNotIn('opencue.wrappers.job', modules)
+        self.assertEqual([], [module for module in modules if module.startswith('opencue_proto.')])
+
+    def test__should_import_submodules_on_first_use(self):
+        modules = self.__importedModules('import opencue\nopencue.wrappers.comment.Comment')
+
+        self.assertIn('opencue.wrappers.comment', modules)
+        self.assertIn('opencue_proto.comment_pb2', modules)
+        self.assertNotIn('opencue_proto.job_pb2', modules)
+
+
 if __name__ == '__main__':
     unittest.main()
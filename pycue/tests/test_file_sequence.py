@@ -152,6 +152,33 @@ class FrameRangeTests(unittest.TestCase):
 
         self.assertEqual([1, 2, 3], reverseOrder.getAll())
 
+    def testLargeRangeIsNotMaterialized(self):
+        result = FrameRange('1-10000000x2')
+
+        self.assertEqual(1, len(result.segments))
+        self.assertEqual(5000000, result.size())
+        self.assertEqual(9999999, result.get(-1))
+        self.assertEqual(4999999, result.index(9999999))
+        self.assertEqual(-1, result.index(10))
+        self.assertIn(777, result)
+        self.assertNotIn(778, result)
+        self.assertEqual([1, 3, 5], result[:3])
+
+    def testStr(self):
+        self.assertEqual('4927', str(FrameRange('4927')))
+        self.assertEqual('1-7', str(FrameRange('1-7')))
+        self.assertEqual('6-2', str(FrameRange('6-2')))
+        self.assertEqual('1-7x2', str(FrameRange('1-8x2')))
+        self.assertEqual('8-2x-2', str(FrameRange('8-1x-2')))
+        self.assertEqual('1-9y3', str(FrameRange('1-10y3')))
+
+    def testStrRoundTrips(self):
+        for spec in ('1-10:5', '10-1:-5', '1-100:8', '1-20y4', '20-1y-3', '-5-3', '-20--13x3'):
+            frameRange = FrameRange(spec)
+
+            self.assertEqual(frameRange.getAll(), FrameRange.parseFrameRange(spec))
+            self.assertEqual(frameRange.getAll(), FrameSet(str(frameRange)).getAll())
+
 
 class FrameSetTests(unittest.TestCase):
 
@@ -189,6 +216,55 @@ class FrameSetTests(unittest.TestCase):
 
         self.assertEqual([1, 2, 3], duplicates.getAll())
 
+    def testStrRegroupsFrames(self):
+        self.assertEqual('1-10', str(FrameSet('1-5,6-10')))
+        self.assertEqual('1-5,7-11x2', str(FrameSet('1,2,3,4,5,7,9,11')))
+        self.assertEqual('57,1-3,4-2', str(FrameSet('57,1-3,4-2')))
+        self.assertEqual('10,1-3,7', str(FrameSet('10,1,2,3,7')))
+
+    def testIteration(self):
+        result = FrameSet('1-3,10-20x5,2')
+
+        self.assertEqual([1, 2, 3, 10, 15, 20, 2], list(result))
+        self.assertEqual(4, result.index(15))
+        self.assertEqual(1, result.index(2))
+        self.assertIn(20, result)
+        self.assertNotIn(11, result)
+
+    def testFromFrames(self):
+        result = FrameSet.fromFrames([1, 2, 3, 5, 7, 9, 9])
+
+        self.assertEqual([1, 2, 3, 5, 7, 9, 9], result.getAll())
+        self.assertEqual('1-3,5-9x2,9', str(result))
+
+    def testUnion(self):
+        result = FrameSet('20-30,1-10').union(FrameSet('5-15'))
+
+        self.assertEqual('1-15,20-30', str(result))
+        self.assertEqual(list(range(1, 16)) + list(range(20, 31)), result.getAll())
+
+    def testIntersection(self):
+        result = FrameSet('1-100') & FrameSet('50-150x2')
+
+        self.assertEqual('50-100x2', str(result))
+        self.assertEqual(26, len(result))
+
+    def testDifference(self):
+        result = FrameSet('1-100').difference('1-100x3')
+
+        self.assertEqual('1-99y3', str(result))
+        self.assertEqual([frame for frame in range(1, 101) if frame % 3 != 1], result.getAll())
+
+    def testSetOperationsMatchPythonSets(self):
+        first = FrameSet('1-50:7,40-10x-3,5-60y4')
+        second = FrameSet('20-80x2,3,11-13')
+        firstFrames = set(first)
+        secondFrames = set(second)
+
+        self.assertEqual(sorted(firstFrames | secondFrames), (first | second).getAll())
+        self.assertEqual(sorted(firstFrames & secondFrames), (first & second).getAll())
+        self.assertEqual(sorted(firstFrames - secondFrames), (first - second).getAll())
+
 
 class FileSequenceTests(unittest.TestCase):
     def __testFileSequence(self, filespec, **kwargs):
@@ -0,0 +1,105 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""Tests for `opencue.paging`."""
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+import threading
+import unittest
+
+import opencue.paging
+
+
+def pagesOf(total):
+    """Returns a fetchPage function serving range(total), and the list of pages it was asked."""
+    calls = []
+
+    def fetchPage(page, pageSize):
+        calls.append(page)
+        return list(range(total))[(page - 1) * pageSize:page * pageSize]
+    return fetchPage, calls
+
+
+class IterPagesTests(unittest.TestCase):
+
+    def testYieldsEveryItem(self):
+        for prefetch in (True, False):
+            fetchPage, calls = pagesOf(25)
+
+            items = list(opencue.paging.iterPages(fetchPage, 10, prefetch=prefetch))
+
+            self.assertEqual(list(range(25)), items)
+            self.assertEqual([1, 2, 3], calls)
+
+    def testFetchesOnePageMoreWhenLastPageIsFull(self):
+        fetchPage, calls = pagesOf(20)
+
+        items = list(opencue.paging.iterPages(fetchPage, 10))
+
+        self.assertEqual(list(range(20)), items)
+        self.assertEqual([1, 2, 3], calls)
+
+    def testStopsWhenServerIgnoresPaging(self):
+        calls = []
+
+        def fetchPage(page, _):
+            calls.append(page)
+            return list(range(25))
+
+        self.assertEqual(list(range(25)), list(opencue.paging.iterPages(fetchPage, 10)))
+        self.assertEqual([1], calls)
+
+    def testPrefetchesNextPage(self):
+        fetched = threading.Event()
+
+        def fetchPage(page, pageSize):
+            if page == 2:
+                fetched.set()
+            return [page] * pageSize
+
+        pages = opencue.paging.iterPages(fetchPage, 2)
+        next(pages)
+
+        self.assertTrue(fetched.wait(5))
+        pages.close()
+
+    def testIsLazy(self):
+        fetchPage, calls = pagesOf(100)
+
+        pages = opencue.paging.iterPages(fetchPage, 10, prefetch=False)
+        self.assertEqual([], calls)
+        self.assertEqual([0, 1], [next(pages), next(pages)])
+        pages.close()
+
+        self.assertEqual([1], calls)
+
+    def testRaisesFetchErrors(self):
+        def fetchPage(page, pageSize):
+            if page == 2:
+                raise ValueError('page 2')
+            return list(range(pageSize))
+
+        pages = opencue.paging.iterPages(fetchPage, 3)
+
+        self.assertEqual([0, 1, 2], [next(pages) for _ in range(3)])
+        self.assertRaises(ValueError, next, pages)
+
+    def testRejectsEmptyPages(self):
+        self.assertRaises(ValueError, list, opencue.paging.iterPages(lambda *_: [], 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -88,6 +88,23 @@ class ProxyTests(unittest.TestCase):
                               lambda: testRaise(response))
         self.assertEqual(mockUuid.call_count, 1)
 
+    def testRetryReturnsResult(self):
+        response = grpc.RpcError()
+        response.code = lambda: grpc.StatusCode.UNAVAILABLE
+        response.details = lambda: "Connection Error"
+        grpcFunc = mock.Mock(side_effect=[response, 'result'], __name__='grpcFunc')
+
+        with mock.patch('time.sleep'):
+            self.assertEqual(
+                'result', opencue.util.grpcExceptionParser(grpcFunc)('arg', key='value'))
+        grpcFunc.assert_called_with('arg', key='value')
+        self.assertEqual(2, grpcFunc.call_count)
+
+    def testSuccessSkipsRetryCount(self):
+        with mock.patch('opencue.exception.getRetryCount') as getRetryCountMock:
+            self.assertEqual(4, opencue.util.grpcExceptionParser(lambda x: x * 2)(2))
+        getRetryCountMock.assert_not_called()
+
     def testUnknownExceptionParser(self):
         response = grpc.RpcError()
         response.code = lambda: "unknown"
@@ -259,6 +259,24 @@ class JobTests(unittest.TestCase):
         self.assertTrue(frames[0].name(), frameNames[0])
         self.assertTrue(frames[1].name(), frameNames[1])
 
+    def testIterFrames(self, getStubMock):
+        stubMock = mock.Mock()
+        stubMock.GetFrames.return_value = job_pb2.JobGetFramesResponse(
+            frames=job_pb2.FrameSeq(frames=[job_pb2.Frame(name='testFrameA'),
+                                            job_pb2.Frame(name='testFrameB')]))
+        getStubMock.return_value = stubMock
+
+        job = opencue.wrappers.job.Job(
+            job_pb2.Job(name=TEST_JOB_NAME))
+        frames = list(job.iterFrames(pageSize=5000, range='1-10'))
+
+        criteria = opencue.search.FrameSearch.criteriaFromOptions(
+            range='1-10', page=1, limit=opencue.search.FrameSearch.max_limit)
+        stubMock.GetFrames.assert_called_with(
+            job_pb2.JobGetFramesRequest(job=job.data, req=criteria), timeout=mock.ANY)
+        self.assertEqual(1, stubMock.GetFrames.call_count)
+        self.assertEqual(['testFrameA', 'testFrameB'], [frame.data.name for frame in frames])
+
     def testGetUpdatedFrames(self, getStubMock):
         stubMock = mock.Mock()
         stubMock.GetUpdatedFrames.return_value = job_pb2.JobGetUpdatedFramesResponse(
@@ -280,6 +298,33 @@ class JobTests(unittest.TestCase):
         self.assertEqual(framesResponse.state, job_pb2.FINISHED)
         self.assertEqual(len(framesResponse.updated_frames.updated_frames), 1)
 
+    def testStreamUpdatedFrames(self, getStubMock):
+        stubMock = mock.Mock()
+        stubMock.StreamUpdatedFrames.return_value = iter([
+            job_pb2.JobStreamUpdatedFramesResponse(
+                state=job_pb2.PENDING,
+                server_time=123456790,
+                updated_frames=job_pb2.UpdatedFrameSeq(
+                    updated_frames=[job_pb2.UpdatedFrame(id='uuu-uuuu-uuu')])),
+            job_pb2.JobStreamUpdatedFramesResponse(
+                state=job_pb2.FINISHED,
+                server_time=123456791)])
+        getStubMock.return_value = stubMock
+
+        lastCheck = 123456789
+        layer = job_pb2.Layer(id='lll-llll-lll')
+        job = opencue.wrappers.job.Job(
+            job_pb2.Job(name=TEST_JOB_NAME))
+        responses = list(job.streamUpdatedFrames(lastCheck, [layer]))
+
+        stubMock.StreamUpdatedFrames.assert_called_with(
+            job_pb2.JobStreamUpdatedFramesRequest(
+                job=job.data, last_check=lastCheck,
+                layer_filter=job_pb2.LayerSeq(layers=[layer])))
+        self.assertEqual(len(responses), 2)
+        self.assertEqual(responses[0].updated_frames.updated_frames[0].id, 'uuu-uuuu-uuu')
+        self.assertEqual(responses[1].state, job_pb2.FINISHED)
+
     def testSetAutoEating(self, getStubMock):
         stubMock = mock.Mock()
         stubMock.SetAutoEat.return_value = job_pb2.JobSetAutoEatResponse()
@@ -170,6 +170,27 @@ class LayerTests(unittest.TestCase):
         self.assertEqual(len(frames), 1)
         self.assertEqual(frames[0].data.layer_name, TEST_LAYER_NAME)
 
+    def testIterFrames(self, getStubMock):
+        stubMock = mock.Mock()
+        stubMock.GetFrames.side_effect = [
+            job_pb2.LayerGetFramesResponse(frames=job_pb2.FrameSeq(frames=[
+                job_pb2.Frame(number=1), job_pb2.Frame(number=2)])),
+            job_pb2.LayerGetFramesResponse(frames=job_pb2.FrameSeq(frames=[
+                job_pb2.Frame(number=3)])),
+        ]
+        getStubMock.return_value = stubMock
+
+        layer = opencue.wrappers.layer.Layer(
+            job_pb2.Layer(name=TEST_LAYER_NAME))
+        frames = list(layer.iterFrames(pageSize=2))
+
+        stubMock.GetFrames.assert_called_with(
+            job_pb2.LayerGetFramesRequest(
+                layer=layer.data,
+                s=opencue.search.FrameSearch.criteriaFromOptions(page=2, limit=2)),
+            timeout=mock.ANY)
+        self.assertEqual([1, 2, 3], [frame.number() for frame in frames])
+
     def testGetOutputPaths(self, getStubMock):
         stubMock = mock.Mock()
         stubMock.GetOutputPaths.return_value = job_pb2.LayerGetOutputPathsResponse(
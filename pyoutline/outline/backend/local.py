@@ -15,7 +15,9 @@
 """
 Local backend module.
 
-Runs the given job on the local machine, using a SQLite database to store state.
+Runs the given job on the local machine. Like on the cue, frames run as soon
+as the frames they depend on have succeeded, several at a time, and failed
+frames are retried. Every frame writes its output to a log file.
 
 See outline.backend.__init__.py for a description of the PyOutline backend system.
 """
@@ -25,13 +27,20 @@ from __future__ import division
 from __future__ import absolute_import
 
 from builtins import object
+from concurrent import futures
+import heapq
+import itertools
+import os
 import subprocess
-
-import sqlite3
+import tempfile
+import time
 
 import FileSequence
 
 import outline
+import outline.depend
+import outline.exception
+import outline.util
 import outline.versions
 
 
@@ -61,21 +70,35 @@ def build_command(ol, layer, frame):
 
 def launch(launcher, use_pycuerun=None):
     """
-    Start the local dispatcher.
+    Start the local dispatcher and wait for the job to finish.
+
+    :rtype: list<LocalFrame>
+    :return: The frames that were dispatched.
     """
     # pycuerun is not used in this backend, but we keep it as a parameter for compatibility
     # with other backends.
     del use_pycuerun
 
     dispatcher = serialize(launcher)
-    dispatcher.dispatch()
+    frames = dispatcher.dispatch()
+
+    if launcher.get_flag("test"):
+        if any(frame.state != LocalFrame.SUCCEEDED for frame in frames):
+            raise outline.exception.OutlineException(
+                "Job test failed, dead or eaten frames on: %s"
+                % launcher.get_outline().get_name())
+
+    return frames
 
 
 def serialize(launcher):
     """
     Create a local dispatcher object.
     """
-    return Dispatcher(launcher.get_outline())
+    return Dispatcher(launcher.get_outline(),
+                      procs=int(launcher.get_flag("local_procs") or 0) or None,
+                      max_retries=int(launcher.get_flag("maxretries") or 0),
+                      autoeat=bool(launcher.get_flag("autoeat")))
 
 
 def serialize_simple(launcher):
@@ -85,23 +108,21 @@ def serialize_simple(launcher):
     return serialize(launcher)
 
 
+def build_chunks(frame_range, chunk_size):
+    """
+    Return the frames of a frame range split into chunks, with no
+    duplicates. Each chunk is a list of frames run by a single command.
+    """
+    frames = outline.util.disaggregate_frame_set(FileSequence.FrameSet(frame_range))
+    chunk_size = max(chunk_size, 1)
+    return [frames[i:i + chunk_size] for i in range(0, len(frames), chunk_size)]
+
+
 def build_frame_range(frame_range, chunk_size):
     """
     Return an array of frames with no duplicates and chunking applied.
     """
-    frame_set = FileSequence.FrameSet(frame_range)
-    frames = []
-    if chunk_size > 1:
-        if chunk_size >= len(frame_set):
-            frames.append(frame_set[0])
-        else:
-            unique_frames = list(set(frame_set))
-            for i, unique_frame in enumerate(unique_frames):
-                if i % chunk_size == 0:
-                    frames.append(unique_frame)
-    else:
-        frames = list(FileSequence.FrameSet(frame_range))
-    return frames
+    return [chunk[0] for chunk in build_chunks(frame_range, chunk_size)]
 
 
 class LocalFrameError(Exception):
@@ -110,77 +131,292 @@ class LocalFrameError(Exception):
     """
 
 
+class LocalFrame(object):
+    """
+    A frame, or chunk of frames, of a layer run by the local Dispatcher.
+    """
+
+    WAITING = "WAITING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    DEAD = "DEAD"
+    EATEN = "EATEN"
+    # Waiting on frames which died, so it will never run.
+    DEPEND = "DEPEND"
+
+    def __init__(self, layer, layer_order, frames):
+        self.layer = layer
+        self.layer_order = layer_order
+        self.frames = frames
+        self.number = frames[0]
+        self.name = "%04d-%s" % (self.number, layer.get_name())
+        self.state = LocalFrame.WAITING
+        self.retries = 0
+        self.exit_status = None
+        self.log_path = None
+        self.run_time = 0.0
+        # The number of requirements of this frame still to be met.
+        self.pending = 0
+        # The requirements of other frames this frame counts towards.
+        self.requirements = []
+
+    def __repr__(self):
+        return "LocalFrame(%s, %s)" % (self.name, self.state)
+
+
+class _Requirement(object):
+    """
+    A set of frames that must have completed, or any one of them if
+    any_frame is set, before the waiting frames can run. Frames of a
+    whole layer share a requirement when they depend on the same frames.
+    """
+
+    def __init__(self, frames, any_frame=False):
+        self.waiters = []
+        self.remaining = 1 if any_frame else len(frames)
+        for frame in frames:
+            frame.requirements.append(self)
+
+    def add_waiter(self, frame):
+        """Make the given frame wait on the requirement."""
+        self.waiters.append(frame)
+        frame.pending += 1
+
+    def completed(self):
+        """
+        Count one of the frames as completed.
+
+        :rtype: list<LocalFrame>
+        :return: The waiting frames which have no requirement left.
+        """
+        if not self.remaining:
+            return []
+        self.remaining -= 1
+        if self.remaining:
+            return []
+        ready = []
+        for frame in self.waiters:
+            frame.pending -= 1
+            if not frame.pending:
+                ready.append(frame)
+        return ready
+
+
 class Dispatcher(object):
     """
     Local version of a job dispatcher, responsible for launching each frame, monitoring the
     result, and updating the local state.
+
+    Up to procs frames run at once, by default as many as there are CPU cores. Ready
+    frames are started in frame order, then layer order. A frame that fails is retried
+    up to max_retries times, and then left dead, or eaten if autoeat is set. As on the
+    cue, eaten frames satisfy the dependencies on them, dead ones don't.
     """
 
-    def __init__(self, ol):
+    def __init__(self, ol, procs=None, max_retries=0, autoeat=False, log_dir=None):
         self.__ol = ol
-
-        self.__conn = sqlite3.connect(":memory:")
+        self.__procs = procs or os.cpu_count() or 1
+        self.__max_retries = max_retries
+        self.__autoeat = autoeat
+        self.__log_dir = log_dir
+
+        self.__frames = []
+        self.__ready = []
+        self.__sequence = itertools.count()
         self.__create_dispatch_list()
 
-    def dispatch(self):
+    def get_frames(self):
         """
-        Run the frames of the job in sequence and record the result.
+        Return the frames of the job.
+
+        :rtype: list<LocalFrame>
         """
-        try:
-            while True:
-                l, f = self.__get_next_frame()
-                if l is None and f is None:
-                    break
+        return list(self.__frames)
 
-                layer = self.__ol.get_layer(l)
+    def dispatch(self):
+        """
+        Run the frames of the job and record the result.
+
+        :rtype: list<LocalFrame>
+        :return: The frames of the job, in their final state.
+        """
+        log_dir = self.__get_log_dir()
+        start_time = time.time()
+        running = {}
+        with futures.ThreadPoolExecutor(max_workers=self.__procs) as pool:
+            for frame in self.__frames:
+                if not frame.pending:
+                    self.__queue(frame)
+
+            while self.__ready or running:
+                while self.__ready and len(running) < self.__procs:
+                    frame = heapq.heappop(self.__ready)[-1]
+                    frame.state = LocalFrame.RUNNING
+                    frame.log_path = self.__rotate_log(
+                        os.path.join(log_dir, "%s.rqlog" % frame.name), frame.retries)
+                    running[pool.submit(self.__run_frame, frame)] = frame
+
+                done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    self.__frame_done(running.pop(future), future)
+
+        for frame in self.__frames:
+            if frame.state == LocalFrame.WAITING:
+                frame.state = LocalFrame.DEPEND
+
+        self.__print_summary(time.time() - start_time)
+        return self.get_frames()
+
+    def __queue(self, frame):
+        heapq.heappush(self.__ready,
+                       (frame.number, frame.layer_order, next(self.__sequence), frame))
+
+    def __run_frame(self, frame):
+        """
+        Run the command of a frame, sending its output to the frame's log.
 
-                command = build_command(self.__ol, layer, f)
+        :rtype: int
+        :return: The exit status of the command.
+        """
+        command = build_command(self.__ol, frame.layer, frame.number)
+        start_time = time.time()
+        try:
+            try:
+                log = open(frame.log_path, "w", encoding="utf-8")
+            except OSError as e:
+                raise LocalFrameError("frame log could not be opened: %s" % e)
+            with log:
                 try:
-                    retcode = subprocess.call(command, shell=False)
-                    if retcode != 0:
-                        raise LocalFrameError("frame failed")
-                except LocalFrameError:
-                    # Failed to run frame
-                    # Set frame to dead
-                    c = self.__conn.cursor()
-                    c.execute("UPDATE frames SET state=? WHERE layer=? AND frame=?",
-                              ('DEAD', l, f))
-                    self.__conn.commit()
+                    return subprocess.call(command, shell=False,
+                                           stdout=log, stderr=subprocess.STDOUT)
+                except OSError as e:
+                    log.write("Failed to run %s: %s\n" % (command, e))
+                    raise LocalFrameError("frame failed to start: %s" % e)
         finally:
-            print("Job is done")
-            self.__conn.close()
+            frame.run_time = time.time() - start_time
+
+    def __frame_done(self, frame, future):
+        """Update the state of a frame that stopped running."""
+        try:
+            frame.exit_status = future.result()
+        except LocalFrameError:
+            frame.exit_status = None
+
+        if frame.exit_status == 0:
+            frame.state = LocalFrame.SUCCEEDED
+        elif frame.retries < self.__max_retries:
+            frame.retries += 1
+            frame.state = LocalFrame.WAITING
+            self.__queue(frame)
+            return
+        elif self.__autoeat:
+            frame.state = LocalFrame.EATEN
+        else:
+            frame.state = LocalFrame.DEAD
+            return
+
+        for requirement in frame.requirements:
+            for ready in requirement.completed():
+                self.__queue(ready)
+
+    def __print_summary(self, run_time):
+        """Print how many frames ended up in each state, and which frames failed."""
+        counts = {}
+        for frame in self.__frames:
+            counts[frame.state] = counts.get(frame.state, 0) + 1
+        print("Job %s is done in %.1fs: %s" % (
+            self.__ol.get_name(), run_time,
+            ", ".join("%d %s" % (counts[state], state.lower()) for state in (
+                LocalFrame.SUCCEEDED, LocalFrame.EATEN, LocalFrame.DEAD, LocalFrame.DEPEND)
+                      if state in counts) or "no frames"))
+        for frame in self.__frames:
+            if frame.state in (LocalFrame.DEAD, LocalFrame.EATEN):
+                print("  %-6s %s, exit status %s after %d retries, log: %s" % (
+                    frame.state, frame.name, frame.exit_status, frame.retries,
+                    frame.log_path))
+
+    def __get_log_dir(self):
+        """Return the directory of the frame logs, creating it if needed."""
+        if not self.__log_dir:
+            try:
+                self.__log_dir = os.path.join(self.__ol.get_session().get_path(), "logs")
+            except outline.exception.SessionException:
+                self.__log_dir = tempfile.mkdtemp(prefix="outline-local-")
+        os.makedirs(self.__log_dir, exist_ok=True)
+        return self.__log_dir
+
+    @staticmethod
+    def __rotate_log(log_path, attempt):
+        """Keep the log of the previous attempt of a frame under a numbered name."""
+        if attempt and os.path.exists(log_path):
+            os.rename(log_path, "%s.%d" % (log_path, attempt))
+        return log_path
 
     def __create_dispatch_list(self):
         """
-        Creates a list of dispatchable frames.
+        Creates a list of dispatchable frames and sets up the
+        requirements their layer dependencies make.
         """
-        c = self.__conn.cursor()
-        c.execute(
-            'create table frames '
-            '(layer text, frame int, state string, layer_order int, frame_order int)')
+        chunks = {}
+        frames_by_number = {}
+        for layer_order, layer in enumerate(self.__ol.get_layers()):
+            frame_range = layer.get_frame_range()
+            if not frame_range:
+                continue
+            name = layer.get_name()
+            chunks[name] = [LocalFrame(layer, layer_order, frames)
+                            for frames in build_chunks(frame_range, layer.get_chunk_size())]
+            frames_by_number[name] = {number: frame for frame in chunks[name]
+                                      for number in frame.frames}
+            self.__frames.extend(chunks[name])
 
         for layer in self.__ol.get_layers():
+            for depend in layer.get_depends():
+                on_name = depend.get_depend_on_layer().get_name()
+                if layer.get_name() not in chunks or not chunks.get(on_name):
+                    continue
+                self.__create_requirements(depend, chunks[layer.get_name()],
+                                           chunks[on_name], frames_by_number[on_name])
+
+    @staticmethod
+    def __create_requirements(depend, frames, on_frames, on_frames_by_number):
+        """
+        Make the frames of a layer wait on the frames of the layer it depends on.
+        """
+        depend_type = depend.get_type()
+        any_frame = depend.is_any_frame()
+
+        if depend_type in (outline.depend.DependType.LayerOnLayer,
+                           outline.depend.DependType.LayerOnAny):
+            requirement = _Requirement(
+                on_frames,
+                any_frame or depend_type == outline.depend.DependType.LayerOnAny)
+            for frame in frames:
+                requirement.add_waiter(frame)
+            return
+
+        if depend_type == outline.depend.DependType.LayerOnSimFrame:
+            requirement = _Requirement(on_frames[:1])
+            for frame in frames:
+                requirement.add_waiter(frame)
+            return
 
-            frames = build_frame_range(layer.get_frame_range(),
-                                       layer.get_chunk_size())
+        if depend_type == outline.depend.DependType.PreviousFrame:
+            # Each frame waits on the frame one position earlier in the other layer.
+            on_numbers = [number for on_frame in on_frames for number in on_frame.frames]
+            index = 0
             for frame in frames:
-                c.execute(
-                    'insert into frames values (?,?,?,?,?)',
-                    (layer.get_name(), frame, 'WAITING', self.__ol.get_layers().index(layer),
-                     int(frame)))
-        self.__conn.commit()
-
-    def __get_next_frame(self):
-        c = self.__conn.cursor()
-        c.execute(
-            "SELECT layer, frame, state FROM frames WHERE state='WAITING' "
-            "ORDER BY frame_order,layer_order LIMIT 1")
-        result = c.fetchone()
-
-        if result:
-            c.execute("UPDATE frames SET state=? WHERE layer=? AND frame=?",
-                      ('RUNNING', result[0], result[1]))
-            self.__conn.commit()
-            return result[0], result[1]
-
-        return None, None
+                previous = set()
+                for _ in frame.frames:
+                    if 0 < index <= len(on_numbers):
+                        previous.add(on_frames_by_number[on_numbers[index - 1]])
+                    index += 1
+                if previous:
+                    _Requirement(previous).add_waiter(frame)
+            return
+
+        for frame in frames:
+            on = {on_frames_by_number[number] for number in frame.frames
+                  if number in on_frames_by_number}
+            if on:
+                _Requirement(on, any_frame).add_waiter(frame)
@@ -136,6 +136,7 @@ class OutlineLauncher(object):
                         "os": False,
                         "env": [],
                         "maxretries": config.get("outline", "maxretries"),
+                        "local_procs": config.get("outline", "local_procs", fallback="0"),
                         "backend": config.get("outline", "backend")}
         self.__flags.update(args)
         self.__backend = None
@@ -260,6 +261,11 @@ class CuerunOptionParser(OptionParser):
 
         grp_std.add_option("-b", "--backend", action="store", dest="backend",
                            default=config.get("outline", "backend"))
+        grp_std.add_option("-j", "--local-procs", action="store", type="int",
+                           dest="local_procs",
+                           default=config.get("outline", "local_procs", fallback="0"),
+                           help="Number of frames the local backend runs at once. "
+                                "Default: one per CPU core")
         grp_std.add_option("-s", "--server", action="store", dest="server")
         grp_std.add_option("-F", "--facility", action="store", dest="facility",
                            default=get_launch_facility(),
@@ -370,6 +376,7 @@ class CuerunOptionParser(OptionParser):
                 "facility": options.facility,
                 "nomail": options.nomail,
                 "maxretries" : options.maxretries,
+                "local_procs": options.local_procs,
                 "os": options.os,
                 "env": options.env,
                 "autoeat": options.autoeat,
@@ -20,6 +20,7 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import division
 
+import functools
 import os
 import sys
 import logging
@@ -113,6 +114,29 @@ class _LayerArgs(TypedDict, total=False):
     type: outline.constants.LayerType  # The layer type (Render, Util, Post)
 
 
+@functools.lru_cache(maxsize=256)
+def _intersect_frame_ranges(outline_range: str, layer_range: str) -> Optional[str]:
+    """
+    Return the intersection of an outline's and a layer's frame range,
+    normalized if that does not change the order of the frames, or None
+    if they have no frame in common. Every layer of an outline usually
+    asks for the same few intersections, over and over, so they are
+    cached.
+    """
+    intersect = outline.util.intersect_frame_set(
+        FileSequence.FrameSet(outline_range),
+        FileSequence.FrameSet(layer_range),
+        normalize=False,
+    )
+    if not intersect:
+        return None
+
+    # If normalizing does not change the order of frames, return normalized
+    if outline.util.is_normalized(intersect):
+        intersect.normalize()
+    return str(intersect)
+
+
 class Layer(metaclass=LayerType):
     """Base class for all outline modules."""
 
@@ -751,22 +775,7 @@ class Layer(metaclass=LayerType):
             # If there is neither a layer range nor an outline range, return a single frame range.
 
             if rng and self.__outline.get_frame_range():
-                ol_rng = FileSequence.FrameSet(self.__outline.get_frame_range())
-                ly_rng = FileSequence.FrameSet(rng)
-
-                intersect = outline.util.intersect_frame_set(
-                    ol_rng, ly_rng, normalize=False
-                )
-                if not intersect:
-                    return None
-
-                # If normalizing does not change the order of frames, return normalized
-                normalized = FileSequence.FrameSet(str(intersect))
-                normalized.normalize()
-                if list(intersect) == list(normalized):
-                    return str(normalized)
-
-                return str(intersect)
+                return _intersect_frame_ranges(self.__outline.get_frame_range(), rng)
             if rng:
                 return rng
 
@@ -796,30 +805,29 @@ class Layer(metaclass=LayerType):
         if chunk == 1:
             return outline.util.make_frame_set([int(start_frame)])
 
-        local_frame_set = []
-        #
-        # Remove the duplicates out of our frame range.
-        #
         frame_range = FileSequence.FrameSet(self.get_frame_range())
-        frame_set = outline.util.disaggregate_frame_set(frame_range)
+        if outline.util.is_normalized(frame_range):
+            #
+            # There are no duplicates, so the chunk can be read
+            # straight off the frame range.
+            #
+            frame_set = frame_range
+        else:
+            #
+            # Remove the duplicates out of our frame range.
+            #
+            frame_set = outline.util.disaggregate_frame_set(frame_range)
 
         #
         # Now find the index for the current frame and start
         # the frame there. Find all frames this instance
         # is responsible for.
         #
-        idx = frame_set.index(int(start_frame))
-        for i in range(idx, idx + chunk):
-            try:
-                if frame_set[i] in local_frame_set:
-                    continue
-                local_frame_set.append(frame_set[i])
-            except IndexError:
-                break
-        if not local_frame_set:
+        if int(start_frame) not in frame_set:
             msg = f"Frame {start_frame} is outside of the frame range."
             raise outline.exception.LayerException(msg)
-        return outline.util.make_frame_set(local_frame_set)
+        idx = frame_set.index(int(start_frame))
+        return outline.util.make_frame_set(frame_set[idx:idx + chunk])
 
     def set_chunk_size(self, size: int) -> None:
         """
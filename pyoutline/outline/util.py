@@ -20,8 +20,6 @@ from __future__ import absolute_import
 from __future__ import print_function
 from __future__ import division
 
-from builtins import str
-
 import getpass
 import os
 import platform
@@ -42,14 +40,28 @@ def disaggregate_frame_set(frameset):
     :rtype:            List
     :return:           The list of disaggregated frames.
     """
-    # This is not a Set because sets are unordered.
+    # Dictionaries keep their insertion order, unlike sets.
+    return list(dict.fromkeys(frameset))
 
-    found = []
-    for frame in frameset:
-        if frame in found:
-            continue
-        found.append(frame)
-    return found
+def is_normalized(frameset):
+    """
+    Return True if the frames of a FileSequence.FrameSet are in
+    ascending order without duplicates, that is if normalizing the
+    frame set would leave it unchanged.  Only the frame set's segments
+    are looked at, not its individual frames.
+
+    :type  frameset: FileSequence.FrameSet
+    :param frameset: The frameset to check
+    :rtype:          bool
+    """
+    previous = None
+    for segment in frameset.segments:
+        if len(segment) > 1 and segment.direction < 0:
+            return False
+        if previous is not None and segment.low <= previous:
+            return False
+        previous = segment.high
+    return True
 
 def intersect_frame_set(range1, range2, normalize=True):
     """
@@ -57,14 +69,16 @@ def intersect_frame_set(range1, range2, normalize=True):
     as a FileSequence.FrameSet.  By default, the net frameset is
     normalized and duplicates are removed.  If no intersection
     can be found then None is returned.
+
+    Without normalize, the frames keep the order they have in range1.
     """
-    found = []
-    for frame in range1:
-        if range2.index(frame) > -1 and frame not in found:
-            found.append(frame)
-    if not found:
+    if normalize or is_normalized(range1):
+        fs = FileSequence.FrameSet.fromSegments(range1.intersection(range2).segments)
+    else:
+        fs = make_frame_set(
+            [frame for frame in disaggregate_frame_set(range1) if frame in range2], False)
+    if not fs.size():
         return None
-    fs = make_frame_set(found, normalize)
     return fs
 
 def make_frame_set(frames, normalize=True):
@@ -78,7 +92,7 @@ def make_frame_set(frames, normalize=True):
     :rtype: FrameSet
     :return: a normalized FileSequence.FrameSet
     """
-    fs = FileSequence.FrameSet(",".join([str(f) for f in frames]))
+    fs = FileSequence.FrameSet.fromFrames(int(f) for f in frames)
     if normalize:
         fs.normalize()
     return fs
@@ -23,6 +23,10 @@ from __future__ import division
 from __future__ import absolute_import
 
 import os
+import re
+import shutil
+import tempfile
+import threading
 import unittest
 
 import mock
@@ -30,6 +34,9 @@ import mock
 import outline
 import outline.backend.local
 import outline.cuerun
+import outline.depend
+import outline.exception
+import outline.modules.shell
 
 
 SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
@@ -85,7 +92,48 @@ class BuildFrameRangeTest(unittest.TestCase):
         self.assertEqual([3], outline.backend.local.build_frame_range('3-9', 87))
 
 
+    def testBuildFrameRangeKeepsOrder(self):
+        self.assertEqual([9, 5, 1], outline.backend.local.build_frame_range('9-1,5', 4))
+
+    def testBuildChunks(self):
+        self.assertEqual(
+            [[3, 4, 5, 6], [7, 8, 9]], outline.backend.local.build_chunks('3-9,5', 4))
+
+
 class DispatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.logDir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.logDir)
+        self.ol = outline.Outline('local-test', current=True)
+        self.first = outline.modules.shell.Shell('first', command=['true'], range='1-4')
+        self.second = outline.modules.shell.Shell('second', command=['true'], range='1-4')
+        self.lock = threading.Lock()
+        self.events = []
+        self.failures = {}
+
+    def runFrame(self, command, **kwargs):
+        """Stands in for subprocess.call, recording when each frame starts and ends."""
+        number, layer = re.search(r'-e  (\d+)-(\S+)', command[5]).groups()
+        name = '%04d-%s' % (int(number), layer)
+        kwargs['stdout'].write('running %s\n' % name)
+        with self.lock:
+            self.events.append(('start', name))
+        with self.lock:
+            self.events.append(('end', name))
+            if self.failures.get(name):
+                self.failures[name] -= 1
+                return 1
+        return 0
+
+    def dispatch(self, **kwargs):
+        dispatcher = outline.backend.local.Dispatcher(self.ol, log_dir=self.logDir, **kwargs)
+        with mock.patch('subprocess.call', side_effect=self.runFrame):
+            frames = dispatcher.dispatch()
+        return {frame.name: frame for frame in frames}
+
+    def assertRunsAfter(self, name, onName):
+        self.assertGreater(self.events.index(('start', name)), self.events.index(('end', onName)))
+
     @mock.patch('subprocess.call')
     def testDispatch(self, subprocessCallMock):
         path = os.path.join(SCRIPTS_DIR, 'shell.outline')
@@ -95,6 +143,131 @@ class DispatcherTest(unittest.TestCase):
 
         outline.backend.local.launch(launcher)
 
+    def testRunsFramesConcurrently(self):
+        barrier = threading.Barrier(4, timeout=10)
+
+        def runFrame(command, **kwargs):
+            del command, kwargs
+            barrier.wait()
+            return 0
+
+        dispatcher = outline.backend.local.Dispatcher(self.ol, procs=4, log_dir=self.logDir)
+        with mock.patch('subprocess.call', side_effect=runFrame):
+            frames = dispatcher.dispatch()
+
+        self.assertEqual(8, len(frames))
+        self.assertTrue(all(frame.state == 'SUCCEEDED' for frame in frames))
+
+    def testRunsInFrameOrder(self):
+        self.dispatch(procs=1)
+
+        self.assertEqual(
+            ['0001-first', '0001-second', '0002-first', '0002-second',
+             '0003-first', '0003-second', '0004-first', '0004-second'],
+            [name for event, name in self.events if event == 'start'])
+
+    def testLayerOnLayer(self):
+        self.second.depend_all(self.first)
+
+        self.dispatch(procs=4)
+
+        for frame in range(1, 5):
+            self.assertRunsAfter('%04d-second' % frame, '0004-first')
+            self.assertRunsAfter('%04d-second' % frame, '0001-first')
+
+    def testFrameByFrame(self):
+        self.second.depend_on(self.first)
+
+        self.dispatch(procs=4)
+
+        for frame in range(1, 5):
+            self.assertRunsAfter('%04d-second' % frame, '%04d-first' % frame)
+
+    def testPreviousFrame(self):
+        self.second.depend_previous(self.first)
+        self.failures['0002-first'] = 1
+
+        frames = self.dispatch(procs=4)
+
+        self.assertRunsAfter('0004-second', '0003-first')
+        self.assertEqual('SUCCEEDED', frames['0001-second'].state)
+        self.assertEqual('DEPEND', frames['0003-second'].state)
+        self.assertEqual('SUCCEEDED', frames['0004-second'].state)
+
+    def testChunks(self):
+        self.second.set_chunk_size(2)
+        self.second.depend_on(self.first)
+
+        frames = self.dispatch(procs=4)
+
+        self.assertEqual(6, len(frames))
+        self.assertEqual([3, 4], frames['0003-second'].frames)
+        self.assertRunsAfter('0003-second', '0003-first')
+        self.assertRunsAfter('0003-second', '0004-first')
+
+    def testRetriesFailedFrames(self):
+        self.failures['0002-first'] = 1
+
+        frames = self.dispatch(max_retries=1)
+
+        self.assertEqual('SUCCEEDED', frames['0002-first'].state)
+        self.assertEqual(1, frames['0002-first'].retries)
+        self.assertEqual(0, frames['0002-first'].exit_status)
+        log = os.path.join(self.logDir, '0002-first.rqlog')
+        self.assertEqual(log, frames['0002-first'].log_path)
+        self.assertTrue(os.path.exists(log))
+        self.assertTrue(os.path.exists(log + '.1'))
+
+    def testDeadFramesBlockDependants(self):
+        self.second.depend_on(self.first)
+        self.failures['0002-first'] = 3
+
+        frames = self.dispatch(max_retries=2)
+
+        self.assertEqual('DEAD', frames['0002-first'].state)
+        self.assertEqual(1, frames['0002-first'].exit_status)
+        self.assertEqual('DEPEND', frames['0002-second'].state)
+        self.assertNotIn(('start', '0002-second'), self.events)
+        self.assertEqual('SUCCEEDED', frames['0003-second'].state)
+
+    def testEatenFramesSatisfyDependants(self):
+        self.second.depend_all(self.first)
+        self.failures['0002-first'] = 1
+
+        frames = self.dispatch(autoeat=True)
+
+        self.assertEqual('EATEN', frames['0002-first'].state)
+        self.assertEqual('SUCCEEDED', frames['0002-second'].state)
+
+    def testFramesThatFailToStart(self):
+        dispatcher = outline.backend.local.Dispatcher(self.ol, log_dir=self.logDir)
+        with mock.patch('subprocess.call', side_effect=OSError('no such file')):
+            frames = dispatcher.dispatch()
+
+        self.assertTrue(all(frame.state == 'DEAD' for frame in frames))
+        with open(frames[0].log_path, encoding='utf-8') as log:
+            self.assertIn('no such file', log.read())
+
+    def testFramesWhoseLogCannotBeOpened(self):
+        dispatcher = outline.backend.local.Dispatcher(self.ol, log_dir=self.logDir)
+        with mock.patch('subprocess.call') as subprocessCallMock, \
+                mock.patch('outline.backend.local.open', create=True,
+                           side_effect=PermissionError('denied')):
+            frames = dispatcher.dispatch()
+
+        subprocessCallMock.assert_not_called()
+        self.assertTrue(all(frame.state == 'DEAD' for frame in frames))
+
+    @mock.patch('subprocess.call')
+    def testLaunchTestFailsOnDeadFrames(self, subprocessCallMock):
+        subprocessCallMock.return_value = 1
+        launcher = outline.cuerun.OutlineLauncher(
+            self.ol, test=True, maxretries='0', local_procs=2)
+
+        with mock.patch('tempfile.mkdtemp', return_value=self.logDir):
+            self.assertRaises(outline.exception.OutlineException,
+                              outline.backend.local.launch, launcher)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Times the frame set helpers of outline.util and the frame range
+resolution of layers, which job setup runs for every layer and the node
+runs before executing every frame.
+
+Every case works on a layer of --frames frames, intersected with a job
+range holding every other frame so that the intersection isn't trivial.
+An unordered job range, which the helpers can't simply work out segment
+by segment, is timed as well. The best of --repeat runs is reported.
+
+Usage, from the pyoutline directory:
+    python -m tests.benchmarks.bench_frame_sets --frames 20000 --chunk 10
+"""
+
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+
+import argparse
+import timeit
+
+import FileSequence
+
+import outline
+import outline.modules.shell
+import outline.util
+
+
+def make_layer(job_range, layer_range, chunk):
+    """Returns a shell layer of a new outline with the given ranges."""
+    ol = outline.Outline('bench', frame_range=job_range)
+    layer = outline.modules.shell.Shell('cmd', command=['true'], range=layer_range,
+                                        chunk=chunk)
+    ol.add_layer(layer)
+    return layer
+
+
+def cases(frames, chunk):
+    """Yields the name and the function of every case."""
+    layer_range = '1-%d' % frames
+    job_range = '1-%dx2' % (frames * 2)
+    unordered_range = '%d-1x-2,%d-%dx2' % (frames - 1, frames, frames * 2)
+    middle = frames // 2 + 1
+
+    layer_set = FileSequence.FrameSet(layer_range)
+    job_set = FileSequence.FrameSet(job_range)
+    unordered_set = FileSequence.FrameSet(unordered_range)
+    frame_list = layer_set.getAll()
+    items = list(range(frames))
+    local_frames = list(range(middle, middle + chunk))
+
+    yield 'make_frame_set', lambda: outline.util.make_frame_set(frame_list)
+    yield 'disaggregate_frame_set', lambda: outline.util.disaggregate_frame_set(layer_set)
+    yield 'intersect_frame_set', lambda: outline.util.intersect_frame_set(layer_set, job_set)
+    yield 'intersect_frame_set unordered', lambda: outline.util.intersect_frame_set(
+        unordered_set, layer_set, normalize=False)
+    yield 'get_slice', lambda: outline.util.get_slice(layer_range, local_frames, items)
+
+    layer = make_layer(job_range, layer_range, chunk)
+    unordered_layer = make_layer(unordered_range, layer_range, chunk)
+    yield 'Layer.get_frame_range', layer.get_frame_range
+    yield 'Layer.get_frame_range unordered', unordered_layer.get_frame_range
+    yield 'Layer.get_local_frame_set', lambda: layer.get_local_frame_set(middle)
+    yield 'Layer.get_local_frame_set unordered', lambda: unordered_layer.get_local_frame_set(
+        middle)
+
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=20000, help='frames in the layer')
+    parser.add_argument('--chunk', type=int, default=10, help='chunk size of the layer')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of every case')
+    args = parser.parse_args()
+
+    print('%d frames, chunks of %d' % (args.frames, args.chunk))
+    for name, case in cases(args.frames, args.chunk):
+        elapsed = min(timeit.repeat(case, number=1, repeat=args.repeat))
+        print('  %-38s %10.3f ms' % (name, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -24,7 +24,6 @@ from __future__ import division
 
 # WARNING: Do not import builtins.str here as we do elsewhere in the code. Unit tests on Python 2
 # need to preserve the existing Python 2 string type.
-from builtins import range
 import os
 import sys
 import unittest
@@ -99,6 +98,18 @@ class ChunkingTest(unittest.TestCase):
         self.assertEqual([1, 2, 3, 4, 5], self.event.get_local_frame_set(1).getAll())
         self.assertEqual([8, 9, 10], self.event.get_local_frame_set(8).getAll())
 
+    def test_get_local_frame_set_skips_duplicates(self):
+        self.ol.set_frame_range("10-1,2-4,11")
+        with test_utils.TemporarySessionDirectory():
+            self.ol.setup()
+        self.assertEqual([1, 2, 3, 11], self.event.get_local_frame_set(3).getAll())
+
+    def test_get_local_frame_set_outside_range(self):
+        with test_utils.TemporarySessionDirectory():
+            self.ol.setup()
+        self.assertRaises(
+            outline.exception.LayerException, self.event.get_local_frame_set, 11)
+
 
 class RangeTests(unittest.TestCase):
 
@@ -128,18 +139,22 @@ class RangeTests(unittest.TestCase):
         self.ol.set_frame_range('1000-2000')
         self.ol.get_layer('cmd').set_frame_range('1000-2000')
 
-        expectedFrameStr = ','.join([str(i) for i in range(1000, 2001)])
-        self.assertEqual(expectedFrameStr, self.ol.get_layer('cmd').get_frame_range())
+        self.assertEqual('1000-2000', self.ol.get_layer('cmd').get_frame_range())
         self.assertEqual('1000-2000', self.ol.get_frame_range())
 
     def test_intersecting_range(self):
         self.ol.set_frame_range('1000-2000x8')
         self.ol.get_layer('cmd').set_frame_range('1000-2000')
 
-        expectedFrameStr = ','.join([str(i) for i in range(1000, 2001, 8)])
-        self.assertEqual(expectedFrameStr, self.ol.get_layer('cmd').get_frame_range())
+        self.assertEqual('1000-2000x8', self.ol.get_layer('cmd').get_frame_range())
         self.assertEqual('1000-2000x8', self.ol.get_frame_range())
 
+    def test_intersecting_range_keeps_job_order(self):
+        self.ol.set_frame_range('20-1')
+        self.ol.get_layer('cmd').set_frame_range('5-25x5')
+
+        self.assertEqual('20-5x-5', self.ol.get_layer('cmd').get_frame_range())
+
     def test_intersecting_failure(self):
         self.ol.set_frame_range('1000-1010')
         self.ol.get_layer('cmd').set_frame_range('1100-1200')
@@ -284,7 +299,7 @@ class LayerTest(unittest.TestCase):
         """
         self.assertEqual(self.ol.get_frame_range(), self.layer.get_frame_range())
         self.layer.set_frame_range('1-10')
-        self.assertEqual('1,2,3,4,5,6,7,8,9,10', self.layer.get_frame_range())
+        self.assertEqual('1-10', self.layer.get_frame_range())
 
     def test_get_set_chunk_size(self):
         """Test get/set of chunk size."""
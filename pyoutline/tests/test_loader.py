@@ -168,7 +168,7 @@ class OutlineTest(unittest.TestCase):
 
             # Set frame range from FrameSet
             ol.set_frame_range(FileSequence.FrameSet('5-10'))
-            self.assertEqual('5,6,7,8,9,10', ol.get_frame_range())
+            self.assertEqual('5-10', ol.get_frame_range())
 
     def test_get_set_arg(self):
         with test_utils.TemporarySessionDirectory():
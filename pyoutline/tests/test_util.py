@@ -0,0 +1,79 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+"""
+Tests for the outline.util module.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+import unittest
+
+import FileSequence
+
+import outline.util
+
+
+class FrameSetTest(unittest.TestCase):
+
+    """Tests for the frame set helpers."""
+
+    def test_disaggregate_frame_set(self):
+        frame_set = FileSequence.FrameSet('5-1,3-7,1')
+
+        self.assertEqual([5, 4, 3, 2, 1, 6, 7], outline.util.disaggregate_frame_set(frame_set))
+
+    def test_is_normalized(self):
+        self.assertTrue(outline.util.is_normalized(FileSequence.FrameSet('1-10x2,11,20-30')))
+        self.assertTrue(outline.util.is_normalized(FileSequence.FrameSet('1,3-1x-5')))
+        self.assertFalse(outline.util.is_normalized(FileSequence.FrameSet('1-10,10')))
+        self.assertFalse(outline.util.is_normalized(FileSequence.FrameSet('3-1')))
+        self.assertFalse(outline.util.is_normalized(FileSequence.FrameSet('1-10,5')))
+
+    def test_intersect_frame_set(self):
+        result = outline.util.intersect_frame_set(
+            FileSequence.FrameSet('1-20000'), FileSequence.FrameSet('10000-30000x2'))
+
+        self.assertEqual('10000-20000x2', str(result))
+        self.assertEqual(5001, len(result))
+
+    def test_intersect_frame_set_without_normalizing(self):
+        range1 = FileSequence.FrameSet('10-1,3-5')
+        range2 = FileSequence.FrameSet('2-8')
+
+        self.assertEqual(
+            [8, 7, 6, 5, 4, 3, 2],
+            outline.util.intersect_frame_set(range1, range2, normalize=False).getAll())
+        self.assertEqual(
+            [2, 3, 4, 5, 6, 7, 8], outline.util.intersect_frame_set(range1, range2).getAll())
+
+    def test_intersect_frame_set_empty(self):
+        self.assertIsNone(outline.util.intersect_frame_set(
+            FileSequence.FrameSet('1-10'), FileSequence.FrameSet('11-20')))
+        self.assertIsNone(outline.util.intersect_frame_set(
+            FileSequence.FrameSet('10-1'), FileSequence.FrameSet('11-20'), normalize=False))
+
+    def test_make_frame_set(self):
+        self.assertEqual('1-5', str(outline.util.make_frame_set([3, 1, 2, 5, 4, 3])))
+        self.assertEqual('3,1-2,5-3', str(outline.util.make_frame_set([3, 1, 2, 5, 4, 3], False)))
+
+    def test_get_slice(self):
+        self.assertEqual(
+            ['c', 'd'], outline.util.get_slice('1-10x2', [5, 7], ['a', 'b', 'c', 'd', 'e']))
+
+
+if __name__ == '__main__':
+    unittest.main()
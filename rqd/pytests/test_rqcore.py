@@ -73,3 +73,20 @@ def test_log_size_limit_exceeded(tmp_path, monkeypatch):
     assert exceeded is True
     assert str(log_file) in msg
     assert 'Terminating job' in msg
+
+
+def test_log_size_limit_uses_logger_byte_count(tmp_path, monkeypatch):
+    """Uses the bytes counted by a buffered logger instead of the file size."""
+    _install_minimal_stubs(monkeypatch)
+    from rqd import rqcore, rqconstants  # pylint: disable=import-outside-toplevel
+
+    # Still empty on disk, the data is buffered
+    log_file = tmp_path / 'job.frame.rqlog'
+    log_file.write_bytes(b'')
+
+    monkeypatch.setattr(rqconstants, 'JOB_LOG_MAX_SIZE_IN_BYTES', 1024)
+    att = _bare_attendant_with_log(log_file, rqcore)
+    att.rqlog = types.SimpleNamespace(size=2048)
+    exceeded, _ = att._FrameAttendantThread__log_size_limit_exceeded()
+
+    assert exceeded is True
@@ -21,7 +21,9 @@
 import mock
 import pytest
 import opencue_proto.rqd_pb2
+from rqd.rqlogging import LineBuffer
 from rqd.rqlogging import LokiLogger
+from rqd.rqlogging import RqdLogger
 
 @pytest.fixture
 @mock.patch('opencue_proto.rqd_pb2_grpc.RunningFrameStub')
@@ -45,3 +47,39 @@ def test_LokiLogger_invalid_runFrame():
     with pytest.raises(AttributeError) as excinfo:
         LokiLogger("http://localhost:3100", rf)
     assert excinfo.type == AttributeError
+
+def test_LineBuffer_keeps_partial_line():
+    lineBuffer = LineBuffer()
+    assert lineBuffer.feed(b"first\nsec") == b"first\n"
+    assert lineBuffer.feed(b"ond") == b""
+    assert lineBuffer.feed(b"\nthird") == b"second\n"
+    assert lineBuffer.flush() == b"third"
+    assert lineBuffer.flush() == b""
+
+def test_LineBuffer_splits_long_line():
+    lineBuffer = LineBuffer(maxLineSize=4)
+    assert lineBuffer.feed(b"ab") == b""
+    assert lineBuffer.feed(b"cdef") == b"abcdef"
+
+def test_RqdLogger_buffers_and_counts_bytes(tmp_path):
+    logPath = tmp_path / "frame.rqlog"
+    rqlog = RqdLogger(str(logPath))
+    rqlog.write(b"line one\nline two\n")
+    print("line three", file=rqlog)
+
+    assert rqlog.size == len("line one\nline two\nline three\n")
+    # Nothing reached the file yet
+    assert logPath.stat().st_size == 0
+    rqlog.close()
+    assert logPath.read_text() == "line one\nline two\nline three\n"
+
+@mock.patch("datetime.datetime")
+def test_RqdLogger_prepends_one_timestamp_per_chunk(datetimeMock, tmp_path):
+    datetimeMock.now.return_value.strftime.return_value = "10:20:30"
+    logPath = tmp_path / "frame.rqlog"
+    rqlog = RqdLogger(str(logPath))
+    rqlog.write(b"a\nb\n", prependTimestamp=True)
+    rqlog.close()
+
+    assert logPath.read_text() == "[10:20:30] a\n[10:20:30] b\n"
+    datetimeMock.now.return_value.strftime.assert_called_once_with("%H:%M:%S")
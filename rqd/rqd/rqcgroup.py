@@ -0,0 +1,228 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""cgroup v2 based accounting of running frames."""
+
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+from builtins import object
+import errno
+import logging
+import os
+import threading
+import time
+
+import rqd.rqconstants
+import rqd.rqutil
+
+
+log = logging.getLogger(__name__)
+CGROUP_CONTROLLERS = ("memory", "cpu")
+
+
+def joinCommand(cgroupPath):
+    """Returns the command prefix that moves the frame into the given cgroup
+    before it executes the rest of its command, so every process the frame
+    forks is accounted for. The move is done by a shell that execs the frame
+    rather than by a preexec_fn, which isn't safe in the threads of RQD.
+    @type  cgroupPath: str
+    @param cgroupPath: Path of the frame cgroup
+    @rtype:  list
+    @return: The arguments to put in front of the frame command"""
+    # Writing 0 moves the writing process. If that fails the frame still runs,
+    # rssUpdate falls back to the session scan
+    return ["/bin/sh", "-c", 'echo 0 2>/dev/null > "$0"; exec "$@"',
+            os.path.join(cgroupPath, "cgroup.procs")]
+
+
+class FrameCgroups(object):
+    """Manages one cgroup v2 leaf per running frame under a delegated root.
+
+    The root directory (rqconstants.RQD_CGROUP_ROOT) must live on a cgroup2
+    mount, be writable by RQD and not contain any process itself so the memory
+    and cpu controllers can be enabled for its children, e.g. a systemd unit
+    with Delegate=yes where RQD runs in a sibling leaf.
+    """
+
+    def __init__(self, root=None):
+        """
+        @type  root: str
+        @param root: Directory holding the frame cgroups
+        """
+        self.root = root or rqd.rqconstants.RQD_CGROUP_ROOT
+        self.__lock = threading.Lock()
+        # { <frameId> : (<usage_usec>, <time>, <pcpu>), ... }
+        self.__cpuHistory = {}
+
+    def isAvailable(self):
+        """Returns whether frame cgroups can be created under the root, enabling
+        the required controllers for its children if needed."""
+        rqd.rqutil.permissionsHigh()
+        try:
+            if not os.path.isdir(self.root):
+                os.makedirs(self.root)
+            controllers = self.__read(self.root, "cgroup.controllers").split()
+            missing = [c for c in CGROUP_CONTROLLERS if c not in controllers]
+            if missing:
+                log.warning("cgroup controllers %s are not delegated to %s",
+                            ",".join(missing), self.root)
+                return False
+            enabled = self.__read(self.root, "cgroup.subtree_control").split()
+            toEnable = ["+" + c for c in CGROUP_CONTROLLERS if c not in enabled]
+            if toEnable:
+                self.__write(self.root, "cgroup.subtree_control", " ".join(toEnable))
+            return True
+        except (OSError, IOError) as e:
+            log.warning("cgroup v2 frame accounting is unavailable under %s: %s", self.root, e)
+            return False
+        finally:
+            rqd.rqutil.permissionsLow()
+
+    def getPath(self, frameId):
+        """Returns the cgroup directory of a frame."""
+        return os.path.join(self.root, "frame-%s" % frameId)
+
+    def create(self, runFrame):
+        """Creates the cgroup of a frame.
+        @type  runFrame: RunFrame
+        @param runFrame: rqd_pb2.RunFrame
+        @rtype:  str
+        @return: Path of the cgroup, None if it couldn't be created"""
+        path = self.getPath(runFrame.frame_id)
+        rqd.rqutil.permissionsHigh()
+        try:
+            if not os.path.isdir(path):
+                os.mkdir(path)
+            if rqd.rqconstants.RQD_CGROUP_ENFORCE_MEMORY_LIMIT and runFrame.hard_memory_limit > 0:
+                # Cuebot sends memory in KB
+                self.__write(path, "memory.max", str(runFrame.hard_memory_limit * 1024))
+        except (OSError, IOError) as e:
+            log.warning("Failed to create cgroup %s: %s", path, e)
+            return None
+        finally:
+            rqd.rqutil.permissionsLow()
+        with self.__lock:
+            self.__cpuHistory[runFrame.frame_id] = (0, time.time(), 0.0)
+        return path
+
+    def getStats(self, frameId):
+        """Reads the accounting files of a frame cgroup.
+        @rtype:  dict
+        @return: procs, memory_current, memory_rss, memory_peak, memory_swap_current
+                 (bytes), usage_usec, user_usec, system_usec and pcpu (percent of
+                 a core), None if the frame has no cgroup."""
+        path = self.getPath(frameId)
+        try:
+            stats = {
+                "procs": self.__read(path, "cgroup.procs").split(),
+                "memory_current": int(self.__read(path, "memory.current")),
+            }
+            cpuStat = dict(line.split() for line in self.__read(path, "cpu.stat").splitlines()
+                           if line.strip())
+        except (OSError, IOError, ValueError):
+            return None
+        # memory.current and memory.peak include the page cache of the files the
+        # frame read or wrote, the resident set is its anonymous and mapped memory
+        memoryStat = self.__readStat(path, "memory.stat")
+        if "anon" in memoryStat:
+            stats["memory_rss"] = memoryStat["anon"] + memoryStat.get("file_mapped", 0)
+        else:
+            stats["memory_rss"] = stats["memory_current"]
+        # Only available on recent kernels or with swap accounting on
+        stats["memory_peak"] = self.__readInt(path, "memory.peak", stats["memory_current"])
+        stats["memory_swap_current"] = self.__readInt(path, "memory.swap.current", 0)
+        for key in ("usage_usec", "user_usec", "system_usec"):
+            stats[key] = int(cpuStat.get(key, 0))
+        stats["pcpu"] = self.__updatePcpu(frameId, stats["usage_usec"])
+        return stats
+
+    def __updatePcpu(self, frameId, usageUsec):
+        """Percent cpu using a decaying average, 50% from the previous sample,
+        50% from the time elapsed since."""
+        now = time.time()
+        with self.__lock:
+            previous = self.__cpuHistory.get(frameId)
+            if previous is None:
+                # Unknown start time, i.e. a recovered frame
+                self.__cpuHistory[frameId] = (usageUsec, now, 0.0)
+                return 0.0
+            oldUsage, oldTime, oldPcpu = previous
+            if now <= oldTime:
+                return oldPcpu
+            pcpu = (usageUsec - oldUsage) / ((now - oldTime) * 1000000.0) * 100
+            if oldUsage:
+                pcpu = (oldPcpu + pcpu) / 2
+            self.__cpuHistory[frameId] = (usageUsec, now, pcpu)
+            return pcpu
+
+    def remove(self, frameId):
+        """Removes the cgroup of a finished frame, killing any process that
+        outlived the frame, and returns its last stats."""
+        path = self.getPath(frameId)
+        stats = self.getStats(frameId)
+        with self.__lock:
+            self.__cpuHistory.pop(frameId, None)
+        rqd.rqutil.permissionsHigh()
+        try:
+            os.rmdir(path)
+        except OSError as e:
+            if e.errno == errno.EBUSY:
+                self.__killLeftovers(path)
+            elif e.errno != errno.ENOENT:
+                log.warning("Failed to remove cgroup %s: %s", path, e)
+        finally:
+            rqd.rqutil.permissionsLow()
+        return stats
+
+    def __killLeftovers(self, path):
+        """Kills the processes left in a cgroup and removes it."""
+        try:
+            log.warning("Killing processes left in %s: %s", path,
+                        self.__read(path, "cgroup.procs").split())
+            self.__write(path, "cgroup.kill", "1")
+            for _ in range(10):
+                if not self.__read(path, "cgroup.procs").strip():
+                    break
+                time.sleep(0.1)
+            os.rmdir(path)
+        except (OSError, IOError) as e:
+            log.warning("Failed to remove cgroup %s: %s", path, e)
+
+    def __readInt(self, path, name, default):
+        try:
+            return int(self.__read(path, name))
+        except (OSError, IOError, ValueError):
+            return default
+
+    def __readStat(self, path, name):
+        try:
+            return {key: int(value) for key, value in
+                    (line.split() for line in self.__read(path, name).splitlines()
+                     if line.strip())}
+        except (OSError, IOError, ValueError):
+            return {}
+
+    @staticmethod
+    def __read(path, name):
+        with open(os.path.join(path, name), "r", encoding='utf-8') as cgroupFile:
+            return cgroupFile.read()
+
+    @staticmethod
+    def __write(path, name, value):
+        with open(os.path.join(path, name), "w", encoding='utf-8') as cgroupFile:
+            cgroupFile.write(value)
@@ -53,6 +53,23 @@ CUEBOT_GRPC_PORT = 8443
 
 # RQD behavior:
 RSS_UPDATE_INTERVAL = 10
+# Only sample the process trees of running frames instead of every pid on the host.
+RQD_USE_FRAME_PROC_SAMPLER = True
+# Number of rss updates between two scans of /proc looking for frame processes that
+# left the frame process tree. 0 disables the scan.
+FRAME_PROC_SAMPLER_RESCAN_INTERVAL = 6
+# Run each frame in its own cgroup v2 leaf under RQD_CGROUP_ROOT and account memory and cpu
+# from it. Falls back to sampling /proc when the root isn't a delegated cgroup2 directory.
+RQD_USE_CGROUPS = False
+RQD_CGROUP_ROOT = "/sys/fs/cgroup/opencue-rqd"
+# Set memory.max of frame cgroups to the frame hard_memory_limit
+RQD_CGROUP_ENFORCE_MEMORY_LIMIT = False
+# Only send the frames that changed since the previous host report, along with a full
+# report every RQD_HOST_REPORT_FULL_INTERVAL_SEC. Cuebot takes the unchanged frames from
+# the reports it got before, a Cuebot that missed them only sees those frames again in
+# the next full report. Keep this interval well below its 300s orphaned proc timeout.
+RQD_HOST_REPORT_DELTA = False
+RQD_HOST_REPORT_FULL_INTERVAL_SEC = 60
 RQD_MIN_PING_INTERVAL_SEC = 5
 RQD_MAX_PING_INTERVAL_SEC = 30
 MAX_LOG_FILES = 15
@@ -69,6 +86,20 @@ RQD_NETWORK_INTERFACE = None
 # 0 or None disables the limit.
 # Default: 1 GiB (can be adjusted per studio requirements via config)
 JOB_LOG_MAX_SIZE_IN_BYTES = 1024 * 1024 * 1024
+# Frame logs are written once this many bytes are pending or every RQD_LOG_FLUSH_INTERVAL_SEC.
+RQD_LOG_BUFFER_SIZE = 64 * 1024
+RQD_LOG_FLUSH_INTERVAL_SEC = 1.0
+# Maximum number of bytes read from a frame stdout/stderr pipe at once
+RQD_LOG_READ_CHUNK_SIZE = 64 * 1024
+# Chunks read per pipe once a frame exited, bounds the wait on daemons it left running
+RQD_LOG_DRAIN_PASSES = 16
+# Follow the output and exit of every frame, and run the rss/ping timers, on a single
+# supervisor thread instead of a thread per frame and per timer (not on Windows)
+RQD_USE_FRAME_SUPERVISOR = True
+# Threads running the frame completion work, the rss/ping timers have their own
+RQD_FRAME_SUPERVISOR_WORKERS = 4
+# How often the exit of frames is checked when pidfds are not supported
+RQD_FRAME_SUPERVISOR_EXIT_POLL_SEC = 1.0
 
 # Use the PATH environment variable from the RQD host.
 RQD_USE_PATH_ENV_VAR = False
@@ -130,6 +161,8 @@ PATH_INIT_TARGET = '/lib/systemd/system/default.target' # rhel7
 PATH_LOADAVG = "/proc/loadavg"
 PATH_STAT = "/proc/stat"
 PATH_MEMINFO = "/proc/meminfo"
+PATH_SYS_CPU = "/sys/devices/system/cpu"
+PATH_SYS_NODE = "/sys/devices/system/node"
 # stat and statm are inaccurate because of kernel internal scability optimation
 # stat/statm/status are inaccurate values, true values are in smaps
 # but RQD user can't read smaps get:
@@ -137,6 +170,9 @@ PATH_MEMINFO = "/proc/meminfo"
 PATH_PROC_PID_STAT = "/proc/{0}/stat"
 PATH_PROC_PID_STATM = "/proc/{0}/statm"
 PATH_PROC_PID_CMDLINE = "/proc/{0}/cmdline"
+PATH_PROC_PID_STATUS = "/proc/{0}/status"
+PATH_PROC_PID_TASK = "/proc/{0}/task"
+PATH_PROC_PID_TASK_CHILDREN = "/proc/{0}/task/{1}/children"
 
 if platform.system() == 'Linux':
     SYS_HERTZ = os.sysconf('SC_CLK_TCK')
@@ -162,6 +198,10 @@ OVERRIDE_NIMBY = None # True to turn on, False to turn off
 USE_NIMBY_PYNPUT = True # True pynput, False select
 OVERRIDE_HOSTNAME = None # Force to use this hostname
 ALLOW_GPU = False
+# GPU sampler: auto, nvml (requires nvidia-ml-py) or nvidia-smi, see rqd.rqgpu
+RQD_GPU_SAMPLER = "auto"
+# Minimum time between two samples of the GPUs
+RQD_GPU_SAMPLE_INTERVAL_SEC = 10
 LOAD_MODIFIER = 0 # amount to add/subtract from load
 
 LOG_FORMAT = '%(levelname)-9s openrqd-%(module)-10s: %(message)s'
@@ -184,6 +224,10 @@ DOCKER_GPU_MODE = False
 # None or ""
 BACKUP_CACHE_PATH = ""
 BACKUP_CACHE_TIME_TO_LIVE_SECONDS = 60
+# The running frames journal is compacted once it is larger than both the min size
+# (bytes) and ratio times the size of the frames still running
+BACKUP_CACHE_COMPACT_MIN_SIZE = 1024 * 1024
+BACKUP_CACHE_COMPACT_RATIO = 4.0
 
 try:
     if os.path.isfile(CONFIG_FILE):
@@ -223,6 +267,11 @@ try:
             OVERRIDE_HOSTNAME = config.get(__override_section, "OVERRIDE_HOSTNAME")
         if config.has_option(__override_section, "GPU"):
             ALLOW_GPU = config.getboolean(__override_section, "GPU")
+        if config.has_option(__override_section, "RQD_GPU_SAMPLER"):
+            RQD_GPU_SAMPLER = config.get(__override_section, "RQD_GPU_SAMPLER")
+        if config.has_option(__override_section, "RQD_GPU_SAMPLE_INTERVAL_SEC"):
+            RQD_GPU_SAMPLE_INTERVAL_SEC = config.getfloat(__override_section,
+                "RQD_GPU_SAMPLE_INTERVAL_SEC")
         if config.has_option(__override_section, "LOAD_MODIFIER"):
             LOAD_MODIFIER = config.getint(__override_section, "LOAD_MODIFIER")
         if config.has_option(__override_section, "RQD_USE_IP_AS_HOSTNAME"):
@@ -256,6 +305,37 @@ try:
         if config.has_option(__override_section, "JOB_LOG_MAX_SIZE_IN_BYTES"):
             JOB_LOG_MAX_SIZE_IN_BYTES = config.getint(__override_section,
                 "JOB_LOG_MAX_SIZE_IN_BYTES")
+        if config.has_option(__override_section, "RQD_LOG_BUFFER_SIZE"):
+            RQD_LOG_BUFFER_SIZE = config.getint(__override_section, "RQD_LOG_BUFFER_SIZE")
+        if config.has_option(__override_section, "RQD_LOG_FLUSH_INTERVAL_SEC"):
+            RQD_LOG_FLUSH_INTERVAL_SEC = config.getfloat(__override_section,
+                "RQD_LOG_FLUSH_INTERVAL_SEC")
+        if config.has_option(__override_section, "RQD_LOG_READ_CHUNK_SIZE"):
+            RQD_LOG_READ_CHUNK_SIZE = config.getint(__override_section, "RQD_LOG_READ_CHUNK_SIZE")
+        if config.has_option(__override_section, "RQD_HOST_REPORT_DELTA"):
+            RQD_HOST_REPORT_DELTA = config.getboolean(__override_section, "RQD_HOST_REPORT_DELTA")
+        if config.has_option(__override_section, "RQD_HOST_REPORT_FULL_INTERVAL_SEC"):
+            RQD_HOST_REPORT_FULL_INTERVAL_SEC = config.getint(__override_section,
+                "RQD_HOST_REPORT_FULL_INTERVAL_SEC")
+        if config.has_option(__override_section, "RQD_USE_FRAME_SUPERVISOR"):
+            RQD_USE_FRAME_SUPERVISOR = config.getboolean(__override_section,
+                "RQD_USE_FRAME_SUPERVISOR")
+        if config.has_option(__override_section, "RQD_FRAME_SUPERVISOR_WORKERS"):
+            RQD_FRAME_SUPERVISOR_WORKERS = config.getint(__override_section,
+                "RQD_FRAME_SUPERVISOR_WORKERS")
+        if config.has_option(__override_section, "RQD_USE_FRAME_PROC_SAMPLER"):
+            RQD_USE_FRAME_PROC_SAMPLER = config.getboolean(__override_section,
+                "RQD_USE_FRAME_PROC_SAMPLER")
+        if config.has_option(__override_section, "FRAME_PROC_SAMPLER_RESCAN_INTERVAL"):
+            FRAME_PROC_SAMPLER_RESCAN_INTERVAL = config.getint(__override_section,
+                "FRAME_PROC_SAMPLER_RESCAN_INTERVAL")
+        if config.has_option(__override_section, "RQD_USE_CGROUPS"):
+            RQD_USE_CGROUPS = config.getboolean(__override_section, "RQD_USE_CGROUPS")
+        if config.has_option(__override_section, "RQD_CGROUP_ROOT"):
+            RQD_CGROUP_ROOT = config.get(__override_section, "RQD_CGROUP_ROOT")
+        if config.has_option(__override_section, "RQD_CGROUP_ENFORCE_MEMORY_LIMIT"):
+            RQD_CGROUP_ENFORCE_MEMORY_LIMIT = config.getboolean(__override_section,
+                "RQD_CGROUP_ENFORCE_MEMORY_LIMIT")
         if config.has_option(__override_section, "CHECK_INTERVAL_LOCKED"):
             CHECK_INTERVAL_LOCKED = config.getint(__override_section, "CHECK_INTERVAL_LOCKED")
         if config.has_option(__override_section, "MINIMUM_IDLE"):
@@ -277,6 +357,12 @@ try:
         if config.has_option(__override_section, "BACKUP_CACHE_TIME_TO_LIVE_SECONDS"):
             BACKUP_CACHE_TIME_TO_LIVE_SECONDS = config.getint(
                 __override_section, "BACKUP_CACHE_TIME_TO_LIVE_SECONDS")
+        if config.has_option(__override_section, "BACKUP_CACHE_COMPACT_MIN_SIZE"):
+            BACKUP_CACHE_COMPACT_MIN_SIZE = config.getint(
+                __override_section, "BACKUP_CACHE_COMPACT_MIN_SIZE")
+        if config.has_option(__override_section, "BACKUP_CACHE_COMPACT_RATIO"):
+            BACKUP_CACHE_COMPACT_RATIO = config.getfloat(
+                __override_section, "BACKUP_CACHE_COMPACT_RATIO")
 
         if config.has_option(__override_section, "RQD_DISPLAY_PATH"):
             RQD_DISPLAY_PATH = config.get(__override_section, "RQD_DISPLAY_PATH")
@@ -22,7 +22,10 @@ from __future__ import division
 
 from builtins import str
 from builtins import object
+import concurrent.futures
 import datetime
+import heapq
+import itertools
 import logging
 import os
 import platform
@@ -35,6 +38,7 @@ import threading
 import time
 import traceback
 import select
+import selectors
 import uuid
 
 import opencue_proto.host_pb2
@@ -42,7 +46,9 @@ import opencue_proto.report_pb2
 import opencue_proto.rqd_pb2
 import rqd.rqconstants
 from rqd.rqconstants import DOCKER_AGENT
+import rqd.rqcgroup
 import rqd.rqexceptions
+import rqd.rqjournal
 import rqd.rqmachine
 import rqd.rqnetwork
 from rqd.rqnimby import Nimby
@@ -84,6 +90,9 @@ class RqCore(object):
         self.updateRssThread = None
         self.onIntervalThread = None
         self.intervalStartTime = 0
+        self.frameSupervisor = None
+        if rqd.rqconstants.RQD_USE_FRAME_SUPERVISOR and platform.system() != "Windows":
+            self.frameSupervisor = FrameSupervisor()
         self.intervalSleepTime = rqd.rqconstants.RQD_MIN_PING_INTERVAL_SEC
 
         #  pylint: disable=unused-private-member
@@ -99,6 +108,7 @@ class RqCore(object):
             self.docker_agent.refreshFrameImages()
 
         self.backup_cache_path = None
+        self.frameJournal = None
         if rqd.rqconstants.BACKUP_CACHE_PATH:
             if not rqd.rqconstants.DOCKER_AGENT:
                 log.warning("Cache backup is currently only available "
@@ -114,6 +124,8 @@ class RqCore(object):
 
     def start(self):
         """Called by main to start the rqd service"""
+        if self.frameSupervisor is not None:
+            self.frameSupervisor.start()
         if self.shouldStartNimby():
             self.nimbyOn()
         self.network.start_grpc()
@@ -122,15 +134,32 @@ class RqCore(object):
         """After gRPC connects to the cuebot, this function is called"""
         self.network.reportRqdStartup(self.machine.getBootReport())
 
-        self.updateRssThread = threading.Timer(rqd.rqconstants.RSS_UPDATE_INTERVAL, self.updateRss)
-        self.updateRssThread.start()
+        self.updateRssThread = self.scheduleTimer(rqd.rqconstants.RSS_UPDATE_INTERVAL,
+                                                  self.updateRss)
 
-        self.onIntervalThread = threading.Timer(self.intervalSleepTime, self.onInterval)
         self.intervalStartTime = time.time()
-        self.onIntervalThread.start()
+        self.onIntervalThread = self.scheduleTimer(self.intervalSleepTime, self.onInterval)
 
         log.warning('RQD Started')
 
+    def scheduleTimer(self, interval, function):
+        """Calls function once after interval seconds, on the frame supervisor
+        if there is one, otherwise in a threading.Timer.
+        @rtype:  threading.Timer or SupervisorTimer
+        @return: The started timer, providing cancel() and is_alive()"""
+        if self.frameSupervisor is not None:
+            return self.frameSupervisor.callLater(interval, function)
+        timer = threading.Timer(interval, function)
+        timer.start()
+        return timer
+
+    def startRssUpdate(self):
+        """Schedules the updating of rss information if it isn't already, it
+        stops by itself once no frame is running."""
+        if self.updateRssThread is None or not self.updateRssThread.is_alive():
+            self.updateRssThread = self.scheduleTimer(rqd.rqconstants.RSS_UPDATE_INTERVAL,
+                                                      self.updateRss)
+
     def onInterval(self, sleepTime=None):
 
         """This is called by self.grpcConnected as a timer thread to execute
@@ -142,9 +171,8 @@ class RqCore(object):
         else:
             self.intervalSleepTime = sleepTime
         try:
-            self.onIntervalThread = threading.Timer(self.intervalSleepTime, self.onInterval)
             self.intervalStartTime = time.time()
-            self.onIntervalThread.start()
+            self.onIntervalThread = self.scheduleTimer(self.intervalSleepTime, self.onInterval)
         # pylint: disable=broad-except
         except Exception as e:
             log.critical(
@@ -196,61 +224,70 @@ class RqCore(object):
                 if self.backup_cache_path:
                     self.backupCache()
             finally:
-                self.updateRssThread = threading.Timer(
+                self.updateRssThread = self.scheduleTimer(
                     rqd.rqconstants.RSS_UPDATE_INTERVAL, self.updateRss)
-                self.updateRssThread.start()
 
-    def backupCache(self):
-        """Backs up a copy of the running frames cache for a possible recovery.
-        each backup is destructive and erases the last known state"""
+    def getFrameJournal(self):
+        """Returns the journal of the running frames, None if backups are off
+        @rtype:  rqd.rqjournal.FrameJournal
+        @return: Journal stored at backup_cache_path"""
         if not self.backup_cache_path:
+            return None
+        if self.frameJournal is None or self.frameJournal.path != self.backup_cache_path:
+            if self.frameJournal is not None:
+                self.frameJournal.close()
+            self.frameJournal = rqd.rqjournal.FrameJournal(self.backup_cache_path)
+        return self.frameJournal
+
+    def backupCache(self):
+        """Appends the changes to the running frames since the last backup to
+        the frames journal, for a possible recovery"""
+        journal = self.getFrameJournal()
+        if journal is None:
             return
-        with open(self.backup_cache_path, "wb") as f:
-            for item in list(self.__cache.values()):
-                serialized = item.runFrame.SerializeToString()
-                f.write(len(serialized).to_bytes(4, byteorder="big"))
-                f.write(serialized)
+        try:
+            journal.sync(list(self.__cache.values()))
+        except (OSError, IOError) as e:
+            log.warning("Failed to backup the running frames to %s: %s",
+                        self.backup_cache_path, e)
 
     def recoverCache(self):
-        """Reload the running frames from the latest backup. The backup file
-        will be rejected if it hasn't been updated recently
+        """Reload the running frames and their max memory usage from the frames
+        journal. The journal will be rejected if it hasn't been updated recently
         (rqconstants.BACKUP_CACHE_TIME_TO_LIVE_SECONDS)
         """
-        if not self.backup_cache_path or \
-            not os.path.exists(self.backup_cache_path) or \
-            (time.time() - os.path.getmtime(self.backup_cache_path) > \
-                rqd.rqconstants.BACKUP_CACHE_TIME_TO_LIVE_SECONDS):
+        journal = self.getFrameJournal()
+        if journal is None or not os.path.exists(self.backup_cache_path):
             return
-        with open(self.backup_cache_path, "rb") as f:
-            while True:
-                # Read length (4 bytes)
-                length_bytes = f.read(4)
-                if not length_bytes:
-                    break  # End of file
-
-                length = int.from_bytes(length_bytes, byteorder='big')
-                # Read the message data
-                message_data = f.read(length)
-
-                run_frame = opencue_proto.rqd_pb2.RunFrame()
-                # Ignore frames that failed to be parsed
-                try:
-                    run_frame.ParseFromString(message_data)
-                    log.warning("Recovered frame %s.%s", run_frame.job_name, run_frame.frame_name)
-                    running_frame = rqd.rqnetwork.RunningFrame(self, run_frame)
-                    running_frame.frameAttendantThread = FrameAttendantThread(
-                        self, run_frame, running_frame, recovery_mode=True)
-                    # Make sure cores are accounted for
-                    # pylint: disable=no-member
-                    self.cores.idle_cores -= run_frame.num_cores
-                    self.cores.booked_cores += run_frame.num_cores
-                    # pylint: enable=no-member
+        if time.time() - os.path.getmtime(self.backup_cache_path) > \
+                rqd.rqconstants.BACKUP_CACHE_TIME_TO_LIVE_SECONDS:
+            log.warning("Ignoring the outdated frames backup %s", self.backup_cache_path)
+            journal.reset()
+            return
+        try:
+            frames = journal.load()
+        except (OSError, IOError) as e:
+            log.warning("Failed to read the frames backup %s: %s", self.backup_cache_path, e)
+            return
+        for run_frame, stats in frames:
+            # Ignore frames that failed to be recovered
+            try:
+                log.warning("Recovered frame %s.%s", run_frame.job_name, run_frame.frame_name)
+                running_frame = rqd.rqnetwork.RunningFrame(self, run_frame)
+                for field, value in stats.items():
+                    setattr(running_frame, field, value)
+                running_frame.frameAttendantThread = FrameAttendantThread(
+                    self, run_frame, running_frame, recovery_mode=True)
+                # Make sure cores are accounted for
+                # pylint: disable=no-member
+                self.cores.idle_cores -= run_frame.num_cores
+                self.cores.booked_cores += run_frame.num_cores
+                # pylint: enable=no-member
 
-                    running_frame.frameAttendantThread.start()
-                # pylint: disable=broad-except
-                except Exception:
-                    pass
-                    # Ignore frames that got corrupted
+                running_frame.frameAttendantThread.start()
+            # pylint: disable=broad-except
+            except Exception:
+                log.exception("Failed to recover frame %s", run_frame.frame_id)
 
     def getFrame(self, frameId):
         """Gets a frame from the cache based on frameId
@@ -285,14 +322,18 @@ class RqCore(object):
         with self.__threadLock:
             if frameId in self.__cache:
                 del self.__cache[frameId]
+                if self.frameJournal is not None:
+                    try:
+                        self.frameJournal.complete(frameId)
+                    except (OSError, IOError) as e:
+                        log.warning("Failed to journal the end of frame %s: %s", frameId, e)
                 # pylint: disable=no-member
                 if not self.__cache and self.cores.reserved_cores:
                     # pylint: disable=no-member
                     log.error(
                         'No running frames but reserved_cores is not empty: %s',
                         self.cores.reserved_cores)
-                    # pylint: disable=no-member
-                    self.cores.reserved_cores.clear()
+                    self.machine.setupTaskset()
                 log.info("Successfully delete frame with Id: %s", frameId)
             else:
                 log.info("Frame with Id: %s not found in cache", frameId)
@@ -666,7 +707,13 @@ class RqCore(object):
 
     def sendStatusReport(self):
         """Sends the current host report to Cuebot."""
-        self.network.reportStatus(self.machine.getHostReport())
+        report = self.machine.getHostReport(delta=rqd.rqconstants.RQD_HOST_REPORT_DELTA)
+        try:
+            self.network.reportStatus(report)
+        except Exception:
+            # Frames that changed would otherwise only be sent once they change again
+            self.machine.resetHostReportDelta()
+            raise
 
     def isWaitingForIdle(self):
         """Returns whether the host is waiting until idle to take some action."""
@@ -721,6 +768,295 @@ class RqCore(object):
                                   runningFrame.runFrame.frame_name)
 
 
+class SupervisorTimer(object):
+    """Callback scheduled on the FrameSupervisor, provides the cancel() and
+    is_alive() methods of threading.Timer used by RqCore."""
+
+    def __init__(self, function):
+        self.function = function
+        self.cancelled = False
+        self.finished = False
+
+    def cancel(self):
+        """Stops the timer if its function didn't run yet."""
+        self.cancelled = True
+
+    def is_alive(self):
+        """Returns whether the function is still to be run or running."""
+        return not (self.cancelled or self.finished)
+
+    def run(self):
+        """Runs the function, called on a supervisor worker."""
+        try:
+            if not self.cancelled:
+                self.function()
+        finally:
+            self.finished = True
+
+
+class _FrameWatch(object):
+    """State of a frame process followed by the FrameSupervisor."""
+
+    def __init__(self, process, onOutput, onExit):
+        self.process = process
+        self.onOutput = onOutput
+        self.onExit = onExit
+        # { <fd> : (<pipe>, <LineBuffer>), ... }
+        self.pipes = {}
+        self.pidfd = None
+        # Set once onExit has been handed to the workers
+        self.finished = False
+
+
+class FrameSupervisor(threading.Thread):
+    """Single thread multiplexing the stdout and stderr pipes and the exit of
+    every frame launched by runLinux, along with the periodic RQD timers, in
+    place of a poll loop per frame and a thread per timer.
+
+    Frame exits are watched through a pidfd when the kernel supports it and
+    polled every RQD_FRAME_SUPERVISOR_EXIT_POLL_SEC otherwise. Output callbacks
+    run on the supervisor thread and must not block. Frame exit callbacks, which
+    talk to the cuebot, run on a small pool of workers, and timer functions on
+    workers of their own so that the ping and rss updates don't queue behind
+    the reports of frames that finished together.
+    """
+
+    # One per RQD timer, the rss update and the ping, so neither waits on the other
+    TIMER_WORKERS = 2
+
+    def __init__(self, workers=None):
+        """
+        @type  workers: int
+        @param workers: Number of threads completing frames, defaults to
+                        RQD_FRAME_SUPERVISOR_WORKERS
+        """
+        threading.Thread.__init__(self, name="FrameSupervisor")
+        self.daemon = True
+        self.__lock = threading.Lock()
+        # Created by start()
+        self.__selector = None
+        self.__wakeRead = self.__wakeWrite = None
+        # [(<monotonic time>, <sequence>, <SupervisorTimer>), ...]
+        self.__timers = []
+        self.__timerSequence = itertools.count()
+        self.__newWatches = []
+        # Frames whose exit can't be watched through a pidfd
+        self.__polledWatches = set()
+        self.__workers = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers or rqd.rqconstants.RQD_FRAME_SUPERVISOR_WORKERS,
+            thread_name_prefix="FrameSupervisorWorker")
+        self.__timerWorkers = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.TIMER_WORKERS, thread_name_prefix="FrameSupervisorTimer")
+
+    def start(self):
+        """Starts the supervisor thread, timers and frames given to it before
+        are handled from then on."""
+        self.__selector = selectors.DefaultSelector()
+        wakeRead, wakeWrite = os.pipe()
+        os.set_blocking(wakeRead, False)
+        os.set_blocking(wakeWrite, False)
+        self.__selector.register(wakeRead, selectors.EVENT_READ)
+        self.__wakeRead, self.__wakeWrite = wakeRead, wakeWrite
+        threading.Thread.start(self)
+
+    def callLater(self, delay, function):
+        """Runs function on a timer worker after delay seconds.
+        @rtype:  SupervisorTimer
+        @return: The scheduled timer"""
+        timer = SupervisorTimer(function)
+        with self.__lock:
+            heapq.heappush(self.__timers,
+                           (time.monotonic() + delay, next(self.__timerSequence), timer))
+        self.__wake()
+        return timer
+
+    def watch(self, process, onOutput, onExit):
+        """Follows a frame process started with stdout and stderr pipes.
+
+        onOutput(data) receives complete lines as they are read, on the
+        supervisor thread. Once the process exited and what was left in its
+        pipes got read, they are closed and onExit(False) is called on a
+        worker. If the frame can't be followed, its pipes are closed and
+        onExit(True) is called instead, while the process may still run.
+        @type  process: subprocess.Popen
+        @param process: The frame process"""
+        with self.__lock:
+            self.__newWatches.append(_FrameWatch(process, onOutput, onExit))
+        self.__wake()
+
+    def __wake(self):
+        if self.__wakeWrite is None:
+            # Not started yet
+            return
+        try:
+            os.write(self.__wakeWrite, b"\0")
+        except BlockingIOError:
+            # Already woken up
+            pass
+
+    def run(self):
+        while True:
+            timeout = self.__runDueTimers()
+            if self.__polledWatches:
+                pollInterval = rqd.rqconstants.RQD_FRAME_SUPERVISOR_EXIT_POLL_SEC
+                timeout = pollInterval if timeout is None else min(timeout, pollInterval)
+            for key, _ in self.__selector.select(timeout):
+                if key.data is None:
+                    self.__drainWakeups()
+                    continue
+                watch, isPidfd = key.data
+                try:
+                    if isPidfd:
+                        if watch.pidfd is not None:
+                            self.__checkExit(watch)
+                    elif key.fd in watch.pipes:
+                        # Not closed by an earlier event of this batch
+                        self.__readPipe(watch, key.fd)
+                # pylint: disable=broad-except
+                except Exception:
+                    self.__fail(watch)
+            self.__addNewWatches()
+            for watch in list(self.__polledWatches):
+                try:
+                    self.__checkExit(watch)
+                # pylint: disable=broad-except
+                except Exception:
+                    self.__fail(watch)
+
+    def __drainWakeups(self):
+        try:
+            while os.read(self.__wakeRead, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def __runDueTimers(self):
+        """Hands due timers to the timer workers, returns the seconds until the next
+        one, None if there is none."""
+        now = time.monotonic()
+        with self.__lock:
+            while self.__timers and self.__timers[0][0] <= now:
+                _, _, timer = heapq.heappop(self.__timers)
+                if not timer.cancelled:
+                    self.__timerWorkers.submit(self.__runSafely, timer.run)
+            if not self.__timers:
+                return None
+            return max(0, self.__timers[0][0] - now)
+
+    @staticmethod
+    def __runSafely(function):
+        try:
+            function()
+        # pylint: disable=broad-except
+        except Exception:
+            log.exception("Frame supervisor callback %s failed", function)
+
+    def __addNewWatches(self):
+        with self.__lock:
+            newWatches, self.__newWatches = self.__newWatches, []
+        for watch in newWatches:
+            try:
+                self.__addWatch(watch)
+            # pylint: disable=broad-except
+            except Exception:
+                self.__fail(watch)
+
+    def __addWatch(self, watch):
+        for pipe in (watch.process.stdout, watch.process.stderr):
+            fd = pipe.fileno()
+            os.set_blocking(fd, False)
+            watch.pipes[fd] = (pipe, rqd.rqlogging.LineBuffer())
+            self.__selector.register(fd, selectors.EVENT_READ, (watch, False))
+        try:
+            watch.pidfd = os.pidfd_open(watch.process.pid)
+            self.__selector.register(watch.pidfd, selectors.EVENT_READ, (watch, True))
+        except (AttributeError, OSError):
+            # No pidfd support, Python < 3.9 or Linux < 5.3
+            if watch.pidfd is not None:
+                os.close(watch.pidfd)
+                watch.pidfd = None
+            self.__polledWatches.add(watch)
+        # It may have exited before being registered
+        self.__checkExit(watch)
+
+    def __readPipe(self, watch, fd):
+        """Reads one chunk of a pipe, returns False if it was empty or closed."""
+        try:
+            chunk = os.read(fd, rqd.rqconstants.RQD_LOG_READ_CHUNK_SIZE)
+        except BlockingIOError:
+            return False
+        except OSError:
+            chunk = b""
+        if not chunk:
+            self.__closePipe(watch, fd)
+            return False
+        self.__output(watch, watch.pipes[fd][1].feed(chunk))
+        return True
+
+    def __closePipe(self, watch, fd):
+        pipe, lineBuffer = watch.pipes.pop(fd)
+        self.__selector.unregister(fd)
+        self.__output(watch, lineBuffer.flush())
+        pipe.close()
+
+    def __output(self, watch, data):
+        if not data:
+            return
+        try:
+            watch.onOutput(data)
+        # pylint: disable=broad-except
+        except Exception:
+            log.exception("Failed to log the output of frame pid %s", watch.process.pid)
+
+    def __checkExit(self, watch):
+        """Completes a frame once its process exited. What is already in the
+        pipes is still read, for a bounded number of chunks as daemons the frame
+        left behind may keep them open."""
+        if watch.process.poll() is None:
+            return
+        for fd in list(watch.pipes):
+            for _ in range(rqd.rqconstants.RQD_LOG_DRAIN_PASSES):
+                if not self.__readPipe(watch, fd):
+                    break
+            if fd in watch.pipes:
+                self.__closePipe(watch, fd)
+        if watch.pidfd is not None:
+            self.__selector.unregister(watch.pidfd)
+            os.close(watch.pidfd)
+            watch.pidfd = None
+        self.__polledWatches.discard(watch)
+        self.__finish(watch, False)
+
+    def __fail(self, watch):
+        """Stops following a frame after an error, called from an exception
+        handler. Only that frame is completed as failed, the others and the
+        timers carry on."""
+        log.exception("Failed to supervise frame pid %s", watch.process.pid)
+        if watch.finished:
+            return
+        fds = list(watch.pipes)
+        if watch.pidfd is not None:
+            fds.append(watch.pidfd)
+        for fd in fds:
+            try:
+                self.__selector.unregister(fd)
+            except (KeyError, ValueError):
+                # Never registered
+                pass
+        for pipe, _ in watch.pipes.values():
+            pipe.close()
+        watch.pipes.clear()
+        if watch.pidfd is not None:
+            os.close(watch.pidfd)
+            watch.pidfd = None
+        self.__polledWatches.discard(watch)
+        self.__finish(watch, True)
+
+    def __finish(self, watch, failed):
+        watch.finished = True
+        self.__workers.submit(self.__runSafely, lambda: watch.onExit(failed))
+
+
 class FrameAttendantThread(threading.Thread):
     """Once a frame has been received and checked by RQD, this class handles
        the launching, waiting on, and cleanup work related to running the
@@ -749,6 +1085,25 @@ class FrameAttendantThread(threading.Thread):
         self.recovery_mode = recovery_mode
         # To suppress duplicate "log size exceeded" messages across loops
         self._log_limit_triggered = False
+        # Set once the frame got handed over to the frame supervisor
+        self._supervised = False
+        self._attended = threading.Event()
+
+    def is_alive(self):
+        """Returns whether the frame is still attended, by this thread or,
+        once handed over, by the frame supervisor."""
+        if self._supervised and not self._attended.is_set():
+            return True
+        return threading.Thread.is_alive(self)
+
+    def join(self, timeout=None):
+        """Waits until the frame is no longer attended, at most timeout seconds
+        in all."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        threading.Thread.join(self, timeout)
+        if self._supervised:
+            self._attended.wait(
+                None if deadline is None else max(0, deadline - time.monotonic()))
 
     def __createEnvVariables(self):
         """Define the environmental variables for the frame"""
@@ -944,9 +1299,12 @@ class FrameAttendantThread(threading.Thread):
                 return (False, "")
             # Log file path is defined at setup()
             log_path = self.runFrame.log_dir_file
-            if not log_path or not os.path.exists(log_path):
-                return (False, "")
-            size = os.path.getsize(log_path)
+            # Buffered loggers count the bytes written, saving a stat per write
+            size = getattr(getattr(self, 'rqlog', None), 'size', None)
+            if size is None:
+                if not log_path or not os.path.exists(log_path):
+                    return (False, "")
+                size = os.path.getsize(log_path)
             if size > limit:
                 msg = (
                     f"Job log size exceeded limit: {size} bytes > {limit} bytes. "
@@ -1019,6 +1377,9 @@ class FrameAttendantThread(threading.Thread):
                                              time.time())
         self._tempLocations.append(tempStatFile)
         tempCommand = []
+        cgroupPath = self.rqCore.machine.createFrameCgroup(runFrame)
+        if cgroupPath:
+            tempCommand += rqd.rqcgroup.joinCommand(cgroupPath)
         if self.rqCore.machine.isDesktop():
             tempCommand += ["/bin/nice"]
         tempCommand += ["/usr/bin/time", "-p", "-o", tempStatFile]
@@ -1043,48 +1404,120 @@ class FrameAttendantThread(threading.Thread):
                                                        stderr=subprocess.PIPE,
                                                        close_fds=True,
                                                        preexec_fn=os.setsid)
+        except Exception:
+            # The frame never started, its cgroup would otherwise be left behind
+            if cgroupPath:
+                self.rqCore.machine.releaseFrameCgroup(frameInfo)
+            raise
         finally:
             rqd.rqutil.permissionsLow()
 
         frameInfo.pid = runFrame.pid = frameInfo.forkedCommand.pid
 
-        if not self.rqCore.updateRssThread.is_alive():
-            self.rqCore.updateRssThread = threading.Timer(rqd.rqconstants.RSS_UPDATE_INTERVAL,
-                                                          self.rqCore.updateRss)
-            self.rqCore.updateRssThread.start()
+        self.rqCore.startRssUpdate()
+        # pylint: disable=attribute-defined-outside-init
+        self._tempStatFile = tempStatFile
+        self._cgroupPath = cgroupPath
+
+        if self.rqCore.frameSupervisor is not None:
+            # The supervisor follows the frame from now on, this thread ends
+            self._supervised = True
+            self.rqCore.frameSupervisor.watch(
+                frameInfo.forkedCommand, self.__logFrameOutput, self.__onSupervisedExit)
+            return
 
+        # Pipes are read in chunks and only complete lines are logged, so
+        # stdout and stderr can't be interleaved mid-line
+        streams = {
+            frameInfo.forkedCommand.stdout.fileno(): rqd.rqlogging.LineBuffer(),
+            frameInfo.forkedCommand.stderr.fileno(): rqd.rqlogging.LineBuffer(),
+        }
         poller = select.poll()
-        poller.register(frameInfo.forkedCommand.stdout, select.POLLIN)
-        poller.register(frameInfo.forkedCommand.stderr, select.POLLIN)
-        while True:
-            for fd, event in poller.poll():
-                if event & select.POLLIN:
-                    if fd == frameInfo.forkedCommand.stdout.fileno():
-                        line = frameInfo.forkedCommand.stdout.readline()
-                    elif fd == frameInfo.forkedCommand.stderr.fileno():
-                        line = frameInfo.forkedCommand.stderr.readline()
-                    else:
-                        continue
-                    if not line:
-                        break
-                    self.rqlog.write(line, prependTimestamp=rqd.rqconstants.RQD_PREPEND_TIMESTAMP)
-                    exceeded, msg = self.__log_size_limit_exceeded()
-                    if exceeded:
-                        def _kill_proc_group():
-                            try:
-                                os.killpg(os.getpgid(frameInfo.forkedCommand.pid),
-                                          rqd.rqconstants.KILL_SIGNAL)
-                            # pylint: disable=broad-except
-                            except Exception:
-                                try:
-                                    frameInfo.forkedCommand.kill()
-                                except Exception:
-                                    pass
-                        self.__terminate_due_to_log_limit(msg, _kill_proc_group)
-                        # Break outer loops after termination
-                        break
-            if frameInfo.forkedCommand.poll() is not None:
-                break
+        for fd in streams:
+            poller.register(fd, select.POLLIN)
+        # Once the frame exited, only what is already in the pipes is read,
+        # daemons it left behind may keep them open
+        drainPasses = None
+        while streams and not self._log_limit_triggered:
+            if drainPasses is None:
+                events = poller.poll()
+            else:
+                events = poller.poll(0)
+                drainPasses -= 1
+                if not events or drainPasses < 0:
+                    break
+            for fd, _ in events:
+                if fd not in streams:
+                    continue
+                try:
+                    chunk = os.read(fd, rqd.rqconstants.RQD_LOG_READ_CHUNK_SIZE)
+                except OSError:
+                    chunk = b""
+                if chunk:
+                    data = streams[fd].feed(chunk)
+                else:
+                    data = streams.pop(fd).flush()
+                    poller.unregister(fd)
+                if data:
+                    self.__logFrameOutput(data)
+                if self._log_limit_triggered:
+                    break
+            if drainPasses is None and frameInfo.forkedCommand.poll() is not None:
+                drainPasses = rqd.rqconstants.RQD_LOG_DRAIN_PASSES
+        for lineBuffer in streams.values():
+            data = lineBuffer.flush()
+            if data:
+                self.__logFrameOutput(data)
+
+        self.__completeLinux()
+
+    def __logFrameOutput(self, data):
+        """Writes frame output to the log, killing the frame once the log
+        size limit is exceeded."""
+        if self._log_limit_triggered:
+            return
+        self.rqlog.write(data, prependTimestamp=rqd.rqconstants.RQD_PREPEND_TIMESTAMP)
+        exceeded, msg = self.__log_size_limit_exceeded()
+        if exceeded:
+            forkedCommand = self.frameInfo.forkedCommand
+
+            def _kill_proc_group():
+                try:
+                    os.killpg(os.getpgid(forkedCommand.pid), rqd.rqconstants.KILL_SIGNAL)
+                # pylint: disable=broad-except
+                except Exception:
+                    try:
+                        forkedCommand.kill()
+                    except Exception:
+                        pass
+            self.__terminate_due_to_log_limit(msg, _kill_proc_group)
+
+    def __onSupervisedExit(self, failed):
+        """Completes a frame followed by the frame supervisor, on one of its workers.
+        @type  failed: bool
+        @param failed: Whether the supervisor stopped following the frame
+                       after an error, before it exited"""
+        try:
+            if failed:
+                # Nothing reads its output anymore
+                self.frameInfo.kill("RQD failed to follow the frame")
+            self.__completeLinux(failed)
+        # pylint: disable=broad-except
+        except Exception:
+            log.critical(
+                "Failed to complete frame %s due to: \n%s",
+                self.frameId, ''.join(traceback.format_exception(*sys.exc_info())))
+        finally:
+            try:
+                self.postFrameAction()
+            finally:
+                self._attended.set()
+
+    def __completeLinux(self, failed=False):
+        """The steps required once a frame process exited under linux
+        @type  failed: bool
+        @param failed: Whether the frame is reported as a failed launch"""
+        frameInfo = self.frameInfo
 
         returncode = frameInfo.forkedCommand.wait()
 
@@ -1100,9 +1533,12 @@ class FrameAttendantThread(threading.Thread):
         # Override exitStatus if job was killed due to log size limit
         if self._log_limit_triggered:
             frameInfo.exitStatus = rqd.rqconstants.EXITSTATUS_FOR_LOG_LIMIT_EXCEEDED
+        if failed:
+            frameInfo.exitStatus = rqd.rqconstants.EXITSTATUS_FOR_FAILED_LAUNCH
+            frameInfo.exitSignal = 0
 
         try:
-            with open(tempStatFile, "r", encoding='utf-8') as statFile:
+            with open(self._tempStatFile, "r", encoding='utf-8') as statFile:
                 frameInfo.realtime = statFile.readline().split()[1]
                 frameInfo.utime = statFile.readline().split()[1]
                 frameInfo.stime = statFile.readline().split()[1]
@@ -1111,6 +1547,9 @@ class FrameAttendantThread(threading.Thread):
         except Exception:
             pass  # This happens when frames are killed
 
+        if self._cgroupPath:
+            self.rqCore.machine.releaseFrameCgroup(frameInfo)
+
         self.__writeFooter()
         self.__cleanup()
 
@@ -1213,12 +1652,11 @@ exec su -s %s %s -c "echo \$$; %s /usr/bin/time -p -o %s %s %s"
         # Write command to a file on the job tmpdir to simplify replaying a frame
         command = self._createCommandFile(command)
         container = None
-        docker_client = None
         container_id = "00000000"
         frameInfo.pid = -1
         try:
             log_stream = None
-            docker_client, container = self.docker_agent.runContainer(
+            container = self.docker_agent.runContainer(
                 image_key=runFrame.os,
                 environment=self.frameEnv,
                 working_dir=self.rqCore.machine.getTempPath(),
@@ -1259,10 +1697,7 @@ exec su -s %s %s -c "echo \$$; %s /usr/bin/time -p -o %s %s %s"
             self.rqlog.write(msg, prependTimestamp=rqd.rqconstants.RQD_PREPEND_TIMESTAMP)
 
             # Ping rss thread on rqCore
-            if self.rqCore.updateRssThread and not self.rqCore.updateRssThread.is_alive():
-                self.rqCore.updateRssThread = threading.Timer(rqd.rqconstants.RSS_UPDATE_INTERVAL,
-                                                            self.rqCore.updateRss)
-                self.rqCore.updateRssThread.start()
+            self.rqCore.startRssUpdate()
 
             # Store container id in case this frame needs to be restored from the backup
             runFrame.attributes["container_id"] = container.short_id
@@ -1313,8 +1748,6 @@ exec su -s %s %s -c "echo \$$; %s /usr/bin/time -p -o %s %s %s"
             if container:
                 container_id = container.short_id
                 container.remove()
-            if docker_client:
-                docker_client.close()
 
         # Find exitStatus and exitSignal
         if returncode < 0:
@@ -1374,10 +1807,7 @@ exec su -s %s %s -c "echo \$$; %s /usr/bin/time -p -o %s %s %s"
 
         frameInfo.pid = runFrame.pid = frameInfo.forkedCommand.pid
 
-        if not self.rqCore.updateRssThread.is_alive():
-            self.rqCore.updateRssThread = threading.Timer(rqd.rqconstants.RSS_UPDATE_INTERVAL,
-                                                          self.rqCore.updateRss)
-            self.rqCore.updateRssThread.start()
+        self.rqCore.startRssUpdate()
 
         while True:
             output = frameInfo.forkedCommand.stdout.readline()
@@ -1437,10 +1867,7 @@ exec su -s %s %s -c "echo \$$; %s /usr/bin/time -p -o %s %s %s"
 
         frameInfo.pid = frameInfo.forkedCommand.pid
 
-        if not self.rqCore.updateRssThread.is_alive():
-            self.rqCore.updateRssThread = threading.Timer(rqd.rqconstants.RSS_UPDATE_INTERVAL,
-                                                          self.rqCore.updateRss)
-            self.rqCore.updateRssThread.start()
+        self.rqCore.startRssUpdate()
 
         while True:
             output = frameInfo.forkedCommand.stdout.readline()
@@ -1583,7 +2010,8 @@ exec su -s %s %s -c "echo \$$; %s /usr/bin/time -p -o %s %s %s"
             # Delay keeps the cuebot from spamming failing booking requests
             time.sleep(10)
         finally:
-            self.postFrameAction()
+            if not self._supervised:
+                self.postFrameAction()
 
     def postFrameAction(self):
         """Action to be executed after a frame completes its execution"""
@@ -1619,7 +2047,7 @@ exec su -s %s %s -c "echo \$$; %s /usr/bin/time -p -o %s %s %s"
             raise RuntimeError("Invalid state: recovered frame does't contain a container id")
         container_id = runFrame.attributes.get("container_id")
 
-        docker_client = self.rqCore.docker_agent.new_client()
+        docker_client = self.rqCore.docker_agent.client()
         # The recovered frame will stream back the logs into a new file,
         # therefore, write a new header
         self.__createEnvVariables()
@@ -1632,8 +2060,7 @@ exec su -s %s %s -c "echo \$$; %s /usr/bin/time -p -o %s %s %s"
 
         try:
             log_stream = None
-            with self.rqCore.docker_agent.docker_lock:
-                container = docker_client.containers.get(container_id)
+            container = docker_client.containers.get(container_id)
             log_stream = container.logs(stream=True)
 
             if not container or not log_stream:
@@ -1654,10 +2081,7 @@ exec su -s %s %s -c "echo \$$; %s /usr/bin/time -p -o %s %s %s"
             self.rqlog.write(msg, prependTimestamp=rqd.rqconstants.RQD_PREPEND_TIMESTAMP)
 
             # Ping rss thread on rqCore
-            if self.rqCore.updateRssThread and not self.rqCore.updateRssThread.is_alive():
-                self.rqCore.updateRssThread = threading.Timer(rqd.rqconstants.RSS_UPDATE_INTERVAL,
-                                                            self.rqCore.updateRss)
-                self.rqCore.updateRssThread.start()
+            self.rqCore.startRssUpdate()
 
             # Attach to the job and follow the logs
             for line in log_stream:
@@ -1702,7 +2126,6 @@ exec su -s %s %s -c "echo \$$; %s /usr/bin/time -p -o %s %s %s"
             if container:
                 container_id = container.short_id
                 container.remove()
-            docker_client.close()
 
         if container:
             # Find exitStatus and exitSignal
@@ -17,7 +17,7 @@
 from __future__ import annotations
 
 import os
-from typing import Tuple
+from concurrent import futures
 from configparser import RawConfigParser
 import logging
 import threading
@@ -26,9 +26,10 @@ import threading
 import docker
 import docker.models
 import docker.types
+import docker.utils
 from docker import DockerClient
 from docker.models.containers import Container
-from docker.errors import APIError, ImageNotFound
+from docker.errors import APIError, DockerException, ImageNotFound
 # pylint: enable=import-error
 
 log = logging.getLogger(__name__)
@@ -44,8 +45,13 @@ class RqDocker:
     DOCKER_IMAGES = "docker.images"
     DOCKER_GPU_MODE = "DOCKER_GPU_MODE"
     DOCKER_SHELL_PATH = "DOCKER_SHELL_PATH"
+    DOCKER_MAX_CONCURRENT_LAUNCHES = "DOCKER_MAX_CONCURRENT_LAUNCHES"
+    DOCKER_CLIENT_POOL_SIZE = "DOCKER_CLIENT_POOL_SIZE"
     OVERRIDE_DOCKER_IMAGES = "OVERRIDE_DOCKER_IMAGES"
 
+    DEFAULT_MAX_CONCURRENT_LAUNCHES = 4
+    DEFAULT_CLIENT_POOL_SIZE = 64
+
     @classmethod
     def fromConfig(cls, config: RawConfigParser):
         """Creates a RqDocker instance from a configuration parser.
@@ -59,7 +65,8 @@ class RqDocker:
             RuntimeError: If Docker images are not properly configured
 
         The config should contain:
-        - [docker.config] section with optional DOCKER_SHELL_PATH and DOCKER_GPU_MODE
+        - [docker.config] section with optional DOCKER_SHELL_PATH, DOCKER_GPU_MODE,
+          DOCKER_MAX_CONCURRENT_LAUNCHES and DOCKER_CLIENT_POOL_SIZE
         - [docker.images] section mapping OS names to Docker image tags
         - [docker.mounts] section defining container mount points
 
@@ -67,6 +74,7 @@ class RqDocker:
             [docker.config]
             DOCKER_SHELL_PATH=/bin/bash
             DOCKER_GPU_MODE=true
+            DOCKER_MAX_CONCURRENT_LAUNCHES=4
 
             [docker.images]
             centos7=centos7.3:latest
@@ -88,6 +96,16 @@ class RqDocker:
             gpu_mode = any(value in config.get(cls.DOCKER_CONFIG, cls.DOCKER_GPU_MODE)
                 for value in ["true", "True", "yes", "Yes", "1"])
 
+        # Number of frame containers that can be created at the same time, and
+        # number of connections to the docker daemon kept open for reuse
+        max_concurrent_launches = cls.DEFAULT_MAX_CONCURRENT_LAUNCHES
+        if config.has_option(cls.DOCKER_CONFIG, cls.DOCKER_MAX_CONCURRENT_LAUNCHES):
+            max_concurrent_launches = config.getint(
+                cls.DOCKER_CONFIG, cls.DOCKER_MAX_CONCURRENT_LAUNCHES)
+        client_pool_size = cls.DEFAULT_CLIENT_POOL_SIZE
+        if config.has_option(cls.DOCKER_CONFIG, cls.DOCKER_CLIENT_POOL_SIZE):
+            client_pool_size = config.getint(cls.DOCKER_CONFIG, cls.DOCKER_CLIENT_POOL_SIZE)
+
         docker_images = {}
         if cls.OVERRIDE_DOCKER_IMAGES in os.environ:
             # The OVERRIDE_DOCKER_IMAGES environment variable can be used to
@@ -149,17 +167,27 @@ class RqDocker:
                 logging.exception("Failed to create Mount for key=%s, value=%s",
                                     mount_name, mount_str)
 
-        return cls(sp_os, docker_images, docker_mounts, docker_shell_path, gpu_mode)
+        return cls(sp_os, docker_images, docker_mounts, docker_shell_path, gpu_mode,
+                   max_concurrent_launches=max_concurrent_launches,
+                   client_pool_size=client_pool_size)
 
     def __init__(self, sp_os:str, docker_images: dict[str, str],
         docker_mounts: list[docker.types.Mount], docker_shell_path: str,
-        gpu_mode: bool):
+        gpu_mode: bool, max_concurrent_launches: int = DEFAULT_MAX_CONCURRENT_LAUNCHES,
+        client_pool_size: int = DEFAULT_CLIENT_POOL_SIZE):
         self.sp_os = sp_os
         self.docker_images = docker_images
         self.docker_mounts = docker_mounts
         self.docker_shell_path = docker_shell_path
-        self.docker_lock = threading.Lock()
         self.gpu_mode=gpu_mode
+        self.client_pool_size = client_pool_size
+        # Creating many containers at once overwhelms the docker daemon, a few at a time
+        # is fine and doesn't make frames booked together wait on each other for long
+        self.launch_slots = threading.BoundedSemaphore(max(max_concurrent_launches, 1))
+        self.__client = None
+        self.__client_lock = threading.Lock()
+        # Digest of the registry version of each frame image last found on this host
+        self.__image_digests: dict[str, str] = {}
 
     @staticmethod
     def parse_mount(mount_string):
@@ -177,24 +205,72 @@ class RqDocker:
             parsed_mounts[name.strip()] = mount_path.strip()
         return parsed_mounts
 
+    def client(self) -> DockerClient:
+        """Returns the docker client shared by all frames, connecting on first use.
+
+        The client keeps a pool of connections to the docker daemon which every frame
+        container launched, followed and recovered by this rqd goes through.
+        """
+        with self.__client_lock:
+            if self.__client is None:
+                self.__client = docker.from_env(max_pool_size=self.client_pool_size)
+            return self.__client
+
     def refreshFrameImages(self):
         """
         Download docker images to be used by frames running on this host
+
+        Images are pulled in parallel. Images whose digest on the registry matches the
+        one already on this host are not pulled again.
         """
-        docker_client = docker.from_env()
-        try:
-            for image in self.docker_images.values():
-                log.info("Downloading frame image: %s", image)
-                name, tag = image.split(":")
-                try:
-                    docker_client.images.pull(name, tag)
-                except (ImageNotFound, APIError) as e:
-                    raise RuntimeError("Failed to download frame docker image for %s:%s - %s" %
-                                        (name, tag, e))
-        finally:
-            docker_client.close()
+        docker_client = self.client()
+        images = list(dict.fromkeys(self.docker_images.values()))
+        with futures.ThreadPoolExecutor(max_workers=max(len(images), 1)) as pool:
+            pulls = [pool.submit(self.__refreshImage, docker_client, image)
+                     for image in images]
+        for pull in pulls:
+            pull.result()
         log.info("Finished downloading frame images")
 
+    def __refreshImage(self, docker_client: DockerClient, image: str):
+        """Pulls a frame image, unless this host already has its latest version."""
+        name, tag = docker.utils.parse_repository_tag(image)
+        digest = None
+        try:
+            digest = docker_client.images.get_registry_data(image).id
+        except DockerException as e:
+            log.info("Failed to get the digest of frame image %s, pulling it: %s", image, e)
+
+        if digest and self.__hasImage(docker_client, image, name, digest):
+            log.info("Frame image %s is up to date", image)
+            return
+
+        log.info("Downloading frame image: %s", image)
+        try:
+            docker_client.images.pull(name, tag)
+        except (ImageNotFound, APIError) as e:
+            raise RuntimeError("Failed to download frame docker image for %s:%s - %s" %
+                                (name, tag, e))
+        if digest:
+            self.__image_digests[image] = digest
+
+    def __hasImage(self, docker_client: DockerClient, image: str, name: str,
+                   digest: str) -> bool:
+        """Returns whether this host has the version of an image with the given digest."""
+        if self.__image_digests.get(image) == digest:
+            return True
+        try:
+            local_image = docker_client.images.get(image)
+        except ImageNotFound:
+            return False
+        except APIError as e:
+            log.warning("Failed to inspect frame image %s: %s", image, e)
+            return False
+        if "%s@%s" % (name, digest) in local_image.attrs.get("RepoDigests", []):
+            self.__image_digests[image] = digest
+            return True
+        return False
+
     def getFrameImage(self, frame_os=None) -> str:
         """
         Get the pre-configured image for the given frame_os.
@@ -219,9 +295,12 @@ class RqDocker:
 
     def runContainer(self, image_key: str, environment: dict[str, str], working_dir: str,
         hostname: str, mem_reservation: str, mem_limit: str,
-        entrypoint: str) -> Tuple[DockerClient, Container]:
+        entrypoint: str) -> Container:
         """Creates and runs a new Docker container with the given parameters.
 
+        Up to DOCKER_MAX_CONCURRENT_LAUNCHES containers are created at the same time,
+        through the shared docker client.
+
         Args:
             image_key: OS key to look up Docker image (e.g. 'centos7')
             environment: Dictionary of environment variables to set in container
@@ -232,50 +311,34 @@ class RqDocker:
             entrypoint: Container entrypoint command
 
         Returns:
-            Tuple[DockerClient, Container]: Docker client and running container objects
+            Container: The running container
 
         Raises:
             InvalidFrameOsError: If image_key doesn't match a configured image
             docker.errors.APIError: If container creation/start fails
             RuntimeError: For other Docker-related failures
         """
-        docker_client = docker.from_env()
         image = self.getFrameImage(image_key)
         device_requests = []
         if self.gpu_mode:
             # Similar to gpu=all on the cli counterpart
             device_requests.append(docker.types.DeviceRequest(count=-1, capabilities=[["gpu"]]))
-        try:
-            # Use a lock to prevent multiple threads from trying to create containers at the same
-            # time. Experiments without a lock resulted in a fail state
-            with self.docker_lock:
-                container = docker_client.containers.run(image=image,
-                    detach=True,
-                    environment=environment,
-                    working_dir=working_dir,
-                    mounts=self.docker_mounts,
-                    privileged=True,
-                    pid_mode="host",
-                    network="host",
-                    stderr=True,
-                    hostname=hostname,
-                    mem_reservation=mem_reservation,
-                    mem_limit=mem_limit,
-                    entrypoint=entrypoint,
-                    device_requests=device_requests)
-            return (docker_client, container)
-        # pylint: disable=broad-except
-        except Exception as e:
-            # Purposedly not closing the connection on a finally here
-            # as the caller might need to interact with the daemon to collect
-            # logs and status. This portion only handles closing the connection in
-            # case docker.run crashes
-            docker_client.close()
-            raise e
-
-    def new_client(self) -> DockerClient:
-        """A wrapper around the creation of a new client instance"""
-        return docker.from_env()
+        docker_client = self.client()
+        with self.launch_slots:
+            return docker_client.containers.run(image=image,
+                detach=True,
+                environment=environment,
+                working_dir=working_dir,
+                mounts=self.docker_mounts,
+                privileged=True,
+                pid_mode="host",
+                network="host",
+                stderr=True,
+                hostname=hostname,
+                mem_reservation=mem_reservation,
+                mem_limit=mem_limit,
+                entrypoint=entrypoint,
+                device_requests=device_requests)
 
 class InvalidFrameOsError(RuntimeError):
     """Invalid setup for frame container"""
@@ -0,0 +1,170 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""GPU samplers used by rqd.rqmachine.Machine to report the GPU memory of the
+host and of each frame."""
+
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+from builtins import object
+import abc
+import logging
+import math
+import subprocess
+
+
+log = logging.getLogger(__name__)
+
+
+class GpuUnit(object):
+    """Memory state of one GPU, in KB."""
+
+    def __init__(self, index, total, free, processes=None):
+        """
+        @type  index: int
+        @param index: Index of the unit, as used in GPU_LIST
+        @type  total: int
+        @param total: Total memory of the unit
+        @type  free: int
+        @param free: Free memory of the unit
+        @type  processes: dict
+        @param processes: { <pid> : <used memory> } of the processes using the
+                          unit, None if the sampler can't attribute memory
+        """
+        self.index = index
+        self.total = total
+        self.free = free
+        self.processes = processes
+
+    @property
+    def used(self):
+        """Memory used on the unit."""
+        return self.total - self.free
+
+
+class GpuSampler(abc.ABC):
+    """Interface of the GPU samplers."""
+
+    @abc.abstractmethod
+    def sample(self):
+        """Reads the state of every GPU of the host.
+        @rtype:  list
+        @return: GpuUnit for each GPU"""
+
+
+class NvidiaSmiGpuSampler(GpuSampler):
+    """Queries nvidia-smi, without per process memory."""
+
+    def sample(self):
+        output = subprocess.getoutput(
+            'nvidia-smi --query-gpu=memory.total,memory.free,count'
+            ' --format=csv,noheader')
+        units = []
+        for index, line in enumerate(output.splitlines()):
+            # Example "16130 MiB, 16103 MiB, 8"
+            # 1 MiB = 1048.576 KB
+            fields = line.split()
+            units.append(GpuUnit(index,
+                                 math.ceil(int(fields[0]) * 1048.576),
+                                 math.ceil(int(fields[2]) * 1048.576)))
+        return units
+
+
+class NvmlGpuSampler(GpuSampler):
+    """Reads the GPUs through the NVML bindings (nvidia-ml-py), which are only
+    imported and initialized on the first sample."""
+
+    def __init__(self):
+        self.__nvml = None
+
+    @staticmethod
+    def isAvailable():
+        """Returns whether the NVML bindings are installed."""
+        try:
+            # pylint: disable=import-outside-toplevel,import-error,unused-import
+            import pynvml  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def __getNvml(self):
+        if self.__nvml is None:
+            # pylint: disable=import-outside-toplevel,import-error
+            import pynvml
+            pynvml.nvmlInit()
+            self.__nvml = pynvml
+        return self.__nvml
+
+    def sample(self):
+        nvml = self.__getNvml()
+        units = []
+        for index in range(nvml.nvmlDeviceGetCount()):
+            handle = nvml.nvmlDeviceGetHandleByIndex(index)
+            memory = nvml.nvmlDeviceGetMemoryInfo(handle)
+            units.append(GpuUnit(index, memory.total // 1024, memory.free // 1024,
+                                 self.__getProcesses(nvml, handle)))
+        return units
+
+    @staticmethod
+    def __getProcesses(nvml, handle):
+        """Returns { <pid> : <used memory> } of a GPU, None if the driver
+        doesn't tell."""
+        processes = {}
+        try:
+            for getter in (nvml.nvmlDeviceGetComputeRunningProcesses,
+                           nvml.nvmlDeviceGetGraphicsRunningProcesses):
+                for process in getter(handle):
+                    # usedGpuMemory is None when not available, ie: under Windows WDDM
+                    used = (process.usedGpuMemory or 0) // 1024
+                    pid = str(process.pid)
+                    processes[pid] = processes.get(pid, 0) + used
+        except nvml.NVMLError as e:
+            log.debug('Failed to read the processes of GPU: %s', e)
+            return None
+        return processes
+
+
+class FakeGpuSampler(GpuSampler):
+    """Returns predefined GPU units, for tests."""
+
+    def __init__(self, units=None):
+        self.units = units or []
+        self.samples = 0
+
+    def sample(self):
+        self.samples += 1
+        return [GpuUnit(unit.index, unit.total, unit.free,
+                        None if unit.processes is None else dict(unit.processes))
+                for unit in self.units]
+
+
+def createGpuSampler(name):
+    """Returns the GPU sampler for rqconstants.RQD_GPU_SAMPLER
+    @type  name: str
+    @param name: auto, nvml or nvidia-smi. auto uses NVML when the bindings
+                 are installed and nvidia-smi otherwise
+    @rtype:  GpuSampler"""
+    if name == 'nvml':
+        return NvmlGpuSampler()
+    if name == 'nvidia-smi':
+        return NvidiaSmiGpuSampler()
+    if name != 'auto':
+        log.warning('Unknown GPU sampler %s, using auto', name)
+    if NvmlGpuSampler.isAvailable():
+        return NvmlGpuSampler()
+    return NvidiaSmiGpuSampler()
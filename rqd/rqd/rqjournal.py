@@ -0,0 +1,329 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Append-only journal of the running frames, used to recover them after an
+RQD restart."""
+
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+from builtins import object
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+
+import opencue_proto.rqd_pb2
+import rqd.rqconstants
+
+
+log = logging.getLogger(__name__)
+
+JOURNAL_MAGIC = b"RQDJRNL1"
+# payload length, crc32 of the type and payload, record type
+RECORD_HEADER = struct.Struct(">IIB")
+RECORD_LAUNCH = 1
+RECORD_STATS = 2
+RECORD_COMPLETE = 3
+# RunningFrame attributes restored on recovery
+STAT_FIELDS = ("maxRss", "maxVsize", "maxUsedGpuMemory")
+
+
+class FrameJournal(object):
+    """Keeps the RunFrame and the accumulated stats of every running frame
+    in an append-only file.
+
+    A launch record is appended when a frame starts (or its RunFrame changes,
+    i.e. once docker set its container_id), a stats record when its max
+    values grow and a complete record when it's gone, so the steady state
+    I/O only depends on the frame churn. Every record is checksummed: a tail
+    torn by a crash is dropped on load. Once the file grows past
+    compactRatio times the size of the live frames it is rewritten to a
+    temporary file and atomically renamed over the journal.
+
+    Files written by the previous length-prefixed backup format are read and
+    converted on load.
+    """
+
+    def __init__(self, path, compactMinSize=None, compactRatio=None):
+        """
+        @type  path: str
+        @param path: Path of the journal file
+        @type  compactMinSize: int
+        @param compactMinSize: Size in bytes under which the journal is never compacted
+        @type  compactRatio: float
+        @param compactRatio: Compact once the file is this many times larger
+                             than the live frames records
+        """
+        self.path = path
+        self.__compactMinSize = compactMinSize if compactMinSize is not None \
+            else rqd.rqconstants.BACKUP_CACHE_COMPACT_MIN_SIZE
+        self.__compactRatio = compactRatio if compactRatio is not None \
+            else rqd.rqconstants.BACKUP_CACHE_COMPACT_RATIO
+        self.__lock = threading.Lock()
+        self.__file = None
+        self.__size = 0
+        # { <frameId> : [<serialized RunFrame>, {<stat field> : <value>},
+        #                <size of the stats record, 0 without stats>], ... }
+        self.__frames = {}
+        # Size of the records compaction would write for the frames
+        self.__liveSize = 0
+
+    def load(self):
+        """Reads the journal, dropping a torn or corrupted tail.
+        @rtype:  list
+        @return: [(RunFrame, {<stat field> : <value>}), ...] of the frames
+                 that were running when it was last written"""
+        with self.__lock:
+            self.__close()
+            self.__frames = {}
+            self.__liveSize = 0
+            self.__size = 0
+            try:
+                with open(self.path, "rb") as journalFile:
+                    data = journalFile.read()
+            except FileNotFoundError:
+                return []
+
+            if data.startswith(JOURNAL_MAGIC):
+                end = self.__replay(data)
+                if end < len(data):
+                    log.warning("Dropping %d bytes of torn or corrupted records from %s",
+                                len(data) - end, self.path)
+                    with open(self.path, "r+b") as journalFile:
+                        journalFile.truncate(end)
+                self.__size = end
+            else:
+                self.__replayLegacy(data)
+                self.__compact()
+
+            frames = []
+            for serialized, stats, _ in self.__frames.values():
+                runFrame = opencue_proto.rqd_pb2.RunFrame()
+                runFrame.ParseFromString(serialized)
+                frames.append((runFrame, dict(stats)))
+            return frames
+
+    def sync(self, runningFrames):
+        """Appends the records needed for the journal to match the running frames.
+        @type  runningFrames: list
+        @param runningFrames: rqd.rqnetwork.RunningFrame objects"""
+        with self.__lock:
+            records = []
+            running = set()
+            for runningFrame in runningFrames:
+                frameId = runningFrame.frameId
+                running.add(frameId)
+                entry = self.__frames.get(frameId)
+                serialized = runningFrame.runFrame.SerializeToString()
+                if entry is None or entry[0] != serialized:
+                    entry = self.__setRunFrame(frameId, serialized)
+                    records.append(self.__record(RECORD_LAUNCH, serialized))
+                stats = {field: getattr(runningFrame, field, 0) for field in STAT_FIELDS}
+                if stats != entry[1]:
+                    records.append(self.__setStats(frameId, entry, stats))
+            for frameId in [frameId for frameId in self.__frames if frameId not in running]:
+                self.__remove(frameId)
+                records.append(self.__record(RECORD_COMPLETE, frameId.encode("utf-8")))
+
+            if records:
+                self.__append(records)
+            elif os.path.exists(self.path):
+                # Keeps the journal fresh for BACKUP_CACHE_TIME_TO_LIVE_SECONDS
+                os.utime(self.path)
+
+    def complete(self, frameId):
+        """Records that a frame is done so it won't be recovered."""
+        with self.__lock:
+            if self.__remove(frameId):
+                self.__append([self.__record(RECORD_COMPLETE, frameId.encode("utf-8"))])
+
+    def reset(self):
+        """Forgets every frame and removes the journal file."""
+        with self.__lock:
+            self.__close()
+            self.__frames = {}
+            self.__liveSize = 0
+            self.__size = 0
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        """Closes the journal file."""
+        with self.__lock:
+            self.__close()
+
+    def __close(self):
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def __replay(self, data):
+        """Applies the records of a journal, returns the offset of the end of
+        the last valid record."""
+        offset = end = len(JOURNAL_MAGIC)
+        while offset + RECORD_HEADER.size <= len(data):
+            length, checksum, recordType = RECORD_HEADER.unpack_from(data, offset)
+            start = offset + RECORD_HEADER.size
+            payload = data[start:start + length]
+            if len(payload) != length or \
+                    zlib.crc32(bytes([recordType]) + payload) != checksum:
+                break
+            try:
+                self.__apply(recordType, payload)
+            # pylint: disable=broad-except
+            except Exception as e:
+                # Checksum collisions or records written by a newer version
+                log.warning("Invalid record in %s at offset %d: %s", self.path, offset, e)
+                break
+            offset = end = start + length
+        return end
+
+    def __apply(self, recordType, payload):
+        if recordType == RECORD_LAUNCH:
+            runFrame = opencue_proto.rqd_pb2.RunFrame()
+            runFrame.ParseFromString(payload)
+            self.__setRunFrame(runFrame.frame_id, payload)
+        elif recordType == RECORD_STATS:
+            stats = json.loads(payload.decode("utf-8"))
+            frameId = stats.pop("frame_id")
+            entry = self.__frames.get(frameId)
+            if entry is not None:
+                stats = dict(entry[1], **{
+                    field: stats[field] for field in STAT_FIELDS if field in stats})
+                self.__setStats(frameId, entry, stats)
+        elif recordType == RECORD_COMPLETE:
+            self.__remove(payload.decode("utf-8"))
+        else:
+            raise ValueError("unknown record type %d" % recordType)
+
+    def __replayLegacy(self, data):
+        """Reads the 4 bytes length-prefixed RunFrames of the previous backup
+        format, stopping at the first one that can't be parsed."""
+        offset = 0
+        while offset + 4 <= len(data):
+            length = int.from_bytes(data[offset:offset + 4], byteorder="big")
+            payload = data[offset + 4:offset + 4 + length]
+            if len(payload) != length:
+                break
+            try:
+                self.__apply(RECORD_LAUNCH, payload)
+            # pylint: disable=broad-except
+            except Exception:
+                break
+            offset += 4 + length
+        if self.__frames:
+            log.info("Converting %d frames from the backup %s to a journal",
+                     len(self.__frames), self.path)
+
+    @staticmethod
+    def __noStats():
+        return dict.fromkeys(STAT_FIELDS, 0)
+
+    @staticmethod
+    def __record(recordType, payload):
+        return RECORD_HEADER.pack(len(payload), zlib.crc32(bytes([recordType]) + payload),
+                                  recordType) + payload
+
+    def __statsRecord(self, frameId, stats):
+        payload = dict(stats, frame_id=frameId)
+        return self.__record(RECORD_STATS, json.dumps(payload, sort_keys=True).encode("utf-8"))
+
+    def __setRunFrame(self, frameId, serialized):
+        """Sets the RunFrame of a frame, returns its entry."""
+        entry = self.__frames.get(frameId)
+        if entry is None:
+            entry = self.__frames[frameId] = [serialized, self.__noStats(), 0]
+            self.__liveSize += RECORD_HEADER.size + len(serialized)
+        else:
+            self.__liveSize += len(serialized) - len(entry[0])
+            entry[0] = serialized
+        return entry
+
+    def __setStats(self, frameId, entry, stats):
+        """Sets the stats of a frame, returns their record."""
+        record = self.__statsRecord(frameId, stats)
+        statsSize = len(record) if any(stats.values()) else 0
+        self.__liveSize += statsSize - entry[2]
+        entry[1] = stats
+        entry[2] = statsSize
+        return record
+
+    def __remove(self, frameId):
+        """Forgets a frame, returns whether it was known."""
+        entry = self.__frames.pop(frameId, None)
+        if entry is None:
+            return False
+        self.__liveSize -= RECORD_HEADER.size + len(entry[0]) + entry[2]
+        return True
+
+    def __liveRecords(self):
+        records = []
+        for frameId, (serialized, stats, _) in self.__frames.items():
+            records.append(self.__record(RECORD_LAUNCH, serialized))
+            if any(stats.values()):
+                records.append(self.__statsRecord(frameId, stats))
+        return records
+
+    def __append(self, records):
+        if self.__file is None:
+            # pylint: disable=consider-using-with
+            self.__file = open(self.path, "ab")
+            self.__size = self.__file.tell()
+            if self.__size == 0:
+                self.__file.write(JOURNAL_MAGIC)
+                self.__size = len(JOURNAL_MAGIC)
+        data = b"".join(records)
+        self.__file.write(data)
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+        self.__size += len(data)
+
+        liveSize = len(JOURNAL_MAGIC) + self.__liveSize
+        if self.__size > max(self.__compactMinSize, self.__compactRatio * liveSize):
+            self.__compact()
+
+    def __compact(self):
+        """Rewrites the journal with the live frames only, atomically replacing
+        the previous file."""
+        self.__close()
+        data = JOURNAL_MAGIC + b"".join(self.__liveRecords())
+        tmpPath = self.path + ".tmp"
+        with open(tmpPath, "wb") as tmpFile:
+            tmpFile.write(data)
+            tmpFile.flush()
+            os.fsync(tmpFile.fileno())
+        os.replace(tmpPath, self.path)
+        self.__syncDirectory()
+        self.__size = len(data)
+
+    def __syncDirectory(self):
+        """Makes the rename durable."""
+        try:
+            dirFd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(dirFd)
+        except OSError:
+            pass
+        finally:
+            os.close(dirFd)
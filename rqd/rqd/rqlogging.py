@@ -18,10 +18,12 @@
 from __future__ import annotations
 import abc
 import logging
+import threading
 import time
 import os
 import datetime
 import platform
+import weakref
 
 import rqd.rqconstants
 
@@ -29,8 +31,74 @@ log = logging.getLogger(__name__)
 log.setLevel(rqd.rqconstants.CONSOLE_LOG_LEVEL)
 
 
+class LineBuffer:
+    """Splits the chunks read from a pipe into complete lines, keeping the
+    trailing partial line until the next chunk so output of different pipes
+    never gets interleaved mid-line."""
+
+    def __init__(self, maxLineSize=None):
+        """
+        @type  maxLineSize: int
+        @param maxLineSize: A partial line is returned as is once it gets
+                            bigger than this, defaults to RQD_LOG_BUFFER_SIZE
+        """
+        self._partial = b""
+        self._maxLineSize = maxLineSize or rqd.rqconstants.RQD_LOG_BUFFER_SIZE
+
+    def feed(self, chunk):
+        """Adds a chunk and returns the complete lines it ends, b"" if none."""
+        data = self._partial + chunk
+        end = data.rfind(b"\n") + 1
+        if end == 0 and len(data) < self._maxLineSize:
+            self._partial = data
+            return b""
+        if end == 0:
+            end = len(data)
+        self._partial = data[end:]
+        return data[:end]
+
+    def flush(self):
+        """Returns the partial line left once the pipe is closed."""
+        data, self._partial = self._partial, b""
+        return data
+
+
+class _LogFlusher(threading.Thread):
+    """Flushes the buffered frame logs every RQD_LOG_FLUSH_INTERVAL_SEC so
+    output of quiet frames doesn't stay in memory. A single thread serves
+    every RqdLogger."""
+
+    _instance = None
+    _instanceLock = threading.Lock()
+
+    def __init__(self):
+        threading.Thread.__init__(self, name="RqdLogFlusher")
+        self.daemon = True
+        self.loggers = weakref.WeakSet()
+
+    @classmethod
+    def register(cls, rqdLogger):
+        """Adds a logger, starting the flusher thread on first use."""
+        with cls._instanceLock:
+            if cls._instance is None:
+                cls._instance = cls()
+                cls._instance.start()
+            cls._instance.loggers.add(rqdLogger)
+
+    def run(self):
+        while True:
+            time.sleep(rqd.rqconstants.RQD_LOG_FLUSH_INTERVAL_SEC)
+            for rqdLogger in list(self.loggers):
+                rqdLogger.flush()
+
+
 class RqdLogger:
-    """Class to abstract file logging, this class tries to act as a file object"""
+    """Class to abstract file logging, this class tries to act as a file object
+
+    Writes are buffered, the file gets written once RQD_LOG_BUFFER_SIZE bytes
+    are pending or every RQD_LOG_FLUSH_INTERVAL_SEC. The number of bytes
+    written is kept in size so the log size limit doesn't need to stat the file.
+    """
     filepath = None
     fd = None
     type = 0
@@ -41,6 +109,7 @@ class RqdLogger:
            @param   filepath: The filepath to log to
         """
         self.filepath = filepath
+        self.size = 0
         self._strategy = _make_strategy(self)
 
         log_dir = os.path.dirname(self.filepath)
@@ -70,7 +139,8 @@ class RqdLogger:
             self._strategy.rotateLogFile()
 
         # pylint: disable=consider-using-with
-        self.fd = open(self.filepath, "w+", 1, encoding='utf-8')
+        self.fd = open(self.filepath, "wb+", rqd.rqconstants.RQD_LOG_BUFFER_SIZE)
+        _LogFlusher.register(self)
         try:
             os.chmod(self.filepath, 0o666)
         # pylint: disable=broad-except
@@ -80,23 +150,34 @@ class RqdLogger:
 
     # pylint: disable=arguments-differ
     def write(self, data, prependTimestamp=False):
-        """Abstract write function that will write to the correct backend"""
+        """Abstract write function that will write to the correct backend.
+        data can hold many lines, when prepending they all get the same timestamp."""
         # Convert data to unicode
         if isinstance(data, bytes):
             data = data.decode("utf-8", errors="ignore")
         if prependTimestamp is True:
-            lines = data.splitlines()
             curr_line_timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-            for line in lines:
-                print("[%s] %s" % (curr_line_timestamp, line), file=self)
-        else:
-            self.fd.write(data)
+            data = "".join("[%s] %s\n" % (curr_line_timestamp, line)
+                           for line in data.splitlines())
+        if os.linesep != "\n":
+            data = data.replace("\n", os.linesep)
+        encoded = data.encode("utf-8")
+        self.fd.write(encoded)
+        self.size += len(encoded)
 
     def writelines(self, __lines):
         """Provides support for writing mutliple lines at a time"""
         for line in __lines:
             self.write(line)
 
+    def flush(self):
+        """Writes pending data to the file"""
+        try:
+            self.fd.flush()
+        except ValueError:
+            # Already closed
+            pass
+
     def close(self):
         """Closes the file if the backend is file based"""
         self.fd.close()
@@ -155,11 +236,13 @@ class LokiLogger:
         Provides write function for writing to loki server.
         Ignores prepentTimeStamp which is redundant with Loki
         """
-        if len(data.strip()) == 0:
-            return
         if isinstance(data, bytes):
             data = data.decode('utf-8', errors='ignore')
-        requestStatus, requestCode = self.client.post(self.defaultLogData, [data.strip()])
+        # data can be a chunk of many lines, post one entry per line
+        lines = [line.strip() for line in data.splitlines() if line.strip()]
+        if not lines:
+            return
+        requestStatus, requestCode = self.client.post(self.defaultLogData, lines)
         if requestStatus is not True:
             raise IOError(f"Failed to write log to loki server with error : {requestCode}")
 
@@ -28,7 +28,6 @@ import codecs
 import ctypes
 import errno
 import logging
-import math
 import os
 import platform
 import re
@@ -54,9 +53,13 @@ import psutil
 
 import opencue_proto.host_pb2
 import opencue_proto.report_pb2
+import rqd.rqcgroup
 import rqd.rqconstants
 import rqd.rqexceptions
+import rqd.rqgpu
+import rqd.rqproc
 import rqd.rqswap
+import rqd.rqtopology
 import rqd.rqutil
 
 
@@ -76,6 +79,8 @@ class Machine(object):
         self.__rqCore = rqCore
         self.__coreInfo = coreInfo
         self.__gpusets = set()
+        # Created on first use from rqconstants.RQD_GPU_SAMPLER, see rqd.rqgpu
+        self.gpuSampler = None
 
         # A dictionary built from /proc/cpuinfo containing
         # { <physical id> : { <core_id> : set([<processor>, <processor>, ...]), ... }, ... }
@@ -85,8 +90,21 @@ class Machine(object):
         # { <processor> : (<physical id>, <core_id>), ... }
         self.__physid_and_coreid_by_proc = {}
 
+        # Free physical cores, rebuilt by setupTaskset
+        self.__coreIndex = None
+
+        self.__procSampler = None
+        self.__frameCgroups = None
         if platform.system() == 'Linux':
             self.__vmstat = rqd.rqswap.VmStat()
+            if rqd.rqconstants.RQD_USE_FRAME_PROC_SAMPLER:
+                self.__procSampler = rqd.rqproc.FrameProcSampler()
+            if rqd.rqconstants.RQD_USE_CGROUPS:
+                frameCgroups = rqd.rqcgroup.FrameCgroups()
+                if frameCgroups.isAvailable():
+                    self.__frameCgroups = frameCgroups
+                else:
+                    log.warning('Falling back to /proc sampling for frame accounting')
 
         self.state = opencue_proto.host_pb2.UP
 
@@ -103,6 +121,9 @@ class Machine(object):
         # pylint: disable=no-member
         self.__hostReport.core_info.CopyFrom(self.__coreInfo)
         # pylint: enable=no-member
+        # Frame infos sent in the previous delta host report, by frame id
+        self.__reportedFrames = {}
+        self.__lastFullReportTime = 0
 
         self.__pidHistory = {}
 
@@ -181,7 +202,16 @@ class Machine(object):
         return False
 
     def __updateGpuAndLlu(self, frame):
-        if 'GPU_LIST' in frame.runFrame.attributes:
+        processes = self.__getGpuValues()['processes']
+        if processes is not None:
+            # Memory of the frame processes, wherever they run
+            framePids = set(frame.childrenProcs)
+            framePids.add(str(frame.pid))
+            usedGpuMemory = sum(processes.get(pid, 0) for pid in framePids)
+            if usedGpuMemory or 'GPU_LIST' in frame.runFrame.attributes:
+                frame.usedGpuMemory = usedGpuMemory
+                frame.maxUsedGpuMemory = max(usedGpuMemory, frame.maxUsedGpuMemory)
+        elif 'GPU_LIST' in frame.runFrame.attributes:
             usedGpuMemory = 0
             for unitId in frame.runFrame.attributes.get('GPU_LIST').split(','):
                 usedGpuMemory += self.getGpuMemoryUsed(unitId)
@@ -194,23 +224,8 @@ class Machine(object):
             frame.lluTime = int(stat)
 
     def _getStatFields(self, pidFilePath):
-        """ Read stats file and return list of values
-        Stats file can star with these formats:
-         - 105 name ...
-         - 105 (name) ...
-         - 105 (name with space) ...
-         - 105 (name with) (space and parenthesis) ...
-        """
-        with open(pidFilePath, "r", encoding='utf-8') as statFile:
-            txt = statFile.read()
-            try:
-                open_par_index = txt.index('(')
-                close_par_index = txt.rindex(')')
-                name = txt[open_par_index:close_par_index].strip("()")
-                reminder = (txt[0:open_par_index] + txt[close_par_index + 1:]).split()
-                return reminder[0:1] + [name] + reminder[1:]
-            except ValueError:
-                return txt.split()
+        """ Read stats file and return list of values, see rqd.rqproc.getStatFields"""
+        return rqd.rqproc.getStatFields(pidFilePath)
 
     def rssUpdateWindows(self, frames):
         """Updates the rss and maxrss for all running frames on Windows"""
@@ -235,7 +250,9 @@ class Machine(object):
             dict[str, dict[str, str]],
             dict[str, list[str]]]:
         """
-        Read all proc files and organize them by pids and sessionid for querying
+        Read all proc files and organize them by pids and sessionid for querying.
+        Only used when RQD_USE_FRAME_PROC_SAMPLER is off, see rqd.rqproc.FrameProcSampler
+        for the targeted alternative.
 
         @return: Dict with data about each pid
         @return: Dics with key=sessionid and value=pid
@@ -258,44 +275,8 @@ class Machine(object):
                     if parentid in frame_pids:
                         children.setdefault(parentid, []).append(pid)
 
-                    data = {
-                        "name": statFields[1],
-                        "state": statFields[2],
-                        "pgrp": statFields[4],
-                        "session": sessionid,
-                        # virtual memory size is in bytes convert to kb
-                        "vsize": int(statFields[22]),
-                        "rss": statFields[23],
-                        # These are needed to compute the cpu used
-                        "utime": statFields[13],
-                        "stime": statFields[14],
-                        "cutime": statFields[15],
-                        "cstime": statFields[16],
-                        # The time in jiffies the process started
-                        # after system boot.
-                        "start_time": statFields[21],
-                        # Fetch swap usage
-                        "swap": self._getProcSwap(pid),
-                    }
-
-                    # TODO: Improve this logic to avoid collecting data from all running procs.
-                    # instead, focus on the monitored procs hierarchy
-                    # cmdline:
-                    p = psutil.Process(int(pid))
-                    data["cmd_line"] = p.cmdline()
-
-                    # 2. Collect Statm file: /proc/[pid]/statm (same as status vsize in kb)
-                    #    - size: "total program size"
-                    #    - rss: inaccurate, similar to VmRss in /proc/[pid]/status
-                    child_statm_fields = self._getStatFields(
-                        rqd.rqconstants.PATH_PROC_PID_STATM.format(pid))
-                    data['statm_size'] = \
-                        int(re.search(r"\d+", child_statm_fields[0]).group()) \
-                        if re.search(r"\d+", child_statm_fields[0]) else -1
-                    data['statm_rss'] = \
-                        int(re.search(r"\d+", child_statm_fields[1]).group()) \
-                        if re.search(r"\d+", child_statm_fields[1]) else -1
-                    pids[pid] = data
+                    cmdline = psutil.Process(int(pid)).cmdline()
+                    pids[pid] = rqd.rqproc.readPidData(pid, statFields, cmdline)
 
                 # pylint: disable=broad-except
                 except (OSError, IOError, psutil.ZombieProcess):
@@ -322,7 +303,23 @@ class Machine(object):
             return
 
         frame_pids = [str(f.pid) for f in frames.values()]
-        (pids, sessions) = self.collect_linux_pids_and_sessions(frame_pids)
+
+        # Frames running in their own cgroup are accounted from it, the cgroup
+        # also lists processes that left the frame session.
+        cgroupStats = {}
+        cgroupProcs = {}
+        if self.__frameCgroups is not None:
+            for frame in list(frames.values()):
+                stats = self.__frameCgroups.getStats(frame.frameId)
+                if stats is not None and stats["procs"]:
+                    cgroupStats[frame.frameId] = stats
+                    cgroupProcs[str(frame.pid)] = stats["procs"]
+
+        if self.__procSampler is not None:
+            (pids, sessions) = self.__procSampler.sample(frame_pids, cgroupProcs)
+        else:
+            (pids, sessions) = self.collect_linux_pids_and_sessions(frame_pids)
+            sessions.update(cgroupProcs)
 
         # pylint: disable=too-many-nested-blocks
         try:
@@ -417,6 +414,12 @@ class Machine(object):
                     vsize = int(vsize/1024)
                     swap = swap // 1024
 
+                    if frame.frameId in cgroupStats:
+                        stats = cgroupStats[frame.frameId]
+                        rss = stats["memory_rss"] // 1024
+                        swap = stats["memory_swap_current"] // 1024
+                        pcpu = stats["pcpu"]
+
                     frame.rss = rss
                     frame.maxRss = max(rss, frame.maxRss)
                     frame.usedSwapMemory = swap
@@ -439,20 +442,27 @@ class Machine(object):
         except Exception as e:
             log.exception('Failure with rss update due to: %s', e)
 
+    def createFrameCgroup(self, runFrame):
+        """Creates the cgroup a frame will run in when cgroup accounting is enabled
+        @type  runFrame: RunFrame
+        @param runFrame: rqd_pb2.RunFrame
+        @rtype:  str
+        @return: The path of the frame cgroup, None if frames don't run in cgroups"""
+        if self.__frameCgroups is None:
+            return None
+        return self.__frameCgroups.create(runFrame)
+
+    def releaseFrameCgroup(self, frame):
+        """Removes the cgroup of a finished frame
+        @type  frame: rqd.rqnetwork.RunningFrame
+        @param frame: The finished frame"""
+        if self.__frameCgroups is None:
+            return
+        self.__frameCgroups.remove(frame.frameId)
+
     def _getProcSwap(self, pid):
         """Helper function to get swap memory used by a process"""
-        swap_used = 0
-        try:
-            with open("/proc/%s/status" % pid, "r", encoding='utf-8') as statusFile:
-                for line in statusFile:
-                    if line.startswith("VmSwap:"):
-                        swap_used = int(line.split()[1])
-                        break
-        except FileNotFoundError:
-            log.info('Process %s terminated before swap info could be read.', pid)
-        except Exception as e:
-            log.warning('Failed to read swap usage for pid %s: %s', pid, e)
-        return swap_used
+        return rqd.rqproc.getProcSwap(pid)
 
     def getLoadAvg(self):
         """Returns average number of processes waiting to be served
@@ -498,47 +508,44 @@ class Machine(object):
 
     # pylint: disable=attribute-defined-outside-init
     def __resetGpuResults(self):
-        self.gpuResults = {'count': 0, 'total': 0, 'free': 0, 'used': {}, 'updated': 0}
+        self.gpuResults = {'count': 0, 'total': 0, 'free': 0, 'used': {}, 'processes': None,
+                           'updated': 0}
 
     def __getGpuValues(self):
+        """Samples the GPUs at most every rqconstants.RQD_GPU_SAMPLE_INTERVAL_SEC"""
         if not hasattr(self, 'gpuNotSupported'):
             if not hasattr(self, 'gpuResults'):
                 self.__resetGpuResults()
             if not rqd.rqconstants.ALLOW_GPU:
                 self.gpuNotSupported = True
                 return self.gpuResults
-            if self.gpuResults['updated'] > int(time.time()) - 60:
+            if time.time() - self.gpuResults['updated'] < \
+                    rqd.rqconstants.RQD_GPU_SAMPLE_INTERVAL_SEC:
                 return self.gpuResults
             try:
-                nvidia_smi = subprocess.getoutput(
-                    'nvidia-smi --query-gpu=memory.total,memory.free,count'
-                    ' --format=csv,noheader')
-                total = 0
-                free = 0
-                count = 0
-                unitId = 0
-                for line in nvidia_smi.splitlines():
-                    # Example "16130 MiB, 16103 MiB, 8"
-                    # 1 MiB = 1048.576 KB
-                    l = line.split()
-                    unitTotal = math.ceil(int(l[0]) * 1048.576)
-                    unitFree = math.ceil(int(l[2]) * 1048.576)
-                    total += unitTotal
-                    free += unitFree
-                    count = int(l[-1])
-                    self.gpuResults['used'][str(unitId)] = unitTotal - unitFree
-                    unitId += 1
-
-                self.gpuResults['total'] = int(total)
-                self.gpuResults['free'] = int(free)
-                self.gpuResults['count'] = count
-                self.gpuResults['updated'] = int(time.time())
+                if self.gpuSampler is None:
+                    self.gpuSampler = rqd.rqgpu.createGpuSampler(rqd.rqconstants.RQD_GPU_SAMPLER)
+                units = self.gpuSampler.sample()
+                processes = {}
+                for unit in units:
+                    if unit.processes is None:
+                        processes = None
+                    elif processes is not None:
+                        for pid, used in unit.processes.items():
+                            processes[pid] = processes.get(pid, 0) + used
+
+                self.gpuResults['used'] = {str(unit.index): unit.used for unit in units}
+                self.gpuResults['processes'] = processes if units else None
+                self.gpuResults['total'] = int(sum(unit.total for unit in units))
+                self.gpuResults['free'] = int(sum(unit.free for unit in units))
+                self.gpuResults['count'] = len(units)
+                self.gpuResults['updated'] = time.time()
             # pylint: disable=broad-except
             except Exception as e:
                 self.gpuNotSupported = True
                 self.__resetGpuResults()
                 log.warning(
-                    'Failed to query nvidia-smi due to: %s at %s',
+                    'Failed to query the GPUs due to: %s at %s',
                     e, traceback.extract_tb(sys.exc_info()[2]))
         else:
             self.__resetGpuResults()
@@ -895,23 +902,51 @@ class Machine(object):
         self.updateMachineStats()
         return self.__renderHost
 
-    def getHostReport(self):
-        """Updates and returns the hostReport struct"""
+    def getHostReport(self, delta=False):
+        """Updates and returns the hostReport struct
+        @type  delta: bool
+        @param delta: Only list the frames whose info changed since the previous
+                      delta report, setting frames_delta, and the ids of the
+                      other running frames in unchanged_frame_ids. All frames
+                      are still listed every RQD_HOST_REPORT_FULL_INTERVAL_SEC."""
         self.__hostReport.host.CopyFrom(self.getHostInfo())
 
+        now = time.time()
+        full = not delta or \
+            now - self.__lastFullReportTime >= rqd.rqconstants.RQD_HOST_REPORT_FULL_INTERVAL_SEC
+
         self.__hostReport.ClearField('frames')
+        self.__hostReport.ClearField('unchanged_frame_ids')
         self.__rqCore.sanitizeFrames()
+        reportedFrames = {}
         for frameKey in self.__rqCore.getFrameKeys():
             try:
                 info = self.__rqCore.getFrame(frameKey).runningFrameInfo()
-                self.__hostReport.frames.extend([info])
             except KeyError:
-                pass
+                continue
+            reportedFrames[frameKey] = info
+            # Frame infos are only rebuilt when they changed
+            if full or self.__reportedFrames.get(frameKey) is not info:
+                self.__hostReport.frames.extend([info])
+            else:
+                self.__hostReport.unchanged_frame_ids.append(info.frame_id)
+        self.__hostReport.frames_delta = not full
+
+        if delta:
+            self.__reportedFrames = reportedFrames
+            if full:
+                self.__lastFullReportTime = now
 
         self.__hostReport.core_info.CopyFrom(self.__rqCore.getCoreInfo())
 
         return self.__hostReport
 
+    def resetHostReportDelta(self):
+        """Makes the next delta host report list all frames, i.e. when the
+        previous one couldn't be sent."""
+        self.__reportedFrames = {}
+        self.__lastFullReportTime = 0
+
     def getBootReport(self):
         """Updates and returns the bootReport struct"""
         self.__bootReport.host.CopyFrom(self.getHostInfo())
@@ -931,6 +966,8 @@ class Machine(object):
     def setupTaskset(self):
         """ Setup rqd for hyper-threading """
         self.__coreInfo.reserved_cores.clear()
+        self.__coreIndex = rqd.rqtopology.CoreIndex(
+            rqd.rqtopology.CpuTopology(self.__procs_by_physid_and_coreid))
 
     def setupGpu(self):
         """ Setup rqd for Gpus """
@@ -942,19 +979,9 @@ class Machine(object):
         @return: (avail_cores_dict, avail_cores_count) where avail_cores_dict
                  maps physid -> set(coreid) and avail_cores_count is the total count
         """
-        avail_cores = {}
-        avail_cores_count = 0
-        reserved_cores = self.__coreInfo.reserved_cores
-
-        for physid, cores in self.__procs_by_physid_and_coreid.items():
-            for coreid in cores.keys():
-                if int(physid) in reserved_cores and \
-                        int(coreid) in reserved_cores[int(physid)].coreid:
-                    continue
-                avail_cores.setdefault(physid, set()).add(coreid)
-                avail_cores_count += 1
-
-        return avail_cores, avail_cores_count
+        avail_cores = {physid: cores for physid, cores
+                       in self.__coreIndex.getFreeBySocket().items() if cores}
+        return avail_cores, self.__coreIndex.freeCount
 
     def canReserveHT(self, frameCores: int):
         """Check if hyperthreading cores can be reserved without actually reserving them
@@ -966,13 +993,13 @@ class Machine(object):
         if frameCores % 100:
             return False
 
-        _, avail_cores_count = self._getAvailableHTCores()
-        remaining_cores = frameCores / 100
-        return avail_cores_count >= remaining_cores
+        return self.__coreIndex.canReserve(frameCores // 100)
 
     def reserveHT(self, frameCores: int):
         """ Reserve cores for use by taskset
         taskset -c 0,1,8,9 COMMAND
+        The cores are kept within a single L3 cache domain or NUMA node
+        whenever possible, see rqd.rqtopology.CoreIndex.
         Not thread save, use with locking.
         @type   frameCores: int
         @param  frameCores: The total physical cores reserved by the frame.
@@ -985,39 +1012,21 @@ class Machine(object):
             return None
         log.info('Taskset: Requesting reserve of %d', (frameCores // 100))
 
-        # Get available cores using factored method
-        avail_cores, avail_cores_count = self._getAvailableHTCores()
-        remaining_cores = frameCores / 100
-
-        if avail_cores_count < remaining_cores:
+        cores = self.__coreIndex.reserve(frameCores // 100)
+        if cores is None:
             err = ('Not launching, insufficient hyperthreading cores to reserve '
                    'based on frameCores (%s < %s)')  \
-                  % (avail_cores_count, remaining_cores)
+                  % (self.__coreIndex.freeCount, frameCores // 100)
             log.critical(err)
             raise rqd.rqexceptions.CoreReservationFailureException(err)
 
         tasksets = []
         reserved_cores = self.__coreInfo.reserved_cores
-
-        for physid, cores in sorted(
-                avail_cores.items(),
-                # Return the physical socket that has
-                # the most idle cores first.
-                key=lambda tup: len(tup[1]),
-                reverse=True):
-
-            while remaining_cores > 0 and len(cores) > 0:
-                coreid = cores.pop()
-                # Give all the hyperthreads on this core.
-                # This counts as one core.
-                reserved_cores[int(physid)].coreid.extend([int(coreid)])
-                remaining_cores -= 1
-
-                for procid in self.__procs_by_physid_and_coreid[physid][coreid]:
-                    tasksets.append(procid)
-
-            if remaining_cores == 0:
-                break
+        for physid, coreid in cores:
+            # Give all the hyperthreads on this core.
+            # This counts as one core.
+            reserved_cores[int(physid)].coreid.extend([int(coreid)])
+            tasksets.extend(self.__procs_by_physid_and_coreid[physid][coreid])
 
         joined_tasksets = ','.join(sorted(tasksets, key=int))
         log.warning('Taskset: Reserving procs - %s', joined_tasksets)
@@ -1047,6 +1056,7 @@ class Machine(object):
                 reserved_cores[physical_id].coreid.remove(core_id)
                 if len(reserved_cores[physical_id].coreid) == 0:
                     del reserved_cores[physical_id]
+                self.__coreIndex.release([(physical_id_str, core_id_str)])
 
     def reserveGpus(self, reservedGpus):
         """ Reserve gpus
@@ -87,8 +87,26 @@ class RunningFrame(object):
         self.childrenProcs = {}
         self.completeReportSent = False
 
+        # Serialization caches, see runningFrameInfo and _serializeChildrenProcs
+        self.__frameInfo = None
+        self.__frameInfoKey = None
+        self.__frameInfoChildren = None
+        self.__childrenProcStats = None
+        # { <pid> : (<serialized values>, ProcStats), ... }
+        self.__childStats = {}
+
     def runningFrameInfo(self):
-        """Returns the RunningFrameInfo object"""
+        """Returns the RunningFrameInfo object.
+        It is only rebuilt when the frame stats changed since the previous call,
+        the returned message is shared and must not be modified."""
+        children = self._serializeChildrenProcs()
+        key = (self.maxRss, self.rss, self.maxVsize, self.vsize, self.lluTime,
+               self.maxUsedGpuMemory, self.usedGpuMemory, self.usedSwapMemory,
+               tuple(sorted(self.runFrame.attributes.items())))
+        if self.__frameInfo is not None and self.__frameInfoKey == key and \
+                self.__frameInfoChildren is children:
+            return self.__frameInfo
+
         runningFrameInfo = opencue_proto.report_pb2.RunningFrameInfo(
             resource_id=self.runFrame.resource_id,
             job_id=self.runFrame.job_id,
@@ -107,9 +125,12 @@ class RunningFrame(object):
             num_gpus=self.runFrame.num_gpus,
             max_used_gpu_memory=self.maxUsedGpuMemory,
             used_gpu_memory=self.usedGpuMemory,
-            children=self._serializeChildrenProcs(),
+            children=children,
             used_swap_memory=self.usedSwapMemory,
         )
+        self.__frameInfo = runningFrameInfo
+        self.__frameInfoKey = key
+        self.__frameInfoChildren = children
         return runningFrameInfo
 
     def _serializeChildrenProcs(self):
@@ -119,34 +140,57 @@ class RunningFrame(object):
             * Statm size measured in pages
             * Stat size measured in bytes
 
+        Children are cached by pid and only serialized again when their stats
+        changed, the same message is returned as long as no child changed.
+
         :param data: dictionary
         :return: serialized children proc host stats
         :rtype: opencue_proto.report_pb2.ChildrenProcStats
         """
-        childrenProc = opencue_proto.report_pb2.ChildrenProcStats()
+        changed = self.__childrenProcStats is None or \
+            len(self.__childStats) != len(self.childrenProcs)
+        childStats = {}
         for proc, values in self.childrenProcs.items():
-            procStats = opencue_proto.report_pb2.ProcStats()
-            procStatFile = opencue_proto.report_pb2.Stat()
-            procStatmFile = opencue_proto.report_pb2.Statm()
-
-            procStatFile.pid = proc
-            procStatFile.name = values["name"] if values["name"] else ""
-            procStatFile.state = values["state"]
-            procStatFile.vsize = values["vsize"]
-            procStatFile.rss = values["rss"]
-
-            procStatmFile.size = values["statm_size"]
-            procStatmFile.rss = values["statm_rss"]
+            serializedValues = (values["name"], values["state"], values["vsize"], values["rss"],
+                                values["statm_size"], values["statm_rss"], values["start_time"])
+            cached = self.__childStats.get(proc)
+            if cached is None or cached[0] != serializedValues:
+                cached = (serializedValues, self.__serializeChildProc(proc, values))
+                changed = True
+            childStats[proc] = cached
+        self.__childStats = childStats
+
+        if changed:
             # pylint: disable=no-member
-            procStats.stat.CopyFrom(procStatFile)
-            procStats.statm.CopyFrom(procStatmFile)
-            procStats.cmdline = " ".join(values["cmd_line"])
-
-            startTime = datetime.datetime.now() - datetime.timedelta(seconds=values["start_time"])
-            procStats.start_time = startTime.strftime("%Y-%m-%d %H:%M%S")
-            childrenProc.children.extend([procStats])
+            self.__childrenProcStats = opencue_proto.report_pb2.ChildrenProcStats(
+                children=[procStats for _, procStats in childStats.values()])
             # pylint: enable=no-member
-        return childrenProc
+        return self.__childrenProcStats
+
+    @staticmethod
+    def __serializeChildProc(proc, values):
+        """Serializes the stats of one child process."""
+        procStats = opencue_proto.report_pb2.ProcStats()
+        procStatFile = opencue_proto.report_pb2.Stat()
+        procStatmFile = opencue_proto.report_pb2.Statm()
+
+        procStatFile.pid = proc
+        procStatFile.name = values["name"] if values["name"] else ""
+        procStatFile.state = values["state"]
+        procStatFile.vsize = values["vsize"]
+        procStatFile.rss = values["rss"]
+
+        procStatmFile.size = values["statm_size"]
+        procStatmFile.rss = values["statm_rss"]
+        # pylint: disable=no-member
+        procStats.stat.CopyFrom(procStatFile)
+        procStats.statm.CopyFrom(procStatmFile)
+        procStats.cmdline = " ".join(values["cmd_line"])
+
+        startTime = datetime.datetime.now() - datetime.timedelta(seconds=values["start_time"])
+        procStats.start_time = startTime.strftime("%Y-%m-%d %H:%M%S")
+        # pylint: enable=no-member
+        return procStats
 
     def status(self):
         """Returns the status of the frame"""
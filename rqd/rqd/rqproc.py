@@ -0,0 +1,290 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Targeted /proc sampling of the process trees owned by running frames."""
+
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+from builtins import object
+import logging
+import os
+import re
+
+import rqd.rqconstants
+
+
+log = logging.getLogger(__name__)
+DIGITS_RE = re.compile(r"\d+")
+
+
+def getStatFields(pidFilePath):
+    """ Read stats file and return list of values
+    Stats file can star with these formats:
+     - 105 name ...
+     - 105 (name) ...
+     - 105 (name with space) ...
+     - 105 (name with) (space and parenthesis) ...
+    """
+    with open(pidFilePath, "r", encoding='utf-8') as statFile:
+        txt = statFile.read()
+        try:
+            open_par_index = txt.index('(')
+            close_par_index = txt.rindex(')')
+            name = txt[open_par_index:close_par_index].strip("()")
+            reminder = (txt[0:open_par_index] + txt[close_par_index + 1:]).split()
+            return reminder[0:1] + [name] + reminder[1:]
+        except ValueError:
+            return txt.split()
+
+
+def getProcSwap(pid):
+    """Helper function to get swap memory used by a process"""
+    swap_used = 0
+    try:
+        with open(rqd.rqconstants.PATH_PROC_PID_STATUS.format(pid), "r",
+                  encoding='utf-8') as statusFile:
+            for line in statusFile:
+                if line.startswith("VmSwap:"):
+                    swap_used = int(line.split()[1])
+                    break
+    except FileNotFoundError:
+        log.info('Process %s terminated before swap info could be read.', pid)
+    # pylint: disable=broad-except
+    except Exception as e:
+        log.warning('Failed to read swap usage for pid %s: %s', pid, e)
+    return swap_used
+
+
+def getCmdline(pid):
+    """Returns the argument list of a process, read from /proc/[pid]/cmdline.
+    Mirrors psutil.Process.cmdline(): processes that rewrite their title into a
+    single space separated string are split on spaces."""
+    with open(rqd.rqconstants.PATH_PROC_PID_CMDLINE.format(pid), "rb") as cmdlineFile:
+        data = cmdlineFile.read().decode('utf-8', 'replace')
+    if data.endswith('\0'):
+        data = data[:-1]
+    cmdline = data.split('\0')
+    if len(cmdline) == 1 and ' ' in data:
+        cmdline = data.split(' ')
+    return [arg for arg in cmdline if arg]
+
+
+def getChildPids(pid):
+    """Returns the direct children of a process by reading the children file of
+    each of its threads. Returns an empty list if the process is gone or the
+    kernel doesn't expose /proc/[pid]/task/[tid]/children."""
+    children = []
+    try:
+        tids = os.listdir(rqd.rqconstants.PATH_PROC_PID_TASK.format(pid))
+    except OSError:
+        return children
+    for tid in tids:
+        try:
+            with open(rqd.rqconstants.PATH_PROC_PID_TASK_CHILDREN.format(pid, tid), "r",
+                      encoding='utf-8') as childrenFile:
+                children.extend(childrenFile.read().split())
+        except OSError:
+            pass
+    return children
+
+
+def readPidData(pid, statFields, cmdline):
+    """Builds the per-pid sample used by Machine.rssUpdate from the already
+    parsed stat fields, reading statm and status once each."""
+    data = {
+        "name": statFields[1],
+        "state": statFields[2],
+        "pgrp": statFields[4],
+        "session": statFields[5],
+        # virtual memory size is in bytes convert to kb
+        "vsize": int(statFields[22]),
+        "rss": statFields[23],
+        # These are needed to compute the cpu used
+        "utime": statFields[13],
+        "stime": statFields[14],
+        "cutime": statFields[15],
+        "cstime": statFields[16],
+        # The time in jiffies the process started
+        # after system boot.
+        "start_time": statFields[21],
+        # Fetch swap usage
+        "swap": getProcSwap(pid),
+        "cmd_line": cmdline,
+    }
+
+    # Collect Statm file: /proc/[pid]/statm (same as status vsize in kb)
+    #    - size: "total program size"
+    #    - rss: inaccurate, similar to VmRss in /proc/[pid]/status
+    statmFields = getStatFields(rqd.rqconstants.PATH_PROC_PID_STATM.format(pid))
+    size = DIGITS_RE.search(statmFields[0])
+    rss = DIGITS_RE.search(statmFields[1])
+    data['statm_size'] = int(size.group()) if size else -1
+    data['statm_rss'] = int(rss.group()) if rss else -1
+    return data
+
+
+class FrameProcSampler(object):
+    """Samples /proc for the process trees of running frames only.
+
+    Instead of reading every pid on the host, each tick walks the process tree
+    down from every frame pid (and from the processes already known to belong
+    to the frame, so daemonized children that got reparented are kept).
+    Command lines are cached for the life of a pid and dropped as soon as the
+    pid disappears or is reused.
+
+    Processes that both detach and get reparented between two ticks can't be
+    found by a tree walk, so every rescanInterval ticks /proc is listed once
+    and any process living in the session of a known frame process is adopted.
+    """
+
+    def __init__(self, rescanInterval=None):
+        """
+        @type  rescanInterval: int
+        @param rescanInterval: Number of ticks between full session rescans,
+                               0 disables them.
+        """
+        if rescanInterval is None:
+            rescanInterval = rqd.rqconstants.FRAME_PROC_SAMPLER_RESCAN_INTERVAL
+        self.__rescanInterval = rescanInterval
+        self.__ticks = 0
+        # { <frame pid> : set([<pid>, ...]), ... }
+        self.__members = {}
+        # { <pid> : (<start_time>, [<arg>, ...]), ... }
+        self.__cmdlines = {}
+
+    def sample(self, framePids, members=None):
+        """Collects proc data for the given frame pids.
+
+        @type  framePids: list
+        @param framePids: frame pids as strings
+        @type  members: dict
+        @param members: Known processes of some frames, keyed by frame pid, i.e.
+                        the content of their cgroup. Those frames are not walked.
+        @rtype:  tuple
+        @return: (pids, sessions) in the format returned by
+                 Machine.collect_linux_pids_and_sessions, sessions being keyed
+                 by frame pid.
+        """
+        fullRescan = self.__rescanInterval > 0 and \
+            self.__ticks % self.__rescanInterval == 0
+        self.__ticks += 1
+
+        members = members or {}
+        pids = {}
+        walked = {}
+        found = {}
+        for framePid in framePids:
+            if framePid in members:
+                found[framePid] = self.__readMembers(members[framePid], pids)
+            elif framePid.isdigit():
+                walked[framePid] = self.__walk(framePid, pids)
+
+        if fullRescan:
+            self.__adoptSessionMembers(walked, pids)
+        found.update(walked)
+
+        # Forget about processes that aren't part of any frame anymore
+        for pid in list(self.__cmdlines):
+            if pid not in pids:
+                del self.__cmdlines[pid]
+        self.__members = walked
+
+        return pids, {framePid: list(procs) for framePid, procs in found.items()}
+
+    def __readMembers(self, memberPids, pids):
+        """Reads the data of an explicit list of processes."""
+        found = set()
+        for pid in memberPids:
+            data = pids.get(pid) or self.__readPid(pid)
+            if data is not None:
+                pids[pid] = data
+                found.add(pid)
+        return found
+
+    def __walk(self, framePid, pids):
+        """Returns the set of alive processes belonging to a frame, filling
+        pids with their data."""
+        found = set()
+        # (pid, trusted) trusted pids were reached through a parent/child link
+        # this tick, others are only remembered from previous ticks.
+        queue = [(framePid, True)]
+        queue.extend((pid, False) for pid in self.__members.get(framePid, ())
+                     if pid != framePid)
+        while queue:
+            pid, trusted = queue.pop()
+            if pid in found:
+                continue
+            if pid not in pids:
+                previous = self.__cmdlines.get(pid)
+                data = self.__readPid(pid)
+                if data is None:
+                    continue
+                if not trusted and previous is not None and \
+                        previous[0] != data["start_time"]:
+                    # The pid got reused by a process outside of the frame
+                    continue
+                pids[pid] = data
+            found.add(pid)
+            queue.extend((child, True) for child in getChildPids(pid) if child not in found)
+        return found
+
+    def __adoptSessionMembers(self, members, pids):
+        """Lists /proc once and adds processes living in the session of a
+        known frame process."""
+        sessionOwners = {}
+        for framePid, found in members.items():
+            for pid in found:
+                sessionOwners[pid] = framePid
+        if not sessionOwners:
+            return
+
+        for pid in os.listdir("/proc"):
+            if not pid.isdigit() or pid in pids:
+                continue
+            try:
+                statFields = getStatFields(rqd.rqconstants.PATH_PROC_PID_STAT.format(pid))
+            except (OSError, IOError):
+                continue
+            owner = sessionOwners.get(statFields[5])
+            if owner is None:
+                continue
+            data = self.__readPid(pid, statFields)
+            if data is not None:
+                pids[pid] = data
+                members[owner].add(pid)
+
+    def __readPid(self, pid, statFields=None):
+        """Reads stat, statm and status of a pid once, reusing the cached
+        cmdline while the pid isn't reused. Returns None for processes that
+        are gone or zombies."""
+        try:
+            if statFields is None:
+                statFields = getStatFields(rqd.rqconstants.PATH_PROC_PID_STAT.format(pid))
+            if statFields[2] == "Z":
+                return None
+            startTime = statFields[21]
+            cached = self.__cmdlines.get(pid)
+            if cached is None or cached[0] != startTime:
+                cached = (startTime, getCmdline(pid))
+                self.__cmdlines[pid] = cached
+            return readPidData(pid, statFields, cached[1])
+        except (OSError, IOError, IndexError):
+            # Many Linux processes are ephemeral and will disappear before we're able
+            # to read them. This is not typically indicative of a problem.
+            log.debug('Failed to read stat/statm file for pid %s', pid)
+            return None
@@ -0,0 +1,244 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""CPU topology of the host and the free core index used to reserve cores
+for taskset."""
+
+
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import division
+
+from builtins import object
+import glob
+import logging
+import os
+
+import rqd.rqconstants
+
+
+log = logging.getLogger(__name__)
+
+
+def parseCpuList(cpuList):
+    """Parses a kernel cpu list, ie: 0-3,8,10-11
+    @rtype:  list
+    @return: The cpu numbers as strings"""
+    cpus = []
+    for part in cpuList.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.extend(str(cpu) for cpu in range(int(first), int(last) + 1))
+        else:
+            cpus.append(str(int(part)))
+    return cpus
+
+
+def _readFile(path):
+    try:
+        with open(path, "r", encoding='utf-8') as sysFile:
+            return sysFile.read().strip()
+    except (OSError, IOError):
+        return None
+
+
+class CpuTopology(object):
+    """Physical cores of the host with the NUMA node and L3 cache domain
+    they belong to.
+
+    Cores are identified by their (physical id, core id) as found in
+    /proc/cpuinfo. The NUMA nodes come from /sys/devices/system/node and the
+    L3 domains from the caches in /sys/devices/system/cpu, each socket being
+    a single node and L3 domain when they aren't available.
+    """
+
+    def __init__(self, procsByPhysidAndCoreid, cpuPath=None, nodePath=None):
+        """
+        @type  procsByPhysidAndCoreid: dict
+        @param procsByPhysidAndCoreid: { <physical id> : { <core id> : set([<processor>, ...]) } }
+        @type  cpuPath: str
+        @param cpuPath: Path of the sysfs cpu directory
+        @type  nodePath: str
+        @param nodePath: Path of the sysfs node directory
+        """
+        cpuPath = cpuPath or rqd.rqconstants.PATH_SYS_CPU
+        nodePath = nodePath or rqd.rqconstants.PATH_SYS_NODE
+
+        nodeByProc = {}
+        for nodeDir in glob.glob(os.path.join(nodePath, "node[0-9]*")):
+            cpuList = _readFile(os.path.join(nodeDir, "cpulist"))
+            if cpuList:
+                node = int(os.path.basename(nodeDir)[len("node"):])
+                for proc in parseCpuList(cpuList):
+                    nodeByProc[proc] = node
+
+        # [((<node>, <l3 domain>, <physical id>, <core id>), ...]
+        cores = []
+        for physid, coresById in procsByPhysidAndCoreid.items():
+            for coreid, procs in coresById.items():
+                proc = min(procs, key=int)
+                node = nodeByProc.get(proc)
+                if node is None:
+                    node = ("socket", int(physid))
+                l3 = self.__getL3Domain(cpuPath, proc)
+                if l3 is None:
+                    l3 = node
+                cores.append((node, l3, physid, coreid))
+
+        def sortKey(core):
+            node, l3, physid, coreid = core
+            # Nodes and L3 domains are numbers, or sockets when unknown
+            return (isinstance(node, tuple), node, isinstance(l3, tuple), l3,
+                    int(physid), int(coreid))
+
+        # Neighbours in this order are neighbours on the die
+        self.cores = [(physid, coreid) for _, _, physid, coreid in sorted(cores, key=sortKey)]
+        self.nodeByCore = {}
+        self.l3ByCore = {}
+        for node, l3, physid, coreid in cores:
+            self.nodeByCore[(physid, coreid)] = node
+            # L3 domains never span nodes, sub-NUMA clustering splits them
+            self.l3ByCore[(physid, coreid)] = (node, l3)
+
+    @staticmethod
+    def __getL3Domain(cpuPath, proc):
+        """Returns the first cpu sharing the L3 cache of a processor."""
+        for cacheDir in glob.glob(os.path.join(cpuPath, "cpu%s" % proc, "cache", "index[0-9]*")):
+            if _readFile(os.path.join(cacheDir, "level")) == "3":
+                sharedList = _readFile(os.path.join(cacheDir, "shared_cpu_list"))
+                if sharedList:
+                    return min(int(cpu) for cpu in parseCpuList(sharedList))
+        return None
+
+
+class CoreIndex(object):
+    """Index of the free physical cores, kept up to date on reserve and
+    release so availability checks don't walk the topology.
+
+    Every core has a bit, in topology order, in a free bitset and in the
+    mask of its socket, NUMA node and L3 domain, and free cores are counted
+    per domain. A reservation goes to the L3 domain, or else the NUMA node,
+    with the fewest free cores that can hold all of it, taking the most
+    contiguous cores of the domain. Larger frames are spread over as few
+    nodes as possible.
+    Not thread safe, use with locking.
+    """
+
+    def __init__(self, topology):
+        """
+        @type  topology: CpuTopology
+        @param topology: Cores of the host
+        """
+        self.__cores = list(topology.cores)
+        self.__bitByCore = {core: bit for bit, core in enumerate(self.__cores)}
+        self.__free = (1 << len(self.__cores)) - 1
+        self.freeCount = len(self.__cores)
+
+        # { <domain> : <mask> } and { <domain> : <free cores> } per level
+        self.__nodeMasks = {}
+        self.__l3Masks = {}
+        self.__socketMasks = {}
+        for bit, core in enumerate(self.__cores):
+            self.__nodeMasks[topology.nodeByCore[core]] = \
+                self.__nodeMasks.get(topology.nodeByCore[core], 0) | (1 << bit)
+            self.__l3Masks[topology.l3ByCore[core]] = \
+                self.__l3Masks.get(topology.l3ByCore[core], 0) | (1 << bit)
+            self.__socketMasks[core[0]] = self.__socketMasks.get(core[0], 0) | (1 << bit)
+        self.__nodeFree = {node: bin(mask).count("1") for node, mask in self.__nodeMasks.items()}
+        self.__l3Free = {l3: bin(mask).count("1") for l3, mask in self.__l3Masks.items()}
+        # Ties between domains go to the first one in topology order
+        self.__rank = {}
+        for bit, core in enumerate(self.__cores):
+            self.__rank.setdefault(topology.nodeByCore[core], bit)
+            self.__rank.setdefault(topology.l3ByCore[core], bit)
+        self.__nodeByBit = [topology.nodeByCore[core] for core in self.__cores]
+        self.__l3ByBit = [topology.l3ByCore[core] for core in self.__cores]
+
+    def canReserve(self, count):
+        """Returns whether count cores are free."""
+        return self.freeCount >= count
+
+    def getFreeBySocket(self):
+        """Returns { <physical id> : set([<core id>, ...]) } of the free cores."""
+        freeBySocket = {}
+        for physid, mask in self.__socketMasks.items():
+            freeBySocket[physid] = {self.__cores[bit][1] for bit in self.__bits(self.__free & mask)}
+        return freeBySocket
+
+    def reserve(self, count):
+        """Reserves count cores.
+        @rtype:  list
+        @return: [(<physical id>, <core id>), ...], None if not enough cores are free"""
+        if count > self.freeCount:
+            return None
+        if count <= 0:
+            return []
+        for masks, freeCounts in ((self.__l3Masks, self.__l3Free),
+                                  (self.__nodeMasks, self.__nodeFree)):
+            fits = [domain for domain, free in freeCounts.items() if free >= count]
+            if fits:
+                domain = min(fits, key=lambda domain, freeCounts=freeCounts:
+                             (freeCounts[domain], self.__rank[domain]))
+                return self.__take(self.__pick(masks[domain], count))
+
+        bits = []
+        nodes = sorted(self.__nodeFree,
+                       key=lambda node: (-self.__nodeFree[node], self.__rank[node]))
+        for node in nodes:
+            needed = count - len(bits)
+            if not needed:
+                break
+            bits.extend(self.__pick(self.__nodeMasks[node], min(needed, self.__nodeFree[node])))
+        return self.__take(bits)
+
+    def release(self, cores):
+        """Marks (physical id, core id) cores as free again, ignoring unknown
+        or already free ones."""
+        for core in cores:
+            bit = self.__bitByCore.get(core)
+            if bit is None or self.__free >> bit & 1:
+                continue
+            self.__free |= 1 << bit
+            self.freeCount += 1
+            self.__nodeFree[self.__nodeByBit[bit]] += 1
+            self.__l3Free[self.__l3ByBit[bit]] += 1
+
+    def __pick(self, mask, count):
+        """Returns the bits of the tightest run of count free cores of a domain."""
+        bits = list(self.__bits(self.__free & mask))
+        if count <= 0:
+            return []
+        start = min(range(len(bits) - count + 1),
+                    key=lambda i: (bits[i + count - 1] - bits[i], i))
+        return bits[start:start + count]
+
+    def __take(self, bits):
+        for bit in bits:
+            self.__free &= ~(1 << bit)
+            self.freeCount -= 1
+            self.__nodeFree[self.__nodeByBit[bit]] -= 1
+            self.__l3Free[self.__l3ByBit[bit]] -= 1
+        return [self.__cores[bit] for bit in bits]
+
+    @staticmethod
+    def __bits(mask):
+        bit = 0
+        while mask:
+            if mask & 1:
+                yield bit
+            mask >>= 1
+            bit += 1
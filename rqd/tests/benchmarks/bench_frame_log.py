@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Compares the frame log throughput of the previous per-line path (readline,
+line buffered log file and a stat of the log per line) against the chunked
+reads and buffered rqd.rqlogging.RqdLogger used by FrameAttendantThread.runLinux
+(Linux only).
+
+A child process writes lines to stdout and stderr as fast as it can, the read
+and write syscalls come from /proc/self/io.
+
+Usage, from the rqd directory:
+    python -m tests.benchmarks.bench_frame_log --lines 500000
+"""
+
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+
+import argparse
+import os
+import select
+import subprocess
+import sys
+import tempfile
+import time
+
+import rqd.rqconstants
+import rqd.rqlogging
+
+
+WRITER = '''
+import sys
+line = "x" * %d + "\\n"
+for i in range(%d):
+    (sys.stderr if i %% 10 == 0 else sys.stdout).write(line)
+'''
+
+
+def spawnWriter(lines, lineLength):
+    """Starts the process producing the frame output."""
+    # pylint: disable=consider-using-with
+    return subprocess.Popen([sys.executable, '-c', WRITER % (lineLength, lines)],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def readSyscalls():
+    """Returns the read and write syscalls done by this process so far."""
+    with open('/proc/self/io', encoding='utf-8') as ioFile:
+        counters = dict(line.split(': ') for line in ioFile.read().splitlines())
+    return int(counters['syscr']), int(counters['syscw'])
+
+
+def perLine(proc, logPath):
+    """The frame log path before buffering, returns the number of stats."""
+    stats = 0
+    # pylint: disable=consider-using-with
+    logFile = open(logPath, 'w+', 1, encoding='utf-8')
+    poller = select.poll()
+    poller.register(proc.stdout, select.POLLIN)
+    poller.register(proc.stderr, select.POLLIN)
+    openPipes = 2
+    while openPipes:
+        for fd, event in poller.poll():
+            if not event & (select.POLLIN | select.POLLHUP):
+                continue
+            pipe = proc.stdout if fd == proc.stdout.fileno() else proc.stderr
+            line = pipe.readline()
+            if not line:
+                poller.unregister(fd)
+                openPipes -= 1
+                continue
+            logFile.write(line.decode('utf-8', errors='ignore'))
+            if os.path.exists(logPath):
+                os.path.getsize(logPath)
+            stats += 2
+    logFile.close()
+    return stats
+
+
+def chunked(proc, logPath):
+    """The frame log path of runLinux, returns the number of stats."""
+    rqlog = rqd.rqlogging.RqdLogger(logPath)
+    streams = {
+        proc.stdout.fileno(): rqd.rqlogging.LineBuffer(),
+        proc.stderr.fileno(): rqd.rqlogging.LineBuffer(),
+    }
+    poller = select.poll()
+    for fd in streams:
+        poller.register(fd, select.POLLIN)
+    while streams:
+        for fd, _ in poller.poll():
+            chunk = os.read(fd, rqd.rqconstants.RQD_LOG_READ_CHUNK_SIZE)
+            if chunk:
+                data = streams[fd].feed(chunk)
+            else:
+                data = streams.pop(fd).flush()
+                poller.unregister(fd)
+            if data:
+                rqlog.write(data)
+                # The log size limit only checks rqlog.size
+    rqlog.close()
+    return 0
+
+
+def run(name, func, args, logPath):
+    """Times one log path and prints its results."""
+    proc = spawnWriter(args.lines, args.length)
+    reads, writes = readSyscalls()
+    start = time.perf_counter()
+    stats = func(proc, logPath)
+    elapsed = time.perf_counter() - start
+    # Read before reaping the writer, its counters get added to ours once waited for
+    endReads, endWrites = readSyscalls()
+    proc.wait()
+    size = os.path.getsize(logPath)
+    expected = args.lines * (args.length + 1)
+    print('%-10s %12.0f %10.3f %10.3f %10.3f %s' % (
+        name, args.lines / elapsed,
+        (endReads - reads) / args.lines,
+        (endWrites - writes) / args.lines,
+        stats / args.lines,
+        'ok' if size == expected else 'size %d != %d' % (size, expected)))
+    return elapsed
+
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', type=int, default=200000, help='lines written by the frame')
+    parser.add_argument('--length', type=int, default=80, help='characters per line')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpDir:
+        logPath = os.path.join(tmpDir, 'frame.rqlog')
+        print('%-10s %12s %10s %10s %10s' % (
+            '', 'lines/s', 'reads/l', 'writes/l', 'stats/l'))
+        perLineTime = run('per line', perLine, args, logPath)
+        chunkedTime = run('chunked', chunked, args, logPath)
+        print('speedup: %.1fx' % (perLineTime / chunkedTime))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Compares the per-tick cost of the full /proc scan used by Machine.rssUpdate
+against rqd.rqproc.FrameProcSampler on the live host (Linux only).
+
+Unrelated idle processes are spawned to mimic a busy render node, next to a
+few frame-like process trees.
+
+Usage, from the rqd directory:
+    python -m tests.benchmarks.bench_proc_sampler --noise 2000 --frames 8
+"""
+
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+
+import argparse
+import os
+import subprocess
+import time
+from unittest import mock
+
+import opencue_proto.report_pb2
+import rqd.rqmachine
+import rqd.rqproc
+
+
+def spawnFrame(children):
+    """Starts a frame-like session leader with a few children."""
+    script = 'for i in $(seq %d); do sleep 600 & done; wait' % children
+    # pylint: disable=consider-using-with
+    return subprocess.Popen(['/bin/sh', '-c', script], start_new_session=True)
+
+
+def timeTicks(func, ticks):
+    """Returns the average wall and cpu time of func in milliseconds."""
+    wallStart = time.perf_counter()
+    cpuStart = time.process_time()
+    for _ in range(ticks):
+        func()
+    return ((time.perf_counter() - wallStart) * 1000 / ticks,
+            (time.process_time() - cpuStart) * 1000 / ticks)
+
+
+def main():
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--noise', type=int, default=1000,
+                        help='unrelated processes to start on the host')
+    parser.add_argument('--frames', type=int, default=8, help='frame process trees')
+    parser.add_argument('--children', type=int, default=4, help='children per frame')
+    parser.add_argument('--ticks', type=int, default=20, help='rss update ticks to time')
+    args = parser.parse_args()
+
+    noise = [subprocess.Popen(['sleep', '600'])  # pylint: disable=consider-using-with
+             for _ in range(args.noise)]
+    frames = [spawnFrame(args.children) for _ in range(args.frames)]
+    try:
+        # Give the frame shells time to fork their children
+        time.sleep(1)
+        framePids = [str(frame.pid) for frame in frames]
+
+        rqCore = mock.MagicMock()
+        rqCore.nimby.is_ready = False
+        rqCore.nimby.locked = False
+        with mock.patch('rqd.rqswap.VmStat'):
+            machine = rqd.rqmachine.Machine(rqCore, opencue_proto.report_pb2.CoreDetail())
+        sampler = rqd.rqproc.FrameProcSampler()
+
+        pids, sessions = machine.collect_linux_pids_and_sessions(framePids)
+        framePidCount = sum(len(sessions.get(pid, [])) for pid in framePids)
+        print('host pids: %d, frame pids: %d' % (len(pids), framePidCount))
+
+        fullWall, fullCpu = timeTicks(
+            lambda: machine.collect_linux_pids_and_sessions(framePids), args.ticks)
+        sampledWall, sampledCpu = timeTicks(lambda: sampler.sample(framePids), args.ticks)
+
+        print('%-22s %10s %10s' % ('', 'wall ms', 'cpu ms'))
+        print('%-22s %10.2f %10.2f' % ('full /proc scan', fullWall, fullCpu))
+        print('%-22s %10.2f %10.2f' % ('FrameProcSampler', sampledWall, sampledCpu))
+        print('speedup: %.1fx' % (fullWall / sampledWall if sampledWall else float('inf')))
+    finally:
+        for proc in noise:
+            proc.kill()
+        for frame in frames:
+            os.killpg(frame.pid, 9)
+        for proc in noise + frames:
+            proc.wait()
+
+
+if __name__ == '__main__':
+    main()
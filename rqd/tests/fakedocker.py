@@ -0,0 +1,175 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""An in-memory stand-in for the parts of the docker SDK rqd uses.
+
+FakeDockerClient answers like docker.DockerClient for containers and images,
+without a docker daemon. Containers finish as soon as they are started, and
+calls can be made to take some time to see how many of them overlap.
+"""
+
+# The fakes only mirror the attributes and methods of the SDK that rqd uses
+# pylint: disable=too-many-instance-attributes,too-few-public-methods
+
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+
+import itertools
+import threading
+import time
+
+import docker.errors
+
+
+class FakeContainer(object):
+    """A container whose frame already ran, printing its pid then its output."""
+
+    def __init__(self, containerId, image, **kwargs):
+        self.id = containerId
+        self.short_id = containerId[:12]
+        self.image = image
+        self.kwargs = kwargs
+        self.pid = 4000 + int(containerId[-4:])
+        self.output = [b'output of %s\n' % image.encode()]
+        self.exitCode = 0
+        self.removed = False
+        self.killed = False
+
+    def logs(self, stream=False):
+        lines = [b'%d\n' % self.pid] + self.output
+        if stream:
+            return iter(lines)
+        return b''.join(lines)
+
+    def top(self):
+        return {'Titles': ['UID', 'PID'], 'Processes': [['root', str(self.pid)]]}
+
+    def wait(self):
+        return {'StatusCode': self.exitCode}
+
+    def kill(self):
+        self.killed = True
+
+    def remove(self):
+        self.removed = True
+
+
+class FakeContainers(object):
+    """The containers of a FakeDockerClient, keeping track of overlapping launches."""
+
+    def __init__(self, launchTime=0):
+        self.launchTime = launchTime
+        self.containers = {}
+        self.launches = 0
+        self.maxConcurrentLaunches = 0
+        self.__ids = itertools.count(1)
+        self.__lock = threading.Lock()
+
+    def run(self, image, detach=False, **kwargs):
+        with self.__lock:
+            self.launches += 1
+            self.maxConcurrentLaunches = max(self.maxConcurrentLaunches, self.launches)
+            container = FakeContainer('%064d' % next(self.__ids), image, **kwargs)
+            self.containers[container.id] = container
+        try:
+            time.sleep(self.launchTime)
+        finally:
+            with self.__lock:
+                self.launches -= 1
+        if detach:
+            return container
+        return container.logs()
+
+    def get(self, containerId):
+        for container in self.containers.values():
+            if containerId in (container.id, container.short_id):
+                return container
+        raise docker.errors.NotFound('No such container: %s' % containerId)
+
+
+class FakeImage(object):
+    """An image pulled from a FakeDockerClient's registry."""
+
+    def __init__(self, name, digest):
+        self.attrs = {'RepoDigests': ['%s@%s' % (name, digest)]}
+
+
+class FakeRegistryData(object):
+    """What the registry knows about an image."""
+
+    def __init__(self, digest):
+        self.id = digest
+
+
+class FakeImages(object):
+    """The images of a FakeDockerClient, and of the registry it pulls from.
+
+    registry maps image names with their tag to the digest of their latest version,
+    local the images on the host to the digest of theirs.
+    """
+
+    def __init__(self, registry=None, pullTime=0):
+        self.registry = dict(registry or {})
+        self.local = {}
+        self.pullTime = pullTime
+        self.pulls = []
+        self.pulling = 0
+        self.maxConcurrentPulls = 0
+        self.registryAvailable = True
+        self.__lock = threading.Lock()
+
+    def pull(self, repository, tag=None, **kwargs):
+        del kwargs
+        image = '%s:%s' % (repository, tag or 'latest')
+        if image not in self.registry:
+            raise docker.errors.ImageNotFound('No such image: %s' % image)
+        with self.__lock:
+            self.pulls.append(image)
+            self.pulling += 1
+            self.maxConcurrentPulls = max(self.maxConcurrentPulls, self.pulling)
+        try:
+            time.sleep(self.pullTime)
+        finally:
+            with self.__lock:
+                self.pulling -= 1
+        self.local[image] = self.registry[image]
+        return FakeImage(repository, self.local[image])
+
+    def get(self, name):
+        if name not in self.local:
+            raise docker.errors.ImageNotFound('No such image: %s' % name)
+        return FakeImage(name.rsplit(':', 1)[0], self.local[name])
+
+    def get_registry_data(self, name, auth_config=None):
+        del auth_config
+        if not self.registryAvailable:
+            raise docker.errors.APIError('registry unavailable')
+        if name not in self.registry:
+            raise docker.errors.NotFound('No such image: %s' % name)
+        return FakeRegistryData(self.registry[name])
+
+
+class FakeDockerClient(object):
+    """Stands in for docker.DockerClient."""
+
+    def __init__(self, registry=None, launchTime=0, pullTime=0):
+        self.containers = FakeContainers(launchTime)
+        self.images = FakeImages(registry, pullTime)
+        self.closed = False
+
+    def close(self):
+        self.closed = True
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Tests for rqd.rqcgroup."""
+
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+
+import errno
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+import mock
+import pyfakefs.fake_filesystem_unittest
+
+import opencue_proto.rqd_pb2
+import rqd.rqcgroup
+import rqd.rqconstants
+
+
+CGROUP_ROOT = '/sys/fs/cgroup/opencue-rqd'
+CPU_STAT = '''usage_usec 4000000
+user_usec 3000000
+system_usec 1000000
+nr_periods 0
+'''
+
+# 1 MiB of the 2 MiB charged to the cgroup is page cache the frame doesn't map
+MEMORY_STAT = '''anon 786432
+file 1310720
+kernel 0
+anon_thp 524288
+file_mapped 262144
+'''
+
+
+class FrameCgroupsTests(pyfakefs.fake_filesystem_unittest.TestCase):
+    """Tests for rqd.rqcgroup.FrameCgroups."""
+
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.fs.create_file(os.path.join(CGROUP_ROOT, 'cgroup.controllers'),
+                            contents='cpuset cpu io memory pids\n')
+        self.subtreeControl = self.fs.create_file(
+            os.path.join(CGROUP_ROOT, 'cgroup.subtree_control'), contents='')
+        self.frameCgroups = rqd.rqcgroup.FrameCgroups(CGROUP_ROOT)
+        self.runFrame = opencue_proto.rqd_pb2.RunFrame(
+            frame_id='frame-id', hard_memory_limit=4194304)
+
+    def _fillFrameCgroup(self, procs='105\n106\n', peak=True, swap=True, memoryStat=True):
+        path = self.frameCgroups.getPath('frame-id')
+        self.fs.create_file(os.path.join(path, 'cgroup.procs'), contents=procs)
+        self.fs.create_file(os.path.join(path, 'memory.current'), contents='2097152\n')
+        if memoryStat:
+            self.fs.create_file(os.path.join(path, 'memory.stat'), contents=MEMORY_STAT)
+        if peak:
+            self.fs.create_file(os.path.join(path, 'memory.peak'), contents='8388608\n')
+        if swap:
+            self.fs.create_file(os.path.join(path, 'memory.swap.current'), contents='1024\n')
+        self.fs.create_file(os.path.join(path, 'cpu.stat'), contents=CPU_STAT)
+        return path
+
+    def test_isAvailableEnablesControllers(self):
+        self.assertTrue(self.frameCgroups.isAvailable())
+
+        self.assertEqual('+memory +cpu', self.subtreeControl.contents)
+
+    def test_isAvailableControllersAlreadyEnabled(self):
+        self.subtreeControl.set_contents('cpu memory')
+
+        self.assertTrue(self.frameCgroups.isAvailable())
+        self.assertEqual('cpu memory', self.subtreeControl.contents)
+
+    def test_isAvailableMissingController(self):
+        self.fs.get_object(os.path.join(CGROUP_ROOT, 'cgroup.controllers')).set_contents('cpu')
+
+        self.assertFalse(self.frameCgroups.isAvailable())
+
+    def test_isAvailableNotCgroup2(self):
+        self.assertFalse(rqd.rqcgroup.FrameCgroups('/sys/fs/cgroup/memory').isAvailable())
+
+    def test_create(self):
+        path = self.frameCgroups.create(self.runFrame)
+
+        self.assertEqual(os.path.join(CGROUP_ROOT, 'frame-frame-id'), path)
+        self.assertTrue(os.path.isdir(path))
+        self.assertFalse(os.path.exists(os.path.join(path, 'memory.max')))
+
+    @mock.patch('rqd.rqconstants.RQD_CGROUP_ENFORCE_MEMORY_LIMIT', new=True)
+    def test_createEnforcesMemoryLimit(self):
+        path = self.frameCgroups.create(self.runFrame)
+
+        with open(os.path.join(path, 'memory.max'), encoding='utf-8') as memoryMax:
+            self.assertEqual(str(4194304 * 1024), memoryMax.read())
+
+    @mock.patch('time.time')
+    def test_getStats(self, timeMock):
+        timeMock.return_value = 1000
+        self.frameCgroups.create(self.runFrame)
+        self._fillFrameCgroup()
+        timeMock.return_value = 1008
+
+        stats = self.frameCgroups.getStats('frame-id')
+
+        self.assertEqual(['105', '106'], stats['procs'])
+        self.assertEqual(2097152, stats['memory_current'])
+        self.assertEqual(1048576, stats['memory_rss'])
+        self.assertEqual(8388608, stats['memory_peak'])
+        self.assertEqual(1024, stats['memory_swap_current'])
+        self.assertEqual(3000000, stats['user_usec'])
+        # 4 cpu seconds over 8 seconds
+        self.assertAlmostEqual(50.0, stats['pcpu'])
+
+    @mock.patch('time.time')
+    def test_getStatsAveragesPcpu(self, timeMock):
+        timeMock.return_value = 1000
+        self.frameCgroups.create(self.runFrame)
+        path = self._fillFrameCgroup()
+        timeMock.return_value = 1008
+        self.frameCgroups.getStats('frame-id')
+
+        self.fs.get_object(os.path.join(path, 'cpu.stat')).set_contents('usage_usec 24000000')
+        timeMock.return_value = 1018
+
+        # (50 + 200) / 2
+        self.assertAlmostEqual(125.0, self.frameCgroups.getStats('frame-id')['pcpu'])
+
+    def test_getStatsOldKernel(self):
+        self.frameCgroups.create(self.runFrame)
+        self._fillFrameCgroup(peak=False, swap=False, memoryStat=False)
+
+        stats = self.frameCgroups.getStats('frame-id')
+
+        self.assertEqual(2097152, stats['memory_rss'])
+        self.assertEqual(2097152, stats['memory_peak'])
+        self.assertEqual(0, stats['memory_swap_current'])
+
+    def test_getStatsNoCgroup(self):
+        self.assertIsNone(self.frameCgroups.getStats('frame-id'))
+
+    def test_remove(self):
+        path = self.frameCgroups.create(self.runFrame)
+
+        self.assertIsNone(self.frameCgroups.remove('frame-id'))
+        self.assertFalse(os.path.exists(path))
+
+    def test_removeKillsLeftovers(self):
+        self.frameCgroups.create(self.runFrame)
+        path = self._fillFrameCgroup()
+        calls = []
+
+        def fakeRmdir(dirPath):
+            # Real cgroupfs directories only contain virtual files
+            calls.append(dirPath)
+            if len(calls) == 1:
+                raise OSError(errno.EBUSY, 'Device or resource busy')
+            self.fs.remove_object(dirPath)
+
+        with mock.patch('os.rmdir', side_effect=fakeRmdir):
+            self.fs.get_object(os.path.join(path, 'cgroup.procs')).set_contents('')
+            stats = self.frameCgroups.remove('frame-id')
+
+        self.assertEqual(8388608, stats['memory_peak'])
+        self.assertEqual([path, path], calls)
+        self.assertFalse(os.path.exists(path))
+
+
+class JoinCommandTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cgroupPath = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cgroupPath)
+
+    def test_joinCommand(self):
+        procsPath = os.path.join(self.cgroupPath, 'cgroup.procs')
+        command = rqd.rqcgroup.joinCommand(self.cgroupPath) + ['echo', 'rendering']
+
+        self.assertEqual(b'rendering\n', subprocess.check_output(command))
+        with open(procsPath, encoding='utf-8') as procs:
+            self.assertEqual('0', procs.read().strip())
+
+    def test_joinCommandWithoutCgroup(self):
+        command = rqd.rqcgroup.joinCommand(
+            os.path.join(self.cgroupPath, 'missing')) + ['echo', 'rendering']
+
+        self.assertEqual(b'rendering\n', subprocess.check_output(command))
+
+
+if __name__ == '__main__':
+    unittest.main()
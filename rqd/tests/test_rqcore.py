@@ -23,6 +23,8 @@ from __future__ import absolute_import
 
 from builtins import str
 import os.path
+import threading
+import time
 import unittest
 import subprocess
 
@@ -32,15 +34,21 @@ import pyfakefs.fake_filesystem_unittest
 import opencue_proto.host_pb2
 import opencue_proto.report_pb2
 import opencue_proto.rqd_pb2
+import rqd.rqcgroup
 import rqd.rqconstants
 import rqd.rqcore
+import rqd.rqdocker
 import rqd.rqexceptions
+import rqd.rqjournal
 import rqd.rqnetwork
 import rqd.rqnimby
 
+from tests.fakedocker import FakeDockerClient
+
 
 class RqCoreTests(unittest.TestCase):
 
+    @mock.patch("rqd.rqconstants.RQD_USE_FRAME_SUPERVISOR", new=False)
     @mock.patch("rqd.rqnimby.Nimby", autospec=True)
     @mock.patch("rqd.rqnetwork.Network", autospec=True)
     @mock.patch("rqd.rqmachine.Machine", autospec=True)
@@ -541,6 +549,22 @@ class RqCoreTests(unittest.TestCase):
         self.assertEqual(40, self.rqcore.cores.idle_cores)
         self.assertEqual(0, self.rqcore.cores.locked_cores)
 
+    @mock.patch("rqd.rqconstants.RQD_HOST_REPORT_DELTA", new=True)
+    def test_sendStatusReportDelta(self):
+        self.rqcore.sendStatusReport()
+
+        self.machineMock.return_value.getHostReport.assert_called_with(delta=True)
+        self.networkMock.return_value.reportStatus.assert_called_with(
+            self.machineMock.return_value.getHostReport.return_value)
+
+    def test_sendStatusReportFailureResetsDelta(self):
+        self.networkMock.return_value.reportStatus.side_effect = RuntimeError("unavailable")
+
+        with self.assertRaises(RuntimeError):
+            self.rqcore.sendStatusReport()
+
+        self.machineMock.return_value.resetHostReportDelta.assert_called_with()
+
     def test_sendFrameCompleteReport(self):
         logDir = "/path/to/log/dir/"
         frameId = "arbitrary-frame-id"
@@ -593,21 +617,36 @@ class RqCoreBackupTests(pyfakefs.fake_filesystem_unittest.TestCase):
         self.rqcore = rqd.rqcore.RqCore()
         self.setUpPyfakefs()
 
-    @mock.patch('builtins.open', new_callable=mock.mock_open)
-    def test_backupCache_withPath(self, mockOpen):
-        """Test backupCache writes frame data when backup path is configured"""
+    def test_backupCache_withPath(self):
+        """Test backupCache journals frame data when backup path is configured"""
         self.rqcore.backup_cache_path = '/tmp/rqd/cache.dat'
+        self.fs.create_dir('/tmp/rqd')
         frameId = 'frame123'
-        runningFrame = mock.MagicMock()
-        runningFrame.runFrame = mock.MagicMock()
-        runningFrame.runFrame.SerializeToString.return_value = b'serialized_frame_data'
+        runningFrame = rqd.rqnetwork.RunningFrame(
+            self.rqcore, opencue_proto.rqd_pb2.RunFrame(frame_id=frameId))
         self.rqcore.storeFrame(frameId, runningFrame)
 
         self.rqcore.backupCache()
+        size = os.path.getsize('/tmp/rqd/cache.dat')
+        self.rqcore.backupCache()
+
+        # Nothing changed, nothing appended
+        self.assertEqual(size, os.path.getsize('/tmp/rqd/cache.dat'))
+        frames = rqd.rqjournal.FrameJournal('/tmp/rqd/cache.dat').load()
+        self.assertEqual([frameId], [runFrame.frame_id for runFrame, _ in frames])
+
+    def test_deleteFrame_completesJournal(self):
+        """Test deleted frames are not recovered"""
+        self.rqcore.backup_cache_path = 'cache.dat'
+        frameId = 'frame123'
+        runningFrame = rqd.rqnetwork.RunningFrame(
+            self.rqcore, opencue_proto.rqd_pb2.RunFrame(frame_id=frameId))
+        self.rqcore.storeFrame(frameId, runningFrame)
+        self.rqcore.backupCache()
+
+        self.rqcore.deleteFrame(frameId)
 
-        mockOpen.assert_called_once_with('/tmp/rqd/cache.dat', 'wb')
-        handle = mockOpen()
-        handle.write.assert_called_with(b'serialized_frame_data')
+        self.assertEqual([], rqd.rqjournal.FrameJournal('cache.dat').load())
 
     def test_backupCache_noPath(self):
         """Test backupCache does nothing when no backup path configured"""
@@ -652,6 +691,24 @@ class RqCoreBackupTests(pyfakefs.fake_filesystem_unittest.TestCase):
 
         self.assertEqual(len(self.rqcore._RqCore__cache), 0)
 
+    @mock.patch("rqd.rqcore.FrameAttendantThread", autospec=True)
+    def test_recoverCache_restoresStats(self, attendant_patch):
+        """Test recoverCache restores the max memory usage of the frames"""
+        self.rqcore.backup_cache_path = 'cache.dat'
+        frame = opencue_proto.rqd_pb2.RunFrame(frame_id='frame123', num_cores=4)
+        running_frame = rqd.rqnetwork.RunningFrame(self.rqcore, frame)
+        running_frame.maxRss = 1024
+        running_frame.maxVsize = 2048
+        self.rqcore.storeFrame('frame123', running_frame)
+        self.rqcore.backupCache()
+        self.rqcore._RqCore__cache = {}
+
+        self.rqcore.recoverCache()
+
+        recovered = attendant_patch.call_args[0][2]
+        self.assertEqual(1024, recovered.maxRss)
+        self.assertEqual(2048, recovered.maxVsize)
+
     @mock.patch("rqd.rqcore.FrameAttendantThread", autospec=True)
     def test_recoverCache_validBackup(self, attendant_patch):
         """Test recoverCache skips frames that fail to parse"""
@@ -736,6 +793,8 @@ class FrameAttendantThreadTests(pyfakefs.fake_filesystem_unittest.TestCase):
         rqCore.machine.getHostInfo.return_value = renderHost
         rqCore.nimby.locked = False
         rqCore.docker_agent = None
+        rqCore.frameSupervisor = None
+        rqCore.machine.createFrameCgroup.return_value = None
         children = opencue_proto.report_pb2.ChildrenProcStats()
 
         runFrame = opencue_proto.rqd_pb2.RunFrame(
@@ -782,6 +841,114 @@ class FrameAttendantThreadTests(pyfakefs.fake_filesystem_unittest.TestCase):
             frameInfo
         )
 
+    def _launchSupervised(self, logDir, getTempDirMock, timeMock, popenMock):
+        """Launches a frame handed over to a mocked frame supervisor."""
+        tempDir = "/some/random/temp/dir"
+        self.fs.create_dir(tempDir)
+        timeMock.return_value = 1568070634.3
+        getTempDirMock.return_value = tempDir
+        popenMock.return_value.wait.return_value = 0
+
+        rqCore = mock.MagicMock()
+        rqCore.intervalStartTime = 20
+        rqCore.intervalSleepTime = 40
+        rqCore.machine.getTempPath.return_value = "/job/temp/path/"
+        rqCore.machine.getHostInfo.return_value = opencue_proto.report_pb2.RenderHost(
+            name="arbitrary-host-name")
+        rqCore.docker_agent = None
+        rqCore.machine.createFrameCgroup.return_value = None
+        runFrame = opencue_proto.rqd_pb2.RunFrame(
+            frame_id="arbitrary-frame-id",
+            job_name="arbitrary-job-name",
+            frame_name="arbitrary-frame-name",
+            uid=928,
+            user_name="my-random-user",
+            log_dir=logDir,
+        )
+        frameInfo = rqd.rqnetwork.RunningFrame(rqCore, runFrame)
+
+        attendantThread = rqd.rqcore.FrameAttendantThread(rqCore, runFrame, frameInfo)
+        frameInfo.frameAttendantThread = attendantThread
+        attendantThread.start()
+        threading.Thread.join(attendantThread)
+        return rqCore, frameInfo, attendantThread
+
+    @mock.patch("platform.system", new=mock.Mock(return_value="Linux"))
+    @mock.patch("tempfile.gettempdir")
+    def test_runLinuxSupervised(self, getTempDirMock, permsUser, timeMock, popenMock):
+        logDir = "/path/to/log/dir/"
+        rqCore, frameInfo, attendantThread = self._launchSupervised(
+            logDir, getTempDirMock, timeMock, popenMock)
+
+        # The launching thread is done but the frame is still attended
+        rqCore.frameSupervisor.watch.assert_called_once_with(
+            popenMock.return_value, mock.ANY, mock.ANY)
+        self.assertTrue(attendantThread.is_alive())
+        rqCore.sendFrameCompleteReport.assert_not_called()
+
+        _, onOutput, onExit = rqCore.frameSupervisor.watch.call_args[0]
+        onOutput(b"frame output\n")
+        onExit(False)
+        attendantThread.join()
+
+        self.assertFalse(attendantThread.is_alive())
+        rqCore.sendFrameCompleteReport.assert_called_with(frameInfo)
+        with open(os.path.join(logDir, "arbitrary-job-name.arbitrary-frame-name.rqlog"),
+                  encoding="utf-8") as logFile:
+            self.assertIn("frame output\n", logFile.read())
+
+    @mock.patch("platform.system", new=mock.Mock(return_value="Linux"))
+    @mock.patch("tempfile.gettempdir")
+    @mock.patch("os.killpg")
+    def test_runLinuxSupervisionFailed(
+            self, killpgMock, getTempDirMock, permsUser, timeMock, popenMock):
+        rqCore, frameInfo, attendantThread = self._launchSupervised(
+            "/path/to/log/dir/", getTempDirMock, timeMock, popenMock)
+
+        _, _, onExit = rqCore.frameSupervisor.watch.call_args[0]
+        onExit(True)
+        attendantThread.join()
+
+        killpgMock.assert_called_once_with(frameInfo.pid, rqd.rqconstants.KILL_SIGNAL)
+        self.assertEqual(rqd.rqconstants.EXITSTATUS_FOR_FAILED_LAUNCH, frameInfo.exitStatus)
+        rqCore.sendFrameCompleteReport.assert_called_with(frameInfo)
+
+    @mock.patch("platform.system", new=mock.Mock(return_value="Linux"))
+    @mock.patch("tempfile.gettempdir")
+    def test_runLinuxReleasesCgroupWhenLaunchFails(
+            self, getTempDirMock, permsUser, timeMock, popenMock):
+        tempDir = "/some/random/temp/dir"
+        cgroupPath = "/sys/fs/cgroup/opencue-rqd/arbitrary-frame-id"
+        self.fs.create_dir(tempDir)
+        timeMock.return_value = 1568070634.3
+        getTempDirMock.return_value = tempDir
+        popenMock.side_effect = OSError("Permission denied")
+
+        rqCore = mock.MagicMock()
+        rqCore.intervalStartTime = 20
+        rqCore.intervalSleepTime = 40
+        rqCore.machine.getTempPath.return_value = "/job/temp/path/"
+        rqCore.machine.isDesktop.return_value = False
+        rqCore.docker_agent = None
+        rqCore.machine.createFrameCgroup.return_value = cgroupPath
+        runFrame = opencue_proto.rqd_pb2.RunFrame(
+            frame_id="arbitrary-frame-id",
+            job_name="arbitrary-job-name",
+            frame_name="arbitrary-frame-name",
+            uid=928,
+            user_name="my-random-user",
+            log_dir="/path/to/log/dir/",
+        )
+        frameInfo = rqd.rqnetwork.RunningFrame(rqCore, runFrame)
+
+        attendantThread = rqd.rqcore.FrameAttendantThread(rqCore, runFrame, frameInfo)
+        attendantThread.start()
+        attendantThread.join()
+
+        command = popenMock.call_args[0][0]
+        self.assertEqual(rqd.rqcgroup.joinCommand(cgroupPath), command[:4])
+        rqCore.machine.releaseFrameCgroup.assert_called_once_with(frameInfo)
+
     @mock.patch('platform.system', new=mock.Mock(return_value='Linux'))
     @mock.patch('tempfile.gettempdir')
     def test_runDocker(self, getTempDirMock, permsUser, timeMock, popenMock):
@@ -888,6 +1055,57 @@ class FrameAttendantThreadTests(pyfakefs.fake_filesystem_unittest.TestCase):
         )
 
 
+    @mock.patch('platform.system', new=mock.Mock(return_value='Linux'))
+    @mock.patch('tempfile.gettempdir')
+    def test_runDockerWithSharedClient(self, getTempDirMock, permsUser, timeMock, popenMock):
+        # given
+        logDir = '/path/to/log/dir/'
+        tempDir = '/some/random/temp/dir'
+        logFile = os.path.join(logDir, 'arbitrary-job-name.arbitrary-frame-name.rqlog')
+        self.fs.create_dir(tempDir)
+        timeMock.return_value = 1568070634.3
+        getTempDirMock.return_value = tempDir
+
+        client = FakeDockerClient()
+        rqCore = mock.MagicMock(docker_agent=rqd.rqdocker.RqDocker(
+            'centos7', {'centos7': 'centos7.3:latest'}, [], '/bin/sh', False))
+        rqCore.intervalStartTime = 20
+        rqCore.intervalSleepTime = 40
+        rqCore.machine.getTempPath.return_value = '/job/temp/path/'
+        rqCore.machine.isDesktop.return_value = False
+        rqCore.machine.getHostInfo.return_value = opencue_proto.report_pb2.RenderHost(
+            name='arbitrary-host-name')
+        rqCore.nimby.locked = False
+
+        runFrame = opencue_proto.rqd_pb2.RunFrame(
+            frame_id='arbitrary-frame-id',
+            job_name='arbitrary-job-name',
+            frame_name='arbitrary-frame-name',
+            uid=928,
+            user_name='my-random-user',
+            log_dir=logDir,
+            children=opencue_proto.report_pb2.ChildrenProcStats(),
+            os='centos7',
+            soft_memory_limit=2000000000,
+            hard_memory_limit=5000000000)
+        frameInfo = rqd.rqnetwork.RunningFrame(rqCore, runFrame)
+
+        # when
+        with mock.patch('docker.from_env', return_value=client):
+            attendantThread = rqd.rqcore.FrameAttendantThread(rqCore, runFrame, frameInfo)
+            attendantThread.start()
+            attendantThread.join()
+
+        # then
+        container, = client.containers.containers.values()
+        self.assertTrue(container.removed)
+        self.assertFalse(client.closed)
+        self.assertEqual(container.pid, frameInfo.pid)
+        self.assertEqual(0, frameInfo.exitStatus)
+        self.assertEqual(container.short_id, runFrame.attributes['container_id'])
+        with open(logFile, encoding='utf-8') as log:
+            self.assertIn('output of centos7.3:latest', log.read())
+
     # TODO(bcipriano) Re-enable this test once Windows is supported. The main sticking point here
     #   is that the log directory is always overridden on Windows which makes mocking difficult.
     @mock.patch("platform.system", new=mock.Mock(return_value="Windows"))
@@ -1038,5 +1256,165 @@ class FrameAttendantThreadTests(pyfakefs.fake_filesystem_unittest.TestCase):
         )
 
 
+class FrameSupervisorTests(unittest.TestCase):
+    """Tests for rqd.rqcore.FrameSupervisor with real processes."""
+
+    def setUp(self):
+        self.supervisor = rqd.rqcore.FrameSupervisor(workers=2)
+        self.supervisor.start()
+
+    def _runFrame(self, script):
+        # pylint: disable=consider-using-with
+        process = subprocess.Popen(['/bin/sh', '-c', script],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        output = []
+        exited = []
+        self.supervisor.watch(process, output.append, exited.append)
+        for _ in range(1000):
+            if exited:
+                break
+            time.sleep(0.01)
+        self.assertEqual([False], exited)
+        return process, output
+
+    def _waitForExit(self, process):
+        exited = []
+        self.supervisor.watch(process, mock.Mock(), exited.append)
+        for _ in range(500):
+            if exited:
+                break
+            time.sleep(0.01)
+        return exited
+
+    def test_watchCollectsOutputUntilExit(self):
+        process, output = self._runFrame(
+            'echo out; echo err >&2; printf partial; exit 3')
+
+        self.assertEqual(3, process.returncode)
+        # Complete lines, the unterminated one comes last once stdout is closed
+        self.assertEqual([b'err\n', b'out\n', b'partial'], sorted(output))
+        self.assertTrue(process.stdout.closed)
+
+    def test_watchWithoutPidfd(self):
+        with mock.patch('rqd.rqconstants.RQD_FRAME_SUPERVISOR_EXIT_POLL_SEC', new=0.05), \
+                mock.patch('os.pidfd_open', side_effect=OSError, create=True):
+            process, output = self._runFrame('echo done')
+
+        self.assertEqual(0, process.returncode)
+        self.assertEqual([b'done\n'], output)
+
+    def test_watchDoesNotWaitForDaemons(self):
+        # The background sleep keeps both pipes open after the frame exited
+        _, output = self._runFrame('echo started; sleep 5 & exit 0')
+
+        self.assertEqual([b'started\n'], output)
+
+    def test_failedWatchOnlyFailsThatFrame(self):
+        # Has no pipes to follow
+        brokenProcess = mock.Mock(stdout=None, stderr=None)
+
+        self.assertEqual([True], self._waitForExit(brokenProcess))
+        _, output = self._runFrame('echo still supervised')
+        self.assertEqual([b'still supervised\n'], output)
+
+    def test_failedExitCheckFailsFrame(self):
+        # pylint: disable=consider-using-with
+        process = subprocess.Popen(['/bin/sh', '-c', 'sleep 10'],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.addCleanup(process.wait)
+        self.addCleanup(process.kill)
+
+        with mock.patch('rqd.rqconstants.RQD_FRAME_SUPERVISOR_EXIT_POLL_SEC', new=0.05), \
+                mock.patch('os.pidfd_open', side_effect=OSError, create=True), \
+                mock.patch.object(process, 'poll', side_effect=OSError('no such process')):
+            exited = self._waitForExit(process)
+
+        self.assertEqual([True], exited)
+        self.assertTrue(process.stdout.closed)
+        called = threading.Event()
+        self.supervisor.callLater(0, called.set)
+        self.assertTrue(called.wait(5))
+
+    def test_callLater(self):
+        called = threading.Event()
+        timer = self.supervisor.callLater(0.01, called.set)
+
+        self.assertTrue(called.wait(5))
+        for _ in range(100):
+            if not timer.is_alive():
+                break
+            time.sleep(0.01)
+        self.assertFalse(timer.is_alive())
+
+    def test_callLaterWhileFramesComplete(self):
+        # Reporting the frames blocks on the cuebot, keeping both frame workers busy
+        release = threading.Event()
+        self.addCleanup(release.set)
+        reporting = threading.Semaphore(0)
+
+        def onExit(_):
+            reporting.release()
+            release.wait(10)
+
+        for _ in range(2):
+            # pylint: disable=consider-using-with
+            process = subprocess.Popen(['/bin/true'], stdout=subprocess.PIPE,
+                                       stderr=subprocess.PIPE)
+            self.supervisor.watch(process, mock.Mock(), onExit)
+        for _ in range(2):
+            # pylint: disable=consider-using-with
+            self.assertTrue(reporting.acquire(timeout=5))
+        called = threading.Event()
+        self.supervisor.callLater(0.01, called.set)
+
+        self.assertTrue(called.wait(5))
+
+    def test_callLaterCancel(self):
+        function = mock.Mock()
+        timer = self.supervisor.callLater(0.05, function)
+        timer.cancel()
+        time.sleep(0.2)
+
+        self.assertFalse(timer.is_alive())
+        function.assert_not_called()
+
+
+class RqCoreSupervisorTests(unittest.TestCase):
+    """Tests for the RqCore timers run by the frame supervisor."""
+
+    @mock.patch("platform.system", new=mock.Mock(return_value="Linux"))
+    @mock.patch("rqd.rqcore.FrameSupervisor")
+    @mock.patch("rqd.rqnimby.Nimby", new=mock.MagicMock())
+    @mock.patch("rqd.rqnetwork.Network", new=mock.MagicMock())
+    @mock.patch("rqd.rqmachine.Machine", new=mock.MagicMock())
+    def setUp(self, supervisorMock):
+        self.supervisor = supervisorMock.return_value
+        self.rqcore = rqd.rqcore.RqCore()
+
+    @mock.patch("threading.Timer")
+    def test_grpcConnectedSchedulesOnSupervisor(self, timerMock):
+        self.rqcore.grpcConnected()
+
+        timerMock.assert_not_called()
+        self.supervisor.callLater.assert_any_call(
+            rqd.rqconstants.RSS_UPDATE_INTERVAL, self.rqcore.updateRss)
+        self.supervisor.callLater.assert_any_call(
+            self.rqcore.intervalSleepTime, self.rqcore.onInterval)
+
+    def test_startRssUpdateOnlyOnce(self):
+        self.supervisor.callLater.return_value.is_alive.return_value = True
+
+        self.rqcore.startRssUpdate()
+        self.rqcore.startRssUpdate()
+
+        self.supervisor.callLater.assert_called_once_with(
+            rqd.rqconstants.RSS_UPDATE_INTERVAL, self.rqcore.updateRss)
+
+    def test_startStartsSupervisor(self):
+        self.rqcore.start()
+
+        self.supervisor.start.assert_called_once_with()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,159 @@
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Tests for rqd.rqdocker."""
+
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+
+import configparser
+import threading
+import unittest
+
+import mock
+
+import rqd.rqdocker
+
+from tests.fakedocker import FakeDockerClient
+
+
+IMAGES = {'centos7': 'centos7.3:latest', 'rocky9': 'registry:5000/rocky9.3:9'}
+REGISTRY = {'centos7.3:latest': 'sha256:aaa', 'registry:5000/rocky9.3:9': 'sha256:bbb'}
+
+
+def runContainer(agent, imageKey='centos7'):
+    return agent.runContainer(
+        image_key=imageKey, environment={}, working_dir='/tmp', hostname='host',
+        mem_reservation='1GB', mem_limit='2GB', entrypoint='/tmp/cmd')
+
+
+class RqDockerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.client = FakeDockerClient(REGISTRY)
+        patcher = mock.patch('docker.from_env', return_value=self.client)
+        self.fromEnv = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def newAgent(self, **kwargs):
+        return rqd.rqdocker.RqDocker('centos7,rocky9', dict(IMAGES), [], '/bin/sh', False,
+                                     **kwargs)
+
+    def test_fromConfig(self):
+        config = configparser.RawConfigParser()
+        config.read_dict({
+            'docker.config': {'DOCKER_SHELL_PATH': '/bin/bash',
+                              'DOCKER_MAX_CONCURRENT_LAUNCHES': '8',
+                              'DOCKER_CLIENT_POOL_SIZE': '32'},
+            'docker.images': IMAGES,
+            'docker.mounts': {}})
+
+        agent = rqd.rqdocker.RqDocker.fromConfig(config)
+        agent.client()
+
+        self.assertEqual('centos7,rocky9', agent.sp_os)
+        self.assertEqual('/bin/bash', agent.docker_shell_path)
+        self.fromEnv.assert_called_once_with(max_pool_size=32)
+
+    def test_runContainer(self):
+        agent = self.newAgent()
+
+        container = runContainer(agent, 'rocky9')
+
+        self.assertEqual('registry:5000/rocky9.3:9', container.image)
+        self.assertEqual('/tmp/cmd', container.kwargs['entrypoint'])
+        self.assertEqual([], container.kwargs['device_requests'])
+
+    def test_runContainerInvalidOs(self):
+        agent = self.newAgent()
+
+        self.assertRaises(rqd.rqdocker.InvalidFrameOsError, runContainer, agent, 'windows')
+
+    def test_runContainerSharesClient(self):
+        agent = self.newAgent()
+
+        runContainer(agent)
+        runContainer(agent)
+        agent.client()
+
+        self.fromEnv.assert_called_once_with(
+            max_pool_size=rqd.rqdocker.RqDocker.DEFAULT_CLIENT_POOL_SIZE)
+        self.assertEqual(2, len(self.client.containers.containers))
+        self.assertFalse(self.client.closed)
+
+    def test_runContainerConcurrently(self):
+        self.client.containers.launchTime = 0.05
+        agent = self.newAgent(max_concurrent_launches=4)
+
+        threads = [threading.Thread(target=runContainer, args=(agent,)) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(16, len(self.client.containers.containers))
+        self.assertGreater(self.client.containers.maxConcurrentLaunches, 1)
+        self.assertLessEqual(self.client.containers.maxConcurrentLaunches, 4)
+
+    def test_refreshFrameImages(self):
+        self.client.images.pullTime = 0.05
+        agent = self.newAgent()
+
+        agent.refreshFrameImages()
+
+        self.assertEqual(sorted(REGISTRY), sorted(self.client.images.pulls))
+        self.assertEqual(2, self.client.images.maxConcurrentPulls)
+
+    def test_refreshFrameImagesSkipsUnchangedImages(self):
+        self.client.images.local = {'centos7.3:latest': 'sha256:aaa',
+                                    'registry:5000/rocky9.3:9': 'sha256:old'}
+        agent = self.newAgent()
+
+        agent.refreshFrameImages()
+
+        self.assertEqual(['registry:5000/rocky9.3:9'], self.client.images.pulls)
+
+    def test_refreshFrameImagesCachesDigests(self):
+        agent = self.newAgent()
+
+        agent.refreshFrameImages()
+        agent.refreshFrameImages()
+        self.client.images.registry['centos7.3:latest'] = 'sha256:new'
+        agent.refreshFrameImages()
+
+        self.assertEqual(3, len(self.client.images.pulls))
+        self.assertEqual('centos7.3:latest', self.client.images.pulls[-1])
+
+    def test_refreshFrameImagesWithoutRegistryData(self):
+        self.client.images.local = dict(REGISTRY)
+        self.client.images.registryAvailable = False
+        agent = self.newAgent()
+
+        agent.refreshFrameImages()
+
+        self.assertEqual(2, len(self.client.images.pulls))
+
+    def test_refreshFrameImagesFailure(self):
+        del self.client.images.registry['centos7.3:latest']
+        agent = self.newAgent()
+
+        self.assertRaises(RuntimeError, agent.refreshFrameImages)
+        self.assertEqual(['registry:5000/rocky9.3:9'], self.client.images.pulls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Tests for rqd.rqgpu."""
+
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+
+import unittest
+
+import mock
+
+import rqd.rqgpu
+
+
+class FakeNVMLError(Exception):
+    pass
+
+
+def fakeNvml(processes=None):
+    """Returns a stand-in for the pynvml module with 2 GPUs of 16 GB."""
+    nvml = mock.MagicMock()
+    nvml.NVMLError = FakeNVMLError
+    nvml.nvmlDeviceGetCount.return_value = 2
+    nvml.nvmlDeviceGetHandleByIndex.side_effect = lambda index: 'handle%d' % index
+    nvml.nvmlDeviceGetMemoryInfo.side_effect = lambda handle: mock.Mock(
+        total=16 * 1024 ** 3, free=(8 if handle == 'handle0' else 16) * 1024 ** 3)
+    if processes is None:
+        processes = {'handle0': [mock.Mock(pid=105, usedGpuMemory=1024 ** 3),
+                                 mock.Mock(pid=106, usedGpuMemory=None)],
+                     'handle1': []}
+    nvml.nvmlDeviceGetComputeRunningProcesses.side_effect = processes.get
+    nvml.nvmlDeviceGetGraphicsRunningProcesses.side_effect = \
+        lambda handle: [mock.Mock(pid=105, usedGpuMemory=1024)] if handle == 'handle0' else []
+    return nvml
+
+
+class NvmlGpuSamplerTests(unittest.TestCase):
+
+    def test_sample(self):
+        nvml = fakeNvml()
+        sampler = rqd.rqgpu.NvmlGpuSampler()
+
+        with mock.patch.dict('sys.modules', {'pynvml': nvml}):
+            units = sampler.sample()
+            sampler.sample()
+
+        nvml.nvmlInit.assert_called_once_with()
+        self.assertEqual([0, 1], [unit.index for unit in units])
+        self.assertEqual(16 * 1024 ** 2, units[0].total)
+        self.assertEqual(8 * 1024 ** 2, units[0].used)
+        self.assertEqual({'105': 1024 ** 2 + 1, '106': 0}, units[0].processes)
+        self.assertEqual({}, units[1].processes)
+
+    def test_sampleWithoutProcessAccess(self):
+        nvml = fakeNvml()
+        nvml.nvmlDeviceGetComputeRunningProcesses.side_effect = FakeNVMLError('no permission')
+
+        with mock.patch.dict('sys.modules', {'pynvml': nvml}):
+            units = rqd.rqgpu.NvmlGpuSampler().sample()
+
+        self.assertIsNone(units[0].processes)
+
+    def test_notImportedUntilSampled(self):
+        with mock.patch.dict('sys.modules', {'pynvml': None}):
+            sampler = rqd.rqgpu.NvmlGpuSampler()
+            self.assertFalse(rqd.rqgpu.NvmlGpuSampler.isAvailable())
+            with self.assertRaises(ImportError):
+                sampler.sample()
+
+
+class NvidiaSmiGpuSamplerTests(unittest.TestCase):
+
+    @mock.patch('subprocess.getoutput',
+                new=mock.MagicMock(return_value='16130 MiB, 16103 MiB, 2\n'
+                                                 '16130 MiB, 4200 MiB, 2'))
+    def test_sample(self):
+        units = rqd.rqgpu.NvidiaSmiGpuSampler().sample()
+
+        self.assertEqual([0, 1], [unit.index for unit in units])
+        self.assertEqual(16913531, units[0].total)
+        self.assertEqual(4404020, units[1].free)
+        self.assertIsNone(units[0].processes)
+
+
+class GpuSamplerTests(unittest.TestCase):
+
+    def test_sampleIsAbstract(self):
+        # pylint: disable=abstract-class-instantiated
+        self.assertRaises(TypeError, rqd.rqgpu.GpuSampler)
+
+
+class CreateGpuSamplerTests(unittest.TestCase):
+
+    def test_auto(self):
+        with mock.patch.dict('sys.modules', {'pynvml': fakeNvml()}):
+            self.assertIsInstance(rqd.rqgpu.createGpuSampler('auto'), rqd.rqgpu.NvmlGpuSampler)
+        with mock.patch.dict('sys.modules', {'pynvml': None}):
+            self.assertIsInstance(rqd.rqgpu.createGpuSampler('auto'),
+                                  rqd.rqgpu.NvidiaSmiGpuSampler)
+
+    def test_explicit(self):
+        self.assertIsInstance(rqd.rqgpu.createGpuSampler('nvml'), rqd.rqgpu.NvmlGpuSampler)
+        self.assertIsInstance(rqd.rqgpu.createGpuSampler('nvidia-smi'),
+                              rqd.rqgpu.NvidiaSmiGpuSampler)
+
+
+if __name__ == '__main__':
+    unittest.main()
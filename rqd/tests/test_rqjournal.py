@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Tests for rqd.rqjournal."""
+
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+
+import os
+import unittest
+
+import mock
+import pyfakefs.fake_filesystem_unittest
+
+import opencue_proto.rqd_pb2
+import rqd.rqjournal
+
+
+JOURNAL_PATH = '/var/lib/rqd/frames.journal'
+
+
+def runningFrame(frameId, maxRss=0, **attributes):
+    frame = mock.MagicMock()
+    frame.frameId = frameId
+    frame.runFrame = opencue_proto.rqd_pb2.RunFrame(
+        frame_id=frameId, job_name='job', attributes=attributes)
+    frame.maxRss = maxRss
+    frame.maxVsize = 0
+    frame.maxUsedGpuMemory = 0
+    return frame
+
+
+class FrameJournalTests(pyfakefs.fake_filesystem_unittest.TestCase):
+    """Tests for rqd.rqjournal.FrameJournal."""
+
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.fs.create_dir(os.path.dirname(JOURNAL_PATH))
+        self.journal = rqd.rqjournal.FrameJournal(JOURNAL_PATH, compactMinSize=0)
+
+    def _load(self):
+        frames = rqd.rqjournal.FrameJournal(JOURNAL_PATH).load()
+        return {runFrame.frame_id: (runFrame, stats) for runFrame, stats in frames}
+
+    def test_loadNoFile(self):
+        self.assertEqual([], self.journal.load())
+
+    def test_syncAppendsChangesOnly(self):
+        frame = runningFrame('frame-1', maxRss=10)
+        self.journal.sync([frame])
+        size = os.path.getsize(JOURNAL_PATH)
+
+        self.journal.sync([frame])
+        self.assertEqual(size, os.path.getsize(JOURNAL_PATH))
+
+        frame.maxRss = 20
+        self.journal.sync([frame])
+        self.assertLess(size, os.path.getsize(JOURNAL_PATH))
+        self.assertEqual(20, self._load()['frame-1'][1]['maxRss'])
+
+    def test_syncRecordsRunFrameChanges(self):
+        frame = runningFrame('frame-1')
+        self.journal.sync([frame])
+        frame.runFrame.attributes['container_id'] = 'abc'
+
+        self.journal.sync([frame])
+
+        self.assertEqual('abc', self._load()['frame-1'][0].attributes['container_id'])
+
+    def test_syncCompletesMissingFrames(self):
+        self.journal.sync([runningFrame('frame-1'), runningFrame('frame-2')])
+
+        self.journal.sync([runningFrame('frame-2')])
+
+        self.assertEqual(['frame-2'], list(self._load()))
+
+    def test_complete(self):
+        self.journal.sync([runningFrame('frame-1')])
+
+        self.journal.complete('frame-1')
+
+        self.assertEqual({}, self._load())
+
+    def test_loadDropsTornTail(self):
+        self.journal.sync([runningFrame('frame-1', maxRss=10)])
+        size = os.path.getsize(JOURNAL_PATH)
+        self.journal.sync([runningFrame('frame-1', maxRss=10), runningFrame('frame-2')])
+        self.journal.close()
+        with open(JOURNAL_PATH, 'r+b') as journalFile:
+            journalFile.truncate(size + 5)
+
+        frames = self._load()
+
+        self.assertEqual(['frame-1'], list(frames))
+        self.assertEqual(10, frames['frame-1'][1]['maxRss'])
+        self.assertEqual(size, os.path.getsize(JOURNAL_PATH))
+
+    def test_loadDropsCorruptedRecords(self):
+        self.journal.sync([runningFrame('frame-1')])
+        size = os.path.getsize(JOURNAL_PATH)
+        self.journal.sync([runningFrame('frame-1'), runningFrame('frame-2')])
+        self.journal.close()
+        with open(JOURNAL_PATH, 'r+b') as journalFile:
+            journalFile.seek(-1, os.SEEK_END)
+            journalFile.write(b'!')
+
+        self.assertEqual(['frame-1'], list(self._load()))
+        self.assertEqual(size, os.path.getsize(JOURNAL_PATH))
+
+    def test_loadThenAppend(self):
+        self.journal.sync([runningFrame('frame-1')])
+        journal = rqd.rqjournal.FrameJournal(JOURNAL_PATH)
+        journal.load()
+
+        journal.sync([runningFrame('frame-1'), runningFrame('frame-2')])
+
+        self.assertEqual(['frame-1', 'frame-2'], sorted(self._load()))
+
+    def test_loadLegacyBackup(self):
+        with open(JOURNAL_PATH, 'wb') as backup:
+            for frameId in ('frame-1', 'frame-2'):
+                serialized = opencue_proto.rqd_pb2.RunFrame(frame_id=frameId).SerializeToString()
+                backup.write(len(serialized).to_bytes(4, byteorder='big'))
+                backup.write(serialized)
+
+        self.assertEqual(['frame-1', 'frame-2'], sorted(self._load()))
+        with open(JOURNAL_PATH, 'rb') as journalFile:
+            self.assertTrue(journalFile.read().startswith(rqd.rqjournal.JOURNAL_MAGIC))
+
+    def test_compaction(self):
+        journal = rqd.rqjournal.FrameJournal(JOURNAL_PATH, compactMinSize=0, compactRatio=2)
+        frame = runningFrame('frame-1')
+        for maxRss in range(1, 50):
+            frame.maxRss = maxRss
+            journal.sync([frame])
+
+        frames = self._load()
+        self.assertEqual(49, frames['frame-1'][1]['maxRss'])
+        liveSize = len(rqd.rqjournal.JOURNAL_MAGIC) + sum(
+            len(record) for record in journal._FrameJournal__liveRecords())
+        self.assertLessEqual(os.path.getsize(JOURNAL_PATH), 2 * liveSize)
+        self.assertFalse(os.path.exists(JOURNAL_PATH + '.tmp'))
+
+    def test_liveSizeFollowsChanges(self):
+        def assertLiveSize(journal):
+            self.assertEqual(
+                sum(len(record) for record in journal._FrameJournal__liveRecords()),
+                journal._FrameJournal__liveSize)
+
+        self.journal.sync([runningFrame('frame-1'), runningFrame('frame-2', maxRss=5)])
+        assertLiveSize(self.journal)
+        self.journal.sync([runningFrame('frame-1', maxRss=10, container_id='id'),
+                           runningFrame('frame-2', maxRss=5)])
+        assertLiveSize(self.journal)
+        self.journal.complete('frame-2')
+        assertLiveSize(self.journal)
+        self.journal.sync([runningFrame('frame-3')])
+        assertLiveSize(self.journal)
+
+        journal = rqd.rqjournal.FrameJournal(JOURNAL_PATH)
+        journal.load()
+        assertLiveSize(journal)
+
+    def test_reset(self):
+        self.journal.sync([runningFrame('frame-1')])
+
+        self.journal.reset()
+
+        self.assertFalse(os.path.exists(JOURNAL_PATH))
+        self.assertEqual([], self.journal.load())
+
+
+if __name__ == '__main__':
+    unittest.main()
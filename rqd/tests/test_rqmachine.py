@@ -32,6 +32,7 @@ import opencue_proto.report_pb2
 import opencue_proto.rqd_pb2
 import rqd.rqconstants
 import rqd.rqcore
+import rqd.rqgpu
 import rqd.rqmachine
 import rqd.rqnetwork
 import rqd.rqnimby
@@ -277,6 +278,48 @@ class MachineTests(pyfakefs.fake_filesystem_unittest.TestCase):
     def test_rssUpdateWithBrackets(self, processMock):
         self._test_rssUpdate(PROC_PID_STAT_WITH_BRACKETS)
 
+    @mock.patch('time.time', new=mock.MagicMock(return_value=1570057887.61))
+    @mock.patch('rqd.rqconstants.RQD_USE_CGROUPS', new=True)
+    def test_rssUpdateFromCgroup(self):
+        rqd.rqconstants.SYS_HERTZ = 100
+        cgroupRoot = rqd.rqconstants.RQD_CGROUP_ROOT
+        self.fs.create_file(cgroupRoot + '/cgroup.controllers', contents='cpu memory')
+        self.fs.create_file(cgroupRoot + '/cgroup.subtree_control', contents='cpu memory')
+        machine = rqd.rqmachine.Machine(self.rqCore, self.coreDetail)
+
+        # 105 left the frame session but is still in the frame cgroup
+        self.fs.create_file('/proc/105/stat', contents=PROC_PID_STAT)
+        self.fs.create_file('/proc/105/cmdline', contents=PROC_PID_CMDLINE)
+        self.fs.create_file('/proc/105/statm', contents=PROC_PID_STATM)
+        runFrame = opencue_proto.rqd_pb2.RunFrame(frame_id='frame-id', hard_memory_limit=1)
+        cgroupPath = machine.createFrameCgroup(runFrame)
+        self.fs.create_file(cgroupPath + '/cgroup.procs', contents='105\n')
+        self.fs.create_file(cgroupPath + '/memory.current', contents='2097152')
+        # Half of it is the page cache of the files the frame read
+        self.fs.create_file(cgroupPath + '/memory.stat',
+                            contents='anon 1048576\nfile 1048576\nfile_mapped 0\n')
+        self.fs.create_file(cgroupPath + '/memory.peak', contents='8388608')
+        self.fs.create_file(cgroupPath + '/memory.swap.current', contents='1048576')
+        self.fs.create_file(cgroupPath + '/cpu.stat', contents='usage_usec 0')
+        runningFrame = rqd.rqnetwork.RunningFrame(self.rqCore, runFrame)
+        runningFrame.pid = 104
+        frameCache = {'frame-id': runningFrame}
+
+        machine.rssUpdate(frameCache)
+
+        self.assertEqual(1024, runningFrame.rss)
+        self.assertEqual(1024, runningFrame.maxRss)
+        self.assertEqual(1024, runningFrame.usedSwapMemory)
+        self.assertEqual(4356, runningFrame.vsize)
+        self.assertEqual(['105'], list(runningFrame.childrenProcs))
+
+        self.fs.get_object(cgroupPath + '/memory.peak').set_contents('16777216')
+        self.fs.get_object(cgroupPath + '/cgroup.procs').set_contents('')
+        machine.releaseFrameCgroup(runningFrame)
+
+        # The peak counts the page cache as well
+        self.assertEqual(1024, runningFrame.maxRss)
+
     @mock.patch.object(
         rqd.rqmachine.Machine, '_Machine__enabledHT', new=mock.MagicMock(return_value=False))
     def test_getLoadAvg(self):
@@ -304,6 +347,7 @@ class MachineTests(pyfakefs.fake_filesystem_unittest.TestCase):
             delattr(self.machine, 'gpuNotSupported')
         if hasattr(self.machine, 'gpuResults'):
             delattr(self.machine, 'gpuResults')
+        self.machine.gpuSampler = rqd.rqgpu.NvidiaSmiGpuSampler()
 
     @mock.patch.object(
         rqd.rqconstants, 'ALLOW_GPU', new=mock.MagicMock(return_value=True))
@@ -333,6 +377,54 @@ class MachineTests(pyfakefs.fake_filesystem_unittest.TestCase):
         self.assertEqual(135308248, self.machine.getGpuMemoryTotal())
         self.assertEqual(122701222, self.machine.getGpuMemoryFree())
 
+    @mock.patch.object(rqd.rqconstants, 'ALLOW_GPU', new=True)
+    @mock.patch.object(rqd.rqconstants, 'RQD_GPU_SAMPLE_INTERVAL_SEC', new=10)
+    @mock.patch('time.time')
+    def test_gpuSampleInterval(self, timeMock):
+        self._resetGpuStat()
+        sampler = rqd.rqgpu.FakeGpuSampler([rqd.rqgpu.GpuUnit(0, 4096, 1024)])
+        self.machine.gpuSampler = sampler
+        timeMock.return_value = 1000
+
+        self.assertEqual(1024, self.machine.getGpuMemoryFree())
+        sampler.units[0].free = 2048
+        timeMock.return_value = 1005
+        self.assertEqual(1024, self.machine.getGpuMemoryFree())
+        timeMock.return_value = 1010
+        self.assertEqual(2048, self.machine.getGpuMemoryFree())
+        self.assertEqual(2, sampler.samples)
+
+    @mock.patch.object(rqd.rqconstants, 'ALLOW_GPU', new=True)
+    def test_gpuMemoryPerProcess(self):
+        self._resetGpuStat()
+        self.machine.gpuSampler = rqd.rqgpu.FakeGpuSampler([
+            rqd.rqgpu.GpuUnit(0, 4096, 1024, {'105': 1000, '300': 2000}),
+            rqd.rqgpu.GpuUnit(1, 4096, 3096, {'106': 1000}),
+        ])
+        runningFrame = rqd.rqnetwork.RunningFrame(
+            self.rqCore, opencue_proto.rqd_pb2.RunFrame(attributes={'GPU_LIST': '0'}))
+        runningFrame.pid = 105
+        runningFrame.childrenProcs = {'106': {}}
+        runningFrame.maxUsedGpuMemory = 5000
+
+        self.machine._Machine__updateGpuAndLlu(runningFrame)
+
+        # Process 300 belongs to another frame sharing the unit
+        self.assertEqual(2000, runningFrame.usedGpuMemory)
+        self.assertEqual(5000, runningFrame.maxUsedGpuMemory)
+
+    @mock.patch.object(rqd.rqconstants, 'ALLOW_GPU', new=True)
+    def test_gpuMemoryPerUnit(self):
+        self._resetGpuStat()
+        self.machine.gpuSampler = rqd.rqgpu.FakeGpuSampler([
+            rqd.rqgpu.GpuUnit(0, 4096, 1024), rqd.rqgpu.GpuUnit(1, 4096, 3096)])
+        runningFrame = rqd.rqnetwork.RunningFrame(
+            self.rqCore, opencue_proto.rqd_pb2.RunFrame(attributes={'GPU_LIST': '0,1'}))
+
+        self.machine._Machine__updateGpuAndLlu(runningFrame)
+
+        self.assertEqual(4072, runningFrame.usedGpuMemory)
+
     def test_getPathEnv(self):
         self.assertEqual(
             '/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin',
@@ -399,6 +491,81 @@ class MachineTests(pyfakefs.fake_filesystem_unittest.TestCase):
         # Verify core info was copied into the report.
         self.assertEqual(coreDetail, hostReport.core_info)
 
+    @mock.patch('time.time')
+    def test_getHostReportDelta(self, timeMock):
+        frame1Info = opencue_proto.report_pb2.RunningFrameInfo(
+            resource_id='arbitrary-id-1', frame_id='frame1')
+        frame2Info = opencue_proto.report_pb2.RunningFrameInfo(
+            resource_id='arbitrary-id-2', frame_id='frame2')
+        infos = {'frame1': frame1Info, 'frame2': frame2Info}
+        frames = {}
+        for frameId in infos:
+            frames[frameId] = mock.MagicMock(spec=rqd.rqnetwork.RunningFrame)
+            frames[frameId].runningFrameInfo.side_effect = \
+                lambda frameId=frameId: infos[frameId]
+        self.rqCore.getFrameKeys.return_value = ['frame1', 'frame2']
+        self.rqCore.getFrame.side_effect = lambda frameId: frames[frameId]
+        self.rqCore.getCoreInfo.return_value = opencue_proto.report_pb2.CoreDetail()
+        timeMock.return_value = 1000
+
+        # pylint: disable=no-member
+        hostReport = self.machine.getHostReport(delta=True)
+        self.assertFalse(hostReport.frames_delta)
+        self.assertEqual(2, len(hostReport.frames))
+
+        # Only frame2 info got rebuilt
+        infos['frame2'] = opencue_proto.report_pb2.RunningFrameInfo(
+            resource_id='arbitrary-id-2', frame_id='frame2', rss=10)
+        timeMock.return_value = 1010
+        hostReport = self.machine.getHostReport(delta=True)
+        self.assertTrue(hostReport.frames_delta)
+        self.assertEqual([infos['frame2']], list(hostReport.frames))
+        self.assertEqual(['frame1'], list(hostReport.unchanged_frame_ids))
+
+        hostReport = self.machine.getHostReport(delta=True)
+        self.assertTrue(hostReport.frames_delta)
+        self.assertEqual(0, len(hostReport.frames))
+        self.assertEqual(['frame1', 'frame2'], list(hostReport.unchanged_frame_ids))
+
+        # Non delta reports don't interfere
+        self.assertEqual(2, len(self.machine.getHostReport().frames))
+        self.assertEqual(0, len(self.machine.getHostReport(delta=True).frames))
+
+        self.machine.resetHostReportDelta()
+        self.assertEqual(2, len(self.machine.getHostReport(delta=True).frames))
+
+        timeMock.return_value = 1010 + rqd.rqconstants.RQD_HOST_REPORT_FULL_INTERVAL_SEC
+        hostReport = self.machine.getHostReport(delta=True)
+        self.assertFalse(hostReport.frames_delta)
+        self.assertEqual(2, len(hostReport.frames))
+        self.assertEqual(0, len(hostReport.unchanged_frame_ids))
+
+    def test_runningFrameInfoCache(self):
+        runningFrame = rqd.rqnetwork.RunningFrame(
+            self.rqCore, opencue_proto.rqd_pb2.RunFrame(frame_id='frame-id'))
+        runningFrame.childrenProcs = {
+            '105': {'name': 'sleep', 'state': 'S', 'vsize': 4356, 'rss': 616,
+                    'statm_size': 4356, 'statm_rss': 616, 'cmd_line': ['sleep', '60'],
+                    'start_time': 10},
+        }
+
+        info = runningFrame.runningFrameInfo()
+        # pylint: disable=no-member
+        self.assertEqual('sleep 60', info.children.children[0].cmdline)
+        self.assertIs(info, runningFrame.runningFrameInfo())
+
+        runningFrame.rss = 1024
+        updatedInfo = runningFrame.runningFrameInfo()
+        self.assertIsNot(info, updatedInfo)
+        self.assertEqual(1024, updatedInfo.rss)
+
+        runningFrame.childrenProcs['105']['rss'] = 2048
+        runningFrame.childrenProcs['106'] = dict(runningFrame.childrenProcs['105'],
+                                                 cmd_line=['sleep', '120'])
+        updatedInfo = runningFrame.runningFrameInfo()
+        self.assertEqual([2048, 2048], [child.stat.rss for child in updatedInfo.children.children])
+        self.assertEqual('sleep 120', updatedInfo.children.children[1].cmdline)
+
     def test_getBootReport(self):
         bootReport = self.machine.getBootReport()
 
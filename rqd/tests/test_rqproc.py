@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Tests for rqd.rqproc."""
+
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+
+import unittest
+
+import mock
+import pyfakefs.fake_filesystem_unittest
+
+import rqd.rqproc
+
+
+PROC_PID_STAT = ('{pid} ({name}) {state} {ppid} {session} {session} 0 -1 4210688 317 0 1 0 31 '
+                 '13 0 0 20 0 1 0 {start} 4460544 154 18446744073709551615 4194304 4204692 '
+                 '140725890735264 0 0 0 0 16781318 0 0 0 0 17 4 0 0 0 0 0 6303248 6304296 '
+                 '23932928 140725890743234 140725890743420 140725890743420 140725890744298 0')
+PROC_PID_STATM = '152510 14585 7032 9343 0 65453 0'
+PROC_PID_STATUS = 'Name:\tsleep\nVmSwap:\t    12 kB\n'
+
+
+class FrameProcSamplerTests(pyfakefs.fake_filesystem_unittest.TestCase):
+    """Tests for rqd.rqproc.FrameProcSampler."""
+
+    def setUp(self):
+        self.setUpPyfakefs()
+        self.sampler = rqd.rqproc.FrameProcSampler(rescanInterval=0)
+
+    def _createProc(self, pid, ppid, session, children=(), name='sleep', state='S',
+                    start=17385159):
+        self.fs.create_file('/proc/%d/stat' % pid, contents=PROC_PID_STAT.format(
+            pid=pid, name=name, state=state, ppid=ppid, session=session, start=start))
+        self.fs.create_file('/proc/%d/statm' % pid, contents=PROC_PID_STATM)
+        self.fs.create_file('/proc/%d/status' % pid, contents=PROC_PID_STATUS)
+        self.fs.create_file('/proc/%d/cmdline' % pid, contents='%s\0-c\0%d\0' % (name, pid))
+        self.fs.create_file('/proc/%d/task/%d/children' % (pid, pid),
+                            contents=' '.join(str(child) for child in children))
+
+    def _removeProc(self, pid):
+        self.fs.remove_object('/proc/%d' % pid)
+
+    def test_sampleWalksFrameTree(self):
+        self._createProc(100, 1, 100, children=[101])
+        self._createProc(101, 100, 100, children=[102])
+        self._createProc(102, 101, 102)
+        self._createProc(300, 1, 300)
+
+        pids, sessions = self.sampler.sample(['100'])
+
+        self.assertEqual({'100', '101', '102'}, set(sessions['100']))
+        self.assertEqual({'100', '101', '102'}, set(pids))
+        self.assertEqual(['sleep', '-c', '101'], pids['101']['cmd_line'])
+        self.assertEqual(12, pids['101']['swap'])
+        self.assertEqual(14585, pids['101']['statm_rss'])
+
+    def test_sampleSkipsInvalidPids(self):
+        pids, sessions = self.sampler.sample(['None', '-1', '404'])
+
+        self.assertEqual({}, pids)
+        self.assertEqual({'404': []}, sessions)
+
+    def test_sampleSkipsZombies(self):
+        self._createProc(100, 1, 100, children=[101])
+        self._createProc(101, 100, 100, state='Z')
+
+        _, sessions = self.sampler.sample(['100'])
+
+        self.assertEqual(['100'], sessions['100'])
+
+    def test_sampleKeepsReparentedChildren(self):
+        self._createProc(100, 1, 100, children=[101])
+        self._createProc(101, 100, 100)
+        self.sampler.sample(['100'])
+
+        # 101 got reparented to init and isn't listed as a child of 100 anymore
+        self.fs.get_object('/proc/100/task/100/children').set_contents('')
+
+        _, sessions = self.sampler.sample(['100'])
+
+        self.assertEqual({'100', '101'}, set(sessions['100']))
+
+    def test_sampleDropsReusedPid(self):
+        self._createProc(100, 1, 100, children=[101])
+        self._createProc(101, 100, 100)
+        self.sampler.sample(['100'])
+
+        self.fs.get_object('/proc/100/task/100/children').set_contents('')
+        self._removeProc(101)
+        self._createProc(101, 1, 101, start=99999999)
+
+        pids, sessions = self.sampler.sample(['100'])
+
+        self.assertEqual(['100'], sessions['100'])
+        self.assertNotIn('101', pids)
+
+    def test_sampleDropsDeadPids(self):
+        self._createProc(100, 1, 100, children=[101])
+        self._createProc(101, 100, 100)
+        self.sampler.sample(['100'])
+
+        self._removeProc(101)
+        self.fs.get_object('/proc/100/task/100/children').set_contents('')
+
+        pids, sessions = self.sampler.sample(['100'])
+
+        self.assertEqual(['100'], sessions['100'])
+        self.assertEqual({'100'}, set(pids))
+
+    @mock.patch('rqd.rqproc.getCmdline', return_value=['sleep'])
+    def test_sampleCachesCmdline(self, getCmdlineMock):
+        self._createProc(100, 1, 100)
+
+        self.sampler.sample(['100'])
+        self.sampler.sample(['100'])
+
+        getCmdlineMock.assert_called_once_with('100')
+
+    def test_rescanAdoptsSessionMembers(self):
+        sampler = rqd.rqproc.FrameProcSampler(rescanInterval=2)
+        self._createProc(100, 1, 100)
+        # Daemonized process that already got reparented
+        self._createProc(200, 1, 100)
+        self._createProc(300, 1, 300)
+
+        _, sessions = sampler.sample(['100'])
+        self.assertEqual({'100', '200'}, set(sessions['100']))
+
+        # Followed by a tree walk only
+        self._createProc(201, 1, 100)
+        _, sessions = sampler.sample(['100'])
+        self.assertEqual({'100', '200'}, set(sessions['100']))
+
+        _, sessions = sampler.sample(['100'])
+        self.assertEqual({'100', '200', '201'}, set(sessions['100']))
+
+
+class ProcHelpersTests(pyfakefs.fake_filesystem_unittest.TestCase):
+    """Tests for the rqd.rqproc helper functions."""
+
+    def setUp(self):
+        self.setUpPyfakefs()
+
+    def test_getCmdlineSplitsRewrittenTitle(self):
+        self.fs.create_file('/proc/100/cmdline', contents='nginx: worker process\0')
+
+        self.assertEqual(['nginx:', 'worker', 'process'], rqd.rqproc.getCmdline(100))
+
+    def test_getChildPidsAllThreads(self):
+        self.fs.create_file('/proc/100/task/100/children', contents='101 102 ')
+        self.fs.create_file('/proc/100/task/105/children', contents='103 ')
+
+        self.assertEqual(['101', '102', '103'], sorted(rqd.rqproc.getChildPids(100)))
+
+    def test_getChildPidsMissingProcess(self):
+        self.assertEqual([], rqd.rqproc.getChildPids(100))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+#  Copyright Contributors to the OpenCue Project
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+"""Tests for rqd.rqtopology."""
+
+
+from __future__ import print_function
+from __future__ import division
+from __future__ import absolute_import
+
+import os
+import unittest
+
+import pyfakefs.fake_filesystem_unittest
+
+import rqd.rqconstants
+import rqd.rqtopology
+
+
+def makeHost(sockets, coresPerSocket, threadsPerCore=2):
+    """Returns the procs_by_physid_and_coreid mapping of a host, processors
+    being numbered like linux does, first threads of every core first."""
+    procs = {}
+    totalCores = sockets * coresPerSocket
+    for socket in range(sockets):
+        for core in range(coresPerSocket):
+            first = socket * coresPerSocket + core
+            procs.setdefault(str(socket), {})[str(core)] = {
+                str(first + thread * totalCores) for thread in range(threadsPerCore)}
+    return procs
+
+
+def cpuList(cpus):
+    return ",".join(str(cpu) for cpu in sorted(cpus))
+
+
+class CpuTopologyTests(pyfakefs.fake_filesystem_unittest.TestCase):
+    """Tests for rqd.rqtopology.CpuTopology and CoreIndex on synthetic sysfs trees."""
+
+    def setUp(self):
+        self.setUpPyfakefs()
+
+    def _createSysfs(self, procs, coresPerNode, coresPerL3):
+        """Creates the node cpulists and L3 caches of a host, grouping its
+        cores in order."""
+        cores = [(physid, coreid) for physid in sorted(procs, key=int)
+                 for coreid in sorted(procs[physid], key=int)]
+        for first in range(0, len(cores), coresPerNode):
+            cpus = set()
+            for physid, coreid in cores[first:first + coresPerNode]:
+                cpus.update(int(proc) for proc in procs[physid][coreid])
+            self.fs.create_file(
+                os.path.join(rqd.rqconstants.PATH_SYS_NODE,
+                             'node%d' % (first // coresPerNode), 'cpulist'),
+                contents=cpuList(cpus) + '\n')
+        for first in range(0, len(cores), coresPerL3):
+            cpus = set()
+            for physid, coreid in cores[first:first + coresPerL3]:
+                cpus.update(int(proc) for proc in procs[physid][coreid])
+            for cpu in cpus:
+                cacheDir = os.path.join(rqd.rqconstants.PATH_SYS_CPU, 'cpu%d' % cpu, 'cache')
+                self.fs.create_file(os.path.join(cacheDir, 'index0', 'level'), contents='1\n')
+                self.fs.create_file(os.path.join(cacheDir, 'index0', 'shared_cpu_list'),
+                                    contents='%d\n' % cpu)
+                self.fs.create_file(os.path.join(cacheDir, 'index3', 'level'), contents='3\n')
+                self.fs.create_file(os.path.join(cacheDir, 'index3', 'shared_cpu_list'),
+                                    contents=cpuList(cpus) + '\n')
+
+    def test_parseCpuList(self):
+        self.assertEqual(['0', '1', '2', '8', '10', '11'],
+                         rqd.rqtopology.parseCpuList('0-2,8,10-11\n'))
+
+    def test_topologyWithoutSysfs(self):
+        topology = rqd.rqtopology.CpuTopology(makeHost(2, 4))
+
+        self.assertEqual(8, len(topology.cores))
+        self.assertEqual(topology.nodeByCore[('0', '0')], topology.nodeByCore[('0', '3')])
+        self.assertNotEqual(topology.nodeByCore[('0', '0')], topology.nodeByCore[('1', '0')])
+
+    def test_topologyFromSysfs(self):
+        # One socket, 2 NUMA nodes of 2 L3 domains of 4 cores
+        procs = makeHost(1, 16)
+        self._createSysfs(procs, coresPerNode=8, coresPerL3=4)
+
+        topology = rqd.rqtopology.CpuTopology(procs)
+
+        self.assertEqual(0, topology.nodeByCore[('0', '7')])
+        self.assertEqual(1, topology.nodeByCore[('0', '8')])
+        self.assertEqual(topology.l3ByCore[('0', '4')], topology.l3ByCore[('0', '7')])
+        self.assertNotEqual(topology.l3ByCore[('0', '3')], topology.l3ByCore[('0', '4')])
+
+    def test_reserveWithinL3Domain(self):
+        procs = makeHost(1, 16)
+        self._createSysfs(procs, coresPerNode=8, coresPerL3=4)
+        index = rqd.rqtopology.CoreIndex(rqd.rqtopology.CpuTopology(procs))
+
+        self.assertEqual([('0', '0'), ('0', '1'), ('0', '2')], index.reserve(3))
+        # The partly used domain is the best fit
+        self.assertEqual([('0', '3')], index.reserve(1))
+        self.assertEqual([('0', '4'), ('0', '5'), ('0', '6'), ('0', '7')], index.reserve(4))
+        self.assertEqual(8, index.freeCount)
+
+    def test_reserveWithinNumaNode(self):
+        procs = makeHost(1, 16)
+        self._createSysfs(procs, coresPerNode=8, coresPerL3=4)
+        index = rqd.rqtopology.CoreIndex(rqd.rqtopology.CpuTopology(procs))
+        index.reserve(2)
+
+        cores = index.reserve(6)
+
+        # Too large for an L3 domain, the rest of the first node fits exactly
+        self.assertEqual([('0', str(core)) for core in range(2, 8)], cores)
+        self.assertEqual([('0', str(core)) for core in range(8, 13)], index.reserve(5))
+
+    def test_reserveSpreadsOverFewestNodes(self):
+        procs = makeHost(2, 4)
+        index = rqd.rqtopology.CoreIndex(rqd.rqtopology.CpuTopology(procs))
+        index.reserve(1)
+
+        cores = index.reserve(6)
+
+        # All of the free node first
+        self.assertEqual(4, len([core for core in cores if core[0] == '1']))
+        self.assertEqual(1, index.freeCount)
+
+    def test_reserveContiguousAfterRelease(self):
+        procs = makeHost(1, 8)
+        index = rqd.rqtopology.CoreIndex(rqd.rqtopology.CpuTopology(procs))
+        index.reserve(8)
+        index.release([('0', '1'), ('0', '4'), ('0', '5'), ('0', '6')])
+
+        self.assertEqual([('0', '4'), ('0', '5')], index.reserve(2))
+
+    def test_reserveNotEnoughCores(self):
+        index = rqd.rqtopology.CoreIndex(rqd.rqtopology.CpuTopology(makeHost(1, 4)))
+
+        self.assertFalse(index.canReserve(5))
+        self.assertIsNone(index.reserve(5))
+        self.assertEqual(4, index.freeCount)
+
+    def test_releaseIgnoresFreeAndUnknownCores(self):
+        index = rqd.rqtopology.CoreIndex(rqd.rqtopology.CpuTopology(makeHost(1, 4)))
+        cores = index.reserve(2)
+
+        index.release(cores + [('0', '3'), ('7', '0')])
+        index.release(cores)
+
+        self.assertEqual(4, index.freeCount)
+        self.assertEqual({'0': {'0', '1', '2', '3'}}, index.getFreeBySocket())
+
+
+if __name__ == '__main__':
+    unittest.main()